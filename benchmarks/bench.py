@@ -0,0 +1,304 @@
+"""Benchmark the monitor against a fake management API.
+
+Each requester backend is measured in its own process, so the peak resident
+set size of one backend does not hide another's. For example:
+
+    python benchmarks/bench.py --vhosts 20 --queues 500 --json results.json
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Sequence
+
+from fake_server import FakeManagementServer, SyntheticCluster
+
+from jetblack_rabbitmqmon import Monitor
+from jetblack_rabbitmqmon.publish import OutgoingMessage
+
+BACKENDS: Mapping[str, Sequence[str]] = {
+    'asyncio': ('jetblack_rabbitmqmon.clients.asyncio_requester', 'AsyncioRequester'),
+    'aiohttp': ('jetblack_rabbitmqmon.clients.aiohttp_requester', 'AioHttpRequester'),
+    'httpx': ('jetblack_rabbitmqmon.clients.httpx_requester', 'HttpxRequester'),
+}
+
+
+class Context:
+    """The state shared by the scenarios"""
+
+    def __init__(self, monitor: Monitor, args: argparse.Namespace) -> None:
+        self.monitor = monitor
+        self.args = args
+        self.vhosts: List[Any] = []
+        self.queues: List[Any] = []
+        self.exchange: Any = None
+
+    async def setup(self) -> None:
+        """Fetch the objects which the scenarios operate on."""
+        self.vhosts = list((await self.monitor.vhosts()).values())
+        queues = await self.vhosts[0].queues()
+        self.queues = list(queues.values())[:self.args.refresh_count]
+        exchanges = await self.vhosts[0].exchanges()
+        self.exchange = next(iter(exchanges.values()))
+
+
+async def _monitor_vhosts(context: Context) -> int:
+    return len(await context.monitor.vhosts())
+
+
+async def _vhost_queues(context: Context) -> int:
+    count = 0
+    for vhost in context.vhosts:
+        count += len(await vhost.queues())
+    return count
+
+
+async def _queue_refresh(context: Context) -> int:
+    await asyncio.gather(*(queue.refresh() for queue in context.queues))
+    return len(context.queues)
+
+
+async def _queue_get_messages(context: Context) -> int:
+    messages = await context.queues[0].get_messages(count=context.args.message_count)
+    return len(messages)
+
+
+async def _monitor_connections(context: Context) -> int:
+    return len(await context.monitor.connections())
+
+
+async def _monitor_channels(context: Context) -> int:
+    return len(await context.monitor.channels())
+
+
+async def _exchange_publish_many(context: Context) -> int:
+    messages = (
+        OutgoingMessage(f'key.{index % 16}', 'x' * 256)
+        for index in range(context.args.publish_count)
+    )
+    result = await context.exchange.publish_many(messages)
+    return result.published
+
+
+async def _monitor_snapshot(context: Context) -> int:
+    snapshot = await context.monitor.snapshot()
+    return (
+        len(snapshot.queues) + len(snapshot.exchanges) + len(snapshot.bindings)
+        + len(snapshot.consumers) + len(snapshot.connections) + len(snapshot.channels)
+    )
+
+
+SCENARIOS: Mapping[str, Callable[[Context], Awaitable[int]]] = {
+    'Monitor.vhosts': _monitor_vhosts,
+    'VHost.queues': _vhost_queues,
+    'VHostQueue.refresh': _queue_refresh,
+    'VHostQueue.get_messages': _queue_get_messages,
+    'Monitor.connections': _monitor_connections,
+    'Monitor.channels': _monitor_channels,
+    'VHostExchange.publish_many': _exchange_publish_many,
+    'Monitor.snapshot': _monitor_snapshot,
+}
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes.
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+async def _measure(
+        scenario: Callable[[Context], Awaitable[int]],
+        context: Context,
+        repeat: int
+) -> Dict[str, Any]:
+    entities = await scenario(context)  # Warm up.
+    latencies: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await scenario(context)
+        latencies.append(time.perf_counter() - start)
+
+    # Measure the allocations separately, as tracing slows everything down.
+    tracemalloc.start()
+    await scenario(context)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'entities': entities,
+        'latency_min_ms': latencies[0] * 1000,
+        'latency_median_ms': statistics.median(latencies) * 1000,
+        'latency_p95_ms': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000,
+        'throughput_per_s': entities * len(latencies) / sum(latencies),
+        'alloc_peak_kib': peak / 1024,
+        'rss_peak_mib': _peak_rss_mib(),
+    }
+
+
+async def run_backend(backend: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the scenarios with a requester backend.
+
+    Args:
+        backend (str): The name of the backend.
+        args (argparse.Namespace): The command line arguments.
+
+    Returns:
+        Dict[str, Any]: The results of each scenario.
+    """
+    module_name, class_name = BACKENDS[backend]
+    requester_class = getattr(importlib.import_module(module_name), class_name)
+    cluster = SyntheticCluster(
+        vhosts=args.vhosts,
+        queues_per_vhost=args.queues,
+        connections=args.connections,
+        channels_per_connection=args.channels
+    )
+    async with FakeManagementServer(cluster, compress=args.gzip) as server:
+        async with Monitor(requester_class(server.url, 'guest', 'guest')) as monitor:
+            context = Context(monitor, args)
+            await context.setup()
+            results = {}
+            for name, scenario in SCENARIOS.items():
+                if args.scenario and name not in args.scenario:
+                    continue
+                results[name] = await _measure(scenario, context, args.repeat)
+    return results
+
+
+def _available(backend: str) -> bool:
+    try:
+        importlib.import_module(BACKENDS[backend][0])
+        return True
+    except ImportError:
+        return False
+
+
+def _print_table(results: Mapping[str, Mapping[str, Mapping[str, Any]]]) -> None:
+    header = (
+        f"{'backend':<8} {'scenario':<26} {'entities':>8} {'median ms':>10} "
+        f"{'p95 ms':>9} {'entities/s':>11} {'alloc KiB':>10} {'RSS MiB':>8}"
+    )
+    print(header)
+    print('-' * len(header))
+    for backend, scenarios in results.items():
+        for name, result in scenarios.items():
+            print(
+                f"{backend:<8} {name:<26} {result['entities']:>8} "
+                f"{result['latency_median_ms']:>10.2f} {result['latency_p95_ms']:>9.2f} "
+                f"{result['throughput_per_s']:>11.0f} {result['alloc_peak_kib']:>10.0f} "
+                f"{result['rss_peak_mib']:>8.1f}"
+            )
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vhosts', type=int, default=10, help='the number of vhosts')
+    parser.add_argument('--queues', type=int, default=200, help='the queues in each vhost')
+    parser.add_argument('--connections', type=int, default=200, help='the connections')
+    parser.add_argument('--channels', type=int, default=5, help='the channels per connection')
+    parser.add_argument('--repeat', type=int, default=20, help='the timed runs of each scenario')
+    parser.add_argument(
+        '--refresh-count',
+        type=int,
+        default=100,
+        help='the queues refreshed concurrently'
+    )
+    parser.add_argument(
+        '--message-count',
+        type=int,
+        default=10,
+        help='the messages to get from a queue'
+    )
+    parser.add_argument(
+        '--publish-count',
+        type=int,
+        default=1000,
+        help='the messages to publish'
+    )
+    parser.add_argument('--gzip', action='store_true', help='compress the responses')
+    parser.add_argument(
+        '--backend',
+        action='append',
+        choices=list(BACKENDS),
+        help='the requester backends, defaulting to all which are installed'
+    )
+    parser.add_argument(
+        '--scenario',
+        action='append',
+        choices=list(SCENARIOS),
+        help='the scenarios, defaulting to all'
+    )
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def _worker_argv(args: argparse.Namespace, backend: str) -> List[str]:
+    argv = [
+        '--vhosts', str(args.vhosts),
+        '--queues', str(args.queues),
+        '--connections', str(args.connections),
+        '--channels', str(args.channels),
+        '--repeat', str(args.repeat),
+        '--refresh-count', str(args.refresh_count),
+        '--message-count', str(args.message_count),
+        '--publish-count', str(args.publish_count),
+        '--backend', backend,
+        '--worker',
+    ]
+    if args.gzip:
+        argv.append('--gzip')
+    for scenario in args.scenario or ():
+        argv.extend(('--scenario', scenario))
+    return argv
+
+
+def main(argv: Sequence[str]) -> None:
+    """Run the benchmarks."""
+    args = _parse_args(argv)
+
+    if args.worker:
+        results = asyncio.run(run_backend(args.backend[0], args))
+        json.dump(results, sys.stdout)
+        return
+
+    backends = args.backend or [name for name in BACKENDS if _available(name)]
+    results: Dict[str, Any] = {}
+    for backend in backends:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *_worker_argv(args, backend)],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+        results[backend] = json.loads(output.stdout)
+
+    _print_table(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(
+                {
+                    'python': sys.version,
+                    'arguments': {
+                        name: value
+                        for name, value in vars(args).items()
+                        if name not in ('json', 'worker')
+                    },
+                    'results': results,
+                },
+                file,
+                indent=2
+            )
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
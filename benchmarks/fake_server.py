@@ -0,0 +1,615 @@
+"""A fake RabbitMQ management API serving a synthetic cluster"""
+
+import asyncio
+import gzip
+import json
+import random
+import re
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+def _rate_details(rate: float) -> Dict[str, Any]:
+    return {'rate': rate}
+
+
+def _message_stats(rng: random.Random) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {}
+    for name in ('publish', 'deliver_get', 'deliver', 'ack', 'redeliver', 'get'):
+        stats[name] = rng.randrange(1_000_000)
+        stats[f'{name}_details'] = _rate_details(round(rng.uniform(0, 500), 1))
+    return stats
+
+
+class SyntheticCluster:
+    """The payloads of a synthetic cluster"""
+
+    def __init__(
+            self,
+            vhosts: int = 10,
+            queues_per_vhost: int = 100,
+            connections: int = 100,
+            channels_per_connection: int = 5,
+            nodes: int = 3,
+            message_size: int = 256,
+            seed: int = 42
+    ) -> None:
+        """The payloads of a synthetic cluster, shaped like the responses of
+        the management API.
+
+        Args:
+            vhosts (int, optional): The number of vhosts. Defaults to 10.
+            queues_per_vhost (int, optional): The number of queues in each
+                vhost. Defaults to 100.
+            connections (int, optional): The number of connections, spread
+                over the vhosts. Defaults to 100.
+            channels_per_connection (int, optional): The number of channels on
+                each connection. Defaults to 5.
+            nodes (int, optional): The number of nodes. Defaults to 3.
+            message_size (int, optional): The size of the message payloads
+                returned when getting messages. Defaults to 256.
+            seed (int, optional): The random seed. Defaults to 42.
+        """
+        rng = random.Random(seed)
+        self.message_size = message_size
+        self.nodes = [
+            self._node(f'rabbit@node{index}', rng)
+            for index in range(nodes)
+        ]
+        node_names = [node['name'] for node in self.nodes]
+        self.vhosts = [
+            self._vhost(f'vhost-{index}', rng)
+            for index in range(vhosts)
+        ]
+        self.queues = [
+            self._queue(vhost['name'], f'queue-{index}', rng.choice(node_names), rng)
+            for vhost in self.vhosts
+            for index in range(queues_per_vhost)
+        ]
+        self.exchanges = [
+            self._exchange(vhost['name'], name, kind)
+            for vhost in self.vhosts
+            for name, kind in (
+                ('', 'direct'),
+                ('amq.direct', 'direct'),
+                ('amq.fanout', 'fanout'),
+                ('amq.topic', 'topic'),
+                ('amq.headers', 'headers'),
+            )
+        ]
+        self.connections = [
+            self._connection(
+                index,
+                self.vhosts[index % len(self.vhosts)]['name'],
+                rng.choice(node_names),
+                channels_per_connection,
+                rng
+            )
+            for index in range(connections)
+        ]
+        self.channels = [
+            self._channel(connection, number, rng)
+            for connection in self.connections
+            for number in range(1, channels_per_connection + 1)
+        ]
+        self.overview = {
+            'management_version': '3.12.0',
+            'rabbitmq_version': '3.12.0',
+            'cluster_name': 'rabbit@synthetic',
+            'node': node_names[0],
+            'object_totals': {
+                'connections': len(self.connections),
+                'channels': len(self.channels),
+                'exchanges': len(self.exchanges),
+                'queues': len(self.queues),
+                'consumers': sum(queue['consumers'] for queue in self.queues),
+            },
+            'queue_totals': {
+                'messages': sum(queue['messages'] for queue in self.queues),
+                'messages_ready': sum(queue['messages_ready'] for queue in self.queues),
+                'messages_unacknowledged': sum(
+                    queue['messages_unacknowledged'] for queue in self.queues
+                ),
+            },
+            'message_stats': _message_stats(rng),
+        }
+        self.bindings = [
+            self._binding(queue, exchange)
+            for queue in self.queues
+            for exchange in ('', 'amq.direct')
+        ]
+        vhost_channels: Dict[str, List[Dict[str, Any]]] = {}
+        for channel in self.channels:
+            vhost_channels.setdefault(channel['vhost'], []).append(channel)
+        self.consumers = [
+            self._consumer(queue, channels[(index + number) % len(channels)], number)
+            for index, queue in enumerate(self.queues)
+            if (channels := vhost_channels.get(queue['vhost']))
+            for number in range(queue['consumers'])
+        ]
+
+    @staticmethod
+    def _node(name: str, rng: random.Random) -> Dict[str, Any]:
+        return {
+            'name': name,
+            'type': 'disc',
+            'running': True,
+            'mem_used': rng.randrange(100_000_000, 2_000_000_000),
+            'mem_limit': 6_000_000_000,
+            'disk_free': rng.randrange(10_000_000_000, 100_000_000_000),
+            'disk_free_limit': 50_000_000,
+            'fd_used': rng.randrange(100, 5000),
+            'fd_total': 1_048_576,
+            'sockets_used': rng.randrange(100, 5000),
+            'sockets_total': 943_626,
+            'proc_used': rng.randrange(1000, 50_000),
+            'proc_total': 1_048_576,
+            'uptime': rng.randrange(1_000_000, 100_000_000),
+            'partitions': [],
+            'applications': [],
+        }
+
+    @staticmethod
+    def _vhost(name: str, rng: random.Random) -> Dict[str, Any]:
+        messages = rng.randrange(100_000)
+        return {
+            'name': name,
+            'description': '',
+            'tags': [],
+            'tracing': False,
+            'cluster_state': {},
+            'messages': messages,
+            'messages_ready': messages,
+            'messages_unacknowledged': 0,
+            'message_stats': _message_stats(rng),
+            'recv_oct': rng.randrange(1 << 30),
+            'send_oct': rng.randrange(1 << 30),
+        }
+
+    @staticmethod
+    def _queue(vhost: str, name: str, node: str, rng: random.Random) -> Dict[str, Any]:
+        ready = rng.randrange(10_000)
+        unacknowledged = rng.randrange(100)
+        return {
+            'vhost': vhost,
+            'name': name,
+            'node': node,
+            'durable': True,
+            'auto_delete': False,
+            'exclusive': False,
+            'arguments': {'x-queue-type': 'classic'},
+            'type': 'classic',
+            'state': 'running',
+            'policy': None,
+            'consumers': rng.randrange(5),
+            'consumer_utilisation': None,
+            'memory': rng.randrange(10_000, 10_000_000),
+            'messages': ready + unacknowledged,
+            'messages_details': _rate_details(0.0),
+            'messages_ready': ready,
+            'messages_ready_details': _rate_details(0.0),
+            'messages_unacknowledged': unacknowledged,
+            'messages_unacknowledged_details': _rate_details(0.0),
+            'message_stats': _message_stats(rng),
+            'idle_since': '2024-01-01T00:00:00.000+00:00',
+            'garbage_collection': {
+                'fullsweep_after': 65535,
+                'max_heap_size': 0,
+                'min_bin_vheap_size': 46422,
+                'min_heap_size': 233,
+                'minor_gcs': rng.randrange(1000),
+            },
+            'backing_queue_status': {
+                'mode': 'default',
+                'q1': 0,
+                'q2': 0,
+                'q3': 0,
+                'q4': ready,
+                'delta': ['delta', 'undefined', 0, 0, 'undefined'],
+                'len': ready,
+                'target_ram_count': 'infinity',
+                'avg_ingress_rate': rng.uniform(0, 100),
+                'avg_egress_rate': rng.uniform(0, 100),
+            },
+        }
+
+    @staticmethod
+    def _exchange(vhost: str, name: str, kind: str) -> Dict[str, Any]:
+        return {
+            'vhost': vhost,
+            'name': name,
+            'type': kind,
+            'durable': True,
+            'auto_delete': False,
+            'internal': False,
+            'arguments': {},
+        }
+
+    @staticmethod
+    def _connection(
+            index: int,
+            vhost: str,
+            node: str,
+            channels: int,
+            rng: random.Random
+    ) -> Dict[str, Any]:
+        peer_port = 40000 + index
+        return {
+            'name': f'10.0.0.1:{peer_port} -> 10.0.1.1:5672',
+            'node': node,
+            'vhost': vhost,
+            'user': 'app',
+            'protocol': 'AMQP 0-9-1',
+            'type': 'network',
+            'host': '10.0.1.1',
+            'port': 5672,
+            'peer_host': '10.0.0.1',
+            'peer_port': peer_port,
+            'auth_mechanism': 'PLAIN',
+            'ssl': False,
+            'ssl_hash': None,
+            'ssl_cipher': None,
+            'ssl_protocol': None,
+            'peer_cert_validity': None,
+            'peer_cert_issuer': None,
+            'peer_cert_subject': None,
+            'state': 'running',
+            'channels': channels,
+            'channel_max': 2047,
+            'frame_max': 131072,
+            'timeout': 60,
+            'connected_at': 1_700_000_000_000 + index,
+            'client_properties': {
+                'product': 'bench',
+                'version': '1.0',
+                'capabilities': {'publisher_confirms': True},
+            },
+            'recv_oct': rng.randrange(1 << 30),
+            'recv_oct_details': _rate_details(round(rng.uniform(0, 1e5), 1)),
+            'send_oct': rng.randrange(1 << 30),
+            'send_oct_details': _rate_details(round(rng.uniform(0, 1e5), 1)),
+        }
+
+    @staticmethod
+    def _channel(
+            connection: Mapping[str, Any],
+            number: int,
+            rng: random.Random
+    ) -> Dict[str, Any]:
+        return {
+            'name': f"{connection['name']} ({number})",
+            'node': connection['node'],
+            'vhost': connection['vhost'],
+            'user': connection['user'],
+            'number': number,
+            'state': 'running',
+            'confirm': False,
+            'transactional': False,
+            'consumer_count': rng.randrange(3),
+            'prefetch_count': 10,
+            'messages_unacknowledged': rng.randrange(10),
+            'messages_unconfirmed': 0,
+            'connection_details': {
+                'name': connection['name'],
+                'peer_host': connection['peer_host'],
+                'peer_port': connection['peer_port'],
+            },
+            'message_stats': _message_stats(rng),
+        }
+
+    @staticmethod
+    def _binding(queue: Mapping[str, Any], exchange: str) -> Dict[str, Any]:
+        return {
+            'vhost': queue['vhost'],
+            'source': exchange,
+            'destination': queue['name'],
+            'destination_type': 'queue',
+            'routing_key': queue['name'],
+            'arguments': {},
+            'properties_key': queue['name'],
+        }
+
+    @staticmethod
+    def _consumer(
+            queue: Mapping[str, Any],
+            channel: Mapping[str, Any],
+            number: int
+    ) -> Dict[str, Any]:
+        return {
+            'queue': {'vhost': queue['vhost'], 'name': queue['name']},
+            'channel_details': {
+                'name': channel['name'],
+                'connection_name': channel['connection_details']['name'],
+                'number': channel['number'],
+                'node': channel['node'],
+                'user': channel['user'],
+                'peer_host': channel['connection_details']['peer_host'],
+                'peer_port': channel['connection_details']['peer_port'],
+            },
+            'consumer_tag': f"amq.ctag-{queue['name']}-{number}",
+            'ack_required': True,
+            'exclusive': False,
+            'prefetch_count': channel['prefetch_count'],
+            'active': True,
+            'activity_status': 'up',
+            'arguments': {},
+        }
+
+    def messages(self, queue: Mapping[str, Any], count: int) -> List[Dict[str, Any]]:
+        """The messages returned by getting from a queue."""
+        payload = 'x' * self.message_size
+        return [
+            {
+                'payload_bytes': self.message_size,
+                'redelivered': False,
+                'exchange': '',
+                'routing_key': queue['name'],
+                'message_count': max(queue['messages_ready'] - index - 1, 0),
+                'properties': {'delivery_mode': 2, 'headers': {}},
+                'payload': payload,
+                'payload_encoding': 'string',
+            }
+            for index in range(min(count, queue['messages_ready']))
+        ]
+
+
+def _project(item: Mapping[str, Any], columns: Sequence[str]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    for column in columns:
+        source: Any = item
+        path = column.split('.')
+        for name in path:
+            if not isinstance(source, Mapping) or name not in source:
+                break
+            source = source[name]
+        else:
+            target = result
+            for name in path[:-1]:
+                target = target.setdefault(name, {})
+            target[path[-1]] = source
+    return result
+
+
+def _query(
+        items: List[Dict[str, Any]],
+        query: Mapping[str, List[str]]
+) -> Any:
+    if 'name' in query:
+        pattern = query['name'][0]
+        if query.get('use_regex', ['false'])[0] == 'true':
+            regex = re.compile(pattern)
+            items = [item for item in items if regex.search(item['name'])]
+        else:
+            items = [item for item in items if pattern in item['name']]
+    if 'columns' in query:
+        columns = query['columns'][0].split(',')
+        items = [_project(item, columns) for item in items]
+    if 'page' not in query:
+        return items
+    page = int(query['page'][0])
+    page_size = int(query.get('page_size', ['100'])[0])
+    start = (page - 1) * page_size
+    return {
+        'items': items[start:start + page_size],
+        'page': page,
+        'page_size': page_size,
+        'page_count': max((len(items) + page_size - 1) // page_size, 1),
+        'filtered_count': len(items),
+        'item_count': len(items[start:start + page_size]),
+        'total_count': len(items),
+    }
+
+
+class FakeManagementServer:
+    """A fake RabbitMQ management API"""
+
+    def __init__(
+            self,
+            cluster: SyntheticCluster,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            compress: bool = False
+    ) -> None:
+        """A fake RabbitMQ management API serving a synthetic cluster over
+        HTTP/1.1 with keep-alive.
+
+        The cluster does not change, so each response is encoded once and
+        served from a cache. This keeps the cost of the server, which shares
+        the process with the client being measured, small and constant.
+
+        Args:
+            cluster (SyntheticCluster): The cluster.
+            host (str, optional): The address to listen on. Defaults to
+                '127.0.0.1'.
+            port (int, optional): The port to listen on, where 0 chooses a free
+                port. Defaults to 0.
+            compress (bool, optional): If true gzip the responses for clients
+                which accept it. Defaults to False.
+        """
+        self.cluster = cluster
+        self.host = host
+        self.port = port
+        self.compress = compress
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._cache: Dict[Tuple[str, str, bytes, bool], Tuple[int, bytes]] = {}
+        self._queues = {
+            (queue['vhost'], queue['name']): queue
+            for queue in cluster.queues
+        }
+        self._connections = {
+            connection['name']: connection
+            for connection in cluster.connections
+        }
+        self._channels = {
+            channel['name']: channel
+            for channel in cluster.channels
+        }
+        self._nodes = {node['name']: node for node in cluster.nodes}
+        self._vhosts = {vhost['name']: vhost for vhost in cluster.vhosts}
+
+    @property
+    def url(self) -> str:
+        """The url of the server."""
+        return f'http://{self.host}:{self.port}'
+
+    async def start(self) -> None:
+        """Start listening."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> 'FakeManagementServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop()
+
+    def _route(
+            self,
+            method: str,
+            path: List[str],
+            query: Mapping[str, List[str]],
+            body: bytes
+    ) -> Tuple[int, Any]:
+        cluster = self.cluster
+        match (method, path):
+            case ('GET', ['overview']):
+                return 200, cluster.overview
+            case ('GET', ['cluster-name']):
+                return 200, {'name': cluster.overview['cluster_name']}
+            case ('GET', ['nodes']):
+                return 200, _query(cluster.nodes, query)
+            case ('GET', ['nodes', name]) if name in self._nodes:
+                return 200, self._nodes[name]
+            case ('GET', ['vhosts']):
+                return 200, _query(cluster.vhosts, query)
+            case ('GET', ['vhosts', vhost]) if vhost in self._vhosts:
+                return 200, self._vhosts[vhost]
+            case ('GET', ['vhosts', vhost, 'connections']):
+                return 200, _query(
+                    [item for item in cluster.connections if item['vhost'] == vhost],
+                    query
+                )
+            case ('GET', ['vhosts', vhost, 'channels']):
+                return 200, _query(
+                    [item for item in cluster.channels if item['vhost'] == vhost],
+                    query
+                )
+            case ('GET', ['queues']):
+                return 200, _query(cluster.queues, query)
+            case ('GET', ['queues', vhost]):
+                return 200, _query(
+                    [item for item in cluster.queues if item['vhost'] == vhost],
+                    query
+                )
+            case ('GET', ['queues', vhost, name]) if (vhost, name) in self._queues:
+                return 200, self._queues[(vhost, name)]
+            case ('POST', ['queues', vhost, name, 'get']) if (vhost, name) in self._queues:
+                request = json.loads(body or b'{}')
+                return 200, cluster.messages(
+                    self._queues[(vhost, name)],
+                    int(request.get('count', 1))
+                )
+            case ('POST', ['exchanges', vhost, name, 'publish']) if vhost in self._vhosts:
+                return 200, {'routed': True}
+            case ('GET', ['exchanges']):
+                return 200, _query(cluster.exchanges, query)
+            case ('GET', ['exchanges', vhost]):
+                return 200, _query(
+                    [item for item in cluster.exchanges if item['vhost'] == vhost],
+                    query
+                )
+            case ('GET', ['bindings']):
+                return 200, cluster.bindings
+            case ('GET', ['bindings', vhost]):
+                return 200, [item for item in cluster.bindings if item['vhost'] == vhost]
+            case ('GET', ['consumers']):
+                return 200, cluster.consumers
+            case ('GET', ['connections']):
+                return 200, _query(cluster.connections, query)
+            case ('GET', ['connections', name]) if name in self._connections:
+                return 200, self._connections[name]
+            case ('GET', ['connections', name, 'channels']):
+                return 200, _query(
+                    [
+                        item
+                        for item in cluster.channels
+                        if item['connection_details']['name'] == name
+                    ],
+                    query
+                )
+            case ('GET', ['channels']):
+                return 200, _query(cluster.channels, query)
+            case ('GET', ['channels', name]) if name in self._channels:
+                return 200, self._channels[name]
+        return 404, {'error': 'Object Not Found', 'reason': 'Not Found'}
+
+    def _respond(
+            self,
+            method: str,
+            target: str,
+            body: bytes,
+            accepts_gzip: bool
+    ) -> Tuple[int, bytes]:
+        key = (method, target, body, accepts_gzip)
+        response = self._cache.get(key)
+        if response is None:
+            parts = urlsplit(target)
+            segments = [unquote(segment) for segment in parts.path.split('/') if segment]
+            if segments[:1] == ['api']:
+                status, payload = self._route(method, segments[1:], parse_qs(parts.query), body)
+            else:
+                status, payload = 404, {'error': 'Not Found'}
+            content = json.dumps(payload).encode('utf-8')
+            if accepts_gzip:
+                content = gzip.compress(content, 1)
+            response = (status, content)
+            self._cache[key] = response
+        return response
+
+    async def _handle(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', '0')))
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                accepts_gzip = self.compress and 'gzip' in headers.get('accept-encoding', '')
+                status, content = self._respond(method, target, body, accepts_gzip)
+                self.requests += 1
+                writer.write(
+                    (
+                        f'HTTP/1.1 {status} {"OK" if status == 200 else "Not Found"}\r\n'
+                        'Content-Type: application/json\r\n'
+                        f'Content-Length: {len(content)}\r\n'
+                        + ('Content-Encoding: gzip\r\n' if accepts_gzip else '')
+                        + '\r\n'
+                    ).encode('latin-1') + content
+                )
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,314 @@
+"""Queue anomaly detection"""
+
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+QueueKey = Tuple[str, str]
+
+# The fields the detector reads from each queue payload.
+DETECTOR_COLUMNS: Sequence[str] = (
+    'vhost',
+    'name',
+    'messages',
+    'consumers',
+    'message_stats.redeliver',
+    'message_stats.redeliver_details.rate',
+)
+
+_BACKLOG = 1
+_NO_CONSUMERS = 2
+_REDELIVERY = 4
+
+
+class QueueAlert:
+    """An alert raised or resolved by the detector"""
+
+    BACKLOG_GROWTH = 'backlog_growth'
+    NO_CONSUMERS = 'no_consumers'
+    REDELIVERY_SPIKE = 'redelivery_spike'
+
+    __slots__ = ('kind', 'key', 'value', 'timestamp', 'resolved')
+
+    def __init__(
+            self,
+            kind: str,
+            key: QueueKey,
+            value: float,
+            timestamp: float,
+            resolved: bool = False
+    ) -> None:
+        """An alert raised or resolved by the detector.
+
+        Args:
+            kind (str): One of 'backlog_growth', 'no_consumers' or
+                'redelivery_spike'.
+            key (QueueKey): The (vhost, name) of the queue.
+            value (float): The value which triggered the alert: the smoothed
+                growth in messages per second, the depth, or the redelivery
+                rate.
+            timestamp (float): The time of the snapshot.
+            resolved (bool, optional): True if the condition has ended.
+                Defaults to False.
+        """
+        self.kind = kind
+        self.key = key
+        self.value = value
+        self.timestamp = timestamp
+        self.resolved = resolved
+
+    def __str__(self) -> str:
+        return '<QueueAlert {kind}{resolved} {vhost}:{name} {value:.2f}>'.format(
+            kind=self.kind,
+            resolved=' resolved' if self.resolved else '',
+            vhost=self.key[0],
+            name=self.key[1],
+            value=self.value
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class _QueueState:
+    __slots__ = (
+        'timestamp',
+        'depth',
+        'growth',
+        'redelivered',
+        'redelivery_rate',
+        'samples',
+        'flags',
+        'tick'
+    )
+
+    def __init__(self, timestamp: float, depth: float, redelivered: Optional[float]) -> None:
+        self.timestamp = timestamp
+        self.depth = depth
+        self.growth = 0.0
+        self.redelivered = redelivered
+        self.redelivery_rate = 0.0
+        self.samples = 0
+        self.flags = 0
+        self.tick = 0
+
+
+class AnomalyDetector:
+    """Detect unhealthy queues in successive snapshots"""
+
+    def __init__(
+            self,
+            alpha: float = 0.3,
+            growth_threshold: float = 1.0,
+            min_depth: int = 100,
+            redelivery_factor: float = 3.0,
+            min_redelivery_rate: float = 1.0,
+            baseline_alpha: float = 0.05,
+            warmup: int = 3
+    ) -> None:
+        """Detect unhealthy queues in successive snapshots.
+
+        The state kept for each queue is a handful of numbers: the last depth,
+        an exponentially weighted moving average (EWMA) of the growth of the
+        depth, and an EWMA baseline of the redelivery rate. Each snapshot is
+        processed in a single pass, and an alert is reported when its
+        condition starts and again, as resolved, when it ends.
+
+        * Backlog growth: the smoothed growth exceeds `growth_threshold`
+          messages per second while the depth is at least `min_depth`. It is
+          resolved when the growth falls below half the threshold.
+        * No consumers: the queue has messages but no consumers.
+        * Redelivery spike: the redelivery rate exceeds both
+          `min_redelivery_rate` and `redelivery_factor` times its baseline.
+
+        Args:
+            alpha (float, optional): The weight of the newest sample in the
+                growth EWMA. Defaults to 0.3.
+            growth_threshold (float, optional): The growth in messages per
+                second which is a backlog. Defaults to 1.0.
+            min_depth (int, optional): The depth below which growth is
+                ignored. Defaults to 100.
+            redelivery_factor (float, optional): The multiple of the baseline
+                redelivery rate which is a spike. Defaults to 3.0.
+            min_redelivery_rate (float, optional): The redelivery rate per
+                second below which spikes are ignored. Defaults to 1.0.
+            baseline_alpha (float, optional): The weight of the newest sample
+                in the redelivery baseline EWMA. Defaults to 0.05.
+            warmup (int, optional): The number of samples of a queue before
+                growth and redelivery alerts are raised. Defaults to 3.
+        """
+        self.alpha = alpha
+        self.growth_threshold = growth_threshold
+        self.min_depth = min_depth
+        self.redelivery_factor = redelivery_factor
+        self.min_redelivery_rate = min_redelivery_rate
+        self.baseline_alpha = baseline_alpha
+        self.warmup = warmup
+        self._states: Dict[QueueKey, _QueueState] = {}
+        self._tick = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def growth(self, vhost: str, name: str) -> Optional[float]:
+        """The smoothed growth of a queue in messages per second.
+
+        Returns:
+            Optional[float]: The growth, or None if the queue is unknown.
+        """
+        state = self._states.get((vhost, name))
+        return None if state is None else state.growth
+
+    def update(
+            self,
+            items: Iterable[Mapping[str, Any]],
+            timestamp: Optional[float] = None
+    ) -> List[QueueAlert]:
+        """Process a snapshot of every queue. Queues missing from the snapshot
+        are forgotten, and any of their alerts which were raised are resolved.
+
+        The payloads need the fields in DETECTOR_COLUMNS.
+
+        Args:
+            items (Iterable[Mapping[str, Any]]): The queue payloads.
+            timestamp (Optional[float], optional): The time of the snapshot.
+                Defaults to the current time.
+
+        Returns:
+            List[QueueAlert]: The alerts raised or resolved.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self._tick += 1
+        tick = self._tick
+        alerts: List[QueueAlert] = []
+        for item in items:
+            stats = item.get('message_stats') or {}
+            redelivered = stats.get('redeliver')
+            redelivery_rate = None
+            if redelivered is None:
+                details = stats.get('redeliver_details')
+                if details is not None:
+                    redelivery_rate = details.get('rate')
+            self._observe(
+                (item['vhost'], item['name']),
+                item.get('messages') or 0,
+                item.get('consumers') or 0,
+                redelivered,
+                redelivery_rate,
+                timestamp,
+                tick,
+                alerts
+            )
+        stale = [key for key, state in self._states.items() if state.tick != tick]
+        for key in stale:
+            self._resolve(key, self._states.pop(key), timestamp, alerts)
+        return alerts
+
+    @staticmethod
+    def _resolve(
+            key: QueueKey,
+            state: _QueueState,
+            timestamp: float,
+            alerts: List[QueueAlert]
+    ) -> None:
+        # A queue which was deleted cannot clear its alerts itself.
+        if state.flags & _BACKLOG:
+            alerts.append(
+                QueueAlert(QueueAlert.BACKLOG_GROWTH, key, state.growth, timestamp, True)
+            )
+        if state.flags & _NO_CONSUMERS:
+            alerts.append(
+                QueueAlert(QueueAlert.NO_CONSUMERS, key, state.depth, timestamp, True)
+            )
+        if state.flags & _REDELIVERY:
+            alerts.append(
+                QueueAlert(
+                    QueueAlert.REDELIVERY_SPIKE,
+                    key,
+                    state.redelivery_rate,
+                    timestamp,
+                    True
+                )
+            )
+
+    def _observe(
+            self,
+            key: QueueKey,
+            depth: float,
+            consumers: int,
+            redelivered: Optional[float],
+            redelivery_rate: Optional[float],
+            timestamp: float,
+            tick: int,
+            alerts: List[QueueAlert]
+    ) -> None:
+        state = self._states.get(key)
+        if state is None:
+            state = _QueueState(timestamp, depth, redelivered)
+            self._states[key] = state
+        else:
+            elapsed = timestamp - state.timestamp
+            if elapsed > 0:
+                alpha = self.alpha
+                state.growth = (
+                    alpha * (depth - state.depth) / elapsed
+                    + (1 - alpha) * state.growth
+                )
+                if redelivery_rate is None and redelivered is not None:
+                    if state.redelivered is not None and redelivered >= state.redelivered:
+                        redelivery_rate = (redelivered - state.redelivered) / elapsed
+                if redelivery_rate is not None:
+                    self._check_redelivery(key, state, redelivery_rate, timestamp, alerts)
+                state.samples += 1
+                state.timestamp = timestamp
+                state.depth = depth
+                state.redelivered = redelivered
+        state.tick = tick
+
+        flags = state.flags
+        if flags & _BACKLOG:
+            if state.growth < self.growth_threshold / 2 or depth < self.min_depth:
+                state.flags &= ~_BACKLOG
+                alerts.append(
+                    QueueAlert(QueueAlert.BACKLOG_GROWTH, key, state.growth, timestamp, True)
+                )
+        elif (
+                state.samples >= self.warmup
+                and state.growth > self.growth_threshold
+                and depth >= self.min_depth
+        ):
+            state.flags |= _BACKLOG
+            alerts.append(QueueAlert(QueueAlert.BACKLOG_GROWTH, key, state.growth, timestamp))
+
+        stalled = consumers == 0 and depth > 0
+        if flags & _NO_CONSUMERS:
+            if not stalled:
+                state.flags &= ~_NO_CONSUMERS
+                alerts.append(QueueAlert(QueueAlert.NO_CONSUMERS, key, depth, timestamp, True))
+        elif stalled:
+            state.flags |= _NO_CONSUMERS
+            alerts.append(QueueAlert(QueueAlert.NO_CONSUMERS, key, depth, timestamp))
+
+    def _check_redelivery(
+            self,
+            key: QueueKey,
+            state: _QueueState,
+            rate: float,
+            timestamp: float,
+            alerts: List[QueueAlert]
+    ) -> None:
+        limit = max(self.min_redelivery_rate, self.redelivery_factor * state.redelivery_rate)
+        if state.flags & _REDELIVERY:
+            if rate <= limit:
+                state.flags &= ~_REDELIVERY
+                alerts.append(
+                    QueueAlert(QueueAlert.REDELIVERY_SPIKE, key, rate, timestamp, True)
+                )
+        elif state.samples >= self.warmup and rate > limit:
+            state.flags |= _REDELIVERY
+            alerts.append(QueueAlert(QueueAlert.REDELIVERY_SPIKE, key, rate, timestamp))
+        if not state.flags & _REDELIVERY:
+            # Spikes are kept out of the baseline, which starts as the mean of
+            # the first samples.
+            beta = max(self.baseline_alpha, 1 / (state.samples + 1))
+            state.redelivery_rate = beta * rate + (1 - beta) * state.redelivery_rate
@@ -1,7 +1,9 @@
 """Api"""
 
-from typing import Any, Mapping
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, AsyncIterable, AsyncIterator, Mapping, Sequence
 
+from .decoders import iter_json_array
 from .requester import Requester
 from .version import Version
 
@@ -14,6 +16,12 @@ class ApiError(Exception):
     """An API Error"""
 
 
+def _params(columns: Sequence[str] | None, **params: Any) -> dict[str, Any] | None:
+    if columns:
+        params['columns'] = ','.join(columns)
+    return params or None
+
+
 class Api:
     """The RabbitMQ REST api"""
 
@@ -25,6 +33,10 @@ class Api:
         self._requester = requester
         self._management_version: Version | None = None
 
+    async def aclose(self) -> None:
+        """Close the requester, releasing any pooled connections."""
+        await self._requester.aclose()
+
     async def management_version(self) -> Version:
 
         if self._management_version is None:
@@ -32,6 +44,34 @@ class Api:
             self._management_version = Version(overview['management_version'])
         return self._management_version
 
+    async def _iter_pages(
+            self,
+            *args: str,
+            page_size: int,
+            name: str | None,
+            use_regex: bool,
+            columns: Sequence[str] | None
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        params: dict[str, Any] = {
+            'page_size': page_size
+        }
+        if columns:
+            params['columns'] = ','.join(columns)
+        if name:
+            params['name'] = name
+            params['use_regex'] = use_regex
+        page = 1
+        while True:
+            params['page'] = page
+            response = await self._requester.get_object(*args, params=params)
+            if response is None:
+                raise ApiError
+            for item in response['items']:
+                yield item
+            if page >= response['page_count'] or not response['items']:
+                break
+            page += 1
+
     async def get_overview(self) -> Mapping[str, Any]:
         """Various random bits of information that describe the whole system.
 
@@ -73,16 +113,24 @@ class Api:
         if response is not None:
             raise ApiError(response)
 
-    async def get_nodes(self) -> list[Mapping[str, Any]]:
+    async def get_nodes(
+            self,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """A list of nodes in the RabbitMQ cluster.
 
+        Args:
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
         Raises:
             ApiError: If no data was returned
 
         Returns:
             list[Mapping[str, Any]]: The list of nodes
         """
-        response = await self._requester.get_list('nodes')
+        response = await self._requester.get_list('nodes', params=_params(columns))
         if response is None:
             raise ApiError
         return response
@@ -91,16 +139,19 @@ class Api:
             self,
             name: str,
             memory: bool = False,
-            binary: bool = False
+            binary: bool = False,
+            columns: Sequence[str] | None = None
     ) -> Mapping[str, Any]:
         """An individual node in the RabbitMQ cluster. Add "?memory=true" to get
         memory statistics, and "?binary=true" to get a breakdown of binary
         memory use (may be expensive if there are many small binaries in the
         system).
 
-
         Args:
             name (str): The name of the node
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: When no data is returned.
@@ -108,10 +159,7 @@ class Api:
         Returns:
             list[Mapping[str, Any]]: The node details.
         """
-        params = {
-            'memory': memory,
-            'binary': binary
-        }
+        params = _params(columns, memory=memory, binary=binary)
         response = await self._requester.get_object('nodes', name, params=params)
         if response is None:
             raise ApiError
@@ -193,9 +241,52 @@ class Api:
             raise ApiError
         return response
 
-    async def get_connections(self) -> list[Mapping[str, Any]]:
+    def iter_definitions_content(
+            self,
+            vhost: str | None = None
+    ) -> AsyncGenerator[bytes, None]:
+        """Stream the encoded JSON definitions of the server, or of a vhost,
+        as they are received.
+
+        Args:
+            vhost (str | None, optional): The virtual host, or None for the
+                whole server. Defaults to None.
+
+        Returns:
+            AsyncGenerator[bytes, None]: The chunks of the definitions document.
+        """
+        args = ('definitions',) if vhost is None else ('definitions', vhost)
+        return self._requester.iter_content(*args)
+
+    async def upload_definitions(
+            self,
+            body: AsyncIterable[bytes],
+            vhost: str | None = None
+    ) -> None:
+        """Upload encoded JSON definitions as they are produced. The
+        definitions are merged as with `set_definitions`.
+
+        Args:
+            body (AsyncIterable[bytes]): The chunks of the definitions document.
+            vhost (str | None, optional): The virtual host, or None for the
+                whole server. Defaults to None.
+
+        Raises:
+            RequestError: If the operation failed.
+        """
+        args = ('definitions',) if vhost is None else ('definitions', vhost)
+        await self._requester.upload('POST', *args, body=body)
+
+    async def get_connections(
+            self,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """A list of all open connections.
 
+        Args:
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: If the operation failed
@@ -203,16 +294,61 @@ class Api:
         Returns:
             list[Mapping[str, Any]]: A list of connections.
         """
-        response = await self._requester.get_list('connections')
+        response = await self._requester.get_list('connections', params=_params(columns))
         if response is None:
             raise ApiError
         return response
 
-    async def get_vhost_connections(self, vhost: str) -> list[Mapping[str, Any]]:
+    async def iter_connections(
+            self,
+            page_size: int = 100,
+            name: str | None = None,
+            use_regex: bool = False,
+            columns: Sequence[str] | None = None
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Iterate over all open connections.
+
+        The items are requested a page at a time, so only one page is held in
+        memory.
+
+        Args:
+            page_size (int, optional): The number of items fetched with each
+                request. Defaults to 100.
+            name (str | None, optional): Only include items whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
+        Raises:
+            ApiError: If the operation fails
+
+        Yields:
+            Mapping[str, Any]: The connections.
+        """
+        async for item in self._iter_pages(
+                'connections',
+                page_size=page_size,
+                name=name,
+                use_regex=use_regex,
+                columns=columns
+        ):
+            yield item
+
+    async def get_vhost_connections(
+            self,
+            vhost: str,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """A list of all open connections in a specific vhost.
 
         Args:
             vhost (str): The name of the vhost.
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: If the operation failed.
@@ -220,17 +356,29 @@ class Api:
         Returns:
             list[Mapping[str, Any]]: A list of connections
         """
-        response = await self._requester.get_list('vhosts', vhost, 'connections')
+        response = await self._requester.get_list(
+            'vhosts',
+            vhost,
+            'connections',
+            params=_params(columns)
+        )
         if response is None:
             raise ApiError
         return response
 
-    async def get_connection(self, name: str) -> Mapping[str, Any]:
+    async def get_connection(
+            self,
+            name: str,
+            columns: Sequence[str] | None = None
+    ) -> Mapping[str, Any]:
         """An individual connection. DELETEing it will close the connection.
         Optionally set the "X-Reason" header when DELETEing to provide a reason.
 
         Args:
             name (str): The connection name
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: [description]
@@ -238,7 +386,7 @@ class Api:
         Returns:
             Mapping[str, Any]: The connection details
         """
-        response = await self._requester.get_object('connections', name)
+        response = await self._requester.get_object('connections', name, params=_params(columns))
         if response is None:
             raise ApiError
         return response
@@ -259,11 +407,18 @@ class Api:
         if response is not None:
             raise ApiError
 
-    async def get_connection_channels(self, name: str) -> list[Mapping[str, Any]]:
+    async def get_connection_channels(
+            self,
+            name: str,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """List of all channels for a given connection.
 
         Args:
             name (str): The connection name
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: [description]
@@ -271,30 +426,88 @@ class Api:
         Returns:
             list[Mapping[str, Any]]: A list of channels
         """
-        response = await self._requester.get_list('connection', name, 'channels')
+        response = await self._requester.get_list(
+            'connection',
+            name,
+            'channels',
+            params=_params(columns)
+        )
         if response is None:
             raise ApiError
         return response
 
-    async def get_channels(self) -> list[Mapping[str, Any]]:
+    async def get_channels(
+            self,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """A list of all open channels.
 
+        Args:
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
         Raises:
             ApiError: [description]
 
         Returns:
             list[Mapping[str, Any]]: A list of channels
         """
-        response = await self._requester.get_list('channels')
+        response = await self._requester.get_list('channels', params=_params(columns))
         if response is None:
             raise ApiError
         return response
 
-    async def get_vhost_channels(self, vhost: str) -> list[Mapping[str, Any]]:
+    async def iter_channels(
+            self,
+            page_size: int = 100,
+            name: str | None = None,
+            use_regex: bool = False,
+            columns: Sequence[str] | None = None
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Iterate over all open channels.
+
+        The items are requested a page at a time, so only one page is held in
+        memory.
+
+        Args:
+            page_size (int, optional): The number of items fetched with each
+                request. Defaults to 100.
+            name (str | None, optional): Only include items whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
+        Raises:
+            ApiError: If the operation fails
+
+        Yields:
+            Mapping[str, Any]: The channels.
+        """
+        async for item in self._iter_pages(
+                'channels',
+                page_size=page_size,
+                name=name,
+                use_regex=use_regex,
+                columns=columns
+        ):
+            yield item
+
+    async def get_vhost_channels(
+            self,
+            vhost: str,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """A list of all open channels in a specific vhost.
 
         Args:
             vhost (str): The name of the vhost
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: If the operation fails
@@ -302,16 +515,28 @@ class Api:
         Returns:
             list[Mapping[str, Any]]: A list of channel details.
         """
-        response = await self._requester.get_list('vhost', vhost, 'channels')
+        response = await self._requester.get_list(
+            'vhost',
+            vhost,
+            'channels',
+            params=_params(columns)
+        )
         if response is None:
             raise ApiError
         return response
 
-    async def get_channel(self, channel: str) -> Mapping[str, Any]:
+    async def get_channel(
+            self,
+            channel: str,
+            columns: Sequence[str] | None = None
+    ) -> Mapping[str, Any]:
         """Details about an individual channel.
 
         Args:
             channel (str): The channel name
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: If the operation fails
@@ -319,7 +544,7 @@ class Api:
         Returns:
             Mapping[str, Any]: The channel details
         """
-        response = await self._requester.get_object('channels', channel)
+        response = await self._requester.get_object('channels', channel, params=_params(columns))
         if response is None:
             raise ApiError
         return response
@@ -355,25 +580,78 @@ class Api:
             raise ApiError
         return response
 
-    async def get_exchanges(self) -> list[Mapping[str, Any]]:
+    async def get_exchanges(
+            self,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """A list of all exchanges.
 
+        Args:
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
         Raises:
             ApiError: If the operation fails
 
         Returns:
             list[Mapping[str, Any]]: A list of exchanges
         """
-        response = await self._requester.get_list('exchanges')
+        response = await self._requester.get_list('exchanges', params=_params(columns))
         if response is None:
             raise ApiError
         return response
 
-    async def get_vhost_exchanges(self, vhost: str) -> list[Mapping[str, Any]]:
+    async def iter_exchanges(
+            self,
+            page_size: int = 100,
+            name: str | None = None,
+            use_regex: bool = False,
+            columns: Sequence[str] | None = None
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Iterate over all exchanges.
+
+        The items are requested a page at a time, so only one page is held in
+        memory.
+
+        Args:
+            page_size (int, optional): The number of items fetched with each
+                request. Defaults to 100.
+            name (str | None, optional): Only include items whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
+        Raises:
+            ApiError: If the operation fails
+
+        Yields:
+            Mapping[str, Any]: The exchanges.
+        """
+        async for item in self._iter_pages(
+                'exchanges',
+                page_size=page_size,
+                name=name,
+                use_regex=use_regex,
+                columns=columns
+        ):
+            yield item
+
+    async def get_vhost_exchanges(
+            self,
+            vhost: str,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """A list of all exchanges in a given virtual host.
 
         Args:
             vhost (str): The vhost name
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: If the operation fails
@@ -381,18 +659,65 @@ class Api:
         Returns:
             list[Mapping[str, Any]]: A list of exchanges
         """
-        response = await self._requester.get_list('exchanges', vhost)
+        response = await self._requester.get_list('exchanges', vhost, params=_params(columns))
         if response is None:
             raise ApiError
         return response
 
-    async def get_vhost_exchange(self, vhost: str, name: str) -> Mapping[str, Any]:
-        """An individual exchange.
+    async def iter_vhost_exchanges(
+            self,
+            vhost: str,
+            page_size: int = 100,
+            name: str | None = None,
+            use_regex: bool = False,
+            columns: Sequence[str] | None = None
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Iterate over the exchanges in a given virtual host.
 
+        The items are requested a page at a time, so only one page is held in
+        memory.
+
+        Args:
+            vhost (str): The name of the virtual host
+            page_size (int, optional): The number of items fetched with each
+                request. Defaults to 100.
+            name (str | None, optional): Only include items whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
+        Raises:
+            ApiError: If the operation fails
+
+        Yields:
+            Mapping[str, Any]: The exchanges.
+        """
+        async for item in self._iter_pages(
+                'exchanges', vhost,
+                page_size=page_size,
+                name=name,
+                use_regex=use_regex,
+                columns=columns
+        ):
+            yield item
+
+    async def get_vhost_exchange(
+            self,
+            vhost: str,
+            name: str,
+            columns: Sequence[str] | None = None
+    ) -> Mapping[str, Any]:
+        """An individual exchange.
 
         Args:
             vhost (str): The name of the virtual host
             name (str): The exchange name
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: If the operation fails
@@ -400,7 +725,12 @@ class Api:
         Returns:
             Mapping[str, Any]: The exchange details
         """
-        response = await self._requester.get_object('exchanges', vhost, name)
+        response = await self._requester.get_object(
+            'exchanges',
+            vhost,
+            name,
+            params=_params(columns)
+        )
         if response is None:
             raise ApiError
         return response
@@ -562,25 +892,78 @@ class Api:
             raise ApiError
         return response
 
-    async def get_queues(self) -> list[Mapping[str, Any]]:
+    async def get_queues(
+            self,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """A list of all queues.
 
+        Args:
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
         Raises:
             ApiError: If the operation fails
 
         Returns:
             list[Mapping[str, Any]]: A list of queues.
         """
-        response = await self._requester.get_list('queues')
+        response = await self._requester.get_list('queues', params=_params(columns))
         if response is None:
             raise ApiError
         return response
 
-    async def get_vhost_queues(self, vhost: str) -> list[Mapping[str, Any]]:
+    async def iter_queues(
+            self,
+            page_size: int = 100,
+            name: str | None = None,
+            use_regex: bool = False,
+            columns: Sequence[str] | None = None
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Iterate over all queues.
+
+        The items are requested a page at a time, so only one page is held in
+        memory.
+
+        Args:
+            page_size (int, optional): The number of items fetched with each
+                request. Defaults to 100.
+            name (str | None, optional): Only include items whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
+        Raises:
+            ApiError: If the operation fails
+
+        Yields:
+            Mapping[str, Any]: The queues.
+        """
+        async for item in self._iter_pages(
+                'queues',
+                page_size=page_size,
+                name=name,
+                use_regex=use_regex,
+                columns=columns
+        ):
+            yield item
+
+    async def get_vhost_queues(
+            self,
+            vhost: str,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """A list of all queues in a given virtual host.
 
         Args:
             vhost (str): The name of the virtual host
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: If the operation fails
@@ -588,17 +971,65 @@ class Api:
         Returns:
             list[Mapping[str, Any]]: A list of queues
         """
-        response = await self._requester.get_list('queues', vhost)
+        response = await self._requester.get_list('queues', vhost, params=_params(columns))
         if response is None:
             raise ApiError
         return response
 
-    async def get_vhost_queue(self, vhost: str, name: str) -> Mapping[str, Any]:
+    async def iter_vhost_queues(
+            self,
+            vhost: str,
+            page_size: int = 100,
+            name: str | None = None,
+            use_regex: bool = False,
+            columns: Sequence[str] | None = None
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Iterate over the queues in a given virtual host.
+
+        The items are requested a page at a time, so only one page is held in
+        memory.
+
+        Args:
+            vhost (str): The name of the virtual host
+            page_size (int, optional): The number of items fetched with each
+                request. Defaults to 100.
+            name (str | None, optional): Only include items whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
+        Raises:
+            ApiError: If the operation fails
+
+        Yields:
+            Mapping[str, Any]: The queues.
+        """
+        async for item in self._iter_pages(
+                'queues', vhost,
+                page_size=page_size,
+                name=name,
+                use_regex=use_regex,
+                columns=columns
+        ):
+            yield item
+
+    async def get_vhost_queue(
+            self,
+            vhost: str,
+            name: str,
+            columns: Sequence[str] | None = None
+    ) -> Mapping[str, Any]:
         """Get an individual queue.
 
         Args:
             vhost (str): The name of the virtual host
             name (str): The queue name
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: THe queue details.
@@ -606,7 +1037,7 @@ class Api:
         Returns:
             Mapping[str, Any]: [description]
         """
-        response = await self._requester.get_object('queues', vhost, name)
+        response = await self._requester.get_object('queues', vhost, name, params=_params(columns))
         if response is None:
             raise ApiError
         return response
@@ -664,7 +1095,11 @@ class Api:
         Raises:
             ApiError: If the operation failed.
         """
-        response = await self._requester.delete('queues', vhost, name)
+        params = {
+            'if-empty': if_empty,
+            'if-unused': if_unused
+        }
+        response = await self._requester.delete('queues', vhost, name, params=params)
         if response is not None:
             raise ApiError
 
@@ -750,16 +1185,16 @@ class Api:
             raise ApiError
         return response
 
-    async def get_vhost_queue_messages(
+    async def _get_messages_data(
             self,
             vhost: str,
             name: str,
-            count: int = 1,
-            requeue: bool = True,
-            encoding: str = 'auto',
-            truncate: int | None = None,
-            reject: bool = False
-    ) -> list[Mapping[str, Any]]:
+            count: int,
+            requeue: bool,
+            encoding: str,
+            truncate: int | None,
+            reject: bool
+    ) -> dict[str, Any]:
         version = await self.management_version()
 
         if VERSION_3_6 <= version < VERSION_3_7:
@@ -796,11 +1231,97 @@ class Api:
         if truncate is not None:
             data['truncate'] = truncate
 
+        return data
+
+    async def get_vhost_queue_messages(
+            self,
+            vhost: str,
+            name: str,
+            count: int = 1,
+            requeue: bool = True,
+            encoding: str = 'auto',
+            truncate: int | None = None,
+            reject: bool = False
+    ) -> list[Mapping[str, Any]]:
+        data = await self._get_messages_data(
+            vhost,
+            name,
+            count,
+            requeue,
+            encoding,
+            truncate,
+            reject
+        )
         response = await self._requester.post('queues', vhost, name, 'get', data=data)
         if response is None:
             raise ApiError
         return response
 
+    async def iter_vhost_queue_messages(
+            self,
+            vhost: str,
+            name: str,
+            count: int = 1,
+            requeue: bool = True,
+            encoding: str = 'auto',
+            truncate: int | None = None,
+            reject: bool = False
+    ) -> AsyncGenerator[Mapping[str, Any], None]:
+        """Get messages from a queue, decoding each as the response arrives.
+
+        The messages are fetched with a single request, as with
+        `get_vhost_queue_messages`, but only one is decoded at a time. If the
+        requester cannot stream, the response is decoded at once.
+
+        Args:
+            vhost (str): The name of the virtual host
+            name (str): The name of the queue
+            count (int, optional): The maximum number of messages to get.
+                Defaults to 1.
+            requeue (bool, optional): If true the messages are returned to the
+                queue. Defaults to True.
+            encoding (str, optional): Either "auto" or "base64". Defaults to
+                'auto'.
+            truncate (int | None, optional): The size in bytes at which
+                payloads are truncated. Defaults to None.
+            reject (bool, optional): If true the messages are rejected rather
+                than acknowledged. Defaults to False.
+
+        Raises:
+            ApiError: If the operation failed.
+
+        Yields:
+            Mapping[str, Any]: The messages.
+        """
+        data = await self._get_messages_data(
+            vhost,
+            name,
+            count,
+            requeue,
+            encoding,
+            truncate,
+            reject
+        )
+        try:
+            chunks = self._requester.iter_content(
+                'queues',
+                vhost,
+                name,
+                'get',
+                method='POST',
+                data=data
+            )
+        except NotImplementedError:
+            response = await self._requester.post('queues', vhost, name, 'get', data=data)
+            if response is None:
+                raise ApiError from None
+            for item in response:
+                yield item
+            return
+        async with aclosing(chunks):
+            async for item in iter_json_array(chunks):
+                yield item
+
     async def get_vhost_queue_messages_37(
             self,
             vhost: str,
@@ -1010,20 +1531,15 @@ class Api:
             destination (str): The destination exchange
             routing_key (str): The routing key
             arguments (Mapping[str, Any]): Binding arguments.
-
-        Raises:
-            ApiError: If the operation fails
         """
         data = {
             "routing_key": routing_key,
             "arguments": arguments
         }
-        response = await self._requester.post(
+        await self._requester.post(
             'bindings', vhost, 'e', source, 'e', destination,
             data=data
         )
-        if response is None:
-            raise ApiError
 
     async def get_vhost_exchange_exchange_binding_props(
             self,
@@ -1085,25 +1601,40 @@ class Api:
         if response is None:
             raise ApiError
 
-    async def get_vhosts(self) -> list[Mapping[str, Any]]:
+    async def get_vhosts(
+            self,
+            columns: Sequence[str] | None = None
+    ) -> list[Mapping[str, Any]]:
         """A list of all vhosts.
 
+        Args:
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
+
         Raises:
             ApiError: If the operation fails
 
         Returns:
             list[Mapping[str, Any]]: A list of virtual hosts.
         """
-        response = await self._requester.get_list('vhosts')
+        response = await self._requester.get_list('vhosts', params=_params(columns))
         if response is None:
             raise ApiError
         return response
 
-    async def get_vhost(self, vhost: str) -> Mapping[str, Any]:
+    async def get_vhost(
+            self,
+            vhost: str,
+            columns: Sequence[str] | None = None
+    ) -> Mapping[str, Any]:
         """An individual virtual host
 
         Args:
             vhost (str): The name of the virtual host.
+            columns (Sequence[str] | None, optional): The fields to return,
+                with nested fields separated by dots. Defaults to None, which
+                returns all fields.
 
         Raises:
             ApiError: If the operation fails
@@ -1111,7 +1642,7 @@ class Api:
         Returns:
             Mapping[str, Any]: The details of the virtual host
         """
-        response = await self._requester.get_object('vhosts', vhost)
+        response = await self._requester.get_object('vhosts', vhost, params=_params(columns))
         if response is None:
             raise ApiError
         return response
@@ -1183,6 +1714,104 @@ class Api:
             raise ApiError
         return response
 
+    async def get_policies(self) -> list[Mapping[str, Any]]:
+        """A list of all policies.
+
+        Raises:
+            ApiError: If the operation fails
+
+        Returns:
+            list[Mapping[str, Any]]: A list of policies
+        """
+        response = await self._requester.get_list('policies')
+        if response is None:
+            raise ApiError
+        return response
+
+    async def get_vhost_policies(self, vhost: str) -> list[Mapping[str, Any]]:
+        """A list of all policies in a given virtual host.
+
+        Args:
+            vhost (str): The name of the virtual host
+
+        Raises:
+            ApiError: If the operation fails
+
+        Returns:
+            list[Mapping[str, Any]]: A list of policies
+        """
+        response = await self._requester.get_list('policies', vhost)
+        if response is None:
+            raise ApiError
+        return response
+
+    async def get_vhost_policy(self, vhost: str, name: str) -> Mapping[str, Any]:
+        """An individual policy.
+
+        Args:
+            vhost (str): The name of the virtual host
+            name (str): The name of the policy
+
+        Raises:
+            ApiError: If the operation fails
+
+        Returns:
+            Mapping[str, Any]: The policy
+        """
+        response = await self._requester.get_object('policies', vhost, name)
+        if response is None:
+            raise ApiError
+        return response
+
+    async def create_vhost_policy(
+            self,
+            vhost: str,
+            name: str,
+            pattern: str,
+            definition: Mapping[str, Any],
+            priority: int = 0,
+            apply_to: str = 'all'
+    ) -> None:
+        """Create or replace a policy.
+
+        Args:
+            vhost (str): The name of the virtual host
+            name (str): The name of the policy
+            pattern (str): The regular expression matching the names of the
+                queues or exchanges to which the policy applies.
+            definition (Mapping[str, Any]): The policy keys and values.
+            priority (int, optional): The priority, where the highest matching
+                policy applies. Defaults to 0.
+            apply_to (str, optional): One of 'queues', 'exchanges' or 'all'.
+                Defaults to 'all'.
+
+        Raises:
+            ApiError: If the operation fails
+        """
+        data = {
+            'pattern': pattern,
+            'definition': definition,
+            'priority': priority,
+            'apply-to': apply_to
+        }
+        response = await self._requester.put('policies', vhost, name, data=data)
+        if response is not None:
+            raise ApiError
+
+    async def delete_vhost_policy(self, vhost: str, name: str) -> None:
+        """Delete a policy.
+
+        Args:
+            vhost (str): The name of the virtual host
+            name (str): The name of the policy
+
+        Raises:
+            ApiError: If the operation fails
+        """
+        response = await self._requester.delete('policies', vhost, name)
+        if response is not None:
+            raise ApiError
+
     async def get_users(self) -> list[Mapping[str, Any]]:
         """A list of all users.
 
@@ -1228,11 +1857,6 @@ X	X	X		/api/parameters/component/vhost/name	An individual vhost-scoped parameter
 X				/api/global-parameters	A list of all global parameters.
 X	X	X		/api/global-parameters/name	An individual global parameter. To PUT a parameter, you will need a body looking something like this:
 {"name":"user_vhost_mapping","value":{"guest":"/","rabbit":"warren"}}
-X				/api/policies	A list of all policies.
-X				/api/policies/vhost	A list of all policies in a given virtual host.
-X	X	X		/api/policies/vhost/name	An individual policy. To PUT a policy, you will need a body looking something like this:
-{"pattern":"^amq.", "definition": {"federation-upstream-set":"all"}, "priority":0, "apply-to": "all"}
-pattern and definition are mandatory, priority and apply-to are optional.
 X				/api/operator-policies	A list of all operator policiy overrides.
 X				/api/operator-policies/vhost	A list of all operator policiy overrides in a given virtual host.
 X	X	X		/api/operator-policies/vhost/name	An individual operator policy. To PUT a policy, you will need a body looking something like this:
@@ -0,0 +1,521 @@
+"""Snapshot archive"""
+
+import asyncio
+import json
+import mmap
+import os
+import struct
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple
+)
+import zlib
+
+from .api import Api
+from .decoders import json_default
+from .poller import ENDPOINTS, EntityKey
+
+# The endpoints of a snapshot, in the order they are written.
+ARCHIVE_ENDPOINTS: Sequence[str] = (
+    'overview',
+    'nodes',
+    'vhosts',
+    'queues',
+    'connections',
+    'channels',
+)
+
+_MAGIC = b'RMQSNAP\x01'
+_FORMATS = ('json', 'msgpack')
+# The header is the magic followed by the format.
+_HEADER = struct.Struct('<8sB')
+# Each index entry locates the block of one endpoint of one snapshot.
+_INDEX_ENTRY = struct.Struct('<dBQII')
+_BLOCK_HEADER = struct.Struct('<II')
+
+Encoder = Callable[[Any], bytes]
+Decoder = Callable[[bytes], Any]
+
+
+def _default_format() -> str:
+    try:
+        import msgspec  # pylint: disable=import-outside-toplevel,unused-import
+        return 'msgpack'
+    except ImportError:
+        return 'json'
+
+
+def _codec(format_name: str) -> Tuple[Encoder, Decoder]:
+    if format_name == 'msgpack':
+        import msgspec  # pylint: disable=import-outside-toplevel
+        return msgspec.msgpack.Encoder().encode, msgspec.msgpack.Decoder().decode
+
+    def encode(value: Any) -> bytes:
+        return json.dumps(value, separators=(',', ':'), default=json_default).encode('utf-8')
+    return encode, json.loads
+
+
+def _read_format(path: str) -> str:
+    with open(path, 'rb') as file:
+        header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f'"{path}" is not a snapshot archive')
+    magic, format_code = _HEADER.unpack(header)
+    if magic != _MAGIC or format_code >= len(_FORMATS):
+        raise ValueError(f'"{path}" is not a snapshot archive')
+    return _FORMATS[format_code]
+
+
+def _key(endpoint: str, item: Mapping[str, Any]) -> EntityKey:
+    if endpoint == 'overview':
+        return (None, '')
+    return (item.get('vhost'), item['name'])
+
+
+def _encode_block(
+        endpoint: str,
+        items: Sequence[Mapping[str, Any]],
+        encode: Encoder,
+        level: int
+) -> bytes:
+    # A block holds the keys and the separately encoded payloads, so one
+    # entity can be decoded without decoding the others.
+    payloads = [encode(item) for item in items]
+    keys = encode([list(_key(endpoint, item)) for item in items])
+    ends: List[int] = []
+    end = 0
+    for payload in payloads:
+        end += len(payload)
+        ends.append(end)
+    raw = b''.join([
+        _BLOCK_HEADER.pack(len(items), len(keys)),
+        struct.pack(f'<{len(ends)}I', *ends),
+        keys,
+        *payloads
+    ])
+    return zlib.compress(raw, level)
+
+
+class _Block:
+    """A decompressed block"""
+
+    def __init__(self, data: bytes, decode: Decoder) -> None:
+        self._data = data
+        self._decode = decode
+        count, keys_length = _BLOCK_HEADER.unpack_from(data)
+        self.count = count
+        self._ends = struct.unpack_from(f'<{count}I', data, _BLOCK_HEADER.size)
+        keys_start = _BLOCK_HEADER.size + 4 * count
+        self.keys: List[EntityKey] = [
+            (vhost, name)
+            for vhost, name in decode(self._data[keys_start:keys_start + keys_length])
+        ]
+        self._start = keys_start + keys_length
+
+    def item(self, index: int) -> Mapping[str, Any]:
+        """Decode the payload at an index."""
+        begin = self._start + (self._ends[index - 1] if index else 0)
+        return self._decode(self._data[begin:self._start + self._ends[index]])
+
+    def items(self) -> List[Mapping[str, Any]]:
+        """Decode every payload."""
+        return [self.item(index) for index in range(self.count)]
+
+
+class ArchivedSnapshot:
+    """A snapshot read from an archive"""
+
+    def __init__(
+            self,
+            timestamp: float,
+            endpoints: Mapping[str, List[Mapping[str, Any]]]
+    ) -> None:
+        """A snapshot read from an archive.
+
+        Args:
+            timestamp (float): The time of the snapshot.
+            endpoints (Mapping[str, List[Mapping[str, Any]]]): The payloads of
+                each endpoint. The overview is a list with one payload.
+        """
+        self.timestamp = timestamp
+        self.endpoints = endpoints
+
+    @property
+    def overview(self) -> Optional[Mapping[str, Any]]:
+        """The overview, if it was captured."""
+        items = self.endpoints.get('overview')
+        return items[0] if items else None
+
+    def __getitem__(self, endpoint: str) -> List[Mapping[str, Any]]:
+        return self.endpoints[endpoint]
+
+    def __contains__(self, endpoint: object) -> bool:
+        return endpoint in self.endpoints
+
+    def get(self, endpoint: str, key: EntityKey) -> Optional[Mapping[str, Any]]:
+        """Find the payload of an entity.
+
+        Args:
+            endpoint (str): The endpoint, e.g. 'queues'.
+            key (EntityKey): The (vhost, name) of the entity, where the vhost
+                is None for nodes and vhosts.
+
+        Returns:
+            Optional[Mapping[str, Any]]: The payload, or None if the entity
+                is not in the snapshot.
+        """
+        for item in self.endpoints.get(endpoint, ()):
+            if _key(endpoint, item) == key:
+                return item
+        return None
+
+    def __str__(self) -> str:
+        return '<ArchivedSnapshot {timestamp} {counts}>'.format(
+            timestamp=self.timestamp,
+            counts=', '.join(
+                f'{endpoint}={len(items)}'
+                for endpoint, items in self.endpoints.items()
+            )
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+async def capture_snapshot(
+        api: Api,
+        endpoints: Sequence[str] = ARCHIVE_ENDPOINTS,
+        columns: Optional[Mapping[str, Sequence[str]]] = None
+) -> Dict[str, List[Mapping[str, Any]]]:
+    """Fetch the endpoints of a snapshot concurrently.
+
+    Args:
+        api (Api): The api.
+        endpoints (Sequence[str], optional): The endpoints. Defaults to
+            ARCHIVE_ENDPOINTS.
+        columns (Optional[Mapping[str, Sequence[str]]], optional): The fields
+            to fetch for each endpoint. The identifying fields must be
+            included. Defaults to None, for all fields.
+
+    Returns:
+        Dict[str, List[Mapping[str, Any]]]: The payloads of each endpoint.
+    """
+    columns = columns or {}
+
+    async def fetch(endpoint: str) -> List[Mapping[str, Any]]:
+        if endpoint == 'overview':
+            return [await api.get_overview()]
+        return await ENDPOINTS[endpoint](api, columns.get(endpoint))
+
+    results = await asyncio.gather(*(fetch(endpoint) for endpoint in endpoints))
+    return dict(zip(endpoints, results))
+
+
+class SnapshotWriter:
+    """Append snapshots to an archive"""
+
+    def __init__(
+            self,
+            path: str,
+            format_name: Optional[str] = None,
+            compression_level: int = 6
+    ) -> None:
+        """Append snapshots to an archive.
+
+        The archive is two files. The data file at `path` holds a compressed
+        block for each endpoint of each snapshot. The index at `path + '.idx'`
+        holds a fixed size entry for each block with its timestamp, so a
+        reader can find a snapshot by binary search. Blocks are written before
+        their index entries, so after a crash the data written after the last
+        indexed block is discarded when the archive is next opened.
+
+        Args:
+            path (str): The path of the data file, which is created if it does
+                not exist.
+            format_name (Optional[str], optional): The encoding of new
+                archives, 'msgpack' or 'json'. Defaults to None, for msgpack
+                if msgspec is installed. An existing archive keeps its format.
+            compression_level (int, optional): The zlib level. Defaults to 6.
+
+        Raises:
+            ValueError: If the file is not an archive, or the format is
+                unknown.
+        """
+        self.path = path
+        self.index_path = f'{path}.idx'
+        self.compression_level = compression_level
+        self._last_timestamp = float('-inf')
+        exists = os.path.exists(path) and os.path.getsize(path) >= _HEADER.size
+        if exists:
+            self.format_name = _read_format(path)
+        else:
+            self.format_name = format_name or _default_format()
+            if self.format_name not in _FORMATS:
+                raise ValueError(f'Unknown format "{self.format_name}"')
+        # The codec is resolved first, so a missing msgspec changes no files.
+        self._encode, _ = _codec(self.format_name)
+        if exists:
+            self._data = open(path, 'r+b')  # pylint: disable=consider-using-with
+            self._index = open(self.index_path, 'a+b')  # pylint: disable=consider-using-with
+            self._recover()
+        else:
+            self._data = open(path, 'w+b')  # pylint: disable=consider-using-with
+            self._data.write(_HEADER.pack(_MAGIC, _FORMATS.index(self.format_name)))
+            self._index = open(self.index_path, 'w+b')  # pylint: disable=consider-using-with
+
+    def _recover(self) -> None:
+        # Drop any partial index entry, and any data after the last block.
+        index_size = os.fstat(self._index.fileno()).st_size
+        index_size -= index_size % _INDEX_ENTRY.size
+        self._index.truncate(index_size)
+        data_end = _HEADER.size
+        if index_size:
+            self._index.seek(index_size - _INDEX_ENTRY.size)
+            timestamp, _, offset, length, _ = _INDEX_ENTRY.unpack(
+                self._index.read(_INDEX_ENTRY.size)
+            )
+            self._last_timestamp = timestamp
+            data_end = offset + length
+        self._data.truncate(data_end)
+        self._data.seek(data_end)
+        self._index.seek(index_size)
+
+    def write(
+            self,
+            endpoints: Mapping[str, Any],
+            timestamp: Optional[float] = None
+    ) -> float:
+        """Append a snapshot.
+
+        Args:
+            endpoints (Mapping[str, Any]): The payloads of each endpoint. The
+                overview is a single payload, or a list containing it.
+            timestamp (Optional[float], optional): The time of the snapshot,
+                which must be later than the previous snapshot. Defaults to
+                the current time.
+
+        Raises:
+            ValueError: If the timestamp is not later than the previous
+                snapshot.
+
+        Returns:
+            float: The timestamp.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if timestamp <= self._last_timestamp:
+            raise ValueError('Snapshots must be written in time order')
+        entries: List[bytes] = []
+        for code, endpoint in enumerate(ARCHIVE_ENDPOINTS):
+            items = endpoints.get(endpoint)
+            if items is None:
+                continue
+            if isinstance(items, Mapping):
+                items = [items]
+            block = _encode_block(endpoint, items, self._encode, self.compression_level)
+            entries.append(
+                _INDEX_ENTRY.pack(timestamp, code, self._data.tell(), len(block), len(items))
+            )
+            self._data.write(block)
+        self._data.flush()
+        self._index.write(b''.join(entries))
+        self._index.flush()
+        self._last_timestamp = timestamp
+        return timestamp
+
+    async def capture(
+            self,
+            api: Api,
+            endpoints: Sequence[str] = ARCHIVE_ENDPOINTS,
+            columns: Optional[Mapping[str, Sequence[str]]] = None
+    ) -> float:
+        """Fetch a snapshot and append it.
+
+        Args:
+            api (Api): The api.
+            endpoints (Sequence[str], optional): The endpoints. Defaults to
+                ARCHIVE_ENDPOINTS.
+            columns (Optional[Mapping[str, Sequence[str]]], optional): The
+                fields to fetch for each endpoint. Defaults to None.
+
+        Returns:
+            float: The timestamp of the snapshot.
+        """
+        timestamp = time.time()
+        snapshot = await capture_snapshot(api, endpoints, columns)
+        return self.write(snapshot, max(timestamp, self._last_timestamp + 1e-6))
+
+    def close(self) -> None:
+        """Close the files."""
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self) -> 'SnapshotWriter':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class SnapshotReader:
+    """Read snapshots from an archive"""
+
+    def __init__(self, path: str) -> None:
+        """Read snapshots from an archive.
+
+        The data file and the index are memory mapped, and only the blocks
+        which are asked for are read and decompressed. The snapshots present
+        when the reader is opened are visible.
+
+        Args:
+            path (str): The path of the data file.
+
+        Raises:
+            ValueError: If the file is not an archive.
+        """
+        self.path = path
+        self.format_name = _read_format(path)
+        _, self._decode = _codec(self.format_name)
+        with open(path, 'rb') as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index: Optional[mmap.mmap] = None
+        self._count = 0
+        with open(f'{path}.idx', 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            # Ignore entries for blocks beyond the mapped data.
+            count = size // _INDEX_ENTRY.size
+            if count:
+                self._index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                while count and sum(self._entry(count - 1)[2:4]) > len(self._data):
+                    count -= 1
+            self._count = count
+        self._timestamps: Optional[List[float]] = None
+
+    def _entry(self, position: int) -> Tuple[float, int, int, int, int]:
+        assert self._index is not None
+        return _INDEX_ENTRY.unpack_from(self._index, position * _INDEX_ENTRY.size)
+
+    def _timestamp(self, position: int) -> float:
+        assert self._index is not None
+        return struct.unpack_from('<d', self._index, position * _INDEX_ENTRY.size)[0]
+
+    def _block(self, offset: int, length: int) -> _Block:
+        return _Block(zlib.decompress(self._data[offset:offset + length]), self._decode)
+
+    def _bisect(self, timestamp: float, inclusive: bool = True) -> int:
+        # The position of the first entry later than the timestamp, or at or
+        # later than it when not inclusive.
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            found = self._timestamp(middle)
+            if found < timestamp or (inclusive and found == timestamp):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def timestamps(self) -> List[float]:
+        """The timestamps of the snapshots, in order."""
+        if self._timestamps is None:
+            timestamps: List[float] = []
+            for position in range(self._count):
+                timestamp = self._timestamp(position)
+                if not timestamps or timestamps[-1] != timestamp:
+                    timestamps.append(timestamp)
+            self._timestamps = timestamps
+        return self._timestamps
+
+    def __len__(self) -> int:
+        return len(self.timestamps())
+
+    def snapshot(
+            self,
+            timestamp: Optional[float] = None,
+            endpoints: Optional[Sequence[str]] = None
+    ) -> Optional[ArchivedSnapshot]:
+        """Read the snapshot at or before a time.
+
+        Args:
+            timestamp (Optional[float], optional): The time. Defaults to None,
+                for the latest snapshot.
+            endpoints (Optional[Sequence[str]], optional): The endpoints to
+                read. Defaults to None, for all of them.
+
+        Returns:
+            Optional[ArchivedSnapshot]: The snapshot, or None if there is none
+                at or before the time.
+        """
+        end = self._count if timestamp is None else self._bisect(timestamp)
+        if end == 0:
+            return None
+        found = self._timestamp(end - 1)
+        position = end - 1
+        while position > 0 and self._timestamp(position - 1) == found:
+            position -= 1
+        result: Dict[str, List[Mapping[str, Any]]] = {}
+        for index in range(position, end):
+            _, code, offset, length, _ = self._entry(index)
+            endpoint = ARCHIVE_ENDPOINTS[code]
+            if endpoints is None or endpoint in endpoints:
+                result[endpoint] = self._block(offset, length).items()
+        return ArchivedSnapshot(found, result)
+
+    def history(
+            self,
+            endpoint: str,
+            key: EntityKey,
+            start: Optional[float] = None,
+            end: Optional[float] = None
+    ) -> Iterator[Tuple[float, Mapping[str, Any]]]:
+        """Read the payloads of one entity over time.
+
+        Only the blocks of the endpoint within the time range are read, and
+        only the payload of the entity is decoded from each.
+
+        Args:
+            endpoint (str): The endpoint, e.g. 'queues'.
+            key (EntityKey): The (vhost, name) of the entity, where the vhost
+                is None for nodes and vhosts, and the key of the overview is
+                (None, '').
+            start (Optional[float], optional): The earliest time. Defaults to
+                None.
+            end (Optional[float], optional): The latest time. Defaults to None.
+
+        Yields:
+            Tuple[float, Mapping[str, Any]]: The time of each snapshot
+                containing the entity and its payload.
+        """
+        code = ARCHIVE_ENDPOINTS.index(endpoint)
+        first = 0 if start is None else self._bisect(start, False)
+        last = self._count if end is None else self._bisect(end)
+        for position in range(first, last):
+            timestamp, entry_code, offset, length, _ = self._entry(position)
+            if entry_code != code:
+                continue
+            block = self._block(offset, length)
+            try:
+                index = block.keys.index(key)
+            except ValueError:
+                continue
+            yield timestamp, block.item(index)
+
+    def close(self) -> None:
+        """Unmap the files."""
+        self._data.close()
+        if self._index is not None:
+            self._index.close()
+
+    def __enter__(self) -> 'SnapshotReader':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
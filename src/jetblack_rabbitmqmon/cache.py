@@ -0,0 +1,253 @@
+"""Response cache"""
+
+from collections import OrderedDict
+import json
+import time
+from typing import Any, AsyncGenerator, AsyncIterable, Mapping, Optional, Tuple
+
+from .decoders import json_default
+from .requester import Requester
+
+CacheKey = Tuple[Tuple[str, ...], str]
+
+
+class CacheStats:
+    """Counters for a response cache"""
+
+    def __init__(self) -> None:
+        """Counters for a response cache.
+
+        Attributes:
+            hits (int): The number of GETs served from the cache.
+            misses (int): The number of GETs sent to the server.
+            evictions (int): The number of entries evicted to stay within the
+                bounds.
+            invalidations (int): The number of entries removed by a change to
+                the resource.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __str__(self) -> str:
+        return (
+            '<CacheStats hits={hits} misses={misses}'
+            ' evictions={evictions} invalidations={invalidations}>'
+        ).format(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            invalidations=self.invalidations
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class _CacheEntry:
+
+    __slots__ = ('expires', 'size', 'value')
+
+    def __init__(self, expires: float, size: int, value: Any) -> None:
+        self.expires = expires
+        self.size = size
+        self.value = value
+
+
+def _is_related(path: Tuple[str, ...], changed: Tuple[str, ...]) -> bool:
+    # A change affects the resource itself, the collections containing it and
+    # the resources beneath it.
+    length = min(len(path), len(changed))
+    return path[:length] == changed[:length]
+
+
+class CachingRequester(Requester):
+    """A requester which caches the responses of another requester"""
+
+    def __init__(
+            self,
+            requester: Requester,
+            ttls: Optional[Mapping[str, float]] = None,
+            default_ttl: float = 0.0,
+            max_entries: int = 1024,
+            max_bytes: int = 64 * 1024 * 1024,
+            coalesce: bool = True
+    ) -> None:
+        """A requester which caches the GET responses of another requester.
+
+        The time to live is chosen by the longest matching path prefix in
+        `ttls`, for example `{'overview': 5, 'nodes': 10, 'queues/prd': 1}`.
+        Concurrent identical GETs are coalesced into a single request. A PUT,
+        POST or DELETE invalidates the cached responses for the same resource,
+        the collections containing it, and the resources beneath it.
+
+        Cached responses are shared between callers and must not be mutated.
+
+        Args:
+            requester (Requester): The requester to wrap.
+            ttls (Optional[Mapping[str, float]], optional): The time to live in
+                seconds for each path prefix. Defaults to None.
+            default_ttl (float, optional): The time to live in seconds for
+                paths which do not match, where 0 disables caching. Defaults
+                to 0.0.
+            max_entries (int, optional): The maximum number of cached
+                responses. Defaults to 1024.
+            max_bytes (int, optional): The maximum total size of the cached
+                responses, measured as encoded JSON. Defaults to 64MB.
+            coalesce (bool, optional): If true concurrent identical GET
+                requests share a single request. Defaults to True.
+        """
+        super().__init__(coalesce)
+        self._requester = requester
+        self.ttls = {
+            tuple(path.strip('/').split('/')): ttl
+            for path, ttl in (ttls or {}).items()
+        }
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._entries: OrderedDict[CacheKey, _CacheEntry] = OrderedDict()
+        self._size = 0
+        self._generation = 0
+
+    async def aclose(self) -> None:
+        await self._requester.aclose()
+
+    def iter_content(
+            self,
+            *args: str,
+            method: str = 'GET',
+            data: Optional[Any] = None,
+            params: Optional[Any] = None
+    ) -> AsyncGenerator[bytes, None]:
+        # Streamed responses are too large to cache.
+        return self._requester.iter_content(
+            *args,
+            method=method,
+            data=data,
+            params=params
+        )
+
+    async def upload(
+            self,
+            method: str,
+            *args: str,
+            body: AsyncIterable[bytes],
+            params: Optional[Any] = None
+    ) -> None:
+        try:
+            await self._requester.upload(method, *args, body=body, params=params)
+        finally:
+            # An upload may change anything, such as a definitions import.
+            self.clear()
+
+    def ttl(self, *args: str) -> float:
+        """Find the time to live for a path.
+
+        Returns:
+            float: The time to live in seconds.
+        """
+        for length in range(len(args), 0, -1):
+            ttl = self.ttls.get(args[:length])
+            if ttl is not None:
+                return ttl
+        return self.default_ttl
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._entries.clear()
+        self._size = 0
+        self._generation += 1
+
+    def invalidate(self, *args: str) -> None:
+        """Remove the cached responses related to a path.
+
+        The responses for the path, the collections containing it, and the
+        resources beneath it are removed.
+        """
+        self._generation += 1
+        for key in [key for key in self._entries if _is_related(key[0], args)]:
+            self._remove(key)
+            self.stats.invalidations += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def _store(self, key: CacheKey, ttl: float, value: Any) -> None:
+        size = len(json.dumps(value, default=json_default))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _CacheEntry(time.monotonic() + ttl, size, value)
+        self._size += size
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    async def _fetch(
+            self,
+            key: CacheKey,
+            args: Tuple[str, ...],
+            data: Optional[Any],
+            params: Optional[Any]
+    ) -> Optional[Any]:
+        generation = self._generation
+        self.stats.misses += 1
+        response = await self._requester.send(
+            'GET',
+            *args,
+            data=data,
+            params=params
+        )
+        ttl = self.ttl(*args)
+        # Responses fetched across a change may be stale, so are not kept.
+        if ttl > 0 and generation == self._generation:
+            self._store(key, ttl, response)
+        return response
+
+    async def request(
+            self,
+            method: str,
+            *args: str,
+            data: Optional[Any] = None,
+            params: Optional[Any] = None
+    ) -> Optional[Any]:
+        """Make an HTTP request, using the cache for GET requests.
+
+        Args:
+            method (str): The HTTP method
+            data (Optional[Any], optional): Used for the body. Defaults to None.
+            params (Optional[Any], optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            ValueError: If the request fails
+
+        Returns:
+            Optional[Any]: The JSON decoded response.
+        """
+        if method != 'GET':
+            try:
+                return await self._requester.send(
+                    method,
+                    *args,
+                    data=data,
+                    params=params
+                )
+            finally:
+                self.invalidate(*args)
+
+        key: CacheKey = (args, json.dumps([data, params], sort_keys=True))
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry.value
+            self._remove(key)
+
+        return await self._fetch(key, args, data, params)
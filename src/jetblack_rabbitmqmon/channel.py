@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
-from typing import Any, Mapping
+from typing import Any, Mapping, Optional
 
 from .api import Api
+from .history import MetricsHistory, TrackedMixin, CHANNEL_SERIES
 
 
-class Channel:
+class Channel(TrackedMixin):
     """A RabbitMQ channel"""
 
+    SERIES = CHANNEL_SERIES
+
     def __init__(
             self,
             api: Api,
@@ -17,6 +20,9 @@ class Channel:
     ):
         """A RabbitMQ Channel
 
+        Attributes which are missing from a partial payload, for example when
+        columns have been selected, are None.
+
         Attributes:
             node (str): The node name.
             vhost (str): The name of the virtual host.
@@ -24,14 +30,15 @@ class Channel:
             number (int): The channel number
         """
         self._api = api
+        self.history: Optional[MetricsHistory] = None
         self._init(**kwargs)
 
     def _init(
         self,
-        node: str,
-        vhost: str,
         name: str,
-        number: int,
+        node: Optional[str] = None,
+        vhost: Optional[str] = None,
+        number: Optional[int] = None,
         **metrics
     ) -> Channel:
         self.node = node
@@ -39,6 +46,7 @@ class Channel:
         self.name = name
         self.number = number
         self.metrics: Mapping[str, Any] = metrics
+        self._record(metrics)
         return self
 
     async def refresh(self) -> Channel:
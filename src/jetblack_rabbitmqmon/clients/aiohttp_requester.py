@@ -2,12 +2,17 @@
 
 import json
 import ssl
-from typing import Any
+from typing import Any, AsyncGenerator, AsyncIterable, Tuple
 from urllib.parse import quote
 
-from aiohttp import ClientSession, BasicAuth
+from aiohttp import BasicAuth, ClientError, ClientSession, TCPConnector
 
-from ..requester import Requester
+from ..decoders import Decoder, default_decoder
+from ..instrumentation import Instrumentation
+from ..policy import CircuitBreaker, RetryPolicy
+from ..requester import Requester, RequestError
+
+_CHUNK_SIZE = 1 << 16
 
 
 def _quote(value):
@@ -22,28 +27,99 @@ class AioHttpRequester(Requester):
             url: str,
             username: str,
             password: str,
-            cafile: str | None = None
+            cafile: str | None = None,
+            max_connections: int = 100,
+            max_connections_per_host: int = 0,
+            keepalive_timeout: float = 15.0,
+            coalesce: bool = True,
+            timeout: float | None = None,
+            deadline: float | None = None,
+            retry: RetryPolicy | None = None,
+            circuit_breaker: CircuitBreaker | None = None,
+            decoder: Decoder | None = None,
+            instrumentation: Instrumentation | None = None
     ):
         """An HTTP client
 
+        The client holds a single session with a pool of keep-alive
+        connections. The session is opened on the first request, and is closed
+        with `aclose` or by using the requester as an async context manager.
+
         Args:
             url (str): The RabbitMQ url
             username (str): The username
             password (str): The password
             cafile (str | None, optional): The certificate file. Defaults
                 to '/etc/ssl/certs/ca-certificates.crt'.
+            max_connections (int, optional): The maximum number of pooled
+                connections. Defaults to 100.
+            max_connections_per_host (int, optional): The maximum number of
+                pooled connections to a single host, where 0 is unlimited.
+                Defaults to 0.
+            keepalive_timeout (float, optional): The number of seconds an idle
+                connection is kept open. Defaults to 15.0.
+            coalesce (bool, optional): If true concurrent identical GET
+                requests share a single request. Defaults to True.
+            timeout (float | None, optional): The limit in seconds for each
+                attempt. Defaults to None.
+            deadline (float | None, optional): The limit in seconds for a
+                request including retries. Defaults to None.
+            retry (RetryPolicy | None, optional): How failed requests are
+                retried. Defaults to None, for no retries.
+            circuit_breaker (CircuitBreaker | None, optional): Fails requests
+                fast while the server is unhealthy. Defaults to None.
+            decoder (Decoder | None, optional): Decodes the response bodies.
+                Defaults to None, for the fastest JSON decoder installed.
+            instrumentation (Instrumentation | None, optional): Called as
+                each attempt starts and ends. Defaults to None.
         """
+        super().__init__(
+            coalesce,
+            timeout,
+            deadline,
+            retry,
+            circuit_breaker,
+            instrumentation
+        )
         self._base_url = f'{url}/api'
+        self.decoder = decoder or default_decoder()
 
         self.auth = BasicAuth(username, password)
         self.ssl_context = ssl.create_default_context(
             cafile=cafile
         ) if cafile else False
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._session: ClientSession | None = None
 
     def _build_url(self, *args: str) -> str:
         quoted_args = map(_quote, args)
         return f"{self._base_url}/{'/'.join(quoted_args)}"
 
+    def _get_session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ssl=self.ssl_context
+            )
+            self._session = ClientSession(auth=self.auth, connector=connector)
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the session and its pooled connections"""
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+    def _params_as_str(self, params: Any | None) -> dict[str, str] | None:
+        return {
+            name: value if isinstance(value, str) else json.dumps(value)
+            for name, value in params.items()
+        } if params else None
+
     async def request(
             self,
             method: str,
@@ -59,28 +135,116 @@ class AioHttpRequester(Requester):
             params (Any | None, optional): Used for a querystring. Defaults to None.
 
         Raises:
-            ValueError: If the request fails
+            RequestError: If the request fails
 
         Returns:
             Any | None: The JSON decoded response.
         """
 
         url = self._build_url(*args)
-        params_as_str = {
-            name: json.dumps(value)
-            for name, value in params.items()
-        } if params else None
+        params_as_str = self._params_as_str(params)
 
-        async with ClientSession(auth=self.auth) as session:
+        session = self._get_session()
+        try:
             async with session.request(
                     method,
                     url,
                     params=params_as_str,
-                    json=data,
-                    ssl=self.ssl_context
+                    json=data
             ) as response:
-                if response.status == 200:
-                    body = await response.json()
-                    return body
+                if not 200 <= response.status < 300:
+                    raise RequestError(
+                        f'{method} {url} failed with status {response.status}',
+                        response.status
+                    )
+                content = await response.read()
+                self.record_response(response.status, len(content))
+        except ClientError as error:
+            raise RequestError(f'{method} {url} failed: {error}') from error
+
+        if not content:
+            return None
+        return self.decoder(content, args)
+
+    def iter_content(
+            self,
+            *args: str,
+            method: str = 'GET',
+            data: Any | None = None,
+            params: Any | None = None
+    ) -> AsyncGenerator[bytes, None]:
+        """Make a request, yielding the body in chunks as it is received.
 
-        raise ValueError('Request failed')
+        Args:
+            method (str, optional): The HTTP method. Defaults to 'GET'.
+            data (Any | None, optional): Used for the body. Defaults to None.
+            params (Any | None, optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            RequestError: If the request fails
+
+        Returns:
+            AsyncGenerator[bytes, None]: The chunks of the body.
+        """
+        return self._iter_content(args, method, data, params)
+
+    async def _iter_content(
+            self,
+            args: Tuple[str, ...],
+            method: str,
+            data: Any | None,
+            params: Any | None
+    ) -> AsyncGenerator[bytes, None]:
+        url = self._build_url(*args)
+        session = self._get_session()
+        try:
+            async with session.request(
+                    method,
+                    url,
+                    params=self._params_as_str(params),
+                    json=data
+            ) as response:
+                if not 200 <= response.status < 300:
+                    raise RequestError(
+                        f'{method} {url} failed with status {response.status}',
+                        response.status
+                    )
+                async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                    yield chunk
+        except ClientError as error:
+            raise RequestError(f'{method} {url} failed: {error}') from error
+
+    async def upload(
+            self,
+            method: str,
+            *args: str,
+            body: AsyncIterable[bytes],
+            params: Any | None = None
+    ) -> None:
+        """Make a request with a JSON body sent with chunked encoding.
+
+        Args:
+            method (str): The HTTP method
+            body (AsyncIterable[bytes]): The chunks of the encoded JSON body.
+            params (Any | None, optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            RequestError: If the request fails
+        """
+        url = self._build_url(*args)
+        session = self._get_session()
+        try:
+            async with session.request(
+                    method,
+                    url,
+                    params=self._params_as_str(params),
+                    data=body,
+                    headers={'Content-Type': 'application/json'}
+            ) as response:
+                if not 200 <= response.status < 300:
+                    raise RequestError(
+                        f'{method} {url} failed with status {response.status}',
+                        response.status
+                    )
+        except ClientError as error:
+            raise RequestError(f'{method} {url} failed: {error}') from error
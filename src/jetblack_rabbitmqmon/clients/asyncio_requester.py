@@ -0,0 +1,544 @@
+"""asyncio requester"""
+
+import asyncio
+from base64 import b64encode
+import json
+import time
+from typing import Any, AsyncGenerator, AsyncIterable, Dict, List, Tuple
+from urllib.parse import quote, urlencode, urlsplit
+import zlib
+
+from ..decoders import Decoder, default_decoder
+from ..instrumentation import Instrumentation
+from ..policy import CircuitBreaker, RetryPolicy
+from ..requester import IDEMPOTENT_METHODS, Requester, RequestError
+
+_CHUNK_SIZE = 1 << 16
+
+
+def _quote(value):
+    return quote(value, '')
+
+
+class _Connection:
+    """A pooled HTTP/1.1 connection"""
+
+    __slots__ = ('reader', 'writer', 'last_used')
+
+    def __init__(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+
+    def is_usable(self, keepalive_timeout: float) -> bool:
+        return (
+            not self.writer.is_closing()
+            and not self.reader.at_eof()
+            and time.monotonic() - self.last_used < keepalive_timeout
+        )
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _ServerClosedError(ConnectionError):
+    """The server closed a kept alive connection before responding"""
+
+
+async def _read_headers(
+        reader: asyncio.StreamReader
+) -> Tuple[str, int, Dict[str, str]]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise _ServerClosedError('The server closed the connection')
+    try:
+        version, status, *_ = status_line.decode('latin-1').split(None, 2)
+        status_code = int(status)
+    except ValueError as error:
+        raise RequestError(f'Invalid status line {status_line!r}') from error
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n'):
+            break
+        if not line:
+            raise asyncio.IncompleteReadError(b'', None)
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        value = value.strip()
+        headers[name] = f'{headers[name]}, {value}' if name in headers else value
+    return version, status_code, headers
+
+
+async def _iter_chunked(reader: asyncio.StreamReader) -> AsyncGenerator[bytes, None]:
+    while True:
+        size_line = await reader.readline()
+        size = int(size_line.split(b';', 1)[0].strip(), 16)
+        if size == 0:
+            break
+        yield await reader.readexactly(size)
+        await reader.readexactly(2)
+    # Skip any trailers.
+    while (await reader.readline()).strip():
+        pass
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    return b''.join([chunk async for chunk in _iter_chunked(reader)])
+
+
+async def _iter_body(
+        reader: asyncio.StreamReader,
+        headers: Dict[str, str]
+) -> AsyncGenerator[bytes, None]:
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        async for chunk in _iter_chunked(reader):
+            yield chunk
+    elif 'content-length' in headers:
+        remaining = int(headers['content-length'])
+        while remaining:
+            chunk = await reader.read(min(remaining, _CHUNK_SIZE))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b'', remaining)
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        while chunk := await reader.read(_CHUNK_SIZE):
+            yield chunk
+
+
+def _is_keep_alive(version: str, headers: Dict[str, str]) -> bool:
+    if version == 'HTTP/1.1':
+        return headers.get('connection', '').lower() != 'close'
+    return headers.get('connection', '').lower() == 'keep-alive'
+
+
+def _has_body(method: str, status: int) -> bool:
+    return not (method == 'HEAD' or status in (204, 304) or 100 <= status < 200)
+
+
+def _decompress(content: bytes, encoding: str) -> bytes:
+    if encoding in ('', 'identity'):
+        return content
+    if encoding in ('gzip', 'x-gzip'):
+        return zlib.decompress(content, 16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(content)
+        except zlib.error:
+            return zlib.decompress(content, -zlib.MAX_WBITS)
+    raise RequestError(f'Unsupported content encoding "{encoding}"')
+
+
+class AsyncioRequester(Requester):
+    """An HTTP client with no dependencies outside the standard library"""
+
+    def __init__(
+            self,
+            url: str,
+            username: str,
+            password: str,
+            cafile: str | None = None,
+            max_connections: int = 10,
+            keepalive_timeout: float = 15.0,
+            coalesce: bool = True,
+            timeout: float | None = None,
+            deadline: float | None = None,
+            retry: RetryPolicy | None = None,
+            circuit_breaker: CircuitBreaker | None = None,
+            decoder: Decoder | None = None,
+            instrumentation: Instrumentation | None = None
+    ):
+        """An HTTP client with no dependencies outside the standard library.
+
+        The client speaks HTTP/1.1 over `asyncio` streams, keeping a small
+        pool of keep-alive connections. It accepts chunked and gzip or deflate
+        encoded responses. TLS is used for https urls.
+
+        Args:
+            url (str): The RabbitMQ url
+            username (str): The username
+            password (str): The password
+            cafile (str | None, optional): The certificate file. Defaults
+                to None, for the system certificates.
+            max_connections (int, optional): The maximum number of open
+                connections. Defaults to 10.
+            keepalive_timeout (float, optional): The number of seconds an idle
+                connection is kept open. Defaults to 15.0.
+            coalesce (bool, optional): If true concurrent identical GET
+                requests share a single request. Defaults to True.
+            timeout (float | None, optional): The limit in seconds for each
+                attempt. Defaults to None.
+            deadline (float | None, optional): The limit in seconds for a
+                request including retries. Defaults to None.
+            retry (RetryPolicy | None, optional): How failed requests are
+                retried. Defaults to None, for no retries.
+            circuit_breaker (CircuitBreaker | None, optional): Fails requests
+                fast while the server is unhealthy. Defaults to None.
+            decoder (Decoder | None, optional): Decodes the response bodies.
+                Defaults to None, for the fastest JSON decoder installed.
+            instrumentation (Instrumentation | None, optional): Called as
+                each attempt starts and ends. Defaults to None.
+        """
+        super().__init__(
+            coalesce,
+            timeout,
+            deadline,
+            retry,
+            circuit_breaker,
+            instrumentation
+        )
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f'Invalid url "{url}"')
+        self.decoder = decoder or default_decoder()
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.cafile = cafile
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self._use_tls = parts.scheme == 'https'
+        self._base_path = f"{parts.path.rstrip('/')}/api"
+        # IPv6 addresses are bracketed, as in the url.
+        host = f'[{self.host}]' if ':' in self.host else self.host
+        self._host_header = host if parts.port is None else f'{host}:{self.port}'
+        credentials = f'{username}:{password}'.encode('utf-8')
+        self._authorization = f"Basic {b64encode(credentials).decode('ascii')}"
+        self._ssl_context: Any = None
+        self._idle: List[_Connection] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    def _build_target(self, args: Tuple[str, ...], params: Any | None) -> str:
+        target = f"{self._base_path}/{'/'.join(map(_quote, args))}"
+        if params:
+            target += '?' + urlencode({
+                name: value if isinstance(value, str) else json.dumps(value)
+                for name, value in params.items()
+            })
+        return target
+
+    async def _open(self) -> _Connection:
+        ssl_context = None
+        if self._use_tls:
+            if self._ssl_context is None:
+                # Only load ssl when it is needed.
+                import ssl  # pylint: disable=import-outside-toplevel
+                self._ssl_context = ssl.create_default_context(cafile=self.cafile)
+            ssl_context = self._ssl_context
+        reader, writer = await asyncio.open_connection(
+            self.host,
+            self.port,
+            ssl=ssl_context
+        )
+        return _Connection(reader, writer)
+
+    def _take_idle(self) -> _Connection | None:
+        while self._idle:
+            connection = self._idle.pop()
+            if connection.is_usable(self.keepalive_timeout):
+                return connection
+            connection.close()
+        return None
+
+    async def aclose(self) -> None:
+        """Close the pooled connections"""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _head(self, method: str, target: str, *extra: str) -> bytes:
+        lines = [
+            f'{method} {target} HTTP/1.1',
+            f'Host: {self._host_header}',
+            f'Authorization: {self._authorization}',
+            'Accept: application/json',
+            'Accept-Encoding: gzip, deflate',
+            'Connection: keep-alive',
+            *extra
+        ]
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    def _build_request(self, method: str, target: str, data: Any | None) -> bytes:
+        body = b'' if data is None else json.dumps(data).encode('utf-8')
+        extra = []
+        if data is not None:
+            extra.append('Content-Type: application/json')
+        if body or method in ('POST', 'PUT'):
+            extra.append(f'Content-Length: {len(body)}')
+        return self._head(method, target, *extra) + body
+
+    async def _read_content(
+            self,
+            connection: _Connection,
+            method: str
+    ) -> Tuple[int, bytes, bool]:
+        reader = connection.reader
+        version, status, headers = await _read_headers(reader)
+        keep_alive = _is_keep_alive(version, headers)
+        if not _has_body(method, status):
+            content = b''
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            content = await _read_chunked(reader)
+        elif 'content-length' in headers:
+            content = await reader.readexactly(int(headers['content-length']))
+        else:
+            content = await reader.read()
+            keep_alive = False
+        content = _decompress(
+            content,
+            headers.get('content-encoding', '').strip().lower()
+        )
+        return status, content, keep_alive
+
+    async def _exchange(
+            self,
+            connection: _Connection,
+            request: bytes,
+            method: str
+    ) -> Tuple[int, bytes, bool]:
+        connection.writer.write(request)
+        await connection.writer.drain()
+        return await self._read_content(connection, method)
+
+    async def _start(
+            self,
+            request: bytes,
+            method: str
+    ) -> Tuple[_Connection, str, int, Dict[str, str]]:
+        # Send a request with no body and read the response headers, sending
+        # an idempotent request again on a new connection if an idle one was
+        # closed by the server.
+        connection = self._take_idle()
+        if connection is not None:
+            try:
+                connection.writer.write(request)
+                await connection.writer.drain()
+                return connection, *await _read_headers(connection.reader)
+            except (_ServerClosedError, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if method not in IDEMPOTENT_METHODS:
+                    raise
+            except BaseException:
+                connection.close()
+                raise
+        connection = await self._open()
+        try:
+            connection.writer.write(request)
+            await connection.writer.drain()
+            return connection, *await _read_headers(connection.reader)
+        except BaseException:
+            connection.close()
+            raise
+
+    async def _round_trip(
+            self,
+            request: bytes,
+            method: str
+    ) -> Tuple[_Connection, int, bytes, bool]:
+        # Send a request and read the response, sending an idempotent request
+        # again on a new connection if an idle one was closed by the server,
+        # perhaps before it received the request. A connection which fails,
+        # or is cancelled by a timeout, is in an unknown state so is closed.
+        connection = self._take_idle()
+        if connection is not None:
+            try:
+                return connection, *await self._exchange(connection, request, method)
+            except (_ServerClosedError, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if method not in IDEMPOTENT_METHODS:
+                    raise
+            except BaseException:
+                connection.close()
+                raise
+        connection = await self._open()
+        try:
+            return connection, *await self._exchange(connection, request, method)
+        except BaseException:
+            connection.close()
+            raise
+
+    def _release(self, connection: _Connection, keep_alive: bool) -> None:
+        if keep_alive:
+            connection.last_used = time.monotonic()
+            self._idle.append(connection)
+        else:
+            connection.close()
+
+    async def request(
+            self,
+            method: str,
+            *args: str,
+            data: Any | None = None,
+            params: Any | None = None
+    ) -> Any | None:
+        """Make an HTTP request
+
+        Args:
+            method (str): The HTTP method
+            data (Any | None, optional): Used for the body. Defaults to None.
+            params (Any | None, optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            RequestError: If the request fails
+
+        Returns:
+            Any | None: The JSON decoded response.
+        """
+        target = self._build_target(args, params)
+        request = self._build_request(method, target, data)
+
+        async with self._slots:
+            try:
+                connection, status, content, keep_alive = await self._round_trip(
+                    request,
+                    method
+                )
+            except (OSError, asyncio.IncompleteReadError, ValueError, zlib.error) as error:
+                raise RequestError(
+                    f'{method} {target} failed: {error!r}'
+                ) from error
+            self._release(connection, keep_alive)
+
+        self.record_response(status, len(content))
+        if not 200 <= status < 300:
+            raise RequestError(
+                f'{method} {target} failed with status {status}',
+                status
+            )
+        if not content:
+            return None
+        return self.decoder(content, args)
+
+    def iter_content(
+            self,
+            *args: str,
+            method: str = 'GET',
+            data: Any | None = None,
+            params: Any | None = None
+    ) -> AsyncGenerator[bytes, None]:
+        """Make a request, yielding the body in chunks as it is received.
+
+        The connection is held until the iteration finishes or is closed.
+
+        Args:
+            method (str, optional): The HTTP method. Defaults to 'GET'.
+            data (Any | None, optional): Used for the body. Defaults to None.
+            params (Any | None, optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            RequestError: If the request fails
+
+        Returns:
+            AsyncGenerator[bytes, None]: The chunks of the body.
+        """
+        return self._iter_content(args, method, data, params)
+
+    async def _iter_content(
+            self,
+            args: Tuple[str, ...],
+            method: str,
+            data: Any | None,
+            params: Any | None
+    ) -> AsyncGenerator[bytes, None]:
+        target = self._build_target(args, params)
+        request = self._build_request(method, target, data)
+        async with self._slots:
+            connection: _Connection | None = None
+            keep_alive = False
+            try:
+                connection, version, status, headers = await self._start(request, method)
+                if not 200 <= status < 300:
+                    raise RequestError(f'{method} {target} failed with status {status}', status)
+                encoding = headers.get('content-encoding', '').strip().lower()
+                if encoding in ('', 'identity'):
+                    decompressor = None
+                elif encoding in ('gzip', 'x-gzip', 'deflate'):
+                    # Accept either a gzip or a zlib header.
+                    decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)
+                else:
+                    raise RequestError(f'Unsupported content encoding "{encoding}"')
+                if _has_body(method, status):
+                    async for chunk in _iter_body(connection.reader, headers):
+                        if decompressor is not None:
+                            chunk = decompressor.decompress(chunk)
+                        if chunk:
+                            yield chunk
+                    if decompressor is not None and (chunk := decompressor.flush()):
+                        yield chunk
+                keep_alive = _is_keep_alive(version, headers) and (
+                    'content-length' in headers
+                    or 'chunked' in headers.get('transfer-encoding', '').lower()
+                )
+            except RequestError:
+                raise
+            except (OSError, asyncio.IncompleteReadError, ValueError, zlib.error) as error:
+                raise RequestError(f'{method} {target} failed: {error!r}') from error
+            finally:
+                if connection is not None:
+                    self._release(connection, keep_alive)
+
+    async def upload(
+            self,
+            method: str,
+            *args: str,
+            body: AsyncIterable[bytes],
+            params: Any | None = None
+    ) -> None:
+        """Make a request with a JSON body sent with chunked encoding.
+
+        A new connection is used, as the body cannot be sent again if the
+        server had closed an idle one.
+
+        Args:
+            method (str): The HTTP method
+            body (AsyncIterable[bytes]): The chunks of the encoded JSON body.
+            params (Any | None, optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            RequestError: If the request fails
+        """
+        target = self._build_target(args, params)
+        head = self._head(
+            method,
+            target,
+            'Content-Type: application/json',
+            'Transfer-Encoding: chunked'
+        )
+        async with self._slots:
+            connection: _Connection | None = None
+            try:
+                connection = await self._open()
+                writer = connection.writer
+                writer.write(head)
+                async for chunk in body:
+                    if chunk:
+                        writer.write(b'%x\r\n' % len(chunk))
+                        writer.write(chunk)
+                        writer.write(b'\r\n')
+                        await writer.drain()
+                writer.write(b'0\r\n\r\n')
+                await writer.drain()
+                status, _, keep_alive = await self._read_content(connection, method)
+            except RequestError:
+                if connection is not None:
+                    connection.close()
+                raise
+            except (OSError, asyncio.IncompleteReadError, ValueError, zlib.error) as error:
+                if connection is not None:
+                    connection.close()
+                raise RequestError(f'{method} {target} failed: {error!r}') from error
+            except BaseException:
+                if connection is not None:
+                    connection.close()
+                raise
+            self._release(connection, keep_alive)
+
+        if not 200 <= status < 300:
+            raise RequestError(
+                f'{method} {target} failed with status {status}',
+                status
+            )
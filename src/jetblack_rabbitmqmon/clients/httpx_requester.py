@@ -2,12 +2,15 @@
 
 import json
 import ssl
-from typing import Any
+from typing import Any, AsyncGenerator, AsyncIterable, Tuple
 from urllib.parse import quote
 
-from httpx import AsyncClient, BasicAuth
+from httpx import AsyncClient, BasicAuth, HTTPError, Limits
 
-from ..requester import Requester
+from ..decoders import Decoder, default_decoder
+from ..instrumentation import Instrumentation
+from ..policy import CircuitBreaker, RetryPolicy
+from ..requester import Requester, RequestError
 
 
 def _quote(value):
@@ -22,28 +25,98 @@ class HttpxRequester(Requester):
             url: str,
             username: str,
             password: str,
-            cafile: str | None = None
+            cafile: str | None = None,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            keepalive_expiry: float = 15.0,
+            coalesce: bool = True,
+            timeout: float | None = None,
+            deadline: float | None = None,
+            retry: RetryPolicy | None = None,
+            circuit_breaker: CircuitBreaker | None = None,
+            decoder: Decoder | None = None,
+            instrumentation: Instrumentation | None = None
     ):
         """An HTTP client
 
+        The client holds a single session with a pool of keep-alive
+        connections. The session is opened on the first request, and is closed
+        with `aclose` or by using the requester as an async context manager.
+
         Args:
             url (str): The RabbitMQ url
             username (str): The username
             password (str): The password
             cafile (Optional[str], optional): The certificate file. Defaults
                 to '/etc/ssl/certs/ca-certificates.crt'.
+            max_connections (int, optional): The maximum number of pooled
+                connections. Defaults to 100.
+            max_keepalive_connections (int, optional): The maximum number of
+                idle connections kept open. Defaults to 20.
+            keepalive_expiry (float, optional): The number of seconds an idle
+                connection is kept open. Defaults to 15.0.
+            coalesce (bool, optional): If true concurrent identical GET
+                requests share a single request. Defaults to True.
+            timeout (float | None, optional): The limit in seconds for each
+                attempt. Defaults to None.
+            deadline (float | None, optional): The limit in seconds for a
+                request including retries. Defaults to None.
+            retry (RetryPolicy | None, optional): How failed requests are
+                retried. Defaults to None, for no retries.
+            circuit_breaker (CircuitBreaker | None, optional): Fails requests
+                fast while the server is unhealthy. Defaults to None.
+            decoder (Decoder | None, optional): Decodes the response bodies.
+                Defaults to None, for the fastest JSON decoder installed.
+            instrumentation (Instrumentation | None, optional): Called as
+                each attempt starts and ends. Defaults to None.
         """
+        super().__init__(
+            coalesce,
+            timeout,
+            deadline,
+            retry,
+            circuit_breaker,
+            instrumentation
+        )
         self._base_url = f'{url}/api'
+        self.decoder = decoder or default_decoder()
 
         self.auth = BasicAuth(username, password)
         self.ssl_context = ssl.create_default_context(
             cafile=cafile
         ) if cafile else False
+        self.limits = Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._session: AsyncClient | None = None
 
     def _build_url(self, *args: str) -> str:
         quoted_args = map(_quote, args)
         return f"{self._base_url}/{'/'.join(quoted_args)}"
 
+    def _get_session(self) -> AsyncClient:
+        if self._session is None or self._session.is_closed:
+            self._session = AsyncClient(
+                auth=self.auth,
+                verify=self.ssl_context,
+                limits=self.limits
+            )
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the session and its pooled connections"""
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.aclose()
+
+    def _params_as_str(self, params: Any | None) -> dict[str, str] | None:
+        return {
+            name: value if isinstance(value, str) else json.dumps(value)
+            for name, value in params.items()
+        } if params else None
+
     async def request(
             self,
             method: str,
@@ -59,17 +132,14 @@ class HttpxRequester(Requester):
             params (Any | None, optional): Used for a querystring. Defaults to None.
 
         Raises:
-            ValueError: If the request fails
+            RequestError: If the request fails
 
         Returns:
             Any | None: The JSON decoded response.
         """
 
         url = self._build_url(*args)
-        params_as_str = {
-            name: json.dumps(value)
-            for name, value in params.items()
-        } if params else None
+        params_as_str = self._params_as_str(params)
 
         headers = (
             None
@@ -77,7 +147,8 @@ class HttpxRequester(Requester):
             else {'Content-Type': 'application/json'}
         )
 
-        async with AsyncClient(auth=self.auth, verify=self.ssl_context) as session:
+        session = self._get_session()
+        try:
             response = await session.request(
                 method,
                 url,
@@ -85,10 +156,98 @@ class HttpxRequester(Requester):
                 params=params_as_str,
                 json=data,
             )
-            response.raise_for_status()
-            if response.content == b'':
-                return None
-            body = response.json()
-            return body
+        except HTTPError as error:
+            raise RequestError(f'{method} {url} failed: {error}') from error
+        if response.is_error:
+            raise RequestError(
+                f'{method} {url} failed with status {response.status_code}',
+                response.status_code
+            )
+        self.record_response(response.status_code, len(response.content))
+        if response.content == b'':
+            return None
+        return self.decoder(response.content, args)
+
+    def iter_content(
+            self,
+            *args: str,
+            method: str = 'GET',
+            data: Any | None = None,
+            params: Any | None = None
+    ) -> AsyncGenerator[bytes, None]:
+        """Make a request, yielding the body in chunks as it is received.
+
+        Args:
+            method (str, optional): The HTTP method. Defaults to 'GET'.
+            data (Any | None, optional): Used for the body. Defaults to None.
+            params (Any | None, optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            RequestError: If the request fails
 
-        raise ValueError('Request failed')
+        Returns:
+            AsyncGenerator[bytes, None]: The chunks of the body.
+        """
+        return self._iter_content(args, method, data, params)
+
+    async def _iter_content(
+            self,
+            args: Tuple[str, ...],
+            method: str,
+            data: Any | None,
+            params: Any | None
+    ) -> AsyncGenerator[bytes, None]:
+        url = self._build_url(*args)
+        session = self._get_session()
+        try:
+            async with session.stream(
+                    method,
+                    url,
+                    headers=None if data is None else {'Content-Type': 'application/json'},
+                    params=self._params_as_str(params),
+                    json=data
+            ) as response:
+                if response.is_error:
+                    raise RequestError(
+                        f'{method} {url} failed with status {response.status_code}',
+                        response.status_code
+                    )
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+        except HTTPError as error:
+            raise RequestError(f'{method} {url} failed: {error}') from error
+
+    async def upload(
+            self,
+            method: str,
+            *args: str,
+            body: AsyncIterable[bytes],
+            params: Any | None = None
+    ) -> None:
+        """Make a request with a JSON body sent with chunked encoding.
+
+        Args:
+            method (str): The HTTP method
+            body (AsyncIterable[bytes]): The chunks of the encoded JSON body.
+            params (Any | None, optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            RequestError: If the request fails
+        """
+        url = self._build_url(*args)
+        session = self._get_session()
+        try:
+            response = await session.request(
+                method,
+                url,
+                headers={'Content-Type': 'application/json'},
+                params=self._params_as_str(params),
+                content=body
+            )
+        except HTTPError as error:
+            raise RequestError(f'{method} {url} failed: {error}') from error
+        if response.is_error:
+            raise RequestError(
+                f'{method} {url} failed with status {response.status_code}',
+                response.status_code
+            )
@@ -0,0 +1,328 @@
+"""Cluster set monitor"""
+
+import asyncio
+import errno
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar
+)
+
+from .channel import Channel
+from .connection import Connection
+from .monitor import Monitor
+from .node import Node
+from .requester import (
+    IDEMPOTENT_METHODS,
+    CircuitOpenError,
+    Requester,
+    RequestError
+)
+from .vhost import VHost
+from .vhost_queue import VHostQueue
+
+T = TypeVar('T')
+
+
+def _was_not_sent(error: RequestError) -> bool:
+    # The request provably never reached a server when the circuit was open
+    # or the connection was refused.
+    if isinstance(error, CircuitOpenError):
+        return True
+    cause: Optional[BaseException] = error
+    while cause is not None:
+        if isinstance(cause, ConnectionRefusedError) or (
+                isinstance(cause, OSError) and cause.errno == errno.ECONNREFUSED
+        ):
+            return True
+        cause = cause.__cause__
+    return False
+
+
+class FailoverRequester(Requester):
+    """A requester which fails over between the management endpoints of a
+    cluster"""
+
+    def __init__(
+            self,
+            requesters: Sequence[Requester],
+            coalesce: bool = True
+    ) -> None:
+        """A requester which fails over between the management endpoints of a
+        cluster.
+
+        Requests are sent to the endpoint which last succeeded. When it fails
+        for a transient reason, such as a connection error, a timeout or an
+        open circuit breaker, the request is sent to the next endpoint.
+        Permanent failures, such as a 404 status, are raised immediately.
+
+        As a server may have acted on a request which failed, a request with
+        a method which is not idempotent, such as POST, only fails over when
+        it was never sent: when the connection was refused or the circuit
+        breaker was open.
+
+        Args:
+            requesters (Sequence[Requester]): A requester for each endpoint.
+            coalesce (bool, optional): If true concurrent identical GET
+                requests share a single request. Defaults to True.
+        """
+        if not requesters:
+            raise ValueError('At least one requester is required')
+        super().__init__(coalesce)
+        self.requesters = list(requesters)
+        self._current = 0
+
+    async def aclose(self) -> None:
+        for requester in self.requesters:
+            await requester.aclose()
+
+    def iter_content(
+            self,
+            *args: str,
+            method: str = 'GET',
+            data: Optional[Any] = None,
+            params: Optional[Any] = None
+    ) -> AsyncGenerator[bytes, None]:
+        # A stream cannot fail over part way, so it uses the current endpoint.
+        return self.requesters[self._current].iter_content(
+            *args,
+            method=method,
+            data=data,
+            params=params
+        )
+
+    async def upload(
+            self,
+            method: str,
+            *args: str,
+            body: AsyncIterable[bytes],
+            params: Optional[Any] = None
+    ) -> None:
+        await self.requesters[self._current].upload(method, *args, body=body, params=params)
+
+    async def request(
+            self,
+            method: str,
+            *args: str,
+            data: Optional[Any] = None,
+            params: Optional[Any] = None
+    ) -> Optional[Any]:
+        """Make an HTTP request, failing over to the other endpoints.
+
+        Args:
+            method (str): The HTTP method
+            data (Optional[Any], optional): Used for the body. Defaults to None.
+            params (Optional[Any], optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            RequestError: If the request fails on every endpoint.
+
+        Returns:
+            Optional[Any]: The JSON decoded response.
+        """
+        start = self._current
+        count = len(self.requesters)
+        for offset in range(count):
+            index = (start + offset) % count
+            try:
+                response = await self.requesters[index].send(
+                    method,
+                    *args,
+                    data=data,
+                    params=params
+                )
+            except RequestError as error:
+                if (
+                        not error.is_transient or
+                        offset == count - 1 or
+                        (method not in IDEMPOTENT_METHODS and not _was_not_sent(error))
+                ):
+                    raise
+            else:
+                self._current = index
+                return response
+        raise RequestError('No endpoints available')
+
+
+class ClusterResults(Generic[T]):
+    """The results of a sweep across clusters"""
+
+    def __init__(
+            self,
+            results: Dict[str, T],
+            errors: Dict[str, Exception],
+            elapsed: float
+    ) -> None:
+        """The results of a sweep across clusters.
+
+        Args:
+            results (Dict[str, T]): The result for each cluster which
+                succeeded.
+            errors (Dict[str, Exception]): The error for each cluster which
+                failed.
+            elapsed (float): The duration of the sweep in seconds.
+
+        Attributes:
+            results (Dict[str, T]): The result for each cluster which
+                succeeded.
+            errors (Dict[str, Exception]): The error for each cluster which
+                failed.
+            elapsed (float): The duration of the sweep in seconds.
+        """
+        self.results = results
+        self.errors = errors
+        self.elapsed = elapsed
+
+    def tagged(self) -> List[Tuple[str, Any]]:
+        """Merge the results of the clusters, tagging each item with the
+        name of its cluster.
+
+        List results are merged item by item, mapping results value by value,
+        and any other result is included as it is.
+
+        Returns:
+            List[Tuple[str, Any]]: The cluster names and items.
+        """
+        merged: List[Tuple[str, Any]] = []
+        for cluster, result in self.results.items():
+            items: Iterable[Any]
+            if isinstance(result, list):
+                items = result
+            elif isinstance(result, Mapping):
+                items = result.values()
+            else:
+                items = (result,)
+            merged.extend((cluster, item) for item in items)
+        return merged
+
+    def __str__(self) -> str:
+        return '<ClusterResults ok={ok} failed={failed} elapsed={elapsed:.3f}>'.format(
+            ok=list(self.results),
+            failed=list(self.errors),
+            elapsed=self.elapsed
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class ClusterSetMonitor:
+    """Monitor many clusters concurrently"""
+
+    def __init__(
+            self,
+            clusters: Mapping[str, Sequence[Requester]]
+    ) -> None:
+        """Monitor many clusters concurrently.
+
+        Each sweep queries every cluster at the same time, so it takes as long
+        as the slowest cluster. A cluster with several management endpoints
+        fails over between them.
+
+        Args:
+            clusters (Mapping[str, Sequence[Requester]]): A requester for each
+                management endpoint of each cluster, keyed by cluster name.
+
+        Attributes:
+            monitors (Mapping[str, Monitor]): The monitor for each cluster.
+        """
+        self.monitors: Mapping[str, Monitor] = {
+            name: Monitor(
+                requesters[0]
+                if len(requesters) == 1
+                else FailoverRequester(requesters)
+            )
+            for name, requesters in clusters.items()
+        }
+
+    async def __aenter__(self) -> "ClusterSetMonitor":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the requesters of every cluster."""
+        await asyncio.gather(
+            *(monitor.aclose() for monitor in self.monitors.values())
+        )
+
+    async def sweep(
+            self,
+            func: Callable[[Monitor], Awaitable[T]]
+    ) -> ClusterResults[T]:
+        """Call a function with the monitor of every cluster concurrently.
+
+        Args:
+            func (Callable[[Monitor], Awaitable[T]]): The function to call.
+
+        Returns:
+            ClusterResults[T]: The results and errors of each cluster.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        names = list(self.monitors)
+        responses = await asyncio.gather(
+            *(func(self.monitors[name]) for name in names),
+            return_exceptions=True
+        )
+        results: Dict[str, T] = {}
+        errors: Dict[str, Exception] = {}
+        for name, response in zip(names, responses):
+            if isinstance(response, Exception):
+                errors[name] = response
+            elif isinstance(response, BaseException):
+                raise response
+            else:
+                results[name] = response
+        return ClusterResults(results, errors, loop.time() - start)
+
+    async def overview(self) -> ClusterResults[Mapping[str, Any]]:
+        """Get the overview of every cluster."""
+        return await self.sweep(lambda monitor: monitor.overview())
+
+    async def nodes(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> ClusterResults[List[Node]]:
+        """Get the nodes of every cluster."""
+        return await self.sweep(lambda monitor: monitor.nodes(columns))
+
+    async def vhosts(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> ClusterResults[Mapping[str, VHost]]:
+        """Get the vhosts of every cluster."""
+        return await self.sweep(lambda monitor: monitor.vhosts(columns))
+
+    async def queues(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> ClusterResults[List[VHostQueue]]:
+        """Get the queues of every cluster."""
+        return await self.sweep(lambda monitor: monitor.queues(columns))
+
+    async def connections(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> ClusterResults[List[Connection]]:
+        """Get the connections of every cluster."""
+        return await self.sweep(lambda monitor: monitor.connections(columns))
+
+    async def channels(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> ClusterResults[List[Channel]]:
+        """Get the channels of every cluster."""
+        return await self.sweep(lambda monitor: monitor.channels(columns))
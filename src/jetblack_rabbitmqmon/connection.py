@@ -5,12 +5,15 @@ from __future__ import annotations
 from typing import Any, List, Mapping, Optional
 
 from .api import Api
+from .history import MetricsHistory, TrackedMixin, CONNECTION_SERIES
 from .channel import Channel
 
 
-class Connection:
+class Connection(TrackedMixin):
     """A RabbitMQ connection"""
 
+    SERIES = CONNECTION_SERIES
+
     def __init__(
             self,
             api: Api,
@@ -18,6 +21,9 @@ class Connection:
     ):
         """A RabbitMQ connection
 
+        Attributes which are missing from a partial payload, for example when
+        columns have been selected, are None.
+
         Args:
             api (Api): The api.
 
@@ -43,29 +49,30 @@ class Connection:
             peer_cert_subject (Optional[str]): The peer certificate subject name
         """
         self._api = api
+        self.history: Optional[MetricsHistory] = None
         self._init(**kwargs)
 
     def _init(
             self,
-            node: str,
-            vhost: str,
             name: str,
-            user: str,
-            protocol: str,
-            type: str,  # pylint: disable=redefined-builtin
-            host: str,
-            port: int,
-            peer_host: str,
-            peer_port: int,
-            client_properties: Mapping[str, Any],
-            auth_mechanism: str,
-            ssl: bool,
-            ssl_hash: Optional[str],
-            ssl_cipher: Optional[str],
-            ssl_protocol: Optional[str],
-            peer_cert_validity: Optional[str],
-            peer_cert_issuer: Optional[str],
-            peer_cert_subject: Optional[str],
+            node: Optional[str] = None,
+            vhost: Optional[str] = None,
+            user: Optional[str] = None,
+            protocol: Optional[str] = None,
+            type: Optional[str] = None,  # pylint: disable=redefined-builtin
+            host: Optional[str] = None,
+            port: Optional[int] = None,
+            peer_host: Optional[str] = None,
+            peer_port: Optional[int] = None,
+            client_properties: Optional[Mapping[str, Any]] = None,
+            auth_mechanism: Optional[str] = None,
+            ssl: Optional[bool] = None,
+            ssl_hash: Optional[str] = None,
+            ssl_cipher: Optional[str] = None,
+            ssl_protocol: Optional[str] = None,
+            peer_cert_validity: Optional[str] = None,
+            peer_cert_issuer: Optional[str] = None,
+            peer_cert_subject: Optional[str] = None,
             **metrics
     ) -> Connection:
         self.node = node
@@ -87,7 +94,8 @@ class Connection:
         self.peer_cert_validity = peer_cert_validity
         self.peer_cert_issuer = peer_cert_issuer
         self.peer_cert_subject = peer_cert_subject
-        self.metrics: Optional[Mapping[str, Any]] = metrics
+        self.metrics: Mapping[str, Any] = metrics
+        self._record(metrics)
         return self
 
     async def refresh(self) -> Connection:
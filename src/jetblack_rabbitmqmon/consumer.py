@@ -0,0 +1,85 @@
+"""Consumer"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Optional
+
+from .api import Api
+from .channel import Channel
+from .connection import Connection
+from .vhost_queue import VHostQueue
+
+
+class Consumer:
+    """A RabbitMQ consumer"""
+
+    def __init__(
+            self,
+            api: Api,
+            **kwargs
+    ):
+        """A RabbitMQ consumer
+
+        Attributes which are missing from a partial payload, for example when
+        columns have been selected, are None.
+
+        Args:
+            api (Api): The api.
+
+        Attributes:
+            vhost (str): The name of the virtual host.
+            queue_name (str): The name of the queue consumed.
+            channel_name (str): The name of the channel of the consumer.
+            connection_name (str): The name of the connection of the channel.
+            consumer_tag (str): The consumer tag.
+            ack_required (bool): True if messages must be acknowledged.
+            exclusive (bool): True if the consumer is exclusive.
+            prefetch_count (int): The prefetch count.
+            arguments (Mapping[str, Any]): The arguments.
+            queue (Optional[VHostQueue]): The queue, when linked by a
+                snapshot.
+            channel (Optional[Channel]): The channel, when linked by a
+                snapshot.
+            connection (Optional[Connection]): The connection, when linked by a
+                snapshot.
+        """
+        self._api = api
+        self.queue: Optional[VHostQueue] = None
+        self.channel: Optional[Channel] = None
+        self.connection: Optional[Connection] = None
+        self._init(**kwargs)
+
+    def _init(
+            self,
+            queue: Mapping[str, Any],
+            channel_details: Optional[Mapping[str, Any]] = None,
+            consumer_tag: Optional[str] = None,
+            ack_required: Optional[bool] = None,
+            exclusive: Optional[bool] = None,
+            prefetch_count: Optional[int] = None,
+            arguments: Optional[Mapping[str, Any]] = None,
+            **metrics
+    ) -> Consumer:
+        channel_details = channel_details or {}
+        self.vhost = queue['vhost']
+        self.queue_name = queue['name']
+        self.channel_name = channel_details.get('name')
+        self.connection_name = channel_details.get('connection_name')
+        self.consumer_tag = consumer_tag
+        self.ack_required = ack_required
+        self.exclusive = exclusive
+        self.prefetch_count = prefetch_count
+        self.arguments = arguments
+        self.metrics: Mapping[str, Any] = metrics
+        return self
+
+    def __str__(self) -> str:
+        return '<Consumer {vhost}:{queue_name} {consumer_tag} on {channel_name}>'.format(
+            vhost=self.vhost,
+            queue_name=self.queue_name,
+            consumer_tag=self.consumer_tag,
+            channel_name=self.channel_name
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
@@ -0,0 +1,264 @@
+"""Response decoders"""
+
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Callable, List, Mapping, Sequence
+
+# A decoder is called with the response body and the path of the request,
+# e.g. ('queues', '/'), and returns the decoded response.
+Decoder = Callable[[bytes, Sequence[str]], Any]
+
+
+def json_decoder() -> Decoder:
+    """A decoder using the standard library json module.
+
+    Returns:
+        Decoder: The decoder.
+    """
+    return lambda content, path: json.loads(content)
+
+
+def orjson_decoder() -> Decoder:
+    """A decoder using orjson.
+
+    Raises:
+        ImportError: If orjson is not installed.
+
+    Returns:
+        Decoder: The decoder.
+    """
+    import orjson  # pylint: disable=import-outside-toplevel
+    loads = orjson.loads
+    return lambda content, path: loads(content)
+
+
+def msgspec_decoder(typed: bool = False) -> Decoder:
+    """A decoder using msgspec.
+
+    When typed, the responses for queues, connections and channels are
+    decoded straight into structs holding the declared fields, skipping the
+    rest of the payload. The structs behave as read only mappings, so they
+    can be passed wherever a decoded payload is expected.
+
+    Typed decoding loses the undeclared fields, such as 'messages_details'
+    and 'backing_queue_status' on a queue, which are then missing from the
+    metrics of the models. It is only suitable when the declared fields are
+    all that is needed, so is off by default.
+
+    Args:
+        typed (bool, optional): If true decode queues, connections and
+            channels into structs. Defaults to False.
+
+    Raises:
+        ImportError: If msgspec is not installed.
+
+    Returns:
+        Decoder: The decoder.
+    """
+    import msgspec  # pylint: disable=import-outside-toplevel
+    untyped = msgspec.json.Decoder().decode
+    if not typed:
+        return lambda content, path: untyped(content)
+
+    from .payloads import payload_decoder  # pylint: disable=import-outside-toplevel
+
+    def decode(content: bytes, path: Sequence[str]) -> Any:
+        typed_decode = payload_decoder(path)
+        if typed_decode is None:
+            return untyped(content)
+        return typed_decode(content)
+
+    return decode
+
+
+def default_decoder() -> Decoder:
+    """The fastest decoder installed, trying orjson, then msgspec, and
+    falling back to the standard library json module.
+
+    Returns:
+        Decoder: The decoder.
+    """
+    for factory in (orjson_decoder, msgspec_decoder):
+        try:
+            return factory()
+        except ImportError:
+            pass
+    return json_decoder()
+
+
+def json_default(value: Any) -> Any:
+    """The `default` for `json.dumps` when encoding decoded responses. Typed
+    payloads are mappings but not dictionaries, so are encoded as objects.
+
+    Args:
+        value (Any): A value json cannot encode.
+
+    Raises:
+        TypeError: If the value is not a mapping.
+
+    Returns:
+        Any: The value as a dictionary.
+    """
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f'Cannot encode {type(value).__name__}')
+
+
+_WHITESPACE = ' \t\r\n'
+_NUMBER_CHARS = '0123456789.eE+-'
+_START, _FIRST, _NEXT, _ELEMENT, _END = range(5)
+
+# Returned by JsonScanner.value when the value may continue in text which
+# has not yet arrived.
+INCOMPLETE = object()
+
+
+class JsonScanner:
+    """Scans JSON tokens and values from text which arrives in pieces"""
+
+    def __init__(self) -> None:
+        """Scans JSON tokens and values from text which arrives in pieces.
+
+        The text which has been consumed is dropped as more arrives, so only
+        the value being scanned is held.
+        """
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+
+    def append(self, text: str) -> None:
+        """Add the text which follows that already appended.
+
+        Args:
+            text (str): The text.
+        """
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer) - self._pos
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character.
+
+        Returns:
+            str: The character, or '' if the text appended so far is consumed.
+        """
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return buffer[pos] if pos < len(buffer) else ''
+
+    def advance(self) -> None:
+        """Consume the character returned by `peek`."""
+        self._pos += 1
+
+    def value(self, final: bool) -> Any:
+        """Decode the next value.
+
+        Args:
+            final (bool): True if no more text will be appended.
+
+        Raises:
+            json.JSONDecodeError: If the value is invalid and `final` is true.
+
+        Returns:
+            Any: The value, or INCOMPLETE if it may continue in text which
+                has not been appended yet.
+        """
+        self.peek()
+        buffer = self._buffer
+        try:
+            value, end = self._decoder.raw_decode(buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return INCOMPLETE
+        if not final and (end == len(buffer) or buffer[end] in _NUMBER_CHARS):
+            # A number may continue in the next piece.
+            return INCOMPLETE
+        self._pos = end
+        return value
+
+
+class JsonArrayDecoder:
+    """Decodes the elements of a JSON array as its body arrives"""
+
+    def __init__(self) -> None:
+        """Decodes the elements of a JSON array as its body arrives.
+
+        Only the text of the elements which are not yet complete is buffered,
+        so the memory used is set by the largest element rather than the size
+        of the array.
+        """
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._scanner = JsonScanner()
+        self._state = _START
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        """Add the next chunk of the body.
+
+        Args:
+            chunk (bytes): The chunk.
+            final (bool, optional): True for the last chunk. Defaults to False.
+
+        Raises:
+            ValueError: If the body is not a JSON array.
+
+        Returns:
+            List[Any]: The elements completed by the chunk.
+        """
+        scanner = self._scanner
+        scanner.append(self._text.decode(chunk, final))
+        elements: List[Any] = []
+        while True:
+            char = scanner.peek()
+            if not char:
+                break
+            if self._state == _START:
+                if char != '[':
+                    raise ValueError('Expected a JSON array')
+                scanner.advance()
+                self._state = _FIRST
+            elif self._state in (_FIRST, _NEXT) and char == ']':
+                scanner.advance()
+                self._state = _END
+            elif self._state == _NEXT:
+                if char != ',':
+                    raise ValueError(f'Expected "," or "]" but found "{char}"')
+                scanner.advance()
+                self._state = _ELEMENT
+            elif self._state in (_FIRST, _ELEMENT):
+                element = scanner.value(final)
+                if element is INCOMPLETE:
+                    # The element continues in the next chunk.
+                    break
+                elements.append(element)
+                self._state = _NEXT
+            else:
+                raise ValueError('Unexpected data after the JSON array')
+        if final and self._state != _END:
+            raise ValueError('Incomplete JSON array')
+        return elements
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Decode the elements of a JSON array from the chunks of its body.
+
+    Args:
+        chunks (AsyncIterable[bytes]): The chunks, for example from
+            `Requester.iter_content`.
+
+    Raises:
+        ValueError: If the body is not a JSON array.
+
+    Yields:
+        Any: The elements.
+    """
+    decoder = JsonArrayDecoder()
+    async for chunk in chunks:
+        for element in decoder.feed(chunk):
+            yield element
+    for element in decoder.feed(b'', True):
+        yield element
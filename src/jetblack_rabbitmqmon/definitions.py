@@ -0,0 +1,241 @@
+"""Streaming definitions"""
+
+from contextlib import aclosing
+import gzip
+import io
+import json
+import os
+from typing import Any, AsyncGenerator, BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from .api import Api
+from .decoders import INCOMPLETE, JsonScanner
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_CHUNK_SIZE = 1 << 16
+# The largest single item, such as one queue, which is buffered while reading.
+_MAX_ITEM_SIZE = 1 << 26
+# Stands for the elements of an empty list, so the list is not lost.
+_EMPTY = object()
+
+
+class _Scanner:
+    """Reads JSON values from a text stream a chunk at a time"""
+
+    def __init__(self, file: io.TextIOBase) -> None:
+        self._file = file
+        self._scanner = JsonScanner()
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._scanner.append(chunk)
+        if len(self._scanner) > _MAX_ITEM_SIZE:
+            raise ValueError('Invalid definitions: an item is too large')
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or '' at the end."""
+        while True:
+            char = self._scanner.peek()
+            if char or not self._fill():
+                return char
+
+    def expect(self, char: str) -> None:
+        """Consume the next character, which must be `char`."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f'Invalid definitions: expected "{char}" but found "{found}"')
+        self._scanner.advance()
+
+    def value(self) -> Any:
+        """Decode the next value."""
+        self.peek()
+        while True:
+            value = self._scanner.value(self._eof)
+            if value is not INCOMPLETE:
+                return value
+            # The value may continue in the next chunk.
+            self._fill()
+
+
+def _iter_document(file: io.TextIOBase) -> Iterator[Tuple[str, Any, bool]]:
+    # Yields (key, value, in_list), with each element of a top level list
+    # yielded separately, and an empty list yielded as _EMPTY.
+    scanner = _Scanner(file)
+    scanner.expect('{')
+    if scanner.peek() == '}':
+        scanner.expect('}')
+    else:
+        while True:
+            key = scanner.value()
+            if not isinstance(key, str):
+                raise ValueError('Invalid definitions: expected a key')
+            scanner.expect(':')
+            if scanner.peek() == '[':
+                scanner.expect('[')
+                if scanner.peek() == ']':
+                    scanner.expect(']')
+                    yield key, _EMPTY, True
+                else:
+                    while True:
+                        yield key, scanner.value(), True
+                        if scanner.peek() != ',':
+                            break
+                        scanner.expect(',')
+                    scanner.expect(']')
+            else:
+                yield key, scanner.value(), False
+            if scanner.peek() != ',':
+                break
+            scanner.expect(',')
+        scanner.expect('}')
+    if scanner.peek() != '':
+        raise ValueError('Invalid definitions: unexpected data after the document')
+
+
+def _open_binary(path: str) -> BinaryIO:
+    file = open(path, 'rb')  # pylint: disable=consider-using-with
+    if file.read(2) == _GZIP_MAGIC:
+        file.seek(0)
+        return gzip.GzipFile(fileobj=file, mode='rb')  # type: ignore
+    file.seek(0)
+    return file
+
+
+def iter_definitions(path: str) -> Iterator[Tuple[str, Any]]:
+    """Read a definitions file incrementally, which may be gzip compressed.
+
+    Each element of the lists, such as 'queues' or 'bindings', is yielded as
+    it is read, so only one is held in memory at a time. Other values, such
+    as 'rabbit_version', are yielded whole.
+
+    Args:
+        path (str): The path of the file.
+
+    Raises:
+        ValueError: If the file is not a valid definitions document.
+
+    Yields:
+        Tuple[str, Any]: The key of the list and the element, or the key and
+            value.
+    """
+    with _open_binary(path) as binary, io.TextIOWrapper(binary, encoding='utf-8') as file:
+        for key, value, _ in _iter_document(file):
+            if value is not _EMPTY:
+                yield key, value
+
+
+async def export_definitions(
+        api: Api,
+        path: str,
+        vhost: Optional[str] = None,
+        compress: Optional[bool] = None
+) -> int:
+    """Write the definitions to a file as they are received.
+
+    The file is written under a temporary name and renamed when it is
+    complete, so a failed export never leaves a partial file at `path`.
+
+    Args:
+        api (Api): The api.
+        path (str): The path of the file.
+        vhost (Optional[str], optional): The virtual host, or None for the
+            whole server. Defaults to None.
+        compress (Optional[bool], optional): If true the file is gzip
+            compressed. Defaults to None, which compresses when the path ends
+            with '.gz'.
+
+    Raises:
+        RequestError: If the request failed.
+
+    Returns:
+        int: The uncompressed size of the definitions in bytes.
+    """
+    if compress is None:
+        compress = path.endswith('.gz')
+    temporary_path = f'{path}.partial'
+    size = 0
+    try:
+        with open(temporary_path, 'wb') as raw:
+            with (
+                    gzip.GzipFile(fileobj=raw, mode='wb') if compress else raw
+            ) as file:
+                async with aclosing(api.iter_definitions_content(vhost)) as chunks:
+                    async for chunk in chunks:
+                        file.write(chunk)
+                        size += len(chunk)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    return size
+
+
+async def _encode_definitions(
+        path: str,
+        sections: Optional[Iterable[str]]
+) -> AsyncGenerator[bytes, None]:
+    selected = None if sections is None else frozenset(sections)
+    with _open_binary(path) as binary, io.TextIOWrapper(binary, encoding='utf-8') as file:
+        parts: List[str] = ['{']
+        size = 1
+        current: Optional[str] = None
+        current_is_list = False
+        for key, value, in_list in _iter_document(file):
+            if in_list and selected is not None and key not in selected:
+                continue
+            if key != current:
+                if current is not None:
+                    parts.append('],' if current_is_list else ',')
+                parts.append(json.dumps(key) + (':[' if in_list else ':'))
+                current, current_is_list = key, in_list
+            elif in_list:
+                parts.append(',')
+            if value is _EMPTY:
+                continue
+            encoded = json.dumps(value, separators=(',', ':'))
+            parts.append(encoded)
+            size += len(encoded)
+            if size >= _CHUNK_SIZE:
+                yield ''.join(parts).encode('utf-8')
+                parts.clear()
+                size = 0
+        if current_is_list:
+            parts.append(']')
+        parts.append('}')
+        yield ''.join(parts).encode('utf-8')
+
+
+async def import_definitions(
+        api: Api,
+        path: str,
+        vhost: Optional[str] = None,
+        sections: Optional[Iterable[str]] = None
+) -> None:
+    """Upload the definitions in a file as it is read.
+
+    The file is parsed incrementally and re-encoded as it is sent, so it is
+    validated without being held in memory. If it is invalid the upload is
+    abandoned before the request body is complete, and the server applies
+    nothing.
+
+    Args:
+        api (Api): The api.
+        path (str): The path of the file, which may be gzip compressed.
+        vhost (Optional[str], optional): The virtual host, or None for the
+            whole server. Defaults to None.
+        sections (Optional[Iterable[str]], optional): The lists to upload,
+            for example ('exchanges', 'queues', 'bindings'). Defaults to None,
+            for all of them.
+
+    Raises:
+        ValueError: If the file is not a valid definitions document.
+        RequestError: If the request failed.
+    """
+    await api.upload_definitions(_encode_definitions(path, sections), vhost)
@@ -0,0 +1,331 @@
+"""OpenMetrics exporter"""
+
+import asyncio
+import logging
+import time
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+
+from .monitor import Monitor
+from .poller import get_field
+
+LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# The metric name, type, help and field path for each entity type.
+MetricDefinition = Tuple[str, str, str, str]
+
+OVERVIEW_METRICS: Sequence[MetricDefinition] = (
+    ('connections', 'gauge', 'Open connections', 'object_totals.connections'),
+    ('channels', 'gauge', 'Open channels', 'object_totals.channels'),
+    ('exchanges', 'gauge', 'Exchanges', 'object_totals.exchanges'),
+    ('queues', 'gauge', 'Queues', 'object_totals.queues'),
+    ('consumers', 'gauge', 'Consumers', 'object_totals.consumers'),
+    ('messages', 'gauge', 'Messages in all queues', 'queue_totals.messages'),
+    ('messages_ready', 'gauge', 'Messages ready for delivery',
+     'queue_totals.messages_ready'),
+    ('messages_unacknowledged', 'gauge', 'Messages delivered but not acknowledged',
+     'queue_totals.messages_unacknowledged'),
+    ('published', 'counter', 'Messages published',
+     'message_stats.publish'),
+    ('delivered', 'counter', 'Messages delivered or fetched',
+     'message_stats.deliver_get'),
+)
+
+NODE_METRICS: Sequence[MetricDefinition] = (
+    ('running', 'gauge', 'Whether the node is running', 'running'),
+    ('mem_used_bytes', 'gauge', 'Memory used', 'mem_used'),
+    ('mem_limit_bytes', 'gauge', 'Memory high watermark', 'mem_limit'),
+    ('disk_free_bytes', 'gauge', 'Free disk space', 'disk_free'),
+    ('disk_free_limit_bytes', 'gauge', 'Free disk space low watermark',
+     'disk_free_limit'),
+    ('fd_used', 'gauge', 'File descriptors used', 'fd_used'),
+    ('fd_limit', 'gauge', 'File descriptors available', 'fd_total'),
+    ('sockets_used', 'gauge', 'Sockets used', 'sockets_used'),
+    ('processes_used', 'gauge', 'Erlang processes used', 'proc_used'),
+    ('uptime_seconds', 'gauge', 'Time since the node started', 'uptime'),
+)
+
+VHOST_METRICS: Sequence[MetricDefinition] = (
+    ('messages', 'gauge', 'Messages in the vhost', 'messages'),
+    ('messages_ready', 'gauge', 'Messages ready for delivery', 'messages_ready'),
+    ('messages_unacknowledged', 'gauge', 'Messages delivered but not acknowledged',
+     'messages_unacknowledged'),
+)
+
+QUEUE_METRICS: Sequence[MetricDefinition] = (
+    ('messages', 'gauge', 'Messages in the queue', 'messages'),
+    ('messages_ready', 'gauge', 'Messages ready for delivery', 'messages_ready'),
+    ('messages_unacknowledged', 'gauge', 'Messages delivered but not acknowledged',
+     'messages_unacknowledged'),
+    ('consumers', 'gauge', 'Consumers', 'consumers'),
+    ('memory_bytes', 'gauge', 'Memory used by the queue', 'memory'),
+    ('published', 'counter', 'Messages published', 'message_stats.publish'),
+    ('delivered', 'counter', 'Messages delivered or fetched',
+     'message_stats.deliver_get'),
+    ('redelivered', 'counter', 'Messages redelivered', 'message_stats.redeliver'),
+    ('acknowledged', 'counter', 'Messages acknowledged', 'message_stats.ack'),
+)
+
+CONNECTION_METRICS: Sequence[MetricDefinition] = (
+    ('channels', 'gauge', 'Open channels', 'channels'),
+    ('received_bytes', 'counter', 'Bytes received', 'recv_oct'),
+    ('sent_bytes', 'counter', 'Bytes sent', 'send_oct'),
+)
+
+# The factor which converts a field to the base unit of its metric.
+FIELD_SCALES: Mapping[str, float] = {
+    'uptime': 0.001,
+}
+
+QUEUE_COLUMNS = tuple(path for _, _, _, path in QUEUE_METRICS)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{_escape(str(value))}"'
+        for name, value in labels
+    ) + '}'
+
+
+def _format_value(value: Any, scale: Optional[float] = None) -> Optional[str]:
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return repr(value if scale is None else value * scale)
+    return None
+
+
+def render_family(
+        prefix: str,
+        definitions: Sequence[MetricDefinition],
+        samples: Sequence[Tuple[Sequence[Tuple[str, str]], Mapping[str, Any]]]
+) -> List[str]:
+    """Render a family of metrics in the OpenMetrics text format.
+
+    Args:
+        prefix (str): The metric name prefix, e.g. 'rabbitmq_queue'.
+        definitions (Sequence[MetricDefinition]): The metric definitions.
+        samples (Sequence[Tuple[Sequence[Tuple[str, str]], Mapping[str, Any]]]):
+            The labels and payload of each entity.
+
+    Returns:
+        List[str]: The lines of text.
+    """
+    lines: List[str] = []
+    for name, metric_type, help_text, path in definitions:
+        metric = f'{prefix}_{name}'
+        suffix = '_total' if metric_type == 'counter' else ''
+        scale = FIELD_SCALES.get(path)
+        values: List[str] = []
+        for labels, payload in samples:
+            value = _format_value(get_field(payload, path), scale)
+            if value is not None:
+                values.append(f'{metric}{suffix}{_format_labels(labels)} {value}')
+        if values:
+            lines.append(f'# TYPE {metric} {metric_type}')
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.extend(values)
+    return lines
+
+
+class OpenMetricsExporter:
+    """Export RabbitMQ metrics in the OpenMetrics text format"""
+
+    def __init__(
+            self,
+            monitor: Monitor,
+            interval: float = 15.0,
+            host: str = '0.0.0.0',
+            port: int = 9419,
+            prefix: str = 'rabbitmq'
+    ) -> None:
+        """Export RabbitMQ metrics in the OpenMetrics text format.
+
+        The overview, nodes, vhosts, queues and connections are fetched in the
+        background on a schedule and rendered to text. Scrapes are served from
+        the most recent rendering, so never wait for the broker.
+
+        Args:
+            monitor (Monitor): The monitor.
+            interval (float, optional): The number of seconds between refreshes.
+                Defaults to 15.0.
+            host (str, optional): The address to listen on. Defaults to
+                '0.0.0.0'.
+            port (int, optional): The port to listen on. Defaults to 9419.
+            prefix (str, optional): The prefix for metric names. Defaults to
+                'rabbitmq'.
+        """
+        self.monitor = monitor
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self.prefix = prefix
+        self._metrics: List[str] = []
+        self._last_refresh: Optional[float] = None
+        self._last_duration = 0.0
+        self._up = False
+        self._body = self._render_body()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def _fetch(self) -> List[str]:
+        overview, nodes, vhosts, connections = await asyncio.gather(
+            self.monitor.overview(),
+            self.monitor.nodes(),
+            self.monitor.vhosts(),
+            self.monitor.connections(),
+        )
+        queues = [
+            queue
+            async for queue in self.monitor.iter_queues(
+                page_size=500,
+                columns=QUEUE_COLUMNS
+            )
+        ]
+        prefix = self.prefix
+        lines = render_family(prefix, OVERVIEW_METRICS, [((), overview)])
+        lines += render_family(f'{prefix}_node', NODE_METRICS, [
+            ((('node', node.name),), node.metrics)
+            for node in nodes
+        ])
+        lines += render_family(f'{prefix}_vhost', VHOST_METRICS, [
+            ((('vhost', vhost.name),), vhost.metrics)
+            for vhost in vhosts.values()
+        ])
+        lines += render_family(f'{prefix}_queue', QUEUE_METRICS, [
+            ((('vhost', queue.vhost), ('queue', queue.name)), queue.metrics)
+            for queue in queues
+        ])
+        lines += render_family(f'{prefix}_connection', CONNECTION_METRICS, [
+            (
+                (
+                    ('vhost', connection.vhost or ''),
+                    ('connection', connection.name),
+                    ('user', connection.user or '')
+                ),
+                connection.metrics or {}
+            )
+            for connection in connections
+        ])
+        return lines
+
+    def _render_body(self) -> bytes:
+        prefix = self.prefix
+        lines = [
+            *self._metrics,
+            f'# TYPE {prefix}_exporter_up gauge',
+            f'# HELP {prefix}_exporter_up Whether the last refresh succeeded',
+            f'{prefix}_exporter_up {1 if self._up else 0}',
+            f'# TYPE {prefix}_exporter_refresh_duration_seconds gauge',
+            f'# HELP {prefix}_exporter_refresh_duration_seconds The duration of the last refresh',
+            f'{prefix}_exporter_refresh_duration_seconds {self._last_duration!r}',
+        ]
+        if self._last_refresh is not None:
+            lines.extend([
+                f'# TYPE {prefix}_exporter_last_refresh_timestamp_seconds gauge',
+                f'# HELP {prefix}_exporter_last_refresh_timestamp_seconds'
+                ' The time of the last successful refresh',
+                f'{prefix}_exporter_last_refresh_timestamp_seconds {self._last_refresh!r}',
+            ])
+        lines.append('# EOF')
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+    async def refresh(self) -> None:
+        """Fetch the metrics and render them. If the fetch fails the previous
+        metrics are kept, and the exporter reports that it is down.
+        """
+        start = time.monotonic()
+        try:
+            self._metrics = await self._fetch()
+            self._last_refresh = time.time()
+            self._up = True
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception('Failed to refresh the metrics')
+            self._up = False
+        self._last_duration = time.monotonic() - start
+        self._body = self._render_body()
+
+    def render(self) -> bytes:
+        """The most recently rendered metrics.
+
+        Returns:
+            bytes: The metrics in the OpenMetrics text format.
+        """
+        return self._body
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    async def _handle(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, content_type, body = '200 OK', CONTENT_TYPE, self._body
+            else:
+                status, content_type, body = '404 Not Found', 'text/plain', b'Not Found\n'
+            writer.write(
+                (
+                    f'HTTP/1.1 {status}\r\n'
+                    f'Content-Type: {content_type}\r\n'
+                    f'Content-Length: {len(body)}\r\n'
+                    'Connection: close\r\n'
+                    '\r\n'
+                ).encode('latin-1') + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        """Start serving scrapes and refreshing in the background."""
+        # The server is started first, so a failure to bind leaves nothing
+        # running.
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self._refresh_task = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        """Stop refreshing and serving scrapes."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def serve_forever(self) -> None:
+        """Start the exporter and run until cancelled."""
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    async def __aenter__(self) -> "OpenMetricsExporter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop()
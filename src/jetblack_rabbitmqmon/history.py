@@ -0,0 +1,389 @@
+"""Metrics history"""
+
+from array import array
+import math
+import time
+from typing import Any, Dict, Hashable, Iterator, List, Mapping, Optional, Tuple
+
+from .poller import get_field
+
+QUEUE_SERIES: Mapping[str, str] = {
+    'messages': 'messages',
+    'messages_ready': 'messages_ready',
+    'messages_unacknowledged': 'messages_unacknowledged',
+    'consumers': 'consumers',
+    'memory': 'memory',
+    'publish_rate': 'message_stats.publish_details.rate',
+    'deliver_rate': 'message_stats.deliver_get_details.rate',
+    'ack_rate': 'message_stats.ack_details.rate',
+    'redeliver_rate': 'message_stats.redeliver_details.rate',
+}
+
+CONNECTION_SERIES: Mapping[str, str] = {
+    'channels': 'channels',
+    'recv_rate': 'recv_oct_details.rate',
+    'send_rate': 'send_oct_details.rate',
+}
+
+CHANNEL_SERIES: Mapping[str, str] = {
+    'messages_unacknowledged': 'messages_unacknowledged',
+    'consumer_count': 'consumer_count',
+    'publish_rate': 'message_stats.publish_details.rate',
+    'deliver_rate': 'message_stats.deliver_get_details.rate',
+    'ack_rate': 'message_stats.ack_details.rate',
+}
+
+NODE_SERIES: Mapping[str, str] = {
+    'mem_used': 'mem_used',
+    'fd_used': 'fd_used',
+    'sockets_used': 'sockets_used',
+    'proc_used': 'proc_used',
+    'disk_free': 'disk_free',
+}
+
+VHOST_SERIES: Mapping[str, str] = {
+    'messages': 'messages',
+    'messages_ready': 'messages_ready',
+    'messages_unacknowledged': 'messages_unacknowledged',
+    'publish_rate': 'message_stats.publish_details.rate',
+    'deliver_rate': 'message_stats.deliver_get_details.rate',
+}
+
+ENDPOINT_SERIES: Mapping[str, Mapping[str, str]] = {
+    'queues': QUEUE_SERIES,
+    'connections': CONNECTION_SERIES,
+    'channels': CHANNEL_SERIES,
+    'nodes': NODE_SERIES,
+    'vhosts': VHOST_SERIES,
+}
+
+
+class RingBuffer:
+    """A fixed size buffer of timestamped values"""
+
+    __slots__ = ('capacity', '_times', '_values', '_next', '_count')
+
+    def __init__(self, capacity: int) -> None:
+        """A fixed size buffer of timestamped values.
+
+        The memory used is fixed by the capacity, and when the buffer is full
+        appending a value overwrites the oldest.
+
+        Args:
+            capacity (int): The maximum number of values held.
+        """
+        if capacity < 1:
+            raise ValueError('The capacity must be positive')
+        self.capacity = capacity
+        self._times = array('d', bytes(8 * capacity))
+        self._values = array('d', bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Append a value.
+
+        Args:
+            timestamp (float): The time of the value in seconds, which must
+                not be earlier than the previous value.
+            value (float): The value.
+        """
+        self._times[self._next] = timestamp
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _indices(self) -> Iterator[int]:
+        # From newest to oldest.
+        for offset in range(1, self._count + 1):
+            yield (self._next - offset) % self.capacity
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        """The most recent value.
+
+        Returns:
+            Optional[Tuple[float, float]]: The timestamp and value, or None if
+                the buffer is empty.
+        """
+        if self._count == 0:
+            return None
+        index = (self._next - 1) % self.capacity
+        return self._times[index], self._values[index]
+
+    def items(
+            self,
+            window: Optional[float] = None,
+            now: Optional[float] = None
+    ) -> List[Tuple[float, float]]:
+        """The values in a window, oldest first.
+
+        Values with timestamps after the end of the window are skipped.
+
+        Args:
+            window (Optional[float], optional): The length of the window in
+                seconds, or None for all values up to `now`. Defaults to None.
+            now (Optional[float], optional): The end of the window. Defaults
+                to the current time when a window is given, and otherwise to
+                no limit.
+
+        Returns:
+            List[Tuple[float, float]]: The timestamps and values.
+        """
+        if now is None:
+            end = math.inf if window is None else time.time()
+        else:
+            end = now
+        start = -math.inf if window is None else end - window
+        result: List[Tuple[float, float]] = []
+        for index in self._indices():
+            timestamp = self._times[index]
+            if timestamp < start:
+                break
+            if timestamp <= end:
+                result.append((timestamp, self._values[index]))
+        result.reverse()
+        return result
+
+    def values(
+            self,
+            window: Optional[float] = None,
+            now: Optional[float] = None
+    ) -> List[float]:
+        """The values in a window, oldest first.
+
+        Args:
+            window (Optional[float], optional): The length of the window in
+                seconds, or None for all values up to `now`. Defaults to None.
+            now (Optional[float], optional): The end of the window. Defaults
+                to the current time when a window is given, and otherwise to
+                no limit.
+
+        Returns:
+            List[float]: The values.
+        """
+        return [value for _, value in self.items(window, now)]
+
+    def min(self, window: Optional[float] = None, now: Optional[float] = None) -> float:
+        """The minimum value in a window, or NaN if there are no values."""
+        return min(self.values(window, now), default=math.nan)
+
+    def max(self, window: Optional[float] = None, now: Optional[float] = None) -> float:
+        """The maximum value in a window, or NaN if there are no values."""
+        return max(self.values(window, now), default=math.nan)
+
+    def mean(self, window: Optional[float] = None, now: Optional[float] = None) -> float:
+        """The mean of the values in a window, or NaN if there are no values."""
+        values = self.values(window, now)
+        return math.fsum(values) / len(values) if values else math.nan
+
+    def percentile(
+            self,
+            percent: float,
+            window: Optional[float] = None,
+            now: Optional[float] = None
+    ) -> float:
+        """A percentile of the values in a window, interpolating linearly
+        between the closest ranks.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+            window (Optional[float], optional): The length of the window in
+                seconds, or None for all values up to `now`. Defaults to None.
+            now (Optional[float], optional): The end of the window. Defaults
+                to the current time when a window is given, and otherwise to
+                no limit.
+
+        Returns:
+            float: The percentile, or NaN if there are no values.
+        """
+        values = sorted(self.values(window, now))
+        if not values:
+            return math.nan
+        rank = (len(values) - 1) * min(max(percent, 0.0), 100.0) / 100.0
+        lower = math.floor(rank)
+        upper = math.ceil(rank)
+        return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+    def __str__(self) -> str:
+        return '<RingBuffer {count}/{capacity}>'.format(
+            count=self._count,
+            capacity=self.capacity
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class MetricsHistory:
+    """The history of the numeric metrics of an entity"""
+
+    def __init__(
+            self,
+            series: Mapping[str, str],
+            capacity: int = 360
+    ) -> None:
+        """The history of the numeric metrics of an entity.
+
+        Args:
+            series (Mapping[str, str]): The path of the metric for each
+                series, with nested fields separated by dots, e.g.
+                `{'publish_rate': 'message_stats.publish_details.rate'}`.
+            capacity (int, optional): The number of values kept for each
+                series. Defaults to 360.
+
+        Attributes:
+            series (Mapping[str, RingBuffer]): The buffer for each series.
+        """
+        self._paths = dict(series)
+        self.series: Mapping[str, RingBuffer] = {
+            name: RingBuffer(capacity)
+            for name in self._paths
+        }
+
+    def record(
+            self,
+            metrics: Mapping[str, Any],
+            timestamp: Optional[float] = None
+    ) -> None:
+        """Record the metrics. Metrics which are missing or not numeric are
+        skipped.
+
+        Args:
+            metrics (Mapping[str, Any]): The metrics.
+            timestamp (Optional[float], optional): The time of the metrics.
+                Defaults to the current time.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        for name, path in self._paths.items():
+            value = get_field(metrics, path)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.series[name].append(timestamp, value)
+
+    def __getitem__(self, name: str) -> RingBuffer:
+        return self.series[name]
+
+    def __str__(self) -> str:
+        return '<MetricsHistory {series}>'.format(
+            series=list(self.series)
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class MetricsStore:
+    """The metrics history of many entities"""
+
+    def __init__(
+            self,
+            capacity: int = 360,
+            series: Optional[Mapping[str, Mapping[str, str]]] = None
+    ) -> None:
+        """The metrics history of many entities, filled by a poller.
+
+        Args:
+            capacity (int, optional): The number of values kept for each
+                series. Defaults to 360.
+            series (Optional[Mapping[str, Mapping[str, str]]], optional): The
+                series for each endpoint. Defaults to the standard series for
+                queues, connections, channels, nodes and vhosts.
+        """
+        self.capacity = capacity
+        self._series = ENDPOINT_SERIES if series is None else series
+        self._histories: Dict[Tuple[str, Hashable], MetricsHistory] = {}
+
+    def record(
+            self,
+            endpoint: str,
+            key: Hashable,
+            metrics: Mapping[str, Any],
+            timestamp: Optional[float] = None
+    ) -> None:
+        """Record the metrics of an entity.
+
+        Args:
+            endpoint (str): The endpoint, e.g. 'queues'.
+            key (Hashable): The key of the entity.
+            metrics (Mapping[str, Any]): The metrics.
+            timestamp (Optional[float], optional): The time of the metrics.
+                Defaults to the current time.
+        """
+        series = self._series.get(endpoint)
+        if series is None:
+            return
+        history = self._histories.get((endpoint, key))
+        if history is None:
+            history = MetricsHistory(series, self.capacity)
+            self._histories[(endpoint, key)] = history
+        history.record(metrics, timestamp)
+
+    def get(self, endpoint: str, key: Hashable) -> Optional[MetricsHistory]:
+        """Get the history of an entity.
+
+        Args:
+            endpoint (str): The endpoint, e.g. 'queues'.
+            key (Hashable): The key of the entity.
+
+        Returns:
+            Optional[MetricsHistory]: The history, or None if there is none.
+        """
+        return self._histories.get((endpoint, key))
+
+    def remove(self, endpoint: str, key: Hashable) -> None:
+        """Remove the history of an entity.
+
+        Args:
+            endpoint (str): The endpoint, e.g. 'queues'.
+            key (Hashable): The key of the entity.
+        """
+        self._histories.pop((endpoint, key), None)
+
+    def __len__(self) -> int:
+        return len(self._histories)
+
+
+class TrackedMixin:
+    """Keeps a history of the metrics of an entity which is refreshed.
+
+    The class sets `SERIES` to its default series, initialises `history` to
+    None, and calls `_record` with the metrics each time it is refreshed.
+    """
+
+    SERIES: Mapping[str, str] = {}
+
+    history: Optional[MetricsHistory]
+    metrics: Mapping[str, Any]
+
+    def _record(self, metrics: Mapping[str, Any]) -> None:
+        if self.history is not None:
+            self.history.record(metrics)
+
+    def track(
+            self,
+            capacity: int = 360,
+            series: Optional[Mapping[str, str]] = None
+    ) -> MetricsHistory:
+        """Start keeping a history of the numeric metrics, which is updated
+        each time the entity is refreshed.
+
+        Args:
+            capacity (int, optional): The number of values kept for each
+                series. Defaults to 360.
+            series (Optional[Mapping[str, str]], optional): The path of the
+                metric for each series. Defaults to the series of the entity,
+                e.g. QUEUE_SERIES for a queue.
+
+        Returns:
+            MetricsHistory: The history.
+        """
+        self.history = MetricsHistory(
+            self.SERIES if series is None else series,
+            capacity
+        )
+        self.history.record(self.metrics)
+        return self.history
@@ -0,0 +1,505 @@
+"""Request instrumentation"""
+
+from array import array
+from contextvars import ContextVar
+import math
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# The endpoints of the management api, where the segments in braces are
+# names. They group requests for reporting, e.g. 'queues/{vhost}/{name}'.
+ENDPOINT_TEMPLATES: Sequence[str] = (
+    'overview',
+    'cluster-name',
+    'extensions',
+    'whoami',
+    'nodes',
+    'nodes/{name}',
+    'definitions',
+    'definitions/{vhost}',
+    'connections',
+    'connections/{name}',
+    'connections/{name}/channels',
+    'connection/{name}/channels',
+    'channels',
+    'channels/{name}',
+    'consumers',
+    'consumers/{vhost}',
+    'exchanges',
+    'exchanges/{vhost}',
+    'exchanges/{vhost}/{name}',
+    'exchanges/{vhost}/{name}/bindings/source',
+    'exchanges/{vhost}/{name}/bindings/destination',
+    'exchanges/{vhost}/{name}/publish',
+    'queues',
+    'queues/{vhost}',
+    'queues/{vhost}/{name}',
+    'queues/{vhost}/{name}/bindings',
+    'queues/{vhost}/{name}/contents',
+    'queues/{vhost}/{name}/actions',
+    'queues/{vhost}/{name}/get',
+    'queue/{vhost}/{name}/contents',
+    'bindings',
+    'bindings/{vhost}',
+    'bindings/{vhost}/e/{exchange}/q/{queue}',
+    'bindings/{vhost}/e/{exchange}/q/{queue}/{props}',
+    'bindings/{vhost}/e/{source}/e/{destination}',
+    'bindings/{vhost}/e/{source}/e/{destination}/{props}',
+    'vhosts',
+    'vhosts/{vhost}',
+    'vhosts/{vhost}/permissions',
+    'vhosts/{vhost}/topic-permissions',
+    'vhosts/{vhost}/connections',
+    'vhosts/{vhost}/channels',
+    'vhost/{vhost}/channels',
+    'users',
+    'users/{name}',
+    'users/{name}/permissions',
+    'users/{name}/topic-permissions',
+    'permissions',
+    'permissions/{vhost}/{user}',
+    'topic-permissions',
+    'topic-permissions/{vhost}/{user}',
+    'parameters',
+    'parameters/{component}',
+    'parameters/{component}/{vhost}',
+    'parameters/{component}/{vhost}/{name}',
+    'global-parameters',
+    'global-parameters/{name}',
+    'policies',
+    'policies/{vhost}',
+    'policies/{vhost}/{name}',
+    'operator-policies',
+    'operator-policies/{vhost}',
+    'operator-policies/{vhost}/{name}',
+    'aliveness-test/{vhost}',
+)
+
+
+def _compile(
+        templates: Sequence[str]
+) -> Dict[Tuple[str, int], List[Tuple[str, Tuple[Tuple[int, str], ...]]]]:
+    # Index the templates by their first segment and length, with the most
+    # specific first, and keep the positions of the fixed segments.
+    index: Dict[Tuple[str, int], List[Tuple[str, Tuple[Tuple[int, str], ...]]]] = {}
+    for template in templates:
+        segments = template.split('/')
+        fixed = tuple(
+            (position, segment)
+            for position, segment in enumerate(segments)
+            if position and not segment.startswith('{')
+        )
+        index.setdefault((segments[0], len(segments)), []).append((template, fixed))
+    for candidates in index.values():
+        candidates.sort(key=lambda candidate: -len(candidate[1]))
+    return index
+
+
+_TEMPLATES = _compile(ENDPOINT_TEMPLATES)
+
+
+def path_template(path: Sequence[str]) -> str:
+    """Find the endpoint template of a request path.
+
+    Args:
+        path (Sequence[str]): The path segments, e.g. ('queues', '/', 'orders').
+
+    Returns:
+        str: The template, e.g. 'queues/{vhost}/{name}'. A path which is not
+            known keeps its first segment and replaces the rest with '{}'.
+    """
+    if not path:
+        return ''
+    for template, fixed in _TEMPLATES.get((path[0], len(path)), ()):
+        if all(path[position] == segment for position, segment in fixed):
+            return template
+    return '/'.join((path[0], *('{}' for _ in path[1:])))
+
+
+class RequestInfo:
+    """The details of an HTTP request passed to the instrumentation"""
+
+    __slots__ = (
+        'method',
+        'path',
+        'attempt',
+        'start',
+        'duration',
+        'status',
+        'bytes',
+        'span',
+        '_template'
+    )
+
+    def __init__(self, method: str, path: Tuple[str, ...], attempt: int) -> None:
+        """The details of an HTTP request passed to the instrumentation.
+
+        Attributes:
+            method (str): The HTTP method.
+            path (Tuple[str, ...]): The path segments.
+            attempt (int): The attempt, starting at 1, when requests are
+                retried.
+            start (float): The time the request started, from
+                `time.perf_counter`.
+            duration (Optional[float]): The time taken in seconds, once the
+                request has ended.
+            status (Optional[int]): The HTTP status, if a response was
+                received and the requester reports it.
+            bytes (Optional[int]): The size of the response body, if the
+                requester reports it.
+            span (Optional[Any]): The tracing span of the request, when
+                traced by a `TracingInstrumentation`.
+        """
+        self.method = method
+        self.path = path
+        self.attempt = attempt
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.status: Optional[int] = None
+        self.bytes: Optional[int] = None
+        self.span: Optional[Any] = None
+        self._template: Optional[str] = None
+
+    @property
+    def template(self) -> str:
+        """The endpoint template, e.g. 'queues/{vhost}/{name}'."""
+        if self._template is None:
+            self._template = path_template(self.path)
+        return self._template
+
+    def __str__(self) -> str:
+        return '<RequestInfo {method} {template} status={status} duration={duration}>'.format(
+            method=self.method,
+            template=self.template,
+            status=self.status,
+            duration=self.duration
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+# The request being made by the current task, so the requester can report the
+# status and size of the response.
+current_request: ContextVar[Optional[RequestInfo]] = ContextVar(
+    'current_request',
+    default=None
+)
+
+
+class Instrumentation:
+    """Callbacks for each HTTP request made by a requester"""
+
+    def on_request_start(self, info: RequestInfo) -> None:
+        """Called before a request is sent.
+
+        Args:
+            info (RequestInfo): The request.
+        """
+
+    def on_request_end(self, info: RequestInfo) -> None:
+        """Called when a request succeeds.
+
+        Args:
+            info (RequestInfo): The request, with its duration.
+        """
+
+    def on_error(self, info: RequestInfo, error: Exception) -> None:
+        """Called when a request fails, including by timing out.
+
+        Args:
+            info (RequestInfo): The request, with its duration, and its status
+                if a response was received.
+            error (Exception): The error.
+        """
+
+    def on_cancel(self, info: RequestInfo) -> None:
+        """Called when a request is abandoned before it ends, for example
+        because the task making it was cancelled.
+
+        Args:
+            info (RequestInfo): The request, with the time until it was
+                abandoned as its duration.
+        """
+
+
+class InstrumentationGroup(Instrumentation):
+    """Passes each callback to several instruments"""
+
+    def __init__(self, *instruments: Instrumentation) -> None:
+        """Passes each callback to several instruments.
+
+        Args:
+            *instruments (Instrumentation): The instruments.
+        """
+        self.instruments = instruments
+
+    def on_request_start(self, info: RequestInfo) -> None:
+        for instrument in self.instruments:
+            instrument.on_request_start(info)
+
+    def on_request_end(self, info: RequestInfo) -> None:
+        for instrument in self.instruments:
+            instrument.on_request_end(info)
+
+    def on_error(self, info: RequestInfo, error: Exception) -> None:
+        for instrument in self.instruments:
+            instrument.on_error(info, error)
+
+    def on_cancel(self, info: RequestInfo) -> None:
+        for instrument in self.instruments:
+            instrument.on_cancel(info)
+
+
+class LatencyHistogram:
+    """A log-linear histogram of latencies"""
+
+    __slots__ = (
+        'sub_bucket_bits',
+        '_sub_buckets',
+        '_max_value',
+        '_counts',
+        'count',
+        'total',
+        'min',
+        'max'
+    )
+
+    def __init__(self, sub_bucket_bits: int = 5, max_seconds: float = 3600.0) -> None:
+        """A log-linear histogram of latencies, in the style of an HDR
+        histogram.
+
+        Latencies are recorded in whole microseconds. Each power of two is
+        split into 2 ** `sub_bucket_bits` buckets, so the relative error of a
+        percentile is at most 1 / 2 ** `sub_bucket_bits`, about 3% by
+        default. Recording is a few integer operations, and the memory used
+        is fixed: around 8 kB by default.
+
+        Args:
+            sub_bucket_bits (int, optional): The precision. Defaults to 5.
+            max_seconds (float, optional): The largest latency tracked, above
+                which latencies are counted as the largest. Defaults to 3600.0.
+
+        Attributes:
+            count (int): The number of latencies recorded.
+            total (float): The sum of the latencies in seconds.
+            min (float): The smallest latency in seconds.
+            max (float): The largest latency in seconds.
+        """
+        self.sub_bucket_bits = sub_bucket_bits
+        self._sub_buckets = 1 << sub_bucket_bits
+        self._max_value = max(int(max_seconds * 1_000_000), self._sub_buckets)
+        self._counts = array('Q', bytes(8 * (self._index(self._max_value) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value: int) -> int:
+        if value < self._sub_buckets:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits - 1
+        return (shift + 1) * self._sub_buckets + (value >> shift) - self._sub_buckets
+
+    def _upper_bound(self, index: int) -> int:
+        if index < self._sub_buckets:
+            return index
+        shift, offset = divmod(index, self._sub_buckets)
+        shift -= 1
+        return ((self._sub_buckets + offset + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        """Record a latency.
+
+        Args:
+            seconds (float): The latency in seconds.
+        """
+        value = min(int(seconds * 1_000_000), self._max_value)
+        self._counts[self._index(max(value, 0))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        """The mean latency in seconds, or NaN if there are none."""
+        return self.total / self.count if self.count else math.nan
+
+    def percentile(self, percentile: float) -> float:
+        """A percentile of the latencies.
+
+        Args:
+            percentile (float): The percentile, from 0 to 100.
+
+        Returns:
+            float: The latency in seconds, or NaN if there are none.
+        """
+        if not self.count:
+            return math.nan
+        rank = max(math.ceil(percentile / 100 * self.count), 1)
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper_bound(index) / 1_000_000, self.max)
+        return self.max
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """Add the latencies of a histogram with the same precision.
+
+        Args:
+            other (LatencyHistogram): The histogram.
+
+        Raises:
+            ValueError: If the precision or range differ.
+        """
+        if len(other._counts) != len(self._counts):
+            raise ValueError('The histograms have a different precision or range')
+        for index, count in enumerate(other._counts):
+            if count:
+                self._counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def reset(self) -> None:
+        """Forget the latencies recorded."""
+        self._counts = array('Q', bytes(8 * len(self._counts)))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __str__(self) -> str:
+        return '<LatencyHistogram count={count} p50={p50:.4f} p99={p99:.4f} max={max:.4f}>'.format(
+            count=self.count,
+            p50=self.percentile(50),
+            p99=self.percentile(99),
+            max=self.max
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class EndpointStats:
+    """The latencies, errors and bytes of an endpoint"""
+
+    __slots__ = ('latency', 'errors', 'cancelled', 'bytes')
+
+    def __init__(self, histogram: LatencyHistogram) -> None:
+        """The latencies, errors and bytes of an endpoint.
+
+        Attributes:
+            latency (LatencyHistogram): The latencies of the requests which
+                succeeded.
+            errors (int): The number of requests which failed.
+            cancelled (int): The number of requests which were abandoned.
+            bytes (int): The total size of the response bodies reported.
+        """
+        self.latency = histogram
+        self.errors = 0
+        self.cancelled = 0
+        self.bytes = 0
+
+    def __str__(self) -> str:
+        return (
+            '<EndpointStats {latency} errors={errors} cancelled={cancelled} bytes={bytes}>'
+        ).format(
+            latency=self.latency,
+            errors=self.errors,
+            cancelled=self.cancelled,
+            bytes=self.bytes
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class LatencyRecorder(Instrumentation):
+    """Records a latency histogram for each endpoint"""
+
+    def __init__(self, sub_bucket_bits: int = 5, max_seconds: float = 3600.0) -> None:
+        """Records a latency histogram for each method and endpoint template.
+
+        Args:
+            sub_bucket_bits (int, optional): The precision of the histograms.
+                Defaults to 5.
+            max_seconds (float, optional): The largest latency tracked.
+                Defaults to 3600.0.
+        """
+        self.sub_bucket_bits = sub_bucket_bits
+        self.max_seconds = max_seconds
+        self.endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+
+    def _stats(self, info: RequestInfo) -> EndpointStats:
+        key = (info.method, info.template)
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = EndpointStats(LatencyHistogram(self.sub_bucket_bits, self.max_seconds))
+            self.endpoints[key] = stats
+        return stats
+
+    def on_request_end(self, info: RequestInfo) -> None:
+        stats = self._stats(info)
+        stats.latency.record(info.duration or 0.0)
+        if info.bytes is not None:
+            stats.bytes += info.bytes
+
+    def on_error(self, info: RequestInfo, error: Exception) -> None:
+        self._stats(info).errors += 1
+
+    def on_cancel(self, info: RequestInfo) -> None:
+        self._stats(info).cancelled += 1
+
+    def hottest(self, limit: Optional[int] = None) -> List[Tuple[Tuple[str, str], EndpointStats]]:
+        """The endpoints ordered by the total time spent in them.
+
+        Args:
+            limit (Optional[int], optional): The number of endpoints. Defaults
+                to None, for all of them.
+
+        Returns:
+            List[Tuple[Tuple[str, str], EndpointStats]]: The (method,
+                template) and statistics of each endpoint.
+        """
+        ordered = sorted(
+            self.endpoints.items(),
+            key=lambda item: item[1].latency.total,
+            reverse=True
+        )
+        return ordered[:limit]
+
+    def report(self) -> Mapping[str, Mapping[str, float]]:
+        """Summarise the statistics of each endpoint.
+
+        Returns:
+            Mapping[str, Mapping[str, float]]: For each 'METHOD template', the
+                count, errors, cancelled, bytes, mean, p50, p90, p99 and max,
+                with latencies in seconds.
+        """
+        return {
+            f'{method} {template}': {
+                'count': stats.latency.count,
+                'errors': stats.errors,
+                'cancelled': stats.cancelled,
+                'bytes': stats.bytes,
+                'mean': stats.latency.mean,
+                'p50': stats.latency.percentile(50),
+                'p90': stats.latency.percentile(90),
+                'p99': stats.latency.percentile(99),
+                'max': stats.latency.max,
+            }
+            for (method, template), stats in self.hottest()
+        }
+
+    def reset(self) -> None:
+        """Forget the statistics recorded."""
+        self.endpoints.clear()
@@ -1,5 +1,6 @@
 """Message"""
 
+from base64 import b64decode
 from typing import Any, Mapping
 
 
@@ -48,6 +49,17 @@ class Message:
         self.payload = payload
         self.properties = properties
 
+    @property
+    def body(self) -> bytes:
+        """The payload as bytes, decoding it from base64 if necessary.
+
+        The payload is decoded each time it is accessed, rather than held
+        alongside the encoded payload.
+        """
+        if self.payload_encoding == 'base64':
+            return b64decode(self.payload)
+        return self.payload.encode('utf-8')
+
     def __str__(self) -> str:
         return '<Message {exchange}:{routing_key} - {payload}>'.format(
             exchange=self.exchange,
@@ -1,14 +1,35 @@
 """Monitor"""
 
-from typing import Any, List, Mapping, cast
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    cast
+)
 
 from .requester import Requester
 from .api import Api
+from .archive import ARCHIVE_ENDPOINTS, SnapshotWriter
+from .definitions import export_definitions, import_definitions
 from .version import Version
 from .vhost import VHost
+from .vhost_exchange import VHostExchange
+from .vhost_queue import VHostQueue
 from .channel import Channel
 from .connection import Connection
+from .history import MetricsStore
 from .node import Node
+from .poller import Poller
+from .refresh import refresh_all
+from .routing import RoutingIndex, build_routing_index
+from .snapshot import SNAPSHOT_ENDPOINTS, ClusterSnapshot, take_snapshot
+from .table import ChannelTable, ConnectionTable, QueueTable
+from .topology import Topology, TopologyPlan, TopologyResult
 from .user import User
 
 
@@ -16,9 +37,34 @@ class Monitor:
 
     def __init__(
             self,
-            requester: Requester
+            requester: Requester,
+            tracing: bool = False,
+            tracer_provider: Optional[Any] = None
     ):
+        """A RabbitMQ monitor.
+
+        Args:
+            requester (Requester): The HTTP requester.
+            tracing (bool, optional): If true, trace each api call with
+                OpenTelemetry, which must be installed. Defaults to False.
+            tracer_provider (Optional[Any], optional): The OpenTelemetry
+                tracer provider when tracing. Defaults to None, for the
+                global tracer provider.
+        """
         self._api = Api(requester)
+        if tracing:
+            from .tracing import trace_api  # pylint: disable=import-outside-toplevel
+            trace_api(self._api, tracer_provider)
+
+    async def __aenter__(self) -> "Monitor":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the requester, releasing any pooled connections."""
+        await self._api.aclose()
 
     async def overview(self):
         return await self._api.get_overview()
@@ -44,29 +90,268 @@ class Monitor:
         response = await self._api.get_vhost(name)
         return VHost(self._api, **response)
 
-    async def vhosts(self) -> Mapping[str, VHost]:
-        response = await self._api.get_vhosts()
+    async def vhosts(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> Mapping[str, VHost]:
+        response = await self._api.get_vhosts(
+            ['name', *columns] if columns else None
+        )
         return {
             item['name']: VHost(self._api, **item)
             for item in response
         }
 
-    async def channels(self) -> List[Channel]:
-        response = await self._api.get_channels()
+    async def queues(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> List[VHostQueue]:
+        """Get the queues in all vhosts with a single request.
+
+        Args:
+            columns (Optional[Sequence[str]], optional): The fields to
+                return, with nested fields separated by dots. The identifying
+                fields are always returned. Defaults to None, which returns all
+                fields.
+
+        Returns:
+            List[VHostQueue]: The queues.
+        """
+        response = await self._api.get_queues(
+            ['vhost', 'name', *columns] if columns else None
+        )
+        return [
+            VHostQueue(self._api, **item)
+            for item in response
+        ]
+
+    async def iter_queues(
+            self,
+            page_size: int = 100,
+            name: Optional[str] = None,
+            use_regex: bool = False,
+            columns: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[VHostQueue]:
+        """Iterate over the queues in all vhosts a page at a time.
+
+        Args:
+            page_size (int, optional): The number of queues fetched with each
+                request. Defaults to 100.
+            name (Optional[str], optional): Only include queues whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Optional[Sequence[str]], optional): The fields to
+                return, with nested fields separated by dots. The identifying
+                fields are always returned. Defaults to None, which returns all
+                fields.
+
+        Yields:
+            VHostQueue: The queues.
+        """
+        async for item in self._api.iter_queues(
+                page_size,
+                name,
+                use_regex,
+                ['vhost', 'name', *columns] if columns else None
+        ):
+            yield VHostQueue(self._api, **item)
+
+    async def iter_exchanges(
+            self,
+            page_size: int = 100,
+            name: Optional[str] = None,
+            use_regex: bool = False,
+            columns: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[VHostExchange]:
+        """Iterate over the exchanges in all vhosts a page at a time.
+
+        Args:
+            page_size (int, optional): The number of exchanges fetched with
+                each request. Defaults to 100.
+            name (Optional[str], optional): Only include exchanges whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Optional[Sequence[str]], optional): The fields to
+                return, with nested fields separated by dots. The identifying
+                fields are always returned. Defaults to None, which returns all
+                fields.
+
+        Yields:
+            VHostExchange: The exchanges.
+        """
+        async for item in self._api.iter_exchanges(
+                page_size,
+                name,
+                use_regex,
+                ['vhost', 'name', *columns] if columns else None
+        ):
+            if item['name']:
+                yield VHostExchange(self._api, **item)
+
+    async def channels(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> List[Channel]:
+        response = await self._api.get_channels(
+            ['name', *columns] if columns else None
+        )
         return [
             Channel(self._api, **item)
             for item in response
         ]
 
-    async def connections(self) -> List[Connection]:
-        response = await self._api.get_connections()
+    async def connections(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> List[Connection]:
+        response = await self._api.get_connections(
+            ['name', *columns] if columns else None
+        )
         return [
             Connection(self._api, **item)
             for item in response
         ]
 
-    async def nodes(self) -> List[Node]:
-        response = await self._api.get_nodes()
+    async def iter_channels(
+            self,
+            page_size: int = 100,
+            name: Optional[str] = None,
+            use_regex: bool = False,
+            columns: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Channel]:
+        """Iterate over the open channels a page at a time.
+
+        Args:
+            page_size (int, optional): The number of channels fetched with
+                each request. Defaults to 100.
+            name (Optional[str], optional): Only include channels whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Optional[Sequence[str]], optional): The fields to
+                return, with nested fields separated by dots. The identifying
+                fields are always returned. Defaults to None, which returns all
+                fields.
+
+        Yields:
+            Channel: The channels.
+        """
+        async for item in self._api.iter_channels(
+                page_size,
+                name,
+                use_regex,
+                ['name', *columns] if columns else None
+        ):
+            yield Channel(self._api, **item)
+
+    async def iter_connections(
+            self,
+            page_size: int = 100,
+            name: Optional[str] = None,
+            use_regex: bool = False,
+            columns: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[Connection]:
+        """Iterate over the open connections a page at a time.
+
+        Args:
+            page_size (int, optional): The number of connections fetched with
+                each request. Defaults to 100.
+            name (Optional[str], optional): Only include connections whose
+                names contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Optional[Sequence[str]], optional): The fields to
+                return, with nested fields separated by dots. The identifying
+                fields are always returned. Defaults to None, which returns all
+                fields.
+
+        Yields:
+            Connection: The connections.
+        """
+        async for item in self._api.iter_connections(
+                page_size,
+                name,
+                use_regex,
+                ['name', *columns] if columns else None
+        ):
+            yield Connection(self._api, **item)
+
+    async def queue_table(
+            self,
+            page_size: int = 500,
+            text_columns: Optional[Sequence[str]] = None,
+            number_columns: Optional[Sequence[str]] = None
+    ) -> QueueTable:
+        """Fetch the queues in all vhosts into a compact columnar table,
+        which uses far less memory than a list of queues.
+
+        Args:
+            page_size (int, optional): The number of queues fetched with each
+                request. Defaults to 500.
+            text_columns (Optional[Sequence[str]], optional): The text fields
+                to keep. Defaults to QUEUE_TEXT_COLUMNS.
+            number_columns (Optional[Sequence[str]], optional): The numeric
+                fields to keep. Defaults to QUEUE_NUMBER_COLUMNS.
+
+        Returns:
+            QueueTable: The queues keyed by (vhost, name).
+        """
+        table = QueueTable(text_columns, number_columns)
+        return await table.load(self._api, page_size)
+
+    async def connection_table(
+            self,
+            page_size: int = 500,
+            text_columns: Optional[Sequence[str]] = None,
+            number_columns: Optional[Sequence[str]] = None
+    ) -> ConnectionTable:
+        """Fetch the open connections into a compact columnar table.
+
+        Args:
+            page_size (int, optional): The number of connections fetched with
+                each request. Defaults to 500.
+            text_columns (Optional[Sequence[str]], optional): The text fields
+                to keep. Defaults to CONNECTION_TEXT_COLUMNS.
+            number_columns (Optional[Sequence[str]], optional): The numeric
+                fields to keep. Defaults to CONNECTION_NUMBER_COLUMNS.
+
+        Returns:
+            ConnectionTable: The connections keyed by name.
+        """
+        table = ConnectionTable(text_columns, number_columns)
+        return await table.load(self._api, page_size)
+
+    async def channel_table(
+            self,
+            page_size: int = 500,
+            text_columns: Optional[Sequence[str]] = None,
+            number_columns: Optional[Sequence[str]] = None
+    ) -> ChannelTable:
+        """Fetch the open channels into a compact columnar table.
+
+        Args:
+            page_size (int, optional): The number of channels fetched with
+                each request. Defaults to 500.
+            text_columns (Optional[Sequence[str]], optional): The text fields
+                to keep. Defaults to CHANNEL_TEXT_COLUMNS.
+            number_columns (Optional[Sequence[str]], optional): The numeric
+                fields to keep. Defaults to CHANNEL_NUMBER_COLUMNS.
+
+        Returns:
+            ChannelTable: The channels keyed by name.
+        """
+        table = ChannelTable(text_columns, number_columns)
+        return await table.load(self._api, page_size)
+
+    async def nodes(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> List[Node]:
+        response = await self._api.get_nodes(
+            ['name', *columns] if columns else None
+        )
         return [
             Node(self._api, **item)
             for item in response
@@ -79,8 +364,204 @@ class Monitor:
             for item in response
         ]
 
+    async def refresh_all(
+            self,
+            objects: Iterable[Any],
+            concurrency: int = 10,
+            collection_threshold: Optional[int] = 50
+    ) -> List[Tuple[Any, Exception]]:
+        """Refresh many queues, exchanges, connections, channels, nodes or
+        vhosts concurrently.
+
+        Where at least `collection_threshold` objects share a collection
+        endpoint, the collection is fetched once and the objects are updated
+        in place.
+
+        Args:
+            objects (Iterable[Any]): The objects to refresh.
+            concurrency (int, optional): The maximum number of requests in
+                flight. Defaults to 10.
+            collection_threshold (Optional[int], optional): The number of
+                objects at which the collection is fetched instead, or None to
+                always refresh individually. Defaults to 50.
+
+        Returns:
+            List[Tuple[Any, Exception]]: The objects which failed to refresh
+                with the exception raised.
+        """
+        return await refresh_all(
+            self._api,
+            objects,
+            concurrency,
+            collection_threshold
+        )
+
+    def poller(
+            self,
+            endpoints: Iterable[str] = ('queues',),
+            interval: float = 5.0,
+            columns: Optional[Mapping[str, Sequence[str]]] = None,
+            fields: Optional[Mapping[str, Optional[Sequence[str]]]] = None,
+            store: Optional[MetricsStore] = None
+    ) -> Poller:
+        """Create a poller which reports the entities which have been added,
+        removed or changed since the previous poll.
+
+        Args:
+            endpoints (Iterable[str], optional): The endpoints to poll. Any of
+                'vhosts', 'nodes', 'queues', 'exchanges', 'connections' and
+                'channels'. Defaults to ('queues',).
+            interval (float, optional): The number of seconds between polls.
+                Defaults to 5.0.
+            columns (Optional[Mapping[str, Sequence[str]]], optional): The
+                fields to fetch for each endpoint. Defaults to None.
+            fields (Optional[Mapping[str, Optional[Sequence[str]]]], optional):
+                The fields to compare for each endpoint when detecting a
+                change. A value of None compares the whole payload. Defaults
+                to None, for the stable fields in CHANGE_FIELDS.
+            store (Optional[MetricsStore], optional): If given, the metrics of
+                every polled entity are recorded in the store. Defaults to
+                None.
+
+        Returns:
+            Poller: The poller.
+        """
+        return Poller(self._api, endpoints, interval, columns, fields, store)
+
+    async def plan_topology(
+            self,
+            topology: Topology,
+            prune: bool = False
+    ) -> TopologyPlan:
+        """Compare a desired topology with the current definitions of its
+        vhost.
+
+        Args:
+            topology (Topology): The desired topology.
+            prune (bool, optional): If true the plan deletes what is not in the
+                topology. Defaults to False.
+
+        Returns:
+            TopologyPlan: The changes which bring the vhost to the topology.
+        """
+        return await topology.plan(self._api, prune)
+
+    async def apply_topology(
+            self,
+            plan: TopologyPlan,
+            concurrency: int = 10
+    ) -> TopologyResult:
+        """Apply a topology plan.
+
+        Args:
+            plan (TopologyPlan): The plan.
+            concurrency (int, optional): The maximum number of requests in
+                flight. Defaults to 10.
+
+        Returns:
+            TopologyResult: The changes which were applied and which failed.
+        """
+        return await plan.apply(self._api, concurrency)
+
     async def extensions(self) -> List[Mapping[str, Any]]:
         return await self._api.get_extensions()
 
     async def definitions(self) -> Mapping[str, Any]:
         return await self._api.get_definitions()
+
+    async def export_definitions(
+            self,
+            path: str,
+            vhost: Optional[str] = None,
+            compress: Optional[bool] = None
+    ) -> int:
+        """Write the definitions to a file as they are received, so memory use
+        does not grow with the size of the topology.
+
+        Args:
+            path (str): The path of the file.
+            vhost (Optional[str], optional): The virtual host, or None for the
+                whole server. Defaults to None.
+            compress (Optional[bool], optional): If true the file is gzip
+                compressed. Defaults to None, which compresses when the path
+                ends with '.gz'.
+
+        Returns:
+            int: The uncompressed size of the definitions in bytes.
+        """
+        return await export_definitions(self._api, path, vhost, compress)
+
+    async def import_definitions(
+            self,
+            path: str,
+            vhost: Optional[str] = None,
+            sections: Optional[Iterable[str]] = None
+    ) -> None:
+        """Upload the definitions in a file as it is read.
+
+        Args:
+            path (str): The path of the file, which may be gzip compressed.
+            vhost (Optional[str], optional): The virtual host, or None for the
+                whole server. Defaults to None.
+            sections (Optional[Iterable[str]], optional): The lists to upload,
+                for example ('exchanges', 'queues', 'bindings'). Defaults to
+                None, for all of them.
+        """
+        await import_definitions(self._api, path, vhost, sections)
+
+    async def archive_snapshot(
+            self,
+            writer: SnapshotWriter,
+            endpoints: Sequence[str] = ARCHIVE_ENDPOINTS,
+            columns: Optional[Mapping[str, Sequence[str]]] = None
+    ) -> float:
+        """Fetch the overview, nodes, vhosts, queues, connections and channels
+        and append them to an archive.
+
+        Args:
+            writer (SnapshotWriter): The archive writer.
+            endpoints (Sequence[str], optional): The endpoints. Defaults to
+                ARCHIVE_ENDPOINTS.
+            columns (Optional[Mapping[str, Sequence[str]]], optional): The
+                fields to fetch for each endpoint, which must include the
+                identifying fields. Defaults to None, for all fields.
+
+        Returns:
+            float: The timestamp of the snapshot.
+        """
+        return await writer.capture(self._api, endpoints, columns)
+
+    async def snapshot(
+            self,
+            endpoints: Sequence[str] = SNAPSHOT_ENDPOINTS,
+            columns: Optional[Mapping[str, Sequence[str]]] = None
+    ) -> ClusterSnapshot:
+        """Fetch the overview, nodes, vhosts, connections, channels, queues,
+        exchanges, bindings and consumers concurrently, and link them to each
+        other.
+
+        Args:
+            endpoints (Sequence[str], optional): The endpoints. Defaults to
+                SNAPSHOT_ENDPOINTS.
+            columns (Optional[Mapping[str, Sequence[str]]], optional): The
+                fields to fetch for each endpoint, which must include the
+                identifying fields. Defaults to None, for all fields.
+
+        Returns:
+            ClusterSnapshot: The snapshot, with the time taken by each
+                endpoint.
+        """
+        return await take_snapshot(self._api, endpoints, columns)
+
+    async def routing_index(self, vhost: Optional[str] = None) -> RoutingIndex:
+        """Fetch the exchanges and bindings and index them, to answer which
+        queues a message reaches without further requests.
+
+        Args:
+            vhost (Optional[str], optional): The virtual host, or None for
+                every virtual host. Defaults to None.
+
+        Returns:
+            RoutingIndex: The index.
+        """
+        return await build_routing_index(self._api, vhost)
@@ -2,34 +2,42 @@
 
 from __future__ import annotations
 
-from typing import Any, Mapping
+from typing import Any, Mapping, Optional
 
 from .api import Api
+from .history import MetricsHistory, TrackedMixin, NODE_SERIES
 
 
-class Node:
+class Node(TrackedMixin):
     """A rabbitmq node"""
 
+    SERIES = NODE_SERIES
+
     def __init__(self, api: Api, **kwargs):
         """A RabbitMQ Node
 
+        Attributes which are missing from a partial payload, for example when
+        columns have been selected, are None.
+
         Attributes:
             name (str): The node name.
             type (str): The node type.
             metrics (Mapping[str, Any]): The node metrics
         """
         self._api = api
+        self.history: Optional[MetricsHistory] = None
         self._init(**kwargs)
 
     def _init(
             self,
             name: str,
-            type: str,  # pylint: disable=redefined-builtin
+            type: Optional[str] = None,  # pylint: disable=redefined-builtin
             **metrics
     ) -> Node:
         self.name = name
         self.type = type
         self.metrics: Mapping[str, Any] = metrics
+        self._record(metrics)
         return self
 
     async def refresh(self, memory: bool = False, binary: bool = False) -> Node:
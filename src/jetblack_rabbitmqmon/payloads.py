@@ -0,0 +1,210 @@
+"""Typed payloads decoded with msgspec.
+
+Only the fields declared on the structs are decoded. Any other field of a
+response, such as 'messages_details' or 'backing_queue_status' on a queue, is
+dropped, and so is missing from the metrics of the models built from it.
+"""
+
+from collections.abc import Mapping
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union
+)
+
+import msgspec
+from msgspec import UNSET, UnsetType
+
+T = TypeVar('T')
+
+
+class Payload(msgspec.Struct, kw_only=True):
+    """A decoded payload which behaves as a read only mapping of the fields
+    which were present in the response, keyed by their names in the JSON"""
+
+    def _names(self) -> Iterator[Tuple[str, str]]:
+        # The JSON name and attribute name of each field.
+        return zip(self.__struct_encode_fields__, self.__struct_fields__)
+
+    def keys(self) -> List[str]:
+        """The names of the fields which were present."""
+        return [
+            key
+            for key, name in self._names()
+            if getattr(self, name) is not UNSET
+        ]
+
+    def __getitem__(self, key: str) -> Any:
+        for field, name in self._names():
+            if field == key:
+                value = getattr(self, name)
+                if value is UNSET:
+                    break
+                return value
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get the value of a field, or a default if it was not present."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def items(self) -> List[tuple]:
+        """The names and values of the fields which were present."""
+        return [
+            (key, getattr(self, name))
+            for key, name in self._names()
+            if getattr(self, name) is not UNSET
+        ]
+
+    def values(self) -> List[Any]:
+        """The values of the fields which were present."""
+        return [value for _, value in self.items()]
+
+
+Mapping.register(Payload)
+
+
+class QueuePayload(Payload, kw_only=True):
+    """A queue"""
+    vhost: str
+    name: str
+    node: Union[str, None, UnsetType] = UNSET
+    durable: Union[bool, None, UnsetType] = UNSET
+    auto_delete: Union[bool, None, UnsetType] = UNSET
+    exclusive: Union[bool, None, UnsetType] = UNSET
+    arguments: Union[Dict[str, Any], None, UnsetType] = UNSET
+    policy: Union[str, None, UnsetType] = UNSET
+    state: Union[str, None, UnsetType] = UNSET
+    type: Union[str, None, UnsetType] = UNSET
+    messages: Union[int, None, UnsetType] = UNSET
+    messages_ready: Union[int, None, UnsetType] = UNSET
+    messages_unacknowledged: Union[int, None, UnsetType] = UNSET
+    consumers: Union[int, None, UnsetType] = UNSET
+    memory: Union[int, None, UnsetType] = UNSET
+    idle_since: Union[str, None, UnsetType] = UNSET
+    message_stats: Union[Dict[str, Any], None, UnsetType] = UNSET
+
+
+class ConnectionPayload(Payload, kw_only=True):
+    """A connection"""
+    name: str
+    node: Union[str, None, UnsetType] = UNSET
+    vhost: Union[str, None, UnsetType] = UNSET
+    user: Union[str, None, UnsetType] = UNSET
+    protocol: Union[str, None, UnsetType] = UNSET
+    type: Union[str, None, UnsetType] = UNSET
+    host: Union[str, None, UnsetType] = UNSET
+    port: Union[int, str, None, UnsetType] = UNSET
+    peer_host: Union[str, None, UnsetType] = UNSET
+    peer_port: Union[int, str, None, UnsetType] = UNSET
+    client_properties: Union[Dict[str, Any], None, UnsetType] = UNSET
+    auth_mechanism: Union[str, None, UnsetType] = UNSET
+    ssl: Union[bool, None, UnsetType] = UNSET
+    ssl_hash: Union[str, None, UnsetType] = UNSET
+    ssl_cipher: Union[str, None, UnsetType] = UNSET
+    ssl_protocol: Union[str, None, UnsetType] = UNSET
+    peer_cert_validity: Union[str, None, UnsetType] = UNSET
+    peer_cert_issuer: Union[str, None, UnsetType] = UNSET
+    peer_cert_subject: Union[str, None, UnsetType] = UNSET
+    state: Union[str, None, UnsetType] = UNSET
+    channels: Union[int, None, UnsetType] = UNSET
+    connected_at: Union[int, None, UnsetType] = UNSET
+    recv_oct: Union[int, None, UnsetType] = UNSET
+    send_oct: Union[int, None, UnsetType] = UNSET
+    recv_oct_details: Union[Dict[str, Any], None, UnsetType] = UNSET
+    send_oct_details: Union[Dict[str, Any], None, UnsetType] = UNSET
+
+
+class ChannelPayload(Payload, kw_only=True):
+    """A channel"""
+    name: str
+    node: Union[str, None, UnsetType] = UNSET
+    vhost: Union[str, None, UnsetType] = UNSET
+    number: Union[int, None, UnsetType] = UNSET
+    user: Union[str, None, UnsetType] = UNSET
+    state: Union[str, None, UnsetType] = UNSET
+    confirm: Union[bool, None, UnsetType] = UNSET
+    transactional: Union[bool, None, UnsetType] = UNSET
+    consumer_count: Union[int, None, UnsetType] = UNSET
+    prefetch_count: Union[int, None, UnsetType] = UNSET
+    messages_unacknowledged: Union[int, None, UnsetType] = UNSET
+    messages_unconfirmed: Union[int, None, UnsetType] = UNSET
+    connection_details: Union[Dict[str, Any], None, UnsetType] = UNSET
+    message_stats: Union[Dict[str, Any], None, UnsetType] = UNSET
+
+
+class Page(Payload, Generic[T], kw_only=True):
+    """A page of items. The items are held in `entries`, as `items` is the
+    mapping method, and are read as `page['items']`."""
+    entries: List[T] = msgspec.field(name='items')
+    page: Union[int, UnsetType] = UNSET
+    page_count: Union[int, UnsetType] = UNSET
+    page_size: Union[int, UnsetType] = UNSET
+    filtered_count: Union[int, UnsetType] = UNSET
+    item_count: Union[int, UnsetType] = UNSET
+    total_count: Union[int, UnsetType] = UNSET
+
+
+def _list_decoder(payload_type: type) -> Callable[[bytes], Any]:
+    # Paged requests return an object with the items, others a plain list.
+    return msgspec.json.Decoder(
+        Union[List[payload_type], Page[payload_type]]  # type: ignore
+    ).decode
+
+
+def _decoder(payload_type: type) -> Callable[[bytes], Any]:
+    return msgspec.json.Decoder(payload_type).decode
+
+
+_QUEUES = _list_decoder(QueuePayload)
+_QUEUE = _decoder(QueuePayload)
+_CONNECTIONS = _list_decoder(ConnectionPayload)
+_CONNECTION = _decoder(ConnectionPayload)
+_CHANNELS = _list_decoder(ChannelPayload)
+_CHANNEL = _decoder(ChannelPayload)
+
+
+def payload_decoder(path: Sequence[str]) -> Optional[Callable[[bytes], Any]]:
+    """Find the typed decoder for the path of a request.
+
+    Args:
+        path (Sequence[str]): The path of the request, e.g. ('queues', '/').
+
+    Returns:
+        Optional[Callable[[bytes], Any]]: The decoder, or None if the response
+            has no typed payload.
+    """
+    match tuple(path):
+        case ('queues',) | ('queues', _):
+            return _QUEUES
+        case ('queues', _, _):
+            return _QUEUE
+        case ('connections',) | ('vhosts', _, 'connections'):
+            return _CONNECTIONS
+        case ('connections', _):
+            return _CONNECTION
+        case ('channels',) | ('vhost', _, 'channels') | ('connection', _, 'channels'):
+            return _CHANNELS
+        case ('channels', _):
+            return _CHANNEL
+        case _:
+            return None
@@ -0,0 +1,115 @@
+"""Request policies"""
+
+import random
+import time
+from typing import Collection
+
+
+class RetryPolicy:
+    """How failed requests are retried"""
+
+    def __init__(
+            self,
+            max_attempts: int = 3,
+            base_delay: float = 0.1,
+            max_delay: float = 5.0,
+            methods: Collection[str] = ('GET',)
+    ) -> None:
+        """How failed requests are retried.
+
+        Only requests which failed for a transient reason, such as a timeout,
+        a connection error or a 5xx status, are retried. The delay before
+        each retry is chosen at random up to an exponentially increasing
+        limit ("full jitter").
+
+        Args:
+            max_attempts (int, optional): The maximum number of attempts,
+                including the first. Defaults to 3.
+            base_delay (float, optional): The limit of the delay in seconds
+                before the first retry. Defaults to 0.1.
+            max_delay (float, optional): The largest limit of the delay in
+                seconds. Defaults to 5.0.
+            methods (Collection[str], optional): The idempotent HTTP methods
+                which may be retried. Defaults to ('GET',).
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.methods = frozenset(method.upper() for method in methods)
+
+    def delay(self, attempt: int) -> float:
+        """The delay before the next attempt.
+
+        Args:
+            attempt (int): The number of the attempt which failed, starting
+                from 1.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        limit = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, limit)
+
+
+class CircuitBreaker:
+    """Fail fast while the server is unhealthy"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(
+            self,
+            failure_threshold: int = 5,
+            reset_timeout: float = 30.0
+    ) -> None:
+        """Fail fast while the server is unhealthy.
+
+        After `failure_threshold` consecutive transient failures the circuit
+        opens and requests fail immediately. After `reset_timeout` seconds a
+        single trial request is allowed: if it succeeds the circuit closes,
+        otherwise it opens again.
+
+        Args:
+            failure_threshold (int, optional): The number of consecutive
+                failures which opens the circuit. Defaults to 5.
+            reset_timeout (float, optional): The number of seconds the circuit
+                stays open. Defaults to 30.0.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be made.
+
+        Returns:
+            bool: True if the request may be made.
+        """
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            return True
+        # Open, or half-open with the trial request in flight.
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful request."""
+        self._failures = 0
+        self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        """Record a transient failure."""
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def __str__(self) -> str:
+        return f'<CircuitBreaker {self.state}>'
+
+    def __repr__(self) -> str:
+        return str(self)
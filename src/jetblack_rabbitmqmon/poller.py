@@ -0,0 +1,299 @@
+"""Poller"""
+
+import asyncio
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple
+)
+
+from .api import Api
+
+if TYPE_CHECKING:
+    from .history import MetricsStore
+
+EntityKey = Tuple[Optional[str], str]
+Fetcher = Callable[[Api, Optional[Sequence[str]]], Awaitable[List[Mapping[str, Any]]]]
+
+ENDPOINTS: Mapping[str, Fetcher] = {
+    'vhosts': lambda api, columns: api.get_vhosts(columns),
+    'nodes': lambda api, columns: api.get_nodes(columns),
+    'queues': lambda api, columns: api.get_queues(columns),
+    'exchanges': lambda api, columns: api.get_exchanges(columns),
+    'connections': lambda api, columns: api.get_connections(columns),
+    'channels': lambda api, columns: api.get_channels(columns),
+}
+
+# The fields which identify an entity of each endpoint.
+_KEY_COLUMNS: Mapping[str, Sequence[str]] = {
+    'vhosts': ('name',),
+    'nodes': ('name',),
+    'queues': ('vhost', 'name'),
+    'exchanges': ('vhost', 'name'),
+    'connections': ('vhost', 'name'),
+    'channels': ('vhost', 'name'),
+}
+
+# The fields compared for each endpoint when detecting a change. Rates and
+# counters such as 'message_stats' change on every poll, so are not included.
+CHANGE_FIELDS: Mapping[str, Sequence[str]] = {
+    'vhosts': ('messages', 'messages_ready', 'messages_unacknowledged', 'tracing'),
+    'nodes': ('running', 'mem_alarm', 'disk_free_alarm', 'partitions'),
+    'queues': (
+        'messages',
+        'messages_ready',
+        'messages_unacknowledged',
+        'consumers',
+        'state',
+        'policy',
+        'node',
+    ),
+    'exchanges': ('type', 'durable', 'auto_delete', 'internal', 'arguments', 'policy'),
+    'connections': ('state', 'channels', 'user'),
+    'channels': (
+        'state',
+        'consumer_count',
+        'prefetch_count',
+        'messages_unacknowledged',
+        'messages_unconfirmed',
+    ),
+}
+
+
+def get_field(item: Mapping[str, Any], path: str) -> Any:
+    """Get a field from a payload, where nested fields are separated by dots.
+
+    Args:
+        item (Mapping[str, Any]): The payload.
+        path (str): The path to the field, e.g.
+            'message_stats.publish_details.rate'.
+
+    Returns:
+        Any: The value, or None if the field is missing.
+    """
+    value: Any = item
+    for name in path.split('.'):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(name)
+    return value
+
+
+class PollEvent:
+    """A change to an entity detected by the poller"""
+
+    ADDED = 'added'
+    REMOVED = 'removed'
+    CHANGED = 'changed'
+
+    def __init__(
+            self,
+            kind: str,
+            endpoint: str,
+            key: EntityKey,
+            current: Optional[Mapping[str, Any]],
+            previous: Optional[Mapping[str, Any]]
+    ):
+        """A change to an entity detected by the poller.
+
+        Args:
+            kind (str): One of 'added', 'removed' or 'changed'.
+            endpoint (str): The polled endpoint, e.g. 'queues'.
+            key (EntityKey): The (vhost, name) of the entity. The vhost is None
+                for entities which do not belong to a vhost.
+            current (Optional[Mapping[str, Any]]): The new payload, or None if
+                the entity was removed.
+            previous (Optional[Mapping[str, Any]]): The previous payload, or
+                None if the entity was added.
+
+        Attributes:
+            kind (str): One of 'added', 'removed' or 'changed'.
+            endpoint (str): The polled endpoint, e.g. 'queues'.
+            key (EntityKey): The (vhost, name) of the entity.
+            current (Optional[Mapping[str, Any]]): The new payload.
+            previous (Optional[Mapping[str, Any]]): The previous payload.
+        """
+        self.kind = kind
+        self.endpoint = endpoint
+        self.key = key
+        self.current = current
+        self.previous = previous
+
+    def __str__(self) -> str:
+        return '<PollEvent {kind} {endpoint} {vhost}:{name}>'.format(
+            kind=self.kind,
+            endpoint=self.endpoint,
+            vhost=self.key[0],
+            name=self.key[1]
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class Poller:
+    """Poll endpoints on a schedule and report changes"""
+
+    def __init__(
+            self,
+            api: Api,
+            endpoints: Iterable[str] = ('queues',),
+            interval: float = 5.0,
+            columns: Optional[Mapping[str, Sequence[str]]] = None,
+            fields: Optional[Mapping[str, Optional[Sequence[str]]]] = None,
+            store: Optional['MetricsStore'] = None
+    ):
+        """Poll endpoints on a schedule and report changes.
+
+        The previous snapshot of each endpoint is kept keyed by (vhost, name),
+        so only the entities which were added, removed or changed are
+        reported.
+
+        Args:
+            api (Api): The api.
+            endpoints (Iterable[str], optional): The endpoints to poll. Any of
+                'vhosts', 'nodes', 'queues', 'exchanges', 'connections' and
+                'channels'. Defaults to ('queues',).
+            interval (float, optional): The number of seconds between polls.
+                Defaults to 5.0.
+            columns (Optional[Mapping[str, Sequence[str]]], optional): The
+                fields to fetch for each endpoint. The identifying fields are
+                always fetched. Defaults to None, which fetches all fields.
+            fields (Optional[Mapping[str, Optional[Sequence[str]]]], optional):
+                The fields to compare for each endpoint when detecting a
+                change, with nested fields separated by dots, replacing those
+                in CHANGE_FIELDS. A value of None compares the whole payload,
+                which includes rates that change on every poll. Defaults to
+                None, for CHANGE_FIELDS.
+            store (Optional[MetricsStore], optional): If given, the metrics of
+                every polled entity are recorded in the store. Defaults to
+                None.
+
+        Raises:
+            ValueError: If an endpoint is not supported.
+        """
+        self._api = api
+        self.endpoints = tuple(endpoints)
+        for endpoint in self.endpoints:
+            if endpoint not in ENDPOINTS:
+                raise ValueError(f'Unsupported endpoint "{endpoint}"')
+        self.interval = interval
+        self.columns = columns or {}
+        self.fields: Dict[str, Optional[Sequence[str]]] = {
+            **CHANGE_FIELDS,
+            **(fields or {})
+        }
+        self.store = store
+        self._snapshots: Dict[str, Dict[EntityKey, Mapping[str, Any]]] = {}
+
+    def snapshot(self, endpoint: str) -> Mapping[EntityKey, Mapping[str, Any]]:
+        """The latest snapshot of an endpoint.
+
+        Args:
+            endpoint (str): The endpoint.
+
+        Returns:
+            Mapping[EntityKey, Mapping[str, Any]]: The payloads keyed by
+                (vhost, name).
+        """
+        return self._snapshots.get(endpoint, {})
+
+    def _is_changed(
+            self,
+            endpoint: str,
+            current: Mapping[str, Any],
+            previous: Mapping[str, Any]
+    ) -> bool:
+        fields = self.fields.get(endpoint)
+        if fields is None:
+            return current != previous
+        return any(
+            get_field(current, field) != get_field(previous, field)
+            for field in fields
+        )
+
+    async def _fetch(self, endpoint: str) -> List[Mapping[str, Any]]:
+        columns = self.columns.get(endpoint)
+        if columns:
+            columns = [*_KEY_COLUMNS[endpoint], *columns]
+        return await ENDPOINTS[endpoint](self._api, columns)
+
+    def _diff(
+            self,
+            endpoint: str,
+            items: List[Mapping[str, Any]]
+    ) -> List[PollEvent]:
+        timestamp = time.time()
+        previous_snapshot = self._snapshots.get(endpoint, {})
+        snapshot: Dict[EntityKey, Mapping[str, Any]] = {}
+        events: List[PollEvent] = []
+        for item in items:
+            key = (item.get('vhost'), item['name'])
+            snapshot[key] = item
+            if self.store is not None:
+                self.store.record(endpoint, key, item, timestamp)
+            previous = previous_snapshot.get(key)
+            if previous is None:
+                events.append(
+                    PollEvent(PollEvent.ADDED, endpoint, key, item, None)
+                )
+            elif self._is_changed(endpoint, item, previous):
+                events.append(
+                    PollEvent(PollEvent.CHANGED, endpoint, key, item, previous)
+                )
+        for key, previous in previous_snapshot.items():
+            if key not in snapshot:
+                if self.store is not None:
+                    self.store.remove(endpoint, key)
+                events.append(
+                    PollEvent(PollEvent.REMOVED, endpoint, key, None, previous)
+                )
+        self._snapshots[endpoint] = snapshot
+        return events
+
+    async def poll(self) -> List[PollEvent]:
+        """Poll the endpoints once.
+
+        On the first poll every entity is reported as added.
+
+        Returns:
+            List[PollEvent]: The changes since the previous poll.
+        """
+        responses = await asyncio.gather(
+            *(self._fetch(endpoint) for endpoint in self.endpoints)
+        )
+        events: List[PollEvent] = []
+        for endpoint, items in zip(self.endpoints, responses):
+            events.extend(self._diff(endpoint, items))
+        return events
+
+    async def events(self) -> AsyncIterator[PollEvent]:
+        """Poll the endpoints on the schedule, yielding the changes.
+
+        Yields:
+            PollEvent: The changes.
+        """
+        next_poll = time.monotonic()
+        while True:
+            for event in await self.poll():
+                yield event
+            next_poll += self.interval
+            delay = next_poll - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Fell behind the schedule, so start again from now.
+                next_poll = time.monotonic()
+
+    def __aiter__(self) -> AsyncIterator[PollEvent]:
+        return self.events()
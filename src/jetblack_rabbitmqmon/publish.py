@@ -0,0 +1,261 @@
+"""Bulk publishing"""
+
+import asyncio
+from array import array
+from collections import deque
+import math
+import time
+from typing import (
+    Any,
+    AsyncIterable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union
+)
+
+from .api import Api
+
+# Called with the position of the message in the input, the message, and
+# whether it was routed or the exception raised.
+ResultCallback = Callable[[int, 'OutgoingMessage', Union[bool, Exception]], None]
+
+
+class OutgoingMessage:
+    """A message to publish"""
+
+    __slots__ = ('routing_key', 'payload', 'properties', 'payload_encoding')
+
+    def __init__(
+            self,
+            routing_key: str,
+            payload: str,
+            properties: Optional[Mapping[str, Any]] = None,
+            payload_encoding: str = 'string'
+    ) -> None:
+        """A message to publish.
+
+        Args:
+            routing_key (str): The routing key.
+            payload (str): The payload.
+            properties (Optional[Mapping[str, Any]], optional): The message
+                properties. Defaults to None.
+            payload_encoding (str, optional): Either 'string' or 'base64'.
+                Defaults to 'string'.
+        """
+        self.routing_key = routing_key
+        self.payload = payload
+        self.properties = properties
+        self.payload_encoding = payload_encoding
+
+    def __str__(self) -> str:
+        return f'<OutgoingMessage {self.routing_key}>'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class PublishResult:
+    """The outcome of publishing many messages"""
+
+    def __init__(self) -> None:
+        """The outcome of publishing many messages.
+
+        Attributes:
+            published (int): The number of messages accepted by the server.
+            routed (int): The number of messages routed to at least one queue.
+            unrouted (int): The number of messages routed to no queue.
+            failed (List[Tuple[int, OutgoingMessage, Exception]]): The
+                position, message and exception of each failed publish.
+            elapsed (float): The time taken in seconds.
+            latencies (array): The time in seconds of each publish request.
+        """
+        self.published = 0
+        self.routed = 0
+        self.unrouted = 0
+        self.failed: List[Tuple[int, OutgoingMessage, Exception]] = []
+        self.elapsed = 0.0
+        self.latencies = array('d')
+
+    @property
+    def rate(self) -> float:
+        """The messages published per second."""
+        return self.published / self.elapsed if self.elapsed > 0 else 0.0
+
+    def latency(self, percentile: float) -> float:
+        """A percentile of the request latency in seconds.
+
+        Args:
+            percentile (float): The percentile, from 0 to 100.
+
+        Returns:
+            float: The latency, or NaN if nothing was published.
+        """
+        if not self.latencies:
+            return math.nan
+        ordered = sorted(self.latencies)
+        rank = max(math.ceil(percentile / 100 * len(ordered)) - 1, 0)
+        return ordered[rank]
+
+    def __str__(self) -> str:
+        return (
+            '<PublishResult published={published} routed={routed} '
+            'unrouted={unrouted} failed={failed} rate={rate:.1f}/s>'
+        ).format(
+            published=self.published,
+            routed=self.routed,
+            unrouted=self.unrouted,
+            failed=len(self.failed),
+            rate=self.rate
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+async def publish_many(
+        api: Api,
+        vhost: str,
+        exchange: str,
+        messages: Union[Iterable[OutgoingMessage], AsyncIterable[OutgoingMessage]],
+        concurrency: int = 32,
+        max_pending: Optional[int] = None,
+        on_result: Optional[ResultCallback] = None
+) -> PublishResult:
+    """Publish many messages concurrently.
+
+    Up to `concurrency` publish requests are in flight at once, sharing the
+    pooled connections of the requester. Messages with the same routing key
+    are published one after another in the order given, so they reach the
+    exchange in order, and their results are reported in that order.
+    Messages with different routing keys are published concurrently.
+
+    The messages are read from `messages` as they are needed: once
+    `max_pending` messages are queued or in flight, reading waits until one
+    completes. A generator producing a replay can therefore be of any size.
+
+    An exception raised by `on_result` stops the publishing: no more messages
+    are read, the requests in flight are cancelled, and the exception is
+    raised. The message it was called for has already been published.
+
+    Args:
+        api (Api): The api.
+        vhost (str): The name of the virtual host.
+        exchange (str): The name of the exchange.
+        messages (Union[Iterable[OutgoingMessage], AsyncIterable[OutgoingMessage]]):
+            The messages.
+        concurrency (int, optional): The maximum number of requests in
+            flight. Defaults to 32.
+        max_pending (Optional[int], optional): The maximum number of messages
+            queued or in flight. Defaults to None, for four times the
+            concurrency.
+        on_result (Optional[ResultCallback], optional): Called as each
+            message completes with its position, the message, and whether it
+            was routed or the exception raised. Defaults to None.
+
+    Returns:
+        PublishResult: The counts, failures and timings.
+    """
+    if concurrency < 1:
+        raise ValueError('The concurrency must be positive')
+    result = PublishResult()
+    in_flight = asyncio.Semaphore(concurrency)
+    pending = asyncio.Semaphore(max_pending or 4 * concurrency)
+    # The messages waiting behind the one being published for each key.
+    chains: Dict[str, Deque[Tuple[int, OutgoingMessage]]] = {}
+    tasks: set[asyncio.Task] = set()
+    # The exceptions raised by the result callback.
+    errors: List[BaseException] = []
+
+    async def publish(position: int, message: OutgoingMessage) -> None:
+        try:
+            async with in_flight:
+                start = time.perf_counter()
+                try:
+                    response = await api.publish_message(
+                        vhost,
+                        exchange,
+                        message.properties or {},
+                        message.routing_key,
+                        message.payload,
+                        message.payload_encoding
+                    )
+                except Exception as error:  # pylint: disable=broad-except
+                    result.failed.append((position, message, error))
+                    outcome: Union[bool, Exception] = error
+                else:
+                    result.latencies.append(time.perf_counter() - start)
+                    result.published += 1
+                    outcome = bool(response.get('routed'))
+                    if outcome:
+                        result.routed += 1
+                    else:
+                        result.unrouted += 1
+        finally:
+            pending.release()
+        if on_result is not None:
+            on_result(position, message, outcome)
+
+    async def run_chain(routing_key: str, position: int, message: OutgoingMessage) -> None:
+        chain = chains[routing_key]
+        try:
+            while True:
+                await publish(position, message)
+                if not chain:
+                    return
+                position, message = chain.popleft()
+        finally:
+            # When the chain stops early its waiting messages are dropped, so
+            # the reader is not left waiting for their places.
+            for _ in chain:
+                pending.release()
+            del chains[routing_key]
+
+    def chain_done(task: asyncio.Task) -> None:
+        tasks.discard(task)
+        if not task.cancelled():
+            error = task.exception()
+            if error is not None:
+                errors.append(error)
+
+    def submit(position: int, message: OutgoingMessage) -> None:
+        if errors:
+            raise errors[0]
+        chain = chains.get(message.routing_key)
+        if chain is not None:
+            chain.append((position, message))
+            return
+        chains[message.routing_key] = deque()
+        task = asyncio.create_task(run_chain(message.routing_key, position, message))
+        tasks.add(task)
+        task.add_done_callback(chain_done)
+
+    start = time.perf_counter()
+    try:
+        position = 0
+        if isinstance(messages, AsyncIterable):
+            async for message in messages:
+                await pending.acquire()
+                submit(position, message)
+                position += 1
+        else:
+            for message in messages:
+                await pending.acquire()
+                submit(position, message)
+                position += 1
+        while tasks:
+            await asyncio.gather(*tasks)
+        if errors:
+            raise errors[0]
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        result.elapsed = time.perf_counter() - start
+    return result
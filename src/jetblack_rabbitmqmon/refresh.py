@@ -0,0 +1,105 @@
+"""Bulk refresh"""
+
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Iterable, List, Mapping, Tuple
+
+from .api import Api, ApiError
+from .channel import Channel
+from .connection import Connection
+from .node import Node
+from .vhost import VHost
+from .vhost_exchange import VHostExchange
+from .vhost_queue import VHostQueue
+
+CollectionFetcher = Callable[[Api, Any], Awaitable[List[Mapping[str, Any]]]]
+
+# For each model class: how to group objects and how to fetch the collection
+# which contains every object in the group.
+_COLLECTIONS: Mapping[type, Tuple[Callable[[Any], Any], CollectionFetcher]] = {
+    VHostQueue: (lambda obj: obj.vhost, lambda api, vhost: api.get_vhost_queues(vhost)),
+    VHostExchange: (lambda obj: obj.vhost, lambda api, vhost: api.get_vhost_exchanges(vhost)),
+    Connection: (lambda obj: None, lambda api, _: api.get_connections()),
+    Channel: (lambda obj: None, lambda api, _: api.get_channels()),
+    Node: (lambda obj: None, lambda api, _: api.get_nodes()),
+    VHost: (lambda obj: None, lambda api, _: api.get_vhosts()),
+}
+
+
+async def refresh_all(
+        api: Api,
+        objects: Iterable[Any],
+        concurrency: int = 10,
+        collection_threshold: int | None = 50
+) -> List[Tuple[Any, Exception]]:
+    """Refresh many objects concurrently.
+
+    Objects are refreshed individually with at most `concurrency` requests in
+    flight. When a group of objects which share a collection endpoint (for
+    example the queues of a vhost) has at least `collection_threshold` members
+    the collection is fetched once and the objects are updated in place by
+    name.
+
+    Args:
+        api (Api): The api.
+        objects (Iterable[Any]): The objects to refresh.
+        concurrency (int, optional): The maximum number of requests in flight.
+            Defaults to 10.
+        collection_threshold (int | None, optional): The group size at which
+            the collection is fetched instead, or None to always refresh
+            individually. Defaults to 50.
+
+    Returns:
+        List[Tuple[Any, Exception]]: The objects which failed to refresh with
+            the exception raised.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    errors: List[Tuple[Any, Exception]] = []
+
+    async def refresh_one(obj: Any) -> None:
+        async with semaphore:
+            try:
+                await obj.refresh()
+            except Exception as error:  # pylint: disable=broad-except
+                errors.append((obj, error))
+
+    async def refresh_group(
+            fetch: CollectionFetcher,
+            group: Any,
+            members: List[Any]
+    ) -> None:
+        async with semaphore:
+            try:
+                response = await fetch(api, group)
+            except Exception as error:  # pylint: disable=broad-except
+                errors.extend((obj, error) for obj in members)
+                return
+        items = {item['name']: item for item in response}
+        for obj in members:
+            item = items.get(obj.name)
+            if item is None:
+                errors.append((obj, ApiError(f'{obj.name} not found')))
+            else:
+                obj._init(**item)  # pylint: disable=protected-access
+
+    groups: dict[Tuple[type, Any], List[Any]] = defaultdict(list)
+    individual: List[Any] = []
+    for obj in objects:
+        collection = _COLLECTIONS.get(type(obj))
+        if collection is None or collection_threshold is None:
+            individual.append(obj)
+        else:
+            get_group, _ = collection
+            groups[(type(obj), get_group(obj))].append(obj)
+
+    tasks: List[Awaitable[None]] = []
+    for (cls, group), members in groups.items():
+        if collection_threshold is not None and len(members) >= collection_threshold:
+            _, fetch = _COLLECTIONS[cls]
+            tasks.append(refresh_group(fetch, group, members))
+        else:
+            individual.extend(members)
+    tasks.extend(refresh_one(obj) for obj in individual)
+
+    await asyncio.gather(*tasks)
+    return errors
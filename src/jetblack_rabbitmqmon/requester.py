@@ -1,17 +1,151 @@
 """API"""
 
 from abc import ABCMeta, abstractmethod
-from typing import Mapping, Any, Optional, List
+import asyncio
+import json
+import time
+from typing import AsyncGenerator, AsyncIterable, Mapping, Any, Optional, List, Tuple
 from urllib.parse import quote
 
+from .instrumentation import Instrumentation, RequestInfo, current_request
+from .policy import CircuitBreaker, RetryPolicy
+
+TRANSIENT_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+# The methods which may be sent more than once without changing the result.
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'))
+
 
 def _quote(value):
     return quote(value, '')
 
 
+class RequestError(ValueError):
+    """An HTTP request failed"""
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        """An HTTP request failed.
+
+        Args:
+            message (str): A description of the failure.
+            status (Optional[int], optional): The HTTP status, or None if no
+                response was received. Defaults to None.
+        """
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def is_transient(self) -> bool:
+        """True if the failure may not happen when the request is repeated,
+        for example a connection error or a 503 status."""
+        return self.status is None or self.status in TRANSIENT_STATUSES
+
+
+class RequestTimeoutError(RequestError):
+    """An HTTP request timed out"""
+
+
+class CircuitOpenError(RequestError):
+    """An HTTP request was not made because the circuit breaker is open"""
+
+
+class CoalescingStats:
+    """Counters for the coalescing of identical GET requests"""
+
+    def __init__(self) -> None:
+        """Counters for the coalescing of identical GET requests.
+
+        Attributes:
+            requests (int): The number of GET requests sent.
+            coalesced (int): The number of GET requests which were saved by
+                waiting for an identical request already in flight.
+        """
+        self.requests = 0
+        self.coalesced = 0
+
+    def __str__(self) -> str:
+        return '<CoalescingStats requests={requests} coalesced={coalesced}>'.format(
+            requests=self.requests,
+            coalesced=self.coalesced
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class _SharedRequest:
+    """A GET request shared by the callers which coalesced on it"""
+
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
 class Requester(metaclass=ABCMeta):
     """An HTTP requester"""
 
+    def __init__(
+            self,
+            coalesce: bool = True,
+            timeout: Optional[float] = None,
+            deadline: Optional[float] = None,
+            retry: Optional[RetryPolicy] = None,
+            circuit_breaker: Optional[CircuitBreaker] = None,
+            instrumentation: Optional[Instrumentation] = None
+    ) -> None:
+        """An HTTP requester.
+
+        When `coalesce` is true, concurrent GET requests with the same path,
+        body and parameters share a single request, and every caller receives
+        the same response object, which must not be mutated.
+
+        Each attempt is limited by `timeout`, and all the attempts of a request
+        including the delays between retries are limited by `deadline`.
+
+        Args:
+            coalesce (bool, optional): If true coalesce identical GET requests
+                which are in flight. Defaults to True.
+            timeout (Optional[float], optional): The limit in seconds for each
+                attempt. Defaults to None.
+            deadline (Optional[float], optional): The limit in seconds for a
+                request including retries. Defaults to None.
+            retry (Optional[RetryPolicy], optional): How failed requests are
+                retried. Defaults to None, for no retries.
+            circuit_breaker (Optional[CircuitBreaker], optional): Fails
+                requests fast while the server is unhealthy. Defaults to None.
+            instrumentation (Optional[Instrumentation], optional): Called as
+                each attempt starts and ends. Defaults to None.
+
+        Attributes:
+            coalesce (bool): If true coalesce identical GET requests.
+            coalescing_stats (CoalescingStats): The coalescing counters.
+            timeout (Optional[float]): The limit in seconds for each attempt.
+            deadline (Optional[float]): The limit in seconds for a request.
+            retry (Optional[RetryPolicy]): How failed requests are retried.
+            circuit_breaker (Optional[CircuitBreaker]): The circuit breaker.
+            instrumentation (Optional[Instrumentation]): The instrumentation.
+        """
+        self.coalesce = coalesce
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+        self.instrumentation = instrumentation
+        self.coalescing_stats = CoalescingStats()
+        self._in_flight: dict[Tuple[Tuple[str, ...], str], _SharedRequest] = {}
+
+    async def __aenter__(self) -> "Requester":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Release any resources held by the requester, such as pooled
+        connections. The requester may be used again after it has been closed.
+        """
+
     @abstractmethod
     async def request(
             self,
@@ -28,11 +162,201 @@ class Requester(metaclass=ABCMeta):
             params (Optional[Any], optional): Used for a querystring. Defaults to None.
 
         Raises:
-            ValueError: If the request fails
+            RequestError: If the request fails
+
+        Returns:
+            Optional[Any]: The JSON decoded response.
+        """
+
+    def iter_content(
+            self,
+            *args: str,
+            method: str = 'GET',
+            data: Optional[Any] = None,
+            params: Optional[Any] = None
+    ) -> AsyncGenerator[bytes, None]:
+        """Make a request, yielding the undecoded body in chunks as it is
+        received, so large responses are never held in memory.
+
+        The timeout, retry and circuit breaker policies are not applied, as a
+        partly consumed response cannot be retried. Implementations return an
+        async generator, so the response can be released with `aclose`, and
+        raise NotImplementedError when called if they cannot stream.
+
+        Args:
+            method (str, optional): The HTTP method. Defaults to 'GET'.
+            data (Optional[Any], optional): Used for the body. Defaults to None.
+            params (Optional[Any], optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            RequestError: If the request fails
+            NotImplementedError: If the requester cannot stream.
+
+        Returns:
+            AsyncGenerator[bytes, None]: The chunks of the body.
+        """
+        raise NotImplementedError(f'{type(self).__name__} does not support streaming')
+
+    async def upload(
+            self,
+            method: str,
+            *args: str,
+            body: AsyncIterable[bytes],
+            params: Optional[Any] = None
+    ) -> None:
+        """Make a request with a JSON body which is sent in chunks as they are
+        produced.
+
+        The timeout, retry and circuit breaker policies are not applied, as
+        the body can only be consumed once.
+
+        Args:
+            method (str): The HTTP method
+            body (AsyncIterable[bytes]): The chunks of the encoded JSON body.
+            params (Optional[Any], optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            RequestError: If the request fails
+            NotImplementedError: If the requester cannot stream.
+        """
+        raise NotImplementedError(f'{type(self).__name__} does not support streaming')
+
+    def record_response(self, status: int, size: int) -> None:
+        """Report the status and body size of the response being handled,
+        for the instrumentation. Implementations call this from `request`
+        when the response is received.
+
+        Args:
+            status (int): The HTTP status.
+            size (int): The size of the body in bytes.
+        """
+        info = current_request.get()
+        if info is not None:
+            info.status = status
+            info.bytes = size
+
+    async def _attempt(
+            self,
+            method: str,
+            args: Tuple[str, ...],
+            data: Optional[Any],
+            params: Optional[Any],
+            timeout: Optional[float],
+            attempt: int = 1
+    ) -> Optional[Any]:
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return await self._attempt_request(method, args, data, params, timeout)
+
+        info = RequestInfo(method, args, attempt)
+        token = current_request.set(info)
+        instrumentation.on_request_start(info)
+        try:
+            response = await self._attempt_request(method, args, data, params, timeout)
+        except Exception as error:
+            info.duration = time.perf_counter() - info.start
+            if isinstance(error, RequestError):
+                if info.status is None:
+                    info.status = error.status
+            instrumentation.on_error(info, error)
+            raise
+        except BaseException:
+            # Cancelled, so neither a success nor a failure of the server.
+            info.duration = time.perf_counter() - info.start
+            instrumentation.on_cancel(info)
+            raise
+        finally:
+            current_request.reset(token)
+        info.duration = time.perf_counter() - info.start
+        instrumentation.on_request_end(info)
+        return response
+
+    async def _attempt_request(
+            self,
+            method: str,
+            args: Tuple[str, ...],
+            data: Optional[Any],
+            params: Optional[Any],
+            timeout: Optional[float]
+    ) -> Optional[Any]:
+        try:
+            async with asyncio.timeout(timeout):
+                return await self.request(method, *args, data=data, params=params)
+        except TimeoutError as error:
+            raise RequestTimeoutError(
+                f'{method} {"/".join(args)} timed out'
+            ) from error
+        except OSError as error:
+            raise RequestError(str(error)) from error
+
+    async def send(
+            self,
+            method: str,
+            *args: str,
+            data: Optional[Any] = None,
+            params: Optional[Any] = None
+    ) -> Optional[Any]:
+        """Make an HTTP request applying the timeouts, retry policy and
+        circuit breaker.
+
+        Args:
+            method (str): The HTTP method
+            data (Optional[Any], optional): Used for the body. Defaults to None.
+            params (Optional[Any], optional): Used for a querystring. Defaults to None.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            RequestTimeoutError: If the request timed out.
+            RequestError: If the request fails
 
         Returns:
             Optional[Any]: The JSON decoded response.
         """
+        breaker = self.circuit_breaker
+        retry = self.retry
+        expires = None if self.deadline is None else time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            if breaker is not None and not breaker.allow_request():
+                raise CircuitOpenError(f'{method} {"/".join(args)} failed fast')
+            attempt += 1
+            remaining = None if expires is None else expires - time.monotonic()
+            if self.timeout is None:
+                timeout = remaining
+            elif remaining is None:
+                timeout = self.timeout
+            else:
+                timeout = min(self.timeout, remaining)
+            try:
+                response = await self._attempt(method, args, data, params, timeout, attempt)
+            except RequestError as error:
+                if not error.is_transient:
+                    # The server responded, so is healthy.
+                    if breaker is not None:
+                        breaker.record_success()
+                    raise
+                if breaker is not None:
+                    breaker.record_failure()
+                if (
+                        retry is None or
+                        method not in retry.methods or
+                        attempt >= retry.max_attempts
+                ):
+                    raise
+                delay = retry.delay(attempt)
+                if expires is not None and time.monotonic() + delay >= expires:
+                    raise
+                await asyncio.sleep(delay)
+            except BaseException:
+                # A trial request which was cancelled, or failed for another
+                # reason, must not leave the circuit half-open for ever.
+                if breaker is not None and breaker.state == breaker.HALF_OPEN:
+                    breaker.record_failure()
+                raise
+            else:
+                if breaker is not None:
+                    breaker.record_success()
+                return response
 
     async def get(
             self,
@@ -47,12 +371,46 @@ class Requester(metaclass=ABCMeta):
             params (Optional[Any], optional): Used for a querystring. Defaults to None.
 
         Raises:
-            ValueError: If the request fails
+            RequestError: If the request fails
 
         Returns:
             Optional[Any]: The JSON decoded response.
         """
-        return await self.request('GET', *args, data=data, params=params)
+        if not self.coalesce:
+            return await self.send('GET', *args, data=data, params=params)
+
+        key = (args, json.dumps([data, params], sort_keys=True))
+        shared = self._in_flight.get(key)
+        if shared is not None:
+            self.coalescing_stats.coalesced += 1
+        else:
+            self.coalescing_stats.requests += 1
+            shared = _SharedRequest(
+                asyncio.create_task(self.send('GET', *args, data=data, params=params))
+            )
+            self._in_flight[key] = shared
+            shared.task.add_done_callback(
+                lambda _: self._request_done(key, shared)
+            )
+
+        # The request runs in its own task, so a caller which is cancelled
+        # does not cancel it for the others. It is only cancelled when every
+        # caller has given up.
+        shared.waiters += 1
+        try:
+            return await asyncio.shield(shared.task)
+        finally:
+            shared.waiters -= 1
+            if shared.waiters == 0 and not shared.task.done():
+                shared.task.cancel()
+
+    def _request_done(self, key: Tuple[Tuple[str, ...], str], shared: '_SharedRequest') -> None:
+        if self._in_flight.get(key) is shared:
+            del self._in_flight[key]
+        if not shared.task.cancelled():
+            # Retrieve the exception to avoid the "never retrieved" warning
+            # when every caller was cancelled.
+            shared.task.exception()
 
     async def get_list(
             self,
@@ -67,7 +425,7 @@ class Requester(metaclass=ABCMeta):
             params (Optional[Any], optional): Used for a querystring. Defaults to None.
 
         Raises:
-            ValueError: If the request fails
+            RequestError: If the request fails
 
         Returns:
             Optional[Any]: The JSON decoded response.
@@ -87,7 +445,7 @@ class Requester(metaclass=ABCMeta):
             params (Optional[Any], optional): Used for a querystring. Defaults to None.
 
         Raises:
-            ValueError: If the request fails
+            RequestError: If the request fails
 
         Returns:
             Optional[Any]: The JSON decoded response.
@@ -107,12 +465,12 @@ class Requester(metaclass=ABCMeta):
             params (Optional[Any], optional): Used for a querystring. Defaults to None.
 
         Raises:
-            ValueError: If the request fails
+            RequestError: If the request fails
 
         Returns:
             Optional[Any]: The JSON decoded response.
         """
-        return await self.request('PUT', *args, data=data, params=params)
+        return await self.send('PUT', *args, data=data, params=params)
 
     async def post(
             self,
@@ -127,12 +485,12 @@ class Requester(metaclass=ABCMeta):
             params (Optional[Any], optional): Used for a querystring. Defaults to None.
 
         Raises:
-            ValueError: If the request fails
+            RequestError: If the request fails
 
         Returns:
             Optional[Any]: The JSON decoded response.
         """
-        return await self.request('POST', *args, data=data, params=params)
+        return await self.send('POST', *args, data=data, params=params)
 
     async def delete(
             self,
@@ -147,9 +505,9 @@ class Requester(metaclass=ABCMeta):
             params (Optional[Any], optional): Used for a querystring. Defaults to None.
 
         Raises:
-            ValueError: If the request fails
+            RequestError: If the request fails
 
         Returns:
             Optional[Any]: The JSON decoded response.
         """
-        return await self.request('DELETE', *args, data=data, params=params)
+        return await self.send('DELETE', *args, data=data, params=params)
@@ -0,0 +1,486 @@
+"""Routing"""
+
+from abc import ABCMeta, abstractmethod
+import asyncio
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple
+)
+
+from .api import Api
+from .snapshot import ClusterSnapshot
+
+# The destination type and name of a binding.
+Destination = Tuple[str, str]
+Headers = Mapping[str, Any]
+
+_HEADER_MATCHES = ('all', 'any', 'all-with-x', 'any-with-x')
+
+# The exchanges every virtual host has, which definitions do not list.
+_BUILT_IN_EXCHANGES = (
+    ('', 'direct'),
+    ('amq.direct', 'direct'),
+    ('amq.fanout', 'fanout'),
+    ('amq.topic', 'topic'),
+    ('amq.headers', 'headers'),
+    ('amq.match', 'headers'),
+)
+
+
+class Routes(metaclass=ABCMeta):
+    """The bindings of an exchange"""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def add(
+            self,
+            binding_key: str,
+            arguments: Mapping[str, Any],
+            destination: Destination
+    ) -> None:
+        """Add a binding.
+
+        Args:
+            binding_key (str): The routing key of the binding.
+            arguments (Mapping[str, Any]): The arguments of the binding.
+            destination (Destination): The destination type and name.
+        """
+
+    @abstractmethod
+    def match(
+            self,
+            routing_key: str,
+            headers: Optional[Headers],
+            found: Set[Destination]
+    ) -> None:
+        """Add the destinations a message is routed to.
+
+        Args:
+            routing_key (str): The routing key of the message.
+            headers (Optional[Headers]): The headers of the message.
+            found (Set[Destination]): The destinations found so far.
+        """
+
+
+class _DirectRoutes(Routes):
+    """Routes by the exact routing key"""
+
+    __slots__ = ('_destinations',)
+
+    def __init__(self) -> None:
+        self._destinations: Dict[str, Set[Destination]] = {}
+
+    def add(
+            self,
+            binding_key: str,
+            _arguments: Mapping[str, Any],
+            destination: Destination
+    ) -> None:
+        self._destinations.setdefault(binding_key, set()).add(destination)
+
+    def match(
+            self,
+            routing_key: str,
+            _headers: Optional[Headers],
+            found: Set[Destination]
+    ) -> None:
+        destinations = self._destinations.get(routing_key)
+        if destinations:
+            found.update(destinations)
+
+
+class _FanoutRoutes(Routes):
+    """Routes to every binding"""
+
+    __slots__ = ('_destinations',)
+
+    def __init__(self) -> None:
+        self._destinations: Set[Destination] = set()
+
+    def add(
+            self,
+            _binding_key: str,
+            _arguments: Mapping[str, Any],
+            destination: Destination
+    ) -> None:
+        self._destinations.add(destination)
+
+    def match(
+            self,
+            _routing_key: str,
+            _headers: Optional[Headers],
+            found: Set[Destination]
+    ) -> None:
+        found.update(self._destinations)
+
+
+class _TopicNode:
+    """A node of a trie of binding keys, split into words"""
+
+    __slots__ = ('children', 'destinations')
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TopicNode] = {}
+        self.destinations: Set[Destination] = set()
+
+
+class _TopicRoutes(Routes):
+    """Routes by matching the routing key to patterns"""
+
+    __slots__ = ('_root',)
+
+    def __init__(self) -> None:
+        self._root = _TopicNode()
+
+    def add(
+            self,
+            binding_key: str,
+            _arguments: Mapping[str, Any],
+            destination: Destination
+    ) -> None:
+        node = self._root
+        for word in binding_key.split('.'):
+            child = node.children.get(word)
+            if child is None:
+                child = node.children[word] = _TopicNode()
+            node = child
+        node.destinations.add(destination)
+
+    def match(
+            self,
+            routing_key: str,
+            _headers: Optional[Headers],
+            found: Set[Destination]
+    ) -> None:
+        words = routing_key.split('.')
+        count = len(words)
+        # A node is only visited once at each position, which bounds the
+        # work for patterns with several '#' words.
+        visited: Set[Tuple[int, int]] = set()
+        pending: List[Tuple[_TopicNode, int]] = [(self._root, 0)]
+        while pending:
+            node, index = pending.pop()
+            key = (id(node), index)
+            if key in visited:
+                continue
+            visited.add(key)
+            children = node.children
+            if index == count:
+                found.update(node.destinations)
+            else:
+                child = children.get(words[index])
+                if child is not None:
+                    pending.append((child, index + 1))
+                child = children.get('*')
+                if child is not None:
+                    pending.append((child, index + 1))
+            child = children.get('#')
+            if child is not None:
+                # '#' matches zero or more words.
+                pending.extend((child, position) for position in range(index, count + 1))
+
+
+class _HeadersRoutes(Routes):
+    """Routes by matching the message headers to the binding arguments"""
+
+    __slots__ = ('_bindings',)
+
+    def __init__(self) -> None:
+        self._bindings: List[Tuple[bool, Tuple[Tuple[str, Any], ...], Destination]] = []
+
+    def add(
+            self,
+            _binding_key: str,
+            arguments: Mapping[str, Any],
+            destination: Destination
+    ) -> None:
+        match = arguments.get('x-match', 'all')
+        if match not in _HEADER_MATCHES:
+            raise ValueError(f'Invalid x-match "{match}"')
+        with_x = match.endswith('-with-x')
+        required = tuple(
+            (name, value)
+            for name, value in arguments.items()
+            if name != 'x-match' and (with_x or not name.startswith('x-'))
+        )
+        self._bindings.append((match.startswith('all'), required, destination))
+
+    def match(
+            self,
+            _routing_key: str,
+            headers: Optional[Headers],
+            found: Set[Destination]
+    ) -> None:
+        headers = headers or {}
+        missing = object()
+        for match_all, required, destination in self._bindings:
+            matches = (headers.get(name, missing) == value for name, value in required)
+            if all(matches) if match_all else any(matches):
+                found.add(destination)
+
+
+_ROUTES: Dict[str, Callable[[], Routes]] = {
+    'direct': _DirectRoutes,
+    'fanout': _FanoutRoutes,
+    'topic': _TopicRoutes,
+    'headers': _HeadersRoutes,
+}
+
+
+def _exchange_routes(exchange_type: str, arguments: Mapping[str, Any]) -> Routes:
+    if exchange_type == 'x-delayed-message':
+        # Routes as the exchange type it delays for.
+        exchange_type = arguments.get('x-delayed-type', 'direct')
+    routes = _ROUTES.get(exchange_type)
+    if routes is None:
+        raise ValueError(f'Cannot route through an exchange of type "{exchange_type}"')
+    return routes()
+
+
+class RoutingIndex:
+    """An index of the exchanges and bindings for routing queries"""
+
+    def __init__(
+            self,
+            exchanges: Iterable[Mapping[str, Any]],
+            bindings: Iterable[Mapping[str, Any]],
+            queues: Optional[Iterable[Mapping[str, Any]]] = None
+    ) -> None:
+        """An index of the exchanges and bindings, which answers which queues
+        a message reaches without contacting the server.
+
+        Direct exchanges are indexed by routing key, and topic exchanges by a
+        trie of the words of the binding keys. Headers exchanges match the
+        `x-match` arguments of their bindings, and fanout exchanges route to
+        every binding. Exchange to exchange bindings are followed, and an
+        exchange which routes a message nowhere passes it to its
+        'alternate-exchange' argument, if it has one.
+
+        Exchanges of other types, such as 'x-consistent-hash', choose between
+        their bindings at random or by state held on the server, so cannot be
+        routed through.
+
+        The management api lists the bindings of the default exchange, but
+        definitions do not, so the queues may be given to add them. Neither do
+        definitions list the built in exchanges, such as 'amq.topic', so these
+        are added to every virtual host unless given.
+
+        Args:
+            exchanges (Iterable[Mapping[str, Any]]): The exchanges, with the
+                vhost, name, type and arguments.
+            bindings (Iterable[Mapping[str, Any]]): The bindings, with the
+                vhost, source, destination, destination type, routing key and
+                arguments.
+            queues (Optional[Iterable[Mapping[str, Any]]], optional): The
+                queues, with the vhost and name, to bind to the default
+                exchange. Defaults to None.
+        """
+        self._routes: Dict[Tuple[str, str], Optional[Routes]] = {}
+        self._alternates: Dict[Tuple[str, str], str] = {}
+        self._types: Dict[Tuple[str, str], str] = {}
+        self._vhosts: Set[str] = set()
+        for exchange in exchanges:
+            key = (exchange['vhost'], exchange['name'])
+            exchange_type = exchange['type']
+            arguments = exchange.get('arguments') or {}
+            self._types[key] = exchange_type
+            try:
+                self._routes[key] = _exchange_routes(exchange_type, arguments)
+            except ValueError:
+                # Only an error if a message is routed through it.
+                self._routes[key] = None
+            if 'alternate-exchange' in arguments:
+                self._alternates[key] = arguments['alternate-exchange']
+        for vhost, _name in list(self._routes):
+            self._add_built_in_exchanges(vhost)
+        for binding in bindings:
+            self._bind(
+                binding['vhost'],
+                binding['source'],
+                (binding['destination_type'], binding['destination']),
+                binding['routing_key'],
+                binding.get('arguments') or {}
+            )
+        for queue in queues or ():
+            self._bind(queue['vhost'], '', ('queue', queue['name']), queue['name'], {})
+
+    def _bind(
+            self,
+            vhost: str,
+            source: str,
+            destination: Destination,
+            routing_key: str,
+            arguments: Mapping[str, Any]
+    ) -> None:
+        self._add_built_in_exchanges(vhost)
+        routes = self._routes.get((vhost, source))
+        if routes is not None:
+            routes.add(routing_key, arguments, destination)
+
+    def _add_built_in_exchanges(self, vhost: str) -> None:
+        if vhost in self._vhosts:
+            return
+        self._vhosts.add(vhost)
+        for name, exchange_type in _BUILT_IN_EXCHANGES:
+            key = (vhost, name)
+            if key not in self._routes:
+                self._types[key] = exchange_type
+                self._routes[key] = _ROUTES[exchange_type]()
+
+    @classmethod
+    def from_definitions(cls, definitions: Mapping[str, Any]) -> 'RoutingIndex':
+        """Index the exchanges and bindings of exported definitions.
+
+        Args:
+            definitions (Mapping[str, Any]): The definitions of the server.
+
+        Returns:
+            RoutingIndex: The index.
+        """
+        return cls(
+            definitions.get('exchanges') or (),
+            definitions.get('bindings') or (),
+            definitions.get('queues') or ()
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot: ClusterSnapshot) -> 'RoutingIndex':
+        """Index the exchanges and bindings of a snapshot.
+
+        Args:
+            snapshot (ClusterSnapshot): The snapshot.
+
+        Returns:
+            RoutingIndex: The index.
+        """
+        return cls(
+            (
+                {
+                    'vhost': exchange.vhost,
+                    'name': exchange.name,
+                    'type': exchange.type,
+                    'arguments': exchange.arguments,
+                }
+                for exchange in snapshot.exchanges.values()
+            ),
+            (
+                {
+                    'vhost': binding.vhost,
+                    'source': binding.source,
+                    'destination': binding.destination,
+                    'destination_type': binding.destination_type,
+                    'routing_key': binding.routing_key,
+                    'arguments': binding.arguments,
+                }
+                for binding in snapshot.bindings
+            ),
+            (
+                {'vhost': queue.vhost, 'name': queue.name}
+                for queue in snapshot.queues.values()
+            )
+        )
+
+    def _match(
+            self,
+            vhost: str,
+            exchange: str,
+            routing_key: str,
+            headers: Optional[Headers]
+    ) -> Set[Destination]:
+        key = (vhost, exchange)
+        if key not in self._routes:
+            if exchange == '':
+                return set()
+            raise ValueError(f'Unknown exchange "{exchange}" in vhost "{vhost}"')
+        routes = self._routes[key]
+        if routes is None:
+            raise ValueError(
+                f'Cannot route through exchange "{exchange}" of type "{self._types[key]}"'
+            )
+        found: Set[Destination] = set()
+        routes.match(routing_key, headers, found)
+        return found
+
+    def route(
+            self,
+            vhost: str,
+            exchange: str,
+            routing_key: str,
+            headers: Optional[Headers] = None
+    ) -> Set[str]:
+        """Find the queues a message would be routed to.
+
+        Args:
+            vhost (str): The name of the virtual host.
+            exchange (str): The exchange the message is published to.
+            routing_key (str): The routing key.
+            headers (Optional[Headers], optional): The message headers, for
+                headers exchanges. Defaults to None.
+
+        Raises:
+            ValueError: If an exchange the message reaches is unknown, or of a
+                type which cannot be routed through.
+
+        Returns:
+            Set[str]: The names of the queues.
+        """
+        queues: Set[str] = set()
+        visited = {exchange}
+        pending = [exchange]
+        while pending:
+            source = pending.pop()
+            destinations = self._match(vhost, source, routing_key, headers)
+            if not destinations:
+                alternate = self._alternates.get((vhost, source))
+                if alternate is not None and alternate not in visited:
+                    visited.add(alternate)
+                    pending.append(alternate)
+                continue
+            for destination_type, name in destinations:
+                if destination_type == 'queue':
+                    queues.add(name)
+                elif name not in visited:
+                    visited.add(name)
+                    pending.append(name)
+        return queues
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def __str__(self) -> str:
+        return f'<RoutingIndex exchanges={len(self)}>'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+async def build_routing_index(api: Api, vhost: Optional[str] = None) -> RoutingIndex:
+    """Fetch the exchanges and bindings concurrently and index them.
+
+    Args:
+        api (Api): The api.
+        vhost (Optional[str], optional): The virtual host, or None for every
+            virtual host. Defaults to None.
+
+    Returns:
+        RoutingIndex: The index.
+    """
+    if vhost is None:
+        exchanges, bindings = await asyncio.gather(
+            api.get_exchanges(['vhost', 'name', 'type', 'arguments']),
+            api.get_bindings()
+        )
+    else:
+        exchanges, bindings = await asyncio.gather(
+            api.get_vhost_exchanges(vhost, ['vhost', 'name', 'type', 'arguments']),
+            api.get_vhost_bindings(vhost)
+        )
+    return RoutingIndex(exchanges, bindings)
@@ -0,0 +1,311 @@
+"""Cluster snapshots"""
+
+import asyncio
+from collections import defaultdict
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    DefaultDict,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union
+)
+
+from .api import Api
+from .channel import Channel
+from .connection import Connection
+from .consumer import Consumer
+from .node import Node
+from .poller import ENDPOINTS
+from .vhost import VHost
+from .vhost_binding import VHostBinding
+from .vhost_exchange import VHostExchange
+from .vhost_queue import VHostQueue
+
+# The endpoints of a snapshot.
+SNAPSHOT_ENDPOINTS: Sequence[str] = (
+    'overview',
+    'nodes',
+    'vhosts',
+    'connections',
+    'channels',
+    'queues',
+    'exchanges',
+    'bindings',
+    'consumers',
+)
+
+_FETCHERS: Mapping[str, Callable[[Api, Optional[Sequence[str]]], Awaitable[Any]]] = {
+    **ENDPOINTS,
+    'overview': lambda api, columns: api.get_overview(),
+    'bindings': lambda api, columns: api.get_bindings(),
+    'consumers': lambda api, columns: api.get_consumers(),
+}
+
+EntityKey = Tuple[str, str]
+
+
+class ClusterSnapshot:
+    """The entities of a cluster, indexed and linked to each other"""
+
+    def __init__(
+            self,
+            api: Api,
+            payloads: Mapping[str, Any],
+            timings: Optional[Mapping[str, float]] = None,
+            errors: Optional[Mapping[str, Exception]] = None,
+            timestamp: Optional[float] = None,
+            elapsed: float = 0.0
+    ) -> None:
+        """The entities of a cluster, indexed and linked to each other.
+
+        The links are made by name, so an entity which refers to one which is
+        missing from the snapshot, for example a consumer on a queue created
+        after the queues were fetched, has no link.
+
+        Args:
+            api (Api): The api.
+            payloads (Mapping[str, Any]): The response of each endpoint.
+            timings (Optional[Mapping[str, float]], optional): The time in
+                seconds taken to fetch each endpoint. Defaults to None.
+            errors (Optional[Mapping[str, Exception]], optional): The
+                endpoints which could not be fetched. Defaults to None.
+            timestamp (Optional[float], optional): The time the snapshot was
+                started. Defaults to None, for now.
+            elapsed (float, optional): The time in seconds taken to fetch every
+                endpoint. Defaults to 0.0.
+
+        Attributes:
+            overview (Mapping[str, Any]): The overview, or empty if it was not
+                fetched.
+            nodes (Dict[str, Node]): The nodes by name.
+            vhosts (Dict[str, VHost]): The virtual hosts by name.
+            connections (Dict[str, Connection]): The connections by name.
+            channels (Dict[str, Channel]): The channels by name.
+            queues (Dict[EntityKey, VHostQueue]): The queues by vhost and name.
+            exchanges (Dict[EntityKey, VHostExchange]): The exchanges by vhost
+                and name.
+            bindings (List[VHostBinding]): The bindings.
+            consumers (List[Consumer]): The consumers, linked to their queue,
+                channel and connection.
+            timings (Mapping[str, float]): The time in seconds taken to fetch
+                each endpoint.
+            errors (Mapping[str, Exception]): The endpoints which could not be
+                fetched, whose entities are missing.
+            timestamp (float): The time the snapshot was started.
+            elapsed (float): The time in seconds taken to fetch every endpoint.
+        """
+        self.timings: Mapping[str, float] = timings or {}
+        self.errors: Mapping[str, Exception] = errors or {}
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.elapsed = elapsed
+
+        self.overview: Mapping[str, Any] = payloads.get('overview') or {}
+        self.nodes = {
+            item['name']: Node(api, **item)
+            for item in payloads.get('nodes') or ()
+        }
+        self.vhosts = {
+            item['name']: VHost(api, **item)
+            for item in payloads.get('vhosts') or ()
+        }
+        self.connections = {
+            item['name']: Connection(api, **item)
+            for item in payloads.get('connections') or ()
+        }
+        self.channels = {
+            item['name']: Channel(api, **item)
+            for item in payloads.get('channels') or ()
+        }
+        self.queues = {
+            (item['vhost'], item['name']): VHostQueue(api, **item)
+            for item in payloads.get('queues') or ()
+        }
+        self.exchanges = {
+            (item['vhost'], item['name']): VHostExchange(api, **item)
+            for item in payloads.get('exchanges') or ()
+        }
+        self.bindings = [
+            VHostBinding(api, **item)
+            for item in payloads.get('bindings') or ()
+        ]
+        self.consumers = [
+            Consumer(api, **item)
+            for item in payloads.get('consumers') or ()
+        ]
+
+        self._connection_channels: DefaultDict[str, List[Channel]] = defaultdict(list)
+        for channel in self.channels.values():
+            connection_details = channel.metrics.get('connection_details') or {}
+            connection_name = connection_details.get('name')
+            if connection_name is not None:
+                self._connection_channels[connection_name].append(channel)
+
+        self._queue_consumers: DefaultDict[EntityKey, List[Consumer]] = defaultdict(list)
+        self._channel_consumers: DefaultDict[str, List[Consumer]] = defaultdict(list)
+        for consumer in self.consumers:
+            key = (consumer.vhost, consumer.queue_name)
+            consumer.queue = self.queues.get(key)
+            self._queue_consumers[key].append(consumer)
+            if consumer.channel_name is not None:
+                consumer.channel = self.channels.get(consumer.channel_name)
+                self._channel_consumers[consumer.channel_name].append(consumer)
+            if consumer.connection_name is not None:
+                consumer.connection = self.connections.get(consumer.connection_name)
+
+        self._source_bindings: DefaultDict[EntityKey, List[VHostBinding]] = defaultdict(list)
+        self._destination_bindings: DefaultDict[
+            Tuple[str, str, str],
+            List[VHostBinding]
+        ] = defaultdict(list)
+        for binding in self.bindings:
+            self._source_bindings[(binding.vhost, binding.source)].append(binding)
+            self._destination_bindings[
+                (binding.vhost, binding.destination_type, binding.destination)
+            ].append(binding)
+
+    def consumers_of(self, queue: VHostQueue) -> List[Consumer]:
+        """The consumers of a queue.
+
+        Args:
+            queue (VHostQueue): The queue.
+
+        Returns:
+            List[Consumer]: The consumers.
+        """
+        return self._queue_consumers.get((queue.vhost, queue.name), [])
+
+    def consumers_on(self, channel: Channel) -> List[Consumer]:
+        """The consumers on a channel.
+
+        Args:
+            channel (Channel): The channel.
+
+        Returns:
+            List[Consumer]: The consumers.
+        """
+        return self._channel_consumers.get(channel.name, [])
+
+    def channels_of(self, connection: Connection) -> List[Channel]:
+        """The channels of a connection.
+
+        Args:
+            connection (Connection): The connection.
+
+        Returns:
+            List[Channel]: The channels.
+        """
+        return self._connection_channels.get(connection.name, [])
+
+    def connection_of(self, channel: Channel) -> Optional[Connection]:
+        """The connection of a channel.
+
+        Args:
+            channel (Channel): The channel.
+
+        Returns:
+            Optional[Connection]: The connection, or None if it is not in the
+                snapshot.
+        """
+        connection_details = channel.metrics.get('connection_details') or {}
+        return self.connections.get(connection_details.get('name'))
+
+    def bindings_from(self, exchange: VHostExchange) -> List[VHostBinding]:
+        """The bindings whose source is an exchange.
+
+        Args:
+            exchange (VHostExchange): The exchange.
+
+        Returns:
+            List[VHostBinding]: The bindings.
+        """
+        return self._source_bindings.get((exchange.vhost, exchange.name), [])
+
+    def bindings_to(
+            self,
+            destination: Union[VHostQueue, VHostExchange]
+    ) -> List[VHostBinding]:
+        """The bindings to a queue or exchange.
+
+        Args:
+            destination (Union[VHostQueue, VHostExchange]): The queue or
+                exchange.
+
+        Returns:
+            List[VHostBinding]: The bindings.
+        """
+        destination_type = 'queue' if isinstance(destination, VHostQueue) else 'exchange'
+        return self._destination_bindings.get(
+            (destination.vhost, destination_type, destination.name),
+            []
+        )
+
+    def __str__(self) -> str:
+        return (
+            '<ClusterSnapshot queues={queues} exchanges={exchanges} '
+            'consumers={consumers} elapsed={elapsed:.3f}>'
+        ).format(
+            queues=len(self.queues),
+            exchanges=len(self.exchanges),
+            consumers=len(self.consumers),
+            elapsed=self.elapsed
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+async def take_snapshot(
+        api: Api,
+        endpoints: Sequence[str] = SNAPSHOT_ENDPOINTS,
+        columns: Optional[Mapping[str, Sequence[str]]] = None
+) -> ClusterSnapshot:
+    """Fetch the collection endpoints concurrently and link the entities.
+
+    Every endpoint is requested at once, so the responses describe the
+    cluster at nearly the same moment. An endpoint which fails is recorded in
+    the errors of the snapshot, and its entities are missing.
+
+    Args:
+        api (Api): The api.
+        endpoints (Sequence[str], optional): The endpoints. Defaults to
+            SNAPSHOT_ENDPOINTS.
+        columns (Optional[Mapping[str, Sequence[str]]], optional): The fields
+            to fetch for the nodes, vhosts, connections, channels, queues and
+            exchanges. The identifying fields, and the connection details of
+            the channels, must be included. Defaults to None, for all fields.
+
+    Raises:
+        ValueError: If an endpoint is unknown.
+
+    Returns:
+        ClusterSnapshot: The snapshot.
+    """
+    unknown = [endpoint for endpoint in endpoints if endpoint not in _FETCHERS]
+    if unknown:
+        raise ValueError(f'Unknown endpoints: {", ".join(unknown)}')
+    columns = columns or {}
+    payloads: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    errors: Dict[str, Exception] = {}
+
+    async def fetch(endpoint: str) -> None:
+        start = time.perf_counter()
+        try:
+            payloads[endpoint] = await _FETCHERS[endpoint](api, columns.get(endpoint))
+        except Exception as error:  # pylint: disable=broad-except
+            errors[endpoint] = error
+        finally:
+            timings[endpoint] = time.perf_counter() - start
+
+    timestamp = time.time()
+    start = time.perf_counter()
+    await asyncio.gather(*(fetch(endpoint) for endpoint in endpoints))
+    elapsed = time.perf_counter() - start
+    return ClusterSnapshot(api, payloads, timings, errors, timestamp, elapsed)
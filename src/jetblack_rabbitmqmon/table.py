@@ -0,0 +1,357 @@
+"""Columnar entity tables"""
+
+from array import array
+import math
+import sys
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple
+)
+
+from .api import Api
+from .poller import get_field
+
+QUEUE_TEXT_COLUMNS: Sequence[str] = ('node', 'state', 'type')
+QUEUE_NUMBER_COLUMNS: Sequence[str] = (
+    'messages',
+    'messages_ready',
+    'messages_unacknowledged',
+    'consumers',
+    'memory',
+    'message_stats.publish_details.rate',
+    'message_stats.deliver_get_details.rate',
+    'message_stats.ack_details.rate',
+)
+
+CONNECTION_TEXT_COLUMNS: Sequence[str] = (
+    'vhost',
+    'user',
+    'node',
+    'peer_host',
+    'state',
+)
+CONNECTION_NUMBER_COLUMNS: Sequence[str] = (
+    'channels',
+    'recv_oct',
+    'send_oct',
+    'recv_oct_details.rate',
+    'send_oct_details.rate',
+)
+
+CHANNEL_TEXT_COLUMNS: Sequence[str] = (
+    'vhost',
+    'user',
+    'node',
+    'state',
+    'connection_details.name',
+)
+CHANNEL_NUMBER_COLUMNS: Sequence[str] = (
+    'number',
+    'consumer_count',
+    'messages_unacknowledged',
+    'prefetch_count',
+    'message_stats.publish_details.rate',
+    'message_stats.deliver_get_details.rate',
+    'message_stats.ack_details.rate',
+)
+
+
+class TableRow:
+    """A view of a row of a table"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'EntityTable', index: int) -> None:
+        self._table = table
+        self._index = index
+
+    @property
+    def key(self) -> Tuple[str, ...]:
+        """The values of the identifying columns."""
+        return self._table.key_at(self._index)
+
+    def __getitem__(self, column: str) -> Any:
+        return self._table.value_at(self._index, column)
+
+    def get(self, column: str, default: Any = None) -> Any:
+        """Get the value of a column.
+
+        Args:
+            column (str): The column.
+            default (Any, optional): The value returned when the column is
+                missing or has no value. Defaults to None.
+
+        Returns:
+            Any: The value.
+        """
+        try:
+            value = self[column]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Copy the row into a dictionary.
+
+        Returns:
+            Dict[str, Any]: The value of each column.
+        """
+        return {
+            column: self[column]
+            for column in self._table.column_names
+        }
+
+    def __str__(self) -> str:
+        return '<TableRow {key}>'.format(key=':'.join(self.key))
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class EntityTable:
+    """A compact, column oriented table of entities"""
+
+    KEY_COLUMNS: Sequence[str] = ('name',)
+    TEXT_COLUMNS: Sequence[str] = ()
+    NUMBER_COLUMNS: Sequence[str] = ()
+
+    def __init__(
+            self,
+            text_columns: Optional[Sequence[str]] = None,
+            number_columns: Optional[Sequence[str]] = None
+    ) -> None:
+        """A compact, column oriented table of entities.
+
+        Instead of an object and a copy of the payload for each entity, the
+        table keeps a list for each text column and an array of doubles for
+        each numeric column, holding only the selected fields. Repeated text,
+        such as vhost and node names, is interned. Missing numbers are stored
+        as NaN and read back as None.
+
+        Args:
+            text_columns (Optional[Sequence[str]], optional): The text fields
+                to keep, with nested fields separated by dots. Defaults to
+                the table's TEXT_COLUMNS.
+            number_columns (Optional[Sequence[str]], optional): The numeric
+                fields to keep. Defaults to the table's NUMBER_COLUMNS.
+        """
+        text_columns = self.TEXT_COLUMNS if text_columns is None else text_columns
+        number_columns = self.NUMBER_COLUMNS if number_columns is None else number_columns
+        self._text: Dict[str, List[Optional[str]]] = {
+            column: []
+            for column in (*self.KEY_COLUMNS, *text_columns)
+        }
+        self._numbers: Dict[str, array] = {
+            column: array('d')
+            for column in number_columns
+            if column not in self._text
+        }
+        self._index: Dict[Tuple[str, ...], int] = {}
+        self._keys: List[Tuple[str, ...]] = []
+
+    @property
+    def column_names(self) -> List[str]:
+        """The names of the columns."""
+        return [*self._text, *self._numbers]
+
+    def append(self, item: Mapping[str, Any]) -> None:
+        """Append an entity, replacing any entity with the same key.
+
+        Args:
+            item (Mapping[str, Any]): The payload of the entity.
+        """
+        key = tuple(item[column] for column in self.KEY_COLUMNS)
+        row = self._index.get(key)
+        if row is None:
+            row = len(self)
+            self._index[key] = row
+            self._keys.append(key)
+            for values in self._text.values():
+                values.append(None)
+            for numbers in self._numbers.values():
+                numbers.append(math.nan)
+        for column, values in self._text.items():
+            value = get_field(item, column)
+            values[row] = None if value is None else sys.intern(str(value))
+        for column, numbers in self._numbers.items():
+            value = get_field(item, column)
+            numbers[row] = value if isinstance(value, (int, float)) else math.nan
+
+    def extend(self, items: Iterable[Mapping[str, Any]]) -> None:
+        """Append many entities.
+
+        Args:
+            items (Iterable[Mapping[str, Any]]): The payloads of the entities.
+        """
+        for item in items:
+            self.append(item)
+
+    def key_at(self, index: int) -> Tuple[str, ...]:
+        """The key of the entity at a row."""
+        return self._keys[index]
+
+    def value_at(self, index: int, column: str) -> Any:
+        """The value of a column at a row.
+
+        Raises:
+            KeyError: If the column is not in the table.
+        """
+        values = self._text.get(column)
+        if values is not None:
+            return values[index]
+        value = self._numbers[column][index]
+        return None if math.isnan(value) else value
+
+    def column(self, column: str) -> Sequence[Any]:
+        """All the values of a column. Numeric columns are returned as an
+        array of doubles with NaN for missing values.
+
+        Args:
+            column (str): The column.
+
+        Raises:
+            KeyError: If the column is not in the table.
+
+        Returns:
+            Sequence[Any]: The values.
+        """
+        values = self._text.get(column)
+        if values is not None:
+            return values
+        return self._numbers[column]
+
+    def get(self, *key: str) -> Optional[TableRow]:
+        """Find an entity by its key.
+
+        Returns:
+            Optional[TableRow]: The row, or None if there is no such entity.
+        """
+        index = self._index.get(key)
+        return None if index is None else TableRow(self, index)
+
+    def __getitem__(self, key: Tuple[str, ...]) -> TableRow:
+        return TableRow(self, self._index[key])
+
+    def __contains__(self, key: Tuple[str, ...]) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[TableRow]:
+        for index in range(len(self)):
+            yield TableRow(self, index)
+
+    def __str__(self) -> str:
+        return '<{cls} rows={rows} columns={columns}>'.format(
+            cls=type(self).__name__,
+            rows=len(self),
+            columns=len(self._text) + len(self._numbers)
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class QueueTable(EntityTable):
+    """A compact table of queues, keyed by (vhost, name)"""
+
+    KEY_COLUMNS = ('vhost', 'name')
+    TEXT_COLUMNS = QUEUE_TEXT_COLUMNS
+    NUMBER_COLUMNS = QUEUE_NUMBER_COLUMNS
+
+    async def load(
+            self,
+            api: Api,
+            page_size: int = 500,
+            name: Optional[str] = None,
+            use_regex: bool = False
+    ) -> 'QueueTable':
+        """Fetch the queues in all vhosts a page at a time.
+
+        Args:
+            api (Api): The api.
+            page_size (int, optional): The number of queues fetched with each
+                request. Defaults to 500.
+            name (Optional[str], optional): Only include queues whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+
+        Returns:
+            QueueTable: The table.
+        """
+        async for item in api.iter_queues(page_size, name, use_regex, self.column_names):
+            self.append(item)
+        return self
+
+
+class ConnectionTable(EntityTable):
+    """A compact table of connections, keyed by name"""
+
+    TEXT_COLUMNS = CONNECTION_TEXT_COLUMNS
+    NUMBER_COLUMNS = CONNECTION_NUMBER_COLUMNS
+
+    async def load(
+            self,
+            api: Api,
+            page_size: int = 500,
+            name: Optional[str] = None,
+            use_regex: bool = False
+    ) -> 'ConnectionTable':
+        """Fetch the open connections a page at a time.
+
+        Args:
+            api (Api): The api.
+            page_size (int, optional): The number of connections fetched with
+                each request. Defaults to 500.
+            name (Optional[str], optional): Only include connections whose
+                names contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+
+        Returns:
+            ConnectionTable: The table.
+        """
+        async for item in api.iter_connections(page_size, name, use_regex, self.column_names):
+            self.append(item)
+        return self
+
+
+class ChannelTable(EntityTable):
+    """A compact table of channels, keyed by name"""
+
+    TEXT_COLUMNS = CHANNEL_TEXT_COLUMNS
+    NUMBER_COLUMNS = CHANNEL_NUMBER_COLUMNS
+
+    async def load(
+            self,
+            api: Api,
+            page_size: int = 500,
+            name: Optional[str] = None,
+            use_regex: bool = False
+    ) -> 'ChannelTable':
+        """Fetch the open channels a page at a time.
+
+        Args:
+            api (Api): The api.
+            page_size (int, optional): The number of channels fetched with
+                each request. Defaults to 500.
+            name (Optional[str], optional): Only include channels whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+
+        Returns:
+            ChannelTable: The table.
+        """
+        async for item in api.iter_channels(page_size, name, use_regex, self.column_names):
+            self.append(item)
+        return self
@@ -0,0 +1,672 @@
+"""Topology"""
+
+import asyncio
+import json
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .api import Api
+
+
+def _queue_arguments(arguments: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    # Classic is the default queue type, whether or not it is declared.
+    result = dict(arguments or {})
+    if result.get('x-queue-type') == 'classic':
+        del result['x-queue-type']
+    return result
+
+
+def _is_builtin_exchange(name: str) -> bool:
+    return name == '' or name.startswith('amq.')
+
+
+class ExchangeSpec:
+    """A desired exchange"""
+
+    def __init__(
+            self,
+            name: str,
+            exchange_type: str = 'direct',
+            durable: bool = True,
+            auto_delete: bool = False,
+            internal: bool = False,
+            arguments: Optional[Mapping[str, Any]] = None
+    ) -> None:
+        """A desired exchange.
+
+        Args:
+            name (str): The name of the exchange.
+            exchange_type (str, optional): The exchange type. Defaults to
+                'direct'.
+            durable (bool, optional): If true the exchange survives a restart.
+                Defaults to True.
+            auto_delete (bool, optional): If true the exchange is deleted when
+                it is no longer used. Defaults to False.
+            internal (bool, optional): If true clients cannot publish to the
+                exchange. Defaults to False.
+            arguments (Optional[Mapping[str, Any]], optional): Additional
+                arguments. Defaults to None.
+        """
+        self.name = name
+        self.exchange_type = exchange_type
+        self.durable = durable
+        self.auto_delete = auto_delete
+        self.internal = internal
+        self.arguments = dict(arguments or {})
+
+    def properties(self) -> Mapping[str, Any]:
+        """The properties compared with the current exchange."""
+        return {
+            'type': self.exchange_type,
+            'durable': self.durable,
+            'auto_delete': self.auto_delete,
+            'internal': self.internal,
+            'arguments': self.arguments,
+        }
+
+    def __str__(self) -> str:
+        return f'exchange {self.name} ({self.exchange_type})'
+
+    def __repr__(self) -> str:
+        return f'<ExchangeSpec {self.name}>'
+
+
+class QueueSpec:
+    """A desired queue"""
+
+    def __init__(
+            self,
+            name: str,
+            durable: bool = True,
+            auto_delete: bool = False,
+            arguments: Optional[Mapping[str, Any]] = None
+    ) -> None:
+        """A desired queue.
+
+        Args:
+            name (str): The name of the queue.
+            durable (bool, optional): If true the queue survives a restart.
+                Defaults to True.
+            auto_delete (bool, optional): If true the queue is deleted when its
+                last consumer unsubscribes. Defaults to False.
+            arguments (Optional[Mapping[str, Any]], optional): Additional
+                arguments, e.g. {'x-queue-type': 'quorum'}. Defaults to None.
+        """
+        self.name = name
+        self.durable = durable
+        self.auto_delete = auto_delete
+        self.arguments = dict(arguments or {})
+
+    def properties(self) -> Mapping[str, Any]:
+        """The properties compared with the current queue."""
+        return {
+            'durable': self.durable,
+            'auto_delete': self.auto_delete,
+            'arguments': _queue_arguments(self.arguments),
+        }
+
+    def __str__(self) -> str:
+        return f'queue {self.name}'
+
+    def __repr__(self) -> str:
+        return f'<QueueSpec {self.name}>'
+
+
+class BindingSpec:
+    """A desired binding"""
+
+    def __init__(
+            self,
+            source: str,
+            destination: str,
+            destination_type: str = 'queue',
+            routing_key: str = '',
+            arguments: Optional[Mapping[str, Any]] = None
+    ) -> None:
+        """A desired binding.
+
+        Args:
+            source (str): The name of the source exchange.
+            destination (str): The name of the destination queue or exchange.
+            destination_type (str, optional): Either 'queue' or 'exchange'.
+                Defaults to 'queue'.
+            routing_key (str, optional): The routing key. Defaults to ''.
+            arguments (Optional[Mapping[str, Any]], optional): Binding
+                arguments. Defaults to None.
+        """
+        if destination_type not in ('queue', 'exchange'):
+            raise ValueError(f'Invalid destination type "{destination_type}"')
+        self.source = source
+        self.destination = destination
+        self.destination_type = destination_type
+        self.routing_key = routing_key
+        self.arguments = dict(arguments or {})
+
+    @property
+    def key(self) -> Tuple[str, str, str, str, str]:
+        """The identity of the binding. Bindings have no other properties, so
+        they are only ever created or deleted."""
+        return (
+            self.source,
+            self.destination_type,
+            self.destination,
+            self.routing_key,
+            json.dumps(self.arguments, sort_keys=True)
+        )
+
+    def __str__(self) -> str:
+        return 'binding {source} -> {kind} {destination} [{routing_key}]'.format(
+            source=self.source,
+            kind=self.destination_type,
+            destination=self.destination,
+            routing_key=self.routing_key
+        )
+
+    def __repr__(self) -> str:
+        return f'<BindingSpec {self.source}->{self.destination}>'
+
+
+class PolicySpec:
+    """A desired policy"""
+
+    def __init__(
+            self,
+            name: str,
+            pattern: str,
+            definition: Mapping[str, Any],
+            priority: int = 0,
+            apply_to: str = 'all'
+    ) -> None:
+        """A desired policy.
+
+        Args:
+            name (str): The name of the policy.
+            pattern (str): The regular expression matching the names of the
+                queues or exchanges to which the policy applies.
+            definition (Mapping[str, Any]): The policy keys and values.
+            priority (int, optional): The priority. Defaults to 0.
+            apply_to (str, optional): One of 'queues', 'exchanges' or 'all'.
+                Defaults to 'all'.
+        """
+        self.name = name
+        self.pattern = pattern
+        self.definition = dict(definition)
+        self.priority = priority
+        self.apply_to = apply_to
+
+    def properties(self) -> Mapping[str, Any]:
+        """The properties compared with the current policy."""
+        return {
+            'pattern': self.pattern,
+            'definition': self.definition,
+            'priority': self.priority,
+            'apply-to': self.apply_to,
+        }
+
+    def __str__(self) -> str:
+        return f'policy {self.name} ({self.pattern})'
+
+    def __repr__(self) -> str:
+        return f'<PolicySpec {self.name}>'
+
+
+class TopologyChange:
+    """A change in a topology plan"""
+
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    CONFLICT = 'conflict'
+
+    _SYMBOLS = {CREATE: '+', UPDATE: '~', DELETE: '-', CONFLICT: '!'}
+
+    def __init__(
+            self,
+            action: str,
+            spec: Any,
+            current: Optional[Mapping[str, Any]] = None
+    ) -> None:
+        """A change in a topology plan.
+
+        A conflict is an exchange or queue which exists with different
+        properties. These cannot be changed in place, so conflicts are
+        reported but not applied.
+
+        Args:
+            action (str): One of 'create', 'update', 'delete' or 'conflict'.
+            spec (Any): The desired exchange, queue, binding or policy. For a
+                deletion this describes the existing object.
+            current (Optional[Mapping[str, Any]], optional): The current
+                definition, if any. Defaults to None.
+        """
+        self.action = action
+        self.spec = spec
+        self.current = current
+
+    def __str__(self) -> str:
+        return f'{self._SYMBOLS[self.action]} {self.spec}'
+
+    def __repr__(self) -> str:
+        return f'<TopologyChange {self.action} {self.spec!r}>'
+
+
+class TopologyResult:
+    """The outcome of applying a plan"""
+
+    def __init__(self) -> None:
+        """The outcome of applying a plan.
+
+        Attributes:
+            applied (List[TopologyChange]): The changes which were applied.
+            failed (List[Tuple[TopologyChange, Exception]]): The changes which
+                failed, with the exception raised.
+        """
+        self.applied: List[TopologyChange] = []
+        self.failed: List[Tuple[TopologyChange, Exception]] = []
+
+    def __str__(self) -> str:
+        return '<TopologyResult applied={applied} failed={failed}>'.format(
+            applied=len(self.applied),
+            failed=len(self.failed)
+        )
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+async def _delete_binding(api: Api, vhost: str, spec: BindingSpec) -> None:
+    # Bindings are deleted by their properties key, which the definitions do
+    # not include, so it is found from the bindings between the pair.
+    if spec.destination_type == 'queue':
+        bindings = await api.get_vhost_exchange_queue_bindings(
+            vhost,
+            spec.source,
+            spec.destination
+        )
+    else:
+        bindings = await api.get_vhost_exchange_exchange_binding(
+            vhost,
+            spec.source,
+            spec.destination
+        )
+    for binding in bindings:
+        if (
+                binding['routing_key'] == spec.routing_key
+                and (binding.get('arguments') or {}) == spec.arguments
+        ):
+            if spec.destination_type == 'queue':
+                await api.delete_vhost_exchange_queue_binding_props(
+                    vhost,
+                    spec.source,
+                    spec.destination,
+                    binding['properties_key']
+                )
+            else:
+                await api.delete_vhost_exchange_exchange_binding_props(
+                    vhost,
+                    spec.source,
+                    spec.destination,
+                    binding['properties_key']
+                )
+
+
+async def _apply_change(api: Api, vhost: str, change: TopologyChange) -> None:
+    spec = change.spec
+    deleting = change.action == TopologyChange.DELETE
+    if isinstance(spec, ExchangeSpec):
+        if deleting:
+            await api.delete_vhost_exchange(vhost, spec.name, True)
+        else:
+            await api.create_vhost_exchange(
+                vhost,
+                spec.name,
+                spec.exchange_type,
+                spec.durable,
+                spec.auto_delete,
+                spec.internal,
+                spec.arguments
+            )
+    elif isinstance(spec, QueueSpec):
+        if deleting:
+            await api.delete_vhost_queue(vhost, spec.name, True, True)
+        else:
+            await api.create_vhost_queue(
+                vhost,
+                spec.name,
+                spec.durable,
+                spec.auto_delete,
+                spec.arguments
+            )
+    elif isinstance(spec, BindingSpec):
+        if deleting:
+            await _delete_binding(api, vhost, spec)
+        elif spec.destination_type == 'queue':
+            await api.create_vhost_exchange_queue_binding(
+                vhost,
+                spec.source,
+                spec.destination,
+                spec.routing_key,
+                spec.arguments
+            )
+        else:
+            await api.create_vhost_exchange_exchange_binding(
+                vhost,
+                spec.source,
+                spec.destination,
+                spec.routing_key,
+                spec.arguments
+            )
+    elif isinstance(spec, PolicySpec):
+        if deleting:
+            await api.delete_vhost_policy(vhost, spec.name)
+        else:
+            await api.create_vhost_policy(
+                vhost,
+                spec.name,
+                spec.pattern,
+                spec.definition,
+                spec.priority,
+                spec.apply_to
+            )
+
+
+class TopologyPlan:
+    """The changes which bring a vhost to a desired topology"""
+
+    def __init__(self, vhost: str, changes: List[TopologyChange]) -> None:
+        """The changes which bring a vhost to a desired topology.
+
+        Args:
+            vhost (str): The name of the virtual host.
+            changes (List[TopologyChange]): The changes.
+        """
+        self.vhost = vhost
+        self.changes = changes
+
+    @property
+    def conflicts(self) -> List[TopologyChange]:
+        """The changes which cannot be applied."""
+        return [
+            change
+            for change in self.changes
+            if change.action == TopologyChange.CONFLICT
+        ]
+
+    def _stages(self) -> List[List[TopologyChange]]:
+        # Old bindings go first, and new bindings last, once the exchanges and
+        # queues they refer to exist.
+        old_bindings: List[TopologyChange] = []
+        entities: List[TopologyChange] = []
+        new_bindings: List[TopologyChange] = []
+        for change in self.changes:
+            if change.action == TopologyChange.CONFLICT:
+                continue
+            if not isinstance(change.spec, BindingSpec):
+                entities.append(change)
+            elif change.action == TopologyChange.DELETE:
+                old_bindings.append(change)
+            else:
+                new_bindings.append(change)
+        return [old_bindings, entities, new_bindings]
+
+    async def apply(self, api: Api, concurrency: int = 10) -> TopologyResult:
+        """Apply the changes, except conflicts, with bounded concurrency.
+
+        Nothing is fetched after it is created. A failed change does not stop
+        the others.
+
+        Args:
+            api (Api): The api.
+            concurrency (int, optional): The maximum number of requests in
+                flight. Defaults to 10.
+
+        Returns:
+            TopologyResult: The changes which were applied and which failed.
+        """
+        result = TopologyResult()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def apply_change(change: TopologyChange) -> None:
+            async with semaphore:
+                try:
+                    await _apply_change(api, self.vhost, change)
+                except Exception as error:  # pylint: disable=broad-except
+                    result.failed.append((change, error))
+                else:
+                    result.applied.append(change)
+
+        for stage in self._stages():
+            await asyncio.gather(*(apply_change(change) for change in stage))
+        return result
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def __str__(self) -> str:
+        if not self.changes:
+            return f'{self.vhost}: no changes'
+        return '\n'.join([
+            f'{self.vhost}:',
+            *(f'  {change}' for change in self.changes)
+        ])
+
+    def __repr__(self) -> str:
+        return f'<TopologyPlan {self.vhost} changes={len(self.changes)}>'
+
+
+class Topology:
+    """The desired exchanges, queues, bindings and policies of a vhost"""
+
+    def __init__(
+            self,
+            vhost: str,
+            exchanges: Iterable[ExchangeSpec] = (),
+            queues: Iterable[QueueSpec] = (),
+            bindings: Iterable[BindingSpec] = (),
+            policies: Iterable[PolicySpec] = ()
+    ) -> None:
+        """The desired exchanges, queues, bindings and policies of a vhost.
+
+        Args:
+            vhost (str): The name of the virtual host.
+            exchanges (Iterable[ExchangeSpec], optional): The exchanges.
+                Defaults to ().
+            queues (Iterable[QueueSpec], optional): The queues. Defaults to ().
+            bindings (Iterable[BindingSpec], optional): The bindings. Defaults
+                to ().
+            policies (Iterable[PolicySpec], optional): The policies. Defaults
+                to ().
+        """
+        self.vhost = vhost
+        self.exchanges: Dict[str, ExchangeSpec] = {}
+        self.queues: Dict[str, QueueSpec] = {}
+        self.bindings: Dict[Tuple[str, str, str, str, str], BindingSpec] = {}
+        self.policies: Dict[str, PolicySpec] = {}
+        for exchange in exchanges:
+            self.exchanges[exchange.name] = exchange
+        for queue in queues:
+            self.queues[queue.name] = queue
+        for binding in bindings:
+            self.bindings[binding.key] = binding
+        for policy in policies:
+            self.policies[policy.name] = policy
+
+    def exchange(self, name: str, exchange_type: str = 'direct', **kwargs: Any) -> 'Topology':
+        """Add an exchange. The keyword arguments are those of ExchangeSpec.
+
+        Returns:
+            Topology: The topology, so calls can be chained.
+        """
+        self.exchanges[name] = ExchangeSpec(name, exchange_type, **kwargs)
+        return self
+
+    def queue(self, name: str, **kwargs: Any) -> 'Topology':
+        """Add a queue. The keyword arguments are those of QueueSpec.
+
+        Returns:
+            Topology: The topology, so calls can be chained.
+        """
+        self.queues[name] = QueueSpec(name, **kwargs)
+        return self
+
+    def bind(self, source: str, destination: str, **kwargs: Any) -> 'Topology':
+        """Add a binding. The keyword arguments are those of BindingSpec.
+
+        Returns:
+            Topology: The topology, so calls can be chained.
+        """
+        binding = BindingSpec(source, destination, **kwargs)
+        self.bindings[binding.key] = binding
+        return self
+
+    def policy(
+            self,
+            name: str,
+            pattern: str,
+            definition: Mapping[str, Any],
+            **kwargs: Any
+    ) -> 'Topology':
+        """Add a policy. The keyword arguments are those of PolicySpec.
+
+        Returns:
+            Topology: The topology, so calls can be chained.
+        """
+        self.policies[name] = PolicySpec(name, pattern, definition, **kwargs)
+        return self
+
+    def diff(
+            self,
+            definitions: Mapping[str, Any],
+            prune: bool = False
+    ) -> TopologyPlan:
+        """Compare the topology with the definitions of the vhost.
+
+        Args:
+            definitions (Mapping[str, Any]): The vhost definitions.
+            prune (bool, optional): If true delete the exchanges, queues,
+                bindings and policies which are not in the topology. Built in
+                exchanges are never deleted. Defaults to False.
+
+        Returns:
+            TopologyPlan: The plan.
+        """
+        changes: List[TopologyChange] = []
+
+        current_exchanges = {
+            item['name']: item
+            for item in definitions.get('exchanges', [])
+            if not _is_builtin_exchange(item['name'])
+        }
+        for name, exchange in self.exchanges.items():
+            current = current_exchanges.get(name)
+            if current is None:
+                changes.append(TopologyChange(TopologyChange.CREATE, exchange))
+            elif any(
+                    (current.get(key) or {}) != value if key == 'arguments'
+                    else current.get(key) != value
+                    for key, value in exchange.properties().items()
+            ):
+                changes.append(TopologyChange(TopologyChange.CONFLICT, exchange, current))
+
+        current_queues = {
+            item['name']: item
+            for item in definitions.get('queues', [])
+        }
+        for name, queue in self.queues.items():
+            current = current_queues.get(name)
+            if current is None:
+                changes.append(TopologyChange(TopologyChange.CREATE, queue))
+            elif (
+                    current.get('durable') != queue.durable
+                    or current.get('auto_delete') != queue.auto_delete
+                    or _queue_arguments(current.get('arguments')) != queue.properties()['arguments']
+            ):
+                changes.append(TopologyChange(TopologyChange.CONFLICT, queue, current))
+
+        current_policies = {
+            item['name']: item
+            for item in definitions.get('policies', [])
+        }
+        for name, policy in self.policies.items():
+            current = current_policies.get(name)
+            if current is None:
+                changes.append(TopologyChange(TopologyChange.CREATE, policy))
+            elif any(
+                    current.get(key) != value
+                    for key, value in policy.properties().items()
+            ):
+                changes.append(TopologyChange(TopologyChange.UPDATE, policy, current))
+
+        current_bindings: Dict[Tuple[str, str, str, str, str], Mapping[str, Any]] = {}
+        for item in definitions.get('bindings', []):
+            binding = BindingSpec(
+                item['source'],
+                item['destination'],
+                item['destination_type'],
+                item.get('routing_key', ''),
+                item.get('arguments')
+            )
+            current_bindings[binding.key] = item
+            if prune and binding.key not in self.bindings:
+                changes.append(TopologyChange(TopologyChange.DELETE, binding, item))
+        for key, binding in self.bindings.items():
+            if key not in current_bindings:
+                changes.append(TopologyChange(TopologyChange.CREATE, binding))
+
+        if prune:
+            for name, item in current_exchanges.items():
+                if name not in self.exchanges:
+                    changes.append(TopologyChange(
+                        TopologyChange.DELETE,
+                        ExchangeSpec(
+                            name,
+                            item.get('type', 'direct'),
+                            item.get('durable', True),
+                            item.get('auto_delete', False),
+                            item.get('internal', False),
+                            item.get('arguments')
+                        ),
+                        item
+                    ))
+            for name, item in current_queues.items():
+                if name not in self.queues:
+                    changes.append(TopologyChange(
+                        TopologyChange.DELETE,
+                        QueueSpec(
+                            name,
+                            item.get('durable', True),
+                            item.get('auto_delete', False),
+                            item.get('arguments')
+                        ),
+                        item
+                    ))
+            for name, item in current_policies.items():
+                if name not in self.policies:
+                    changes.append(TopologyChange(
+                        TopologyChange.DELETE,
+                        PolicySpec(
+                            name,
+                            item.get('pattern', ''),
+                            item.get('definition') or {},
+                            item.get('priority', 0),
+                            item.get('apply-to', 'all')
+                        ),
+                        item
+                    ))
+
+        return TopologyPlan(self.vhost, changes)
+
+    async def plan(self, api: Api, prune: bool = False) -> TopologyPlan:
+        """Plan the changes which bring the vhost to the topology, using a
+        single request for the current definitions.
+
+        Args:
+            api (Api): The api.
+            prune (bool, optional): If true delete the exchanges, queues,
+                bindings and policies which are not in the topology. Defaults
+                to False.
+
+        Returns:
+            TopologyPlan: The plan.
+        """
+        definitions = await api.get_vhost_definitions(self.vhost)
+        return self.diff(definitions, prune)
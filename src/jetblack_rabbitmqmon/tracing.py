@@ -0,0 +1,220 @@
+"""OpenTelemetry tracing"""
+
+from collections.abc import (
+    AsyncGenerator as AbstractAsyncGenerator,
+    AsyncIterator as AbstractAsyncIterator
+)
+import functools
+import inspect
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, get_origin
+
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode, Tracer, TracerProvider
+
+from .api import Api
+from .instrumentation import Instrumentation, RequestInfo
+
+_TRACER_NAME = 'jetblack_rabbitmqmon'
+
+# The span attributes of the arguments of the api methods.
+_ARGUMENT_ATTRIBUTES = {
+    'vhost': 'rabbitmq.vhost',
+    'queue': 'rabbitmq.queue',
+    'exchange': 'rabbitmq.exchange',
+    'source': 'rabbitmq.source',
+    'destination': 'rabbitmq.destination',
+    'routing_key': 'rabbitmq.routing_key',
+}
+# The entity named by a 'name' argument, found from the name of the method.
+_NAME_ENTITIES = (
+    'queue',
+    'exchange',
+    'policy',
+    'connection',
+    'channel',
+    'node',
+    'user',
+    'cluster',
+    'vhost',
+)
+# Methods which make no requests of their own.
+_UNTRACED = frozenset(('aclose',))
+
+
+def _get_tracer(tracer_provider: Optional[TracerProvider]) -> Tracer:
+    return trace.get_tracer(_TRACER_NAME, tracer_provider=tracer_provider)
+
+
+def _argument_attributes(name: str, method: Callable[..., Any]) -> List[Tuple[str, str]]:
+    # The (argument, attribute) of each argument recorded on the span.
+    words = name.split('_')
+    entity = next((entity for entity in _NAME_ENTITIES if entity in words), None)
+    attributes = []
+    for parameter in inspect.signature(method).parameters:
+        if parameter in _ARGUMENT_ATTRIBUTES:
+            attributes.append((parameter, _ARGUMENT_ATTRIBUTES[parameter]))
+        elif parameter == 'name' and entity is not None:
+            attributes.append((parameter, f'rabbitmq.{entity}'))
+    return attributes
+
+
+def _returns_iterator(method: Callable[..., Any]) -> bool:
+    if inspect.isasyncgenfunction(method):
+        return True
+    annotation = inspect.signature(method).return_annotation
+    return get_origin(annotation) in (AbstractAsyncIterator, AbstractAsyncGenerator)
+
+
+def _wrap(tracer: Tracer, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    span_name = f'Api.{name}'
+    signature = inspect.signature(method)
+    argument_attributes = _argument_attributes(name, method)
+
+    def attributes_of(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        attributes: Dict[str, Any] = {'rabbitmq.operation': name}
+        if argument_attributes:
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            for argument, attribute in argument_attributes:
+                value = arguments.get(argument)
+                if isinstance(value, str):
+                    attributes[attribute] = value
+        return attributes
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def traced(*args: Any, **kwargs: Any) -> Any:
+            with tracer.start_as_current_span(
+                    span_name,
+                    kind=SpanKind.INTERNAL,
+                    attributes=attributes_of(args, kwargs)
+            ):
+                return await method(*args, **kwargs)
+        return traced
+
+    @functools.wraps(method)
+    async def traced_iterator(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        # The span is only made current while the next item is fetched, as
+        # the context cannot be held across the yields of a generator.
+        span = tracer.start_span(
+            span_name,
+            kind=SpanKind.INTERNAL,
+            attributes=attributes_of(args, kwargs)
+        )
+        iterator: Optional[AsyncIterator[Any]] = None
+        count = 0
+        try:
+            with trace.use_span(span):  # pylint: disable=not-context-manager
+                iterator = method(*args, **kwargs)
+            while True:
+                with trace.use_span(span):  # pylint: disable=not-context-manager
+                    try:
+                        item = await anext(iterator)
+                    except StopAsyncIteration:
+                        break
+                count += 1
+                yield item
+        finally:
+            try:
+                aclose = getattr(iterator, 'aclose', None)
+                if aclose is not None:
+                    await aclose()
+            finally:
+                span.set_attribute('rabbitmq.items', count)
+                span.end()
+    return traced_iterator
+
+
+def trace_api(api: Api, tracer_provider: Optional[TracerProvider] = None) -> Api:
+    """Trace the methods of an api.
+
+    Each call of a public method of the api, and so of the monitor and the
+    objects it returns, is made in a span named after the method, such as
+    'Api.get_vhost_queue', with the virtual host, queue, exchange and other
+    names as attributes. The iterating methods are traced with a span which
+    lasts until the iteration ends.
+
+    The span is the current span while the requester is called, so the spans
+    of a `TracingInstrumentation` given to the requester are its children.
+
+    The methods are wrapped on the instance, so an api which is not traced
+    has no overhead.
+
+    Args:
+        api (Api): The api.
+        tracer_provider (Optional[TracerProvider], optional): The tracer
+            provider. Defaults to None, for the global tracer provider.
+
+    Returns:
+        Api: The api, which is traced.
+    """
+    tracer = _get_tracer(tracer_provider)
+    for name, method in inspect.getmembers(api, inspect.ismethod):
+        if name.startswith('_') or name in _UNTRACED or hasattr(method, '__wrapped__'):
+            continue
+        if inspect.iscoroutinefunction(method) or _returns_iterator(method):
+            setattr(api, name, _wrap(tracer, name, method))
+    return api
+
+
+class TracingInstrumentation(Instrumentation):
+    """Records a client span for each HTTP request"""
+
+    def __init__(self, tracer_provider: Optional[TracerProvider] = None) -> None:
+        """Records a client span for each HTTP request made by a requester,
+        following the OpenTelemetry HTTP conventions.
+
+        The spans are children of the current span, such as the span of the
+        api method when the api is traced with `trace_api`. A request which
+        is retried has a span for each attempt.
+
+        Args:
+            tracer_provider (Optional[TracerProvider], optional): The tracer
+                provider. Defaults to None, for the global tracer provider.
+        """
+        self._tracer = _get_tracer(tracer_provider)
+
+    def on_request_start(self, info: RequestInfo) -> None:
+        attributes: Dict[str, Any] = {
+            'http.request.method': info.method,
+            'url.template': info.template,
+        }
+        if info.attempt > 1:
+            attributes['http.request.resend_count'] = info.attempt - 1
+        info.span = self._tracer.start_span(
+            f'{info.method} {info.template}',
+            kind=SpanKind.CLIENT,
+            attributes=attributes
+        )
+
+    def _end(
+            self,
+            info: RequestInfo,
+            error: Optional[Exception] = None,
+            cancelled: bool = False
+    ) -> None:
+        span: Optional[trace.Span] = info.span
+        if span is None:
+            # The request was started before the instrumentation was added.
+            return
+        info.span = None
+        if info.status is not None:
+            span.set_attribute('http.response.status_code', info.status)
+        if info.bytes is not None:
+            span.set_attribute('http.response.body.size', info.bytes)
+        if error is not None:
+            span.record_exception(error)
+            span.set_attribute('error.type', type(error).__qualname__)
+            span.set_status(Status(StatusCode.ERROR, str(error)))
+        elif cancelled:
+            span.set_attribute('error.type', 'cancelled')
+            span.set_status(Status(StatusCode.ERROR, 'The request was cancelled'))
+        span.end()
+
+    def on_request_end(self, info: RequestInfo) -> None:
+        self._end(info)
+
+    def on_error(self, info: RequestInfo, error: Exception) -> None:
+        self._end(info, error=error)
+
+    def on_cancel(self, info: RequestInfo) -> None:
+        self._end(info, cancelled=True)
@@ -2,16 +2,19 @@
 
 from __future__ import annotations
 
-from typing import Any, Mapping, Optional
+from typing import Any, AsyncIterator, Mapping, Optional, Sequence
 
 from .api import Api
+from .history import MetricsHistory, TrackedMixin, VHOST_SERIES
 from .vhost_exchange import VHostExchange
 from .vhost_queue import VHostQueue
 
 
-class VHost:
+class VHost(TrackedMixin):
     """A RabbitMQ VHost"""
 
+    SERIES = VHOST_SERIES
+
     def __init__(self, api: Api, **kwargs):
         """A RabbitMQ VHost.
 
@@ -23,11 +26,13 @@ class VHost:
             metrics (Mapping[str, Any]): The metrics
         """
         self._api = api
+        self.history: Optional[MetricsHistory] = None
         self._init(**kwargs)
 
     def _init(self, name: str, **metrics) -> VHost:
         self.name = name
         self.metrics: Mapping[str, Any] = metrics
+        self._record(metrics)
         return self
 
     async def refresh(self) -> VHost:
@@ -39,32 +44,124 @@ class VHost:
         response = await self._api.get_vhost(self.name)
         return self._init(**response)
 
-    async def exchanges(self) -> Mapping[str, VHostExchange]:
+    async def exchanges(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> Mapping[str, VHostExchange]:
         """Get the VHost exchanges
 
+        Args:
+            columns (Optional[Sequence[str]], optional): The fields to
+                return, with nested fields separated by dots. The identifying
+                fields are always returned. Defaults to None, which returns all
+                fields.
+
         Returns:
             Mapping[str, VHostExchange]: A list of exchanges.
         """
-        response = await self._api.get_vhost_exchanges(self.name)
+        response = await self._api.get_vhost_exchanges(
+            self.name,
+            ['vhost', 'name', *columns] if columns else None
+        )
         return {
             item['name']: VHostExchange(self._api, **item)
             for item in response
             if item['name']
         }
 
-    async def queues(self) -> Mapping[str, VHostQueue]:
+    async def queues(
+            self,
+            columns: Optional[Sequence[str]] = None
+    ) -> Mapping[str, VHostQueue]:
         """Get the queues
 
+        Args:
+            columns (Optional[Sequence[str]], optional): The fields to
+                return, with nested fields separated by dots. The identifying
+                fields are always returned. Defaults to None, which returns all
+                fields.
+
         Returns:
             Mapping[str, VHostQueue]: A list of queues.
         """
-        response = await self._api.get_vhost_queues(self.name)
+        response = await self._api.get_vhost_queues(
+            self.name,
+            ['vhost', 'name', *columns] if columns else None
+        )
         return {
             item['name']: VHostQueue(self._api, **item)
             for item in response
             if item['name']
         }
 
+    async def iter_exchanges(
+            self,
+            page_size: int = 100,
+            name: Optional[str] = None,
+            use_regex: bool = False,
+            columns: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[VHostExchange]:
+        """Iterate over the VHost exchanges a page at a time.
+
+        Args:
+            page_size (int, optional): The number of exchanges fetched with
+                each request. Defaults to 100.
+            name (Optional[str], optional): Only include exchanges whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Optional[Sequence[str]], optional): The fields to
+                return, with nested fields separated by dots. The identifying
+                fields are always returned. Defaults to None, which returns all
+                fields.
+
+        Yields:
+            VHostExchange: The exchanges.
+        """
+        async for item in self._api.iter_vhost_exchanges(
+                self.name,
+                page_size,
+                name,
+                use_regex,
+                ['vhost', 'name', *columns] if columns else None
+        ):
+            if item['name']:
+                yield VHostExchange(self._api, **item)
+
+    async def iter_queues(
+            self,
+            page_size: int = 100,
+            name: Optional[str] = None,
+            use_regex: bool = False,
+            columns: Optional[Sequence[str]] = None
+    ) -> AsyncIterator[VHostQueue]:
+        """Iterate over the queues a page at a time.
+
+        Args:
+            page_size (int, optional): The number of queues fetched with each
+                request. Defaults to 100.
+            name (Optional[str], optional): Only include queues whose names
+                contain this value. Defaults to None.
+            use_regex (bool, optional): If true the name is treated as a
+                regular expression. Defaults to False.
+            columns (Optional[Sequence[str]], optional): The fields to
+                return, with nested fields separated by dots. The identifying
+                fields are always returned. Defaults to None, which returns all
+                fields.
+
+        Yields:
+            VHostQueue: The queues.
+        """
+        async for item in self._api.iter_vhost_queues(
+                self.name,
+                page_size,
+                name,
+                use_regex,
+                ['vhost', 'name', *columns] if columns else None
+        ):
+            if item['name']:
+                yield VHostQueue(self._api, **item)
+
     async def create_exchange(
             self,
             name: str,
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Any, List, Mapping
+from typing import Any, AsyncIterable, Iterable, List, Mapping, Optional, Union
 
 from .api import Api
+from .publish import OutgoingMessage, PublishResult, ResultCallback, publish_many
 from .vhost_binding import VHostBinding
 
 
@@ -18,6 +19,9 @@ class VHostExchange:
     ):
         """A RabbitMQ exchange
 
+        Attributes which are missing from a partial payload, for example when
+        columns have been selected, are None.
+
         Args:
             api (Api): The API
 
@@ -36,11 +40,11 @@ class VHostExchange:
             self,
             vhost: str,
             name: str,
-            type: str,  # pylint: disable=redefined-builtin
-            durable: bool,
-            auto_delete: bool,
-            internal: bool,
-            arguments: Mapping[str, Any],
+            type: Optional[str] = None,  # pylint: disable=redefined-builtin
+            durable: Optional[bool] = None,
+            auto_delete: Optional[bool] = None,
+            internal: Optional[bool] = None,
+            arguments: Optional[Mapping[str, Any]] = None,
             **metrics
     ) -> VHostExchange:
         self.vhost = vhost
@@ -77,6 +81,70 @@ class VHostExchange:
             for item in response
         ]
 
+    async def publish(
+            self,
+            routing_key: str,
+            payload: str,
+            properties: Optional[Mapping[str, Any]] = None,
+            payload_encoding: str = 'string'
+    ) -> bool:
+        """Publish a message to the exchange.
+
+        Args:
+            routing_key (str): The routing key.
+            payload (str): The payload.
+            properties (Optional[Mapping[str, Any]], optional): The message
+                properties. Defaults to None.
+            payload_encoding (str, optional): Either 'string' or 'base64'.
+                Defaults to 'string'.
+
+        Returns:
+            bool: True if the message was routed to at least one queue.
+        """
+        response = await self._api.publish_message(
+            self.vhost,
+            self.name,
+            properties or {},
+            routing_key,
+            payload,
+            payload_encoding
+        )
+        return bool(response.get('routed'))
+
+    async def publish_many(
+            self,
+            messages: Union[Iterable[OutgoingMessage], AsyncIterable[OutgoingMessage]],
+            concurrency: int = 32,
+            max_pending: Optional[int] = None,
+            on_result: Optional[ResultCallback] = None
+    ) -> PublishResult:
+        """Publish many messages concurrently, keeping the order of messages
+        with the same routing key.
+
+        Args:
+            messages (Union[Iterable[OutgoingMessage], AsyncIterable[OutgoingMessage]]):
+                The messages, which are read as they are needed.
+            concurrency (int, optional): The maximum number of requests in
+                flight. Defaults to 32.
+            max_pending (Optional[int], optional): The maximum number of
+                messages queued or in flight. Defaults to None, for four times
+                the concurrency.
+            on_result (Optional[ResultCallback], optional): Called as each
+                message completes. Defaults to None.
+
+        Returns:
+            PublishResult: The counts, failures and timings.
+        """
+        return await publish_many(
+            self._api,
+            self.vhost,
+            self.name,
+            messages,
+            concurrency,
+            max_pending,
+            on_result
+        )
+
     async def delete(self, if_unused: bool = True) -> None:
         """Delete the exchange.
 
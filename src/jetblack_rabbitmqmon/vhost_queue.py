@@ -2,19 +2,26 @@
 
 from __future__ import annotations
 
-from typing import Any, List, Mapping, Optional
+from contextlib import aclosing
+from typing import Any, AsyncIterator, List, Mapping, Optional
 
 from .api import Api
+from .history import MetricsHistory, TrackedMixin, QUEUE_SERIES
 from .vhost_binding import VHostBinding
 from .message import Message
 
 
-class VHostQueue:
+class VHostQueue(TrackedMixin):
     """A RabbitMQ VHost queue"""
 
+    SERIES = QUEUE_SERIES
+
     def __init__(self, api: Api, **kwargs):
         """A RabbitMQ VHost queue
 
+        Attributes which are missing from a partial payload, for example when
+        columns have been selected, are None.
+
         Args:
             api (Api): The API
 
@@ -27,16 +34,17 @@ class VHostQueue:
             node (str): The node name
         """
         self._api = api
+        self.history: Optional[MetricsHistory] = None
         self._init(**kwargs)
 
     def _init(
             self,
             vhost: str,
             name: str,
-            durable: bool,
-            auto_delete: bool,
-            arguments: Mapping[str, Any],
-            node: str,
+            durable: Optional[bool] = None,
+            auto_delete: Optional[bool] = None,
+            arguments: Optional[Mapping[str, Any]] = None,
+            node: Optional[str] = None,
             **metrics
     ) -> VHostQueue:
         self.vhost = vhost
@@ -46,6 +54,7 @@ class VHostQueue:
         self.auto_delete = auto_delete
         self.arguments = arguments
         self.metrics: Mapping[str, Any] = metrics
+        self._record(metrics)
         return self
 
     async def refresh(self) -> VHostQueue:
@@ -145,6 +154,82 @@ class VHostQueue:
             for item in response
         ]
 
+    async def iter_messages(
+            self,
+            count: int,
+            batch: int = 100,
+            max_bytes: Optional[int] = None,
+            requeue: bool = True,
+            encoding: str = 'auto',
+            truncate: Optional[int] = None,
+            reject: bool = False
+    ) -> AsyncIterator[Message]:
+        """Get messages from the queue one at a time.
+
+        Each message is decoded from the response as it arrives, and its
+        payload is only decoded to bytes when `Message.body` is read.
+
+        Requeued messages return to the head of the queue, so when `requeue`
+        is true the messages are fetched with a single request, and `batch`
+        is ignored. Otherwise each request removes its messages, and the queue
+        is drained `batch` messages at a time.
+
+        When `max_bytes` is given no more messages are read once the total
+        size of the message bodies, as given by `Message.payload_bytes`,
+        reaches it. As messages which are not
+        requeued are removed when they are fetched, the messages of a batch
+        which has been fetched are always yielded. When `requeue` is true the
+        server has already fetched all `count` messages in the single
+        request, so the budget only limits how many are decoded and yielded;
+        use `count` to limit the work of the server.
+
+        Args:
+            count (int): The maximum number of messages to get.
+            batch (int, optional): The number of messages in each request when
+                not requeuing. Defaults to 100.
+            max_bytes (Optional[int], optional): The budget in bytes of the
+                message bodies. Defaults to None, for no limit.
+            requeue (bool, optional): Whether to requeue the messages.
+                Defaults to True.
+            encoding (str, optional): The message encoding. Defaults to 'auto'.
+            truncate (Optional[int], optional): The amount to truncate each
+                payload. Defaults to None.
+            reject (bool, optional): Whether to reject the messages. Defaults
+                to False.
+
+        Yields:
+            Message: The messages.
+        """
+        total_bytes = 0
+        remaining = count
+        while remaining > 0:
+            size = remaining if requeue else min(batch, remaining)
+            received = 0
+            items = self._api.iter_vhost_queue_messages(
+                self.vhost,
+                self.name,
+                size,
+                requeue,
+                encoding,
+                truncate,
+                reject
+            )
+            # Closing the messages releases the response when the caller
+            # stops early or the budget is spent.
+            async with aclosing(items):
+                async for item in items:
+                    received += 1
+                    message = Message(**item)
+                    total_bytes += message.payload_bytes
+                    yield message
+                    if requeue and max_bytes is not None and total_bytes >= max_bytes:
+                        return
+            remaining -= received
+            if requeue or received < size:
+                return
+            if max_bytes is not None and total_bytes >= max_bytes:
+                return
+
     async def purge(self) -> None:
         """Purge all messages from the queue
         """
@@ -152,16 +237,16 @@ class VHostQueue:
 
     async def delete(
             self,
-            if_empty: bool = True,
-            if_unused: bool = True
+            if_empty: bool = False,
+            if_unused: bool = False
     ) -> None:
         """Delete the queue
 
         Args:
             if_empty (bool, optional): If true, only delete if empty. Defaults
-                to True.
+                to False.
             if_unused (bool, optional): If true, only delete if unused. Defaults
-                to True.
+                to False.
         """
         await self._api.delete_vhost_queue(self.vhost, self.name, if_empty, if_unused)
 
@@ -0,0 +1,85 @@
+"""Tests for the queue anomaly detection"""
+
+from typing import Any, Dict, List, Tuple
+
+from jetblack_rabbitmqmon.anomaly import AnomalyDetector, QueueAlert
+
+
+def _queue(messages: int, consumers: int = 1, redeliver: int = 0) -> Dict[str, Any]:
+    return {
+        'vhost': '/',
+        'name': 'orders',
+        'messages': messages,
+        'consumers': consumers,
+        'message_stats': {'redeliver': redeliver},
+    }
+
+
+def _kinds(alerts: List[QueueAlert]) -> List[Tuple[str, bool]]:
+    return [(alert.kind, alert.resolved) for alert in alerts]
+
+
+def test_backlog_growth_warmup_firing_and_clearing() -> None:
+    """Backlog growth is raised after the warm-up and resolved when the
+    depth falls"""
+    detector = AnomalyDetector(warmup=3)
+    fired = [
+        _kinds(detector.update([_queue(100 * second)], float(second)))
+        for second in range(1, 5)
+    ]
+    assert fired == [[], [], [], [(QueueAlert.BACKLOG_GROWTH, False)]]
+    growth = detector.growth('/', 'orders')
+    assert growth is not None and growth > 1
+    assert not detector.update([_queue(500)], 5.0)
+    assert _kinds(detector.update([_queue(10)], 6.0)) == [(QueueAlert.BACKLOG_GROWTH, True)]
+
+
+def test_no_consumers_firing_and_clearing() -> None:
+    """A queue with messages but no consumers is raised at once, and
+    resolved when a consumer arrives or the queue empties"""
+    detector = AnomalyDetector()
+    assert _kinds(detector.update([_queue(5, consumers=0)], 1.0)) == [
+        (QueueAlert.NO_CONSUMERS, False)
+    ]
+    assert not detector.update([_queue(6, consumers=0)], 2.0)
+    assert _kinds(detector.update([_queue(6, consumers=1)], 3.0)) == [
+        (QueueAlert.NO_CONSUMERS, True)
+    ]
+    assert not detector.update([_queue(0, consumers=0)], 4.0)
+
+
+def test_redelivery_spike_firing_and_clearing() -> None:
+    """A redelivery rate well above the baseline is a spike, once the
+    baseline has warmed up"""
+    detector = AnomalyDetector(warmup=3)
+    redelivered = [0, 2, 4, 6, 8, 10, 60, 62]
+    fired = [
+        _kinds(detector.update([_queue(0, redeliver=count)], float(second)))
+        for second, count in enumerate(redelivered, 1)
+    ]
+    assert fired[:6] == [[]] * 6
+    assert fired[6] == [(QueueAlert.REDELIVERY_SPIKE, False)]
+    assert fired[7] == [(QueueAlert.REDELIVERY_SPIKE, True)]
+
+
+def test_redelivery_spike_during_warmup_is_ignored() -> None:
+    """A spike before the warm-up ends raises nothing"""
+    detector = AnomalyDetector(warmup=3)
+    assert not detector.update([_queue(0, redeliver=0)], 1.0)
+    assert not detector.update([_queue(0, redeliver=100)], 2.0)
+
+
+def test_alerts_resolved_when_queue_leaves() -> None:
+    """The alerts of a queue missing from a snapshot are resolved and the
+    queue is forgotten"""
+    detector = AnomalyDetector()
+    other = {'vhost': '/', 'name': 'fills', 'messages': 0, 'consumers': 1}
+    detector.update([_queue(5, consumers=0), other], 1.0)
+    assert len(detector) == 2
+    alerts = detector.update([other], 2.0)
+    assert _kinds(alerts) == [(QueueAlert.NO_CONSUMERS, True)]
+    assert alerts[0].key == ('/', 'orders')
+    assert alerts[0].timestamp == 2.0
+    assert len(detector) == 1
+    assert detector.growth('/', 'orders') is None
+    assert not detector.update([other], 3.0)
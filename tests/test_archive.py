@@ -0,0 +1,108 @@
+"""Tests for the snapshot archive"""
+
+import importlib.util
+import os
+from pathlib import Path
+import sys
+from typing import Any, Dict, List
+
+import pytest
+
+from jetblack_rabbitmqmon.archive import SnapshotReader, SnapshotWriter
+
+FORMATS = ['json', pytest.param('msgpack', marks=pytest.mark.skipif(
+    importlib.util.find_spec('msgspec') is None,
+    reason='msgspec is not installed'
+))]
+
+
+def _snapshot(messages: int) -> Dict[str, Any]:
+    return {
+        'overview': {'cluster_name': 'rabbit@a', 'queue_totals': {'messages': messages}},
+        'vhosts': [{'name': '/'}],
+        'queues': [
+            {'vhost': '/', 'name': 'orders', 'messages': messages},
+            {'vhost': '/', 'name': 'events', 'messages': messages * 2},
+        ],
+    }
+
+
+@pytest.mark.parametrize('format_name', FORMATS)
+def test_round_trip(tmp_path: Path, format_name: str) -> None:
+    """Snapshots are read back as they were written"""
+    path = str(tmp_path / 'archive')
+    with SnapshotWriter(path, format_name) as writer:
+        for second in range(1, 4):
+            writer.write(_snapshot(second), timestamp=float(second))
+        with pytest.raises(ValueError):
+            writer.write(_snapshot(0), timestamp=2.0)
+    with SnapshotReader(path) as reader:
+        assert reader.format_name == format_name
+        assert reader.timestamps() == [1.0, 2.0, 3.0]
+        latest = reader.snapshot()
+        assert latest is not None and latest.timestamp == 3.0
+        assert latest.overview == _snapshot(3)['overview']
+        assert latest['queues'] == _snapshot(3)['queues']
+        earlier = reader.snapshot(2.5, endpoints=['queues'])
+        assert earlier is not None and earlier.timestamp == 2.0
+        assert 'vhosts' not in earlier
+        assert earlier.get('queues', ('/', 'events')) == {
+            'vhost': '/', 'name': 'events', 'messages': 4
+        }
+        assert reader.snapshot(0.5) is None
+        history: List[Any] = list(reader.history('queues', ('/', 'orders'), start=2.0))
+        assert [(timestamp, item['messages']) for timestamp, item in history] == [
+            (2.0, 2), (3.0, 3)
+        ]
+
+
+def test_recovers_from_partial_write(tmp_path: Path) -> None:
+    """Data and index entries written after the last complete snapshot are
+    discarded when the archive is next opened"""
+    path = str(tmp_path / 'archive')
+    with SnapshotWriter(path, 'json') as writer:
+        writer.write(_snapshot(1), timestamp=1.0)
+        writer.write(_snapshot(2), timestamp=2.0)
+    data_size = os.path.getsize(path)
+    # A crash while writing: a block without its index entry, and a partial
+    # index entry.
+    with open(path, 'ab') as file:
+        file.write(b'a partial block')
+    with open(f'{path}.idx', 'ab') as file:
+        file.write(b'\x00' * 7)
+    with SnapshotReader(path) as reader:
+        assert reader.timestamps() == [1.0, 2.0]
+    with SnapshotWriter(path) as writer:
+        assert writer.format_name == 'json'
+        assert os.path.getsize(path) == data_size
+        with pytest.raises(ValueError):
+            writer.write(_snapshot(0), timestamp=2.0)
+        writer.write(_snapshot(3), timestamp=3.0)
+    with SnapshotReader(path) as reader:
+        assert reader.timestamps() == [1.0, 2.0, 3.0]
+        snapshot = reader.snapshot()
+        assert snapshot is not None and snapshot['queues'] == _snapshot(3)['queues']
+
+
+def test_not_an_archive(tmp_path: Path) -> None:
+    """Other files are neither read nor appended to"""
+    path = tmp_path / 'archive'
+    path.write_bytes(b'not an archive at all')
+    with pytest.raises(ValueError):
+        SnapshotWriter(str(path))
+    with pytest.raises(ValueError):
+        SnapshotReader(str(path))
+    assert path.read_bytes() == b'not an archive at all'
+    assert not os.path.exists(f'{path}.idx')
+
+
+def test_missing_codec_creates_no_files(
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """An archive which cannot be encoded is not created"""
+    monkeypatch.setitem(sys.modules, 'msgspec', None)
+    path = tmp_path / 'archive'
+    with pytest.raises(ImportError):
+        SnapshotWriter(str(path), 'msgpack')
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,113 @@
+"""Tests for the asyncio requester"""
+
+import asyncio
+from contextlib import aclosing
+import inspect
+from typing import List
+
+import pytest
+
+from jetblack_rabbitmqmon.clients.asyncio_requester import AsyncioRequester
+from jetblack_rabbitmqmon.requester import RequestError
+
+
+class DroppingServer:
+    """Answers the first request on a connection, then closes it when the
+    next request arrives, as a server does when a kept alive connection
+    times out"""
+
+    def __init__(self) -> None:
+        self.requests: List[str] = []
+        self.server: asyncio.AbstractServer
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f'http://127.0.0.1:{port}'
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> str:
+        head = await reader.readuntil(b'\r\n\r\n')
+        request_line = head.split(b'\r\n', 1)[0].decode('latin-1')
+        for line in head.split(b'\r\n'):
+            if line.lower().startswith(b'content-length:'):
+                await reader.readexactly(int(line.split(b':', 1)[1]))
+        self.requests.append(request_line)
+        return request_line
+
+    async def _handle(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            await self._read_request(reader)
+            body = b'{"ok": true}'
+            writer.write(
+                b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                b'Content-Length: %d\r\n\r\n%s' % (len(body), body)
+            )
+            await writer.drain()
+            await self._read_request(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+
+@pytest.mark.parametrize('method,resent', [('GET', True), ('POST', False)])
+def test_dropped_idle_connection(method: str, resent: bool) -> None:
+    """Only idempotent requests are resent when an idle connection is
+    dropped"""
+    async def main() -> None:
+        server = DroppingServer()
+        url = await server.start()
+        requester = AsyncioRequester(url, 'guest', 'guest')
+        try:
+            assert await requester.get('overview') == {'ok': True}
+            if resent:
+                assert await requester.request(method, 'overview') == {'ok': True}
+            else:
+                with pytest.raises(RequestError):
+                    await requester.request(method, 'overview', data={})
+            methods = [request.split()[0] for request in server.requests]
+            assert methods == ['GET', method, method] if resent else ['GET', method]
+        finally:
+            await requester.aclose()
+            await server.stop()
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('url,host', [
+    ('http://[::1]:15672', '[::1]:15672'),
+    ('http://[::1]', '[::1]'),
+    ('http://mq.example.com:15672', 'mq.example.com:15672'),
+    ('https://mq.example.com', 'mq.example.com'),
+])
+def test_host_header(url: str, host: str) -> None:
+    """IPv6 addresses are bracketed in the host header"""
+    requester = AsyncioRequester(url, 'guest', 'guest')
+    head = requester._head('GET', '/api/overview')  # pylint: disable=protected-access
+    assert f'Host: {host}\r\n'.encode() in head
+
+
+def test_iter_content() -> None:
+    """The body is streamed by an async generator, and the connection is
+    pooled once it is consumed"""
+    async def main() -> None:
+        server = DroppingServer()
+        url = await server.start()
+        requester = AsyncioRequester(url, 'guest', 'guest')
+        try:
+            chunks = requester.iter_content('overview')
+            assert inspect.isasyncgen(chunks)
+            async with aclosing(chunks):
+                assert b''.join([chunk async for chunk in chunks]) == b'{"ok": true}'
+            assert len(requester._idle) == 1  # pylint: disable=protected-access
+        finally:
+            await requester.aclose()
+            await server.stop()
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+"""Tests for the response cache"""
+
+import asyncio
+
+from jetblack_rabbitmqmon.cache import CachingRequester
+
+from test_requester import FakeRequester
+
+
+def test_ttl_expiry() -> None:
+    """A response is served from the cache until its time to live expires"""
+    async def main() -> None:
+        inner = FakeRequester(delay=0)
+        cache = CachingRequester(inner, ttls={'overview': 0.05})
+        first = await cache.get('overview')
+        assert await cache.get('overview') is first
+        assert len(inner.calls) == 1
+        await asyncio.sleep(0.06)
+        await cache.get('overview')
+        assert len(inner.calls) == 2
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 2
+    asyncio.run(main())
+
+
+def test_longest_prefix_ttl() -> None:
+    """The time to live is chosen by the longest matching prefix"""
+    cache = CachingRequester(
+        FakeRequester(),
+        ttls={'queues': 10, 'queues/prd': 1},
+        default_ttl=0
+    )
+    assert cache.ttl('queues', 'prd', 'orders') == 1
+    assert cache.ttl('queues', 'dev') == 10
+    assert cache.ttl('nodes') == 0
+
+
+def test_uncached_paths() -> None:
+    """A time to live of zero disables caching"""
+    async def main() -> None:
+        inner = FakeRequester(delay=0)
+        cache = CachingRequester(inner, ttls={'overview': 10})
+        await cache.get('nodes')
+        await cache.get('nodes')
+        assert len(inner.calls) == 2
+    asyncio.run(main())
+
+
+def test_lru_entry_eviction() -> None:
+    """The least recently used entry is evicted beyond the entry limit"""
+    async def main() -> None:
+        inner = FakeRequester(delay=0)
+        cache = CachingRequester(inner, default_ttl=10, max_entries=2)
+        await cache.get('queues', 'a')
+        await cache.get('queues', 'b')
+        await cache.get('queues', 'a')
+        await cache.get('queues', 'c')
+        assert cache.stats.evictions == 1
+        inner.calls.clear()
+        await cache.get('queues', 'a')
+        await cache.get('queues', 'c')
+        assert not inner.calls
+        await cache.get('queues', 'b')
+        assert inner.calls == [('GET', ('queues', 'b'))]
+    asyncio.run(main())
+
+
+def test_size_eviction() -> None:
+    """Entries are evicted to stay within the size limit, and responses
+    larger than the limit are not cached"""
+    async def main() -> None:
+        inner = FakeRequester(delay=0)
+        size = len('{"path": ["queues", "a"]}')
+        cache = CachingRequester(inner, default_ttl=10, max_bytes=size * 2)
+        await cache.get('queues', 'a')
+        await cache.get('queues', 'b')
+        await cache.get('queues', 'c')
+        assert cache.stats.evictions == 1
+        inner.calls.clear()
+        await cache.get('queues', 'c')
+        assert not inner.calls
+        await cache.get('queues', 'a')
+        assert inner.calls == [('GET', ('queues', 'a'))]
+        inner.calls.clear()
+        await cache.get('queues', 'a' * size * 2)
+        await cache.get('queues', 'a' * size * 2)
+        assert len(inner.calls) == 2
+    asyncio.run(main())
+
+
+def test_write_invalidates_related_paths() -> None:
+    """A write removes the resource, its collections and the resources
+    beneath it, but not unrelated resources"""
+    async def main() -> None:
+        inner = FakeRequester(delay=0)
+        cache = CachingRequester(inner, default_ttl=10)
+        paths = [
+            ('queues',),
+            ('queues', 'prd'),
+            ('queues', 'prd', 'orders'),
+            ('queues', 'prd', 'orders', 'bindings'),
+            ('queues', 'prd', 'fills'),
+            ('exchanges', 'prd'),
+        ]
+        for path in paths:
+            await cache.get(*path)
+        await cache.delete('queues', 'prd', 'orders')
+        assert cache.stats.invalidations == 4
+        inner.calls.clear()
+        for path in paths:
+            await cache.get(*path)
+        assert inner.calls == [('GET', path) for path in paths[:4]]
+    asyncio.run(main())
+
+
+def test_failed_write_invalidates() -> None:
+    """A write invalidates the cache even when it fails"""
+    async def main() -> None:
+        inner = FakeRequester(delay=0)
+        cache = CachingRequester(inner, default_ttl=10)
+        await cache.get('queues', 'prd')
+        inner.error = ValueError('failed')
+        try:
+            await cache.put('queues', 'prd', data={})
+        except ValueError:
+            pass
+        inner.error = None
+        inner.calls.clear()
+        await cache.get('queues', 'prd')
+        assert inner.calls == [('GET', ('queues', 'prd'))]
+    asyncio.run(main())
+
+
+def test_stale_response_is_not_stored() -> None:
+    """A response fetched across a write is returned but not cached"""
+    async def main() -> None:
+        inner = FakeRequester(delay=0.05)
+        cache = CachingRequester(inner, default_ttl=10)
+        fetch = asyncio.create_task(cache.get('queues', 'prd', 'orders'))
+        await asyncio.sleep(0.01)
+        await cache.put('queues', 'prd', 'orders', data={})
+        assert await fetch == {'path': ['queues', 'prd', 'orders']}
+        inner.calls.clear()
+        await cache.get('queues', 'prd', 'orders')
+        assert inner.calls == [('GET', ('queues', 'prd', 'orders'))]
+        await cache.get('queues', 'prd', 'orders')
+        assert len(inner.calls) == 1
+    asyncio.run(main())
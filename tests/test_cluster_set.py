@@ -0,0 +1,62 @@
+"""Tests for the cluster set"""
+
+import asyncio
+from typing import Optional
+
+import pytest
+
+from jetblack_rabbitmqmon.cluster_set import FailoverRequester
+from jetblack_rabbitmqmon.requester import (
+    CircuitOpenError,
+    RequestError,
+    RequestTimeoutError
+)
+
+from test_requester import FakeRequester
+
+
+def _refused() -> RequestError:
+    error = RequestError('connection refused')
+    error.__cause__ = ConnectionRefusedError(111, 'Connection refused')
+    return error
+
+
+@pytest.mark.parametrize('method,error,failed_over', [
+    ('GET', RequestError('unavailable', 503), True),
+    ('GET', RequestTimeoutError('timed out'), True),
+    ('GET', RequestError('not found', 404), False),
+    ('PUT', RequestError('unavailable', 503), True),
+    ('POST', RequestError('unavailable', 503), False),
+    ('POST', RequestTimeoutError('timed out'), False),
+    ('POST', RequestError('connection reset'), False),
+    ('POST', _refused(), True),
+    ('POST', CircuitOpenError('failed fast'), True),
+])
+def test_failover(method: str, error: Optional[RequestError], failed_over: bool) -> None:
+    """Only requests which are safe to repeat, or were never sent, fail over"""
+    async def main() -> None:
+        first, second = FakeRequester(delay=0), FakeRequester(delay=0)
+        first.error = error
+        requester = FailoverRequester([first, second])
+        if failed_over:
+            await requester.send(method, 'exchanges', '/', 'amq.direct', 'publish')
+        else:
+            with pytest.raises(RequestError):
+                await requester.send(method, 'exchanges', '/', 'amq.direct', 'publish')
+        assert len(first.calls) == 1
+        assert len(second.calls) == (1 if failed_over else 0)
+    asyncio.run(main())
+
+
+def test_failover_sticks_to_last_success() -> None:
+    """Requests go to the endpoint which last succeeded"""
+    async def main() -> None:
+        first, second = FakeRequester(delay=0), FakeRequester(delay=0)
+        first.error = RequestError('unavailable', 503)
+        requester = FailoverRequester([first, second])
+        await requester.get('overview')
+        first.error = None
+        await requester.get('nodes')
+        assert first.calls == [('GET', ('overview',))]
+        assert second.calls == [('GET', ('overview',)), ('GET', ('nodes',))]
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""Tests for the decoders"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, List
+
+import pytest
+
+from jetblack_rabbitmqmon.decoders import JsonArrayDecoder, iter_json_array
+
+ELEMENTS: List[Any] = [
+    {'name': 'queue.é', 'messages': 12345, 'rate': -1.5e-3},
+    [1, 22, 333],
+    'text with ] and , and "quotes"',
+    1234567890,
+    True,
+    None,
+    {},
+]
+DOCUMENT = json.dumps(ELEMENTS, ensure_ascii=False, indent=1).encode('utf-8')
+
+
+def _decode(chunks: List[bytes]) -> List[Any]:
+    decoder = JsonArrayDecoder()
+    elements: List[Any] = []
+    for chunk in chunks:
+        elements.extend(decoder.feed(chunk))
+    elements.extend(decoder.feed(b'', True))
+    return elements
+
+
+def test_every_split() -> None:
+    """The elements are decoded whichever byte the body is split at"""
+    for index in range(len(DOCUMENT) + 1):
+        assert _decode([DOCUMENT[:index], DOCUMENT[index:]]) == ELEMENTS
+
+
+def test_byte_at_a_time() -> None:
+    """Numbers and multi-byte characters split across chunks are joined"""
+    chunks = [DOCUMENT[index:index + 1] for index in range(len(DOCUMENT))]
+    assert _decode(chunks) == ELEMENTS
+
+
+def test_elements_are_yielded_as_they_complete() -> None:
+    """An element is returned by the chunk which completes it"""
+    decoder = JsonArrayDecoder()
+    assert decoder.feed(b'[{"a": 1}, 12') == [{'a': 1}]
+    assert decoder.feed(b'3, {"b"') == [123]
+    assert decoder.feed(b': 2}]') == [{'b': 2}]
+    assert not decoder.feed(b'', True)
+
+
+@pytest.mark.parametrize('document', [b'{"a": 1}', b'[1, 2', b'[1 2]', b'[1] 2', b''])
+def test_invalid(document: bytes) -> None:
+    """A body which is not a complete JSON array is an error"""
+    with pytest.raises(ValueError):
+        _decode([document])
+
+
+def test_iter_json_array() -> None:
+    """The elements are yielded from the chunks of a body"""
+    async def chunks() -> AsyncIterator[bytes]:
+        for index in range(0, len(DOCUMENT), 7):
+            yield DOCUMENT[index:index + 7]
+
+    async def main() -> List[Any]:
+        return [element async for element in iter_json_array(chunks())]
+
+    assert asyncio.run(main()) == ELEMENTS
@@ -0,0 +1,98 @@
+"""Tests for the streaming definitions"""
+
+import asyncio
+import gzip
+import json
+from pathlib import Path
+from typing import Any, List, Tuple
+
+import pytest
+
+from jetblack_rabbitmqmon import definitions
+from jetblack_rabbitmqmon.definitions import iter_definitions
+
+DEFINITIONS = {
+    'rabbit_version': '3.13.0',
+    'users': [],
+    'vhosts': [{'name': '/'}, {'name': 'vhost.é'}],
+    'queues': [
+        {
+            'name': f'queue-{index}',
+            'vhost': '/',
+            'durable': True,
+            'arguments': {'x-max-length': 10 ** index},
+        }
+        for index in range(5)
+    ],
+    'global_parameters': [{'name': 'cluster_name', 'value': 'rabbit@a'}],
+    'bindings': [],
+}
+
+
+def _expected() -> List[Tuple[str, Any]]:
+    items: List[Tuple[str, Any]] = []
+    for key, value in DEFINITIONS.items():
+        if isinstance(value, list):
+            items.extend((key, item) for item in value)
+        else:
+            items.append((key, value))
+    return items
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 1 << 16])
+@pytest.mark.parametrize('compress', [False, True])
+def test_iter_definitions(
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        chunk_size: int,
+        compress: bool
+) -> None:
+    """The items are read whatever the chunk boundaries"""
+    monkeypatch.setattr(definitions, '_CHUNK_SIZE', chunk_size)
+    content = json.dumps(DEFINITIONS, ensure_ascii=False, indent=2).encode('utf-8')
+    path = tmp_path / 'definitions.json'
+    path.write_bytes(gzip.compress(content) if compress else content)
+    assert list(iter_definitions(str(path))) == _expected()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 1 << 16])
+def test_encode_definitions(
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        chunk_size: int
+) -> None:
+    """The definitions are re-encoded unchanged, or with selected lists"""
+    monkeypatch.setattr(definitions, '_CHUNK_SIZE', chunk_size)
+    path = tmp_path / 'definitions.json'
+    path.write_text(json.dumps(DEFINITIONS), encoding='utf-8')
+
+    async def encode(sections: Any) -> Any:
+        chunks = [
+            chunk
+            async for chunk in definitions._encode_definitions(  # pylint: disable=protected-access
+                str(path),
+                sections
+            )
+        ]
+        return json.loads(b''.join(chunks))
+
+    assert asyncio.run(encode(None)) == DEFINITIONS
+    selected = asyncio.run(encode(['queues']))
+    assert selected['queues'] == DEFINITIONS['queues']
+    assert 'vhosts' not in selected and selected['rabbit_version'] == '3.13.0'
+
+
+@pytest.mark.parametrize('content', [
+    '[]',
+    '{"queues": [1, 2}',
+    '{"queues": [1]} {}',
+    '{"queues": [1]',
+    '{1: 2}',
+])
+def test_invalid(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, content: str) -> None:
+    """A document which is not a definitions object is an error"""
+    monkeypatch.setattr(definitions, '_CHUNK_SIZE', 3)
+    path = tmp_path / 'definitions.json'
+    path.write_text(content, encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iter_definitions(str(path)))
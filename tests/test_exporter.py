@@ -0,0 +1,37 @@
+"""Tests for the OpenMetrics exporter"""
+
+import asyncio
+import socket
+
+import pytest
+
+from jetblack_rabbitmqmon.exporter import NODE_METRICS, OpenMetricsExporter, render_family
+
+
+def test_uptime_in_seconds() -> None:
+    """The node uptime, reported in milliseconds, is exported in seconds"""
+    lines = render_family(
+        'rabbitmq_node',
+        NODE_METRICS,
+        [((('node', 'rabbit@a'),), {'uptime': 90500, 'running': True})]
+    )
+    assert 'rabbitmq_node_uptime_seconds{node="rabbit@a"} 90.5' in lines
+    assert 'rabbitmq_node_running{node="rabbit@a"} 1' in lines
+
+
+def test_bind_failure_starts_nothing() -> None:
+    """An exporter which cannot bind does not start refreshing"""
+    async def main() -> None:
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            sock.listen()
+            port = sock.getsockname()[1]
+            exporter = OpenMetricsExporter(
+                None,  # type: ignore
+                host='127.0.0.1',
+                port=port
+            )
+            with pytest.raises(OSError):
+                await exporter.start()
+            assert exporter._refresh_task is None  # pylint: disable=protected-access
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""Tests for the metrics history"""
+
+import math
+
+import pytest
+
+from jetblack_rabbitmqmon.channel import Channel
+from jetblack_rabbitmqmon.connection import Connection
+from jetblack_rabbitmqmon.history import (
+    CHANNEL_SERIES,
+    CONNECTION_SERIES,
+    NODE_SERIES,
+    QUEUE_SERIES,
+    VHOST_SERIES,
+    RingBuffer
+)
+from jetblack_rabbitmqmon.node import Node
+from jetblack_rabbitmqmon.vhost import VHost
+from jetblack_rabbitmqmon.vhost_queue import VHostQueue
+
+
+def test_ring_buffer_overwrites_oldest() -> None:
+    """A full buffer overwrites its oldest values"""
+    buffer = RingBuffer(3)
+    for value in range(5):
+        buffer.append(float(value), float(value))
+    assert len(buffer) == 3
+    assert buffer.values() == [2.0, 3.0, 4.0]
+    assert buffer.latest() == (4.0, 4.0)
+    assert buffer.values(window=1, now=4) == [3.0, 4.0]
+    assert buffer.percentile(50) == 3.0
+    assert math.isnan(RingBuffer(1).mean())
+
+
+def test_ring_buffer_window_excludes_later_values() -> None:
+    """Values after the end of the window are skipped"""
+    buffer = RingBuffer(5)
+    for value in range(5):
+        buffer.append(float(value), float(value))
+    assert buffer.values(window=1, now=2) == [1.0, 2.0]
+    assert buffer.values(now=2) == [0.0, 1.0, 2.0]
+    assert buffer.max(window=10, now=2.5) == 2.0
+    assert buffer.values(window=1, now=-1) == []
+    assert buffer.values(window=1) == []
+
+
+@pytest.mark.parametrize('cls,keys,series,field', [
+    (Channel, {'name': 'c'}, CHANNEL_SERIES, 'consumer_count'),
+    (Connection, {'name': 'c'}, CONNECTION_SERIES, 'channels'),
+    (Node, {'name': 'n'}, NODE_SERIES, 'mem_used'),
+    (VHost, {'name': '/'}, VHOST_SERIES, 'messages'),
+    (VHostQueue, {'vhost': '/', 'name': 'q'}, QUEUE_SERIES, 'messages'),
+])
+def test_track(cls, keys, series, field) -> None:
+    """Tracking records the metrics each time the entity is refreshed"""
+    tracked = cls(None, **keys, **{field: 1})
+    assert tracked.history is None
+    history = tracked.track(capacity=10)
+    assert list(history.series) == list(series)
+    tracked._init(**keys, **{field: 2})  # pylint: disable=protected-access
+    assert history[field].values() == [1.0, 2.0]
+    assert tracked.track(series={'custom': field}).series.keys() == {'custom'}
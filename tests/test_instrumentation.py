@@ -0,0 +1,103 @@
+"""Tests for the request instrumentation"""
+
+import ast
+import inspect
+import re
+from typing import List, Mapping, Optional
+
+import pytest
+
+from jetblack_rabbitmqmon import api
+from jetblack_rabbitmqmon.instrumentation import ENDPOINT_TEMPLATES, path_template
+
+# The methods which take the segments of the path as positional arguments,
+# and the number of arguments before them.
+_PATH_METHODS: Mapping[str, int] = {
+    'get': 0,
+    'get_list': 0,
+    'get_object': 0,
+    'put': 0,
+    'post': 0,
+    'delete': 0,
+    'iter_content': 0,
+    'send': 1,
+    'request': 1,
+    'upload': 1,
+    '_iter_pages': 0,
+}
+
+
+def _path_method(call: ast.Call) -> Optional[str]:
+    # The method of a call of self._requester.<method>(...) or
+    # self._iter_pages(...), or None for other calls.
+    function = call.func
+    if not isinstance(function, ast.Attribute) or function.attr not in _PATH_METHODS:
+        return None
+    target = function.value
+    if function.attr == '_iter_pages':
+        is_path_call = isinstance(target, ast.Name) and target.id == 'self'
+    else:
+        is_path_call = (
+            isinstance(target, ast.Attribute)
+            and target.attr == '_requester'
+            and isinstance(target.value, ast.Name)
+            and target.value.id == 'self'
+        )
+    return function.attr if is_path_call else None
+
+
+def _requested_templates() -> List[str]:
+    # The paths requested in the source of the api, where each argument which
+    # is a variable, such as `vhost`, is a name.
+    templates: List[str] = []
+    for node in ast.walk(ast.parse(inspect.getsource(api))):
+        if not isinstance(node, ast.Call) or (method := _path_method(node)) is None:
+            continue
+        segments: List[str] = []
+        for argument in node.args[_PATH_METHODS[method]:]:
+            if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+                segments.append(argument.value)
+            elif isinstance(argument, ast.Name):
+                segments.append(f'{{{argument.id}}}')
+            else:
+                break
+        else:
+            if segments and not segments[0].startswith('{'):
+                templates.append('/'.join(segments))
+    return templates
+
+
+@pytest.mark.parametrize('path,template', [
+    (('overview',), 'overview'),
+    (('queues', '/'), 'queues/{vhost}'),
+    (('queues', '/', 'orders'), 'queues/{vhost}/{name}'),
+    (('queues', '/', 'orders', 'get'), 'queues/{vhost}/{name}/get'),
+    (('queue', '/', 'orders', 'contents'), 'queue/{vhost}/{name}/contents'),
+    (('connection', '127.0.0.1:5672', 'channels'), 'connection/{name}/channels'),
+    (('vhost', '/', 'channels'), 'vhost/{vhost}/channels'),
+    (('vhosts', '/', 'connections'), 'vhosts/{vhost}/connections'),
+    (
+        ('bindings', '/', 'e', 'orders', 'q', 'orders', '~'),
+        'bindings/{vhost}/e/{exchange}/q/{queue}/{props}'
+    ),
+    (
+        ('bindings', '/', 'e', 'orders', 'e', 'audit'),
+        'bindings/{vhost}/e/{source}/e/{destination}'
+    ),
+    (('unknown', 'a', 'b'), 'unknown/{}/{}'),
+    ((), ''),
+])
+def test_path_template(path, template) -> None:
+    """Requests are grouped by the endpoints the api requests"""
+    assert path_template(path) == template
+
+
+def test_templates_cover_the_api() -> None:
+    """Every path the api requests has a template"""
+    requested = _requested_templates()
+    assert 'queues/{vhost}/{name}' in requested
+    for template in requested:
+        path = [segment if segment[0] != '{' else 'x' for segment in template.split('/')]
+        found = path_template(path)
+        assert found in ENDPOINT_TEMPLATES, template
+        assert re.sub('{[^}]*}', '{}', found) == re.sub('{[^}]*}', '{}', template)
@@ -0,0 +1,21 @@
+"""Tests for the models"""
+
+import pytest
+
+from jetblack_rabbitmqmon.channel import Channel
+from jetblack_rabbitmqmon.connection import Connection
+from jetblack_rabbitmqmon.consumer import Consumer
+from jetblack_rabbitmqmon.vhost_queue import VHostQueue
+
+
+@pytest.mark.parametrize('cls,keys', [
+    (Channel, {'name': 'c'}),
+    (Connection, {'name': 'c'}),
+    (Consumer, {'queue': {'vhost': '/', 'name': 'q'}}),
+    (VHostQueue, {'vhost': '/', 'name': 'q'}),
+])
+def test_user_attributes(cls, keys) -> None:
+    """Users may set their own attributes on the models"""
+    entity = cls(None, **keys)
+    entity.note = 'checked'
+    assert entity.note == 'checked'
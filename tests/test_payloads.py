@@ -0,0 +1,70 @@
+"""Tests for the typed payloads"""
+
+import json
+
+import pytest
+
+pytest.importorskip('msgspec')
+
+from jetblack_rabbitmqmon.decoders import json_default, msgspec_decoder  # noqa: E402
+from jetblack_rabbitmqmon.payloads import (  # noqa: E402
+    ChannelPayload,
+    Page,
+    QueuePayload,
+    payload_decoder
+)
+
+
+@pytest.mark.parametrize('path', [
+    ('channels',),
+    ('vhost', '/', 'channels'),
+    ('connection', '127.0.0.1:5672 -> 127.0.0.1:15672', 'channels'),
+])
+def test_channel_paths(path) -> None:
+    """The channel lists are decoded from the paths the api requests"""
+    decode = msgspec_decoder(typed=True)
+    channels = decode(json.dumps([{'name': 'c', 'number': 1}]).encode(), path)
+    assert isinstance(channels[0], ChannelPayload)
+    assert dict(channels[0]) == {'name': 'c', 'number': 1}
+
+
+def test_paged_response() -> None:
+    """A page is read as a mapping keyed by the JSON field names"""
+    content = json.dumps({
+        'items': [{'vhost': '/', 'name': 'q'}],
+        'page': 1,
+        'page_count': 1,
+    })
+    page = msgspec_decoder(typed=True)(content.encode(), ('queues',))
+    assert isinstance(page, Page)
+    assert isinstance(page.entries[0], QueuePayload)
+    assert page['items'] is page.entries
+    assert page['page_count'] == 1
+    assert list(page) == ['items', 'page', 'page_count']
+    assert dict(page.items())['items'] is page.entries
+    assert 'total_count' not in page
+    with pytest.raises(KeyError):
+        page['entries']  # pylint: disable=pointless-statement
+
+
+def test_untyped_paths() -> None:
+    """Other responses are not typed"""
+    assert payload_decoder(('vhosts', '/', 'permissions')) is None
+    assert payload_decoder(('queue', '/', 'q', 'contents')) is None
+
+
+def test_typed_decoding_is_opt_in() -> None:
+    """Undeclared fields are only dropped when typed decoding is asked for"""
+    content = json.dumps([{'vhost': '/', 'name': 'q', 'messages_details': {'rate': 1.0}}])
+    untyped = msgspec_decoder()(content.encode(), ('queues',))
+    assert untyped[0]['messages_details'] == {'rate': 1.0}
+    typed = msgspec_decoder(typed=True)(content.encode(), ('queues',))
+    assert 'messages_details' not in typed[0]
+
+
+def test_json_default() -> None:
+    """Typed payloads are encoded as objects"""
+    queues = msgspec_decoder(typed=True)(b'[{"vhost": "/", "name": "q"}]', ('queues',))
+    assert json.loads(json.dumps(queues, default=json_default)) == [{'vhost': '/', 'name': 'q'}]
+    with pytest.raises(TypeError):
+        json.dumps(object(), default=json_default)
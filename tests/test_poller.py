@@ -0,0 +1,63 @@
+"""Tests for the poller"""
+
+import asyncio
+from typing import Any, List, Mapping
+
+from jetblack_rabbitmqmon.poller import PollEvent, Poller
+
+
+class FakeApi:
+    """Returns the queues it is given"""
+
+    def __init__(self) -> None:
+        self.queues: List[Mapping[str, Any]] = []
+
+    async def get_queues(self, columns: Any) -> List[Mapping[str, Any]]:
+        return [dict(queue) for queue in self.queues]
+
+
+def _queue(name: str, messages: int, rate: float) -> Mapping[str, Any]:
+    return {
+        'vhost': '/',
+        'name': name,
+        'messages': messages,
+        'consumers': 1,
+        'message_stats': {'publish_details': {'rate': rate}},
+    }
+
+
+def test_rates_are_not_changes() -> None:
+    """Only the stable fields are compared by default"""
+    api = FakeApi()
+    poller = Poller(api)  # type: ignore
+    api.queues = [_queue('a', 1, 1.0), _queue('b', 1, 1.0)]
+    events = asyncio.run(poller.poll())
+    assert [event.kind for event in events] == [PollEvent.ADDED] * 2
+
+    api.queues = [_queue('a', 1, 2.0), _queue('b', 2, 3.0)]
+    events = asyncio.run(poller.poll())
+    assert [(event.kind, event.key) for event in events] == [
+        (PollEvent.CHANGED, ('/', 'b'))
+    ]
+
+
+def test_whole_payload_is_opt_in() -> None:
+    """A field list of None compares the whole payload"""
+    api = FakeApi()
+    poller = Poller(api, fields={'queues': None})  # type: ignore
+    api.queues = [_queue('a', 1, 1.0)]
+    asyncio.run(poller.poll())
+    api.queues = [_queue('a', 1, 2.0)]
+    events = asyncio.run(poller.poll())
+    assert [event.kind for event in events] == [PollEvent.CHANGED]
+
+
+def test_removed() -> None:
+    """Entities which disappear are reported as removed"""
+    api = FakeApi()
+    poller = Poller(api)  # type: ignore
+    api.queues = [_queue('a', 1, 1.0)]
+    asyncio.run(poller.poll())
+    api.queues = []
+    events = asyncio.run(poller.poll())
+    assert [event.kind for event in events] == [PollEvent.REMOVED]
@@ -0,0 +1,205 @@
+"""Tests for bulk publishing"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Set, Tuple, Union
+
+import pytest
+
+from jetblack_rabbitmqmon.publish import OutgoingMessage, publish_many
+
+
+class FakeApi:
+    """Publishes messages after a delay, failing those with the payload
+    'fail' and routing all but those with the payload 'unrouted'"""
+
+    def __init__(self, delay: float = 0.001) -> None:
+        self.delay = delay
+        self.published: List[Tuple[str, str]] = []
+        self.in_flight: Set[str] = set()
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+    async def publish_message(
+            self,
+            vhost: str,
+            exchange: str,
+            properties: Mapping[str, Any],
+            routing_key: str,
+            payload: str,
+            payload_encoding: str
+    ) -> Mapping[str, Any]:
+        assert (vhost, exchange, payload_encoding) == ('/', 'amq.topic', 'string')
+        assert routing_key not in self.in_flight, 'a key was published concurrently'
+        self.in_flight.add(routing_key)
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            # Later keys are faster, so they would overtake without chaining.
+            await asyncio.sleep(self.delay * (3 - int(routing_key[-1]) % 3))
+        finally:
+            self.concurrent -= 1
+            self.in_flight.discard(routing_key)
+        if payload == 'fail':
+            raise ValueError(payload)
+        self.published.append((routing_key, payload))
+        return {'routed': payload != 'unrouted'}
+
+
+def _messages(count: int, keys: int) -> List[OutgoingMessage]:
+    return [
+        OutgoingMessage(f'key{index % keys}', str(index))
+        for index in range(count)
+    ]
+
+
+def test_per_key_ordering() -> None:
+    """Messages with the same key are published and reported in order"""
+    async def main() -> None:
+        api = FakeApi()
+        messages = _messages(60, 3)
+        reported: Dict[str, List[int]] = {}
+
+        def on_result(position: int, message: OutgoingMessage, outcome: Any) -> None:
+            assert outcome is True
+            reported.setdefault(message.routing_key, []).append(position)
+
+        result = await publish_many(
+            api,  # type: ignore[arg-type]
+            '/',
+            'amq.topic',
+            messages,
+            concurrency=8,
+            on_result=on_result
+        )
+        assert result.published == result.routed == 60
+        for key in ('key0', 'key1', 'key2'):
+            expected = [int(message.payload) for message in messages if message.routing_key == key]
+            assert [int(payload) for k, payload in api.published if k == key] == expected
+            assert reported[key] == expected
+        assert len(result.latencies) == 60
+    asyncio.run(main())
+
+
+def test_concurrency_bound() -> None:
+    """No more than `concurrency` requests are in flight"""
+    async def main() -> None:
+        api = FakeApi()
+        result = await publish_many(
+            api,  # type: ignore[arg-type]
+            '/',
+            'amq.topic',
+            _messages(40, 40),
+            concurrency=4
+        )
+        assert result.published == 40
+        assert api.max_concurrent == 4
+    asyncio.run(main())
+
+
+def test_back_pressure() -> None:
+    """Messages are read only as places become free"""
+    async def main() -> None:
+        api = FakeApi()
+        read = 0
+        completed = 0
+        most_pending = 0
+
+        async def messages() -> AsyncIterator[OutgoingMessage]:
+            nonlocal read, most_pending
+            for message in _messages(30, 30):
+                read += 1
+                most_pending = max(most_pending, read - completed)
+                yield message
+
+        def on_result(*_: Any) -> None:
+            nonlocal completed
+            completed += 1
+
+        await publish_many(
+            api,  # type: ignore[arg-type]
+            '/',
+            'amq.topic',
+            messages(),
+            concurrency=2,
+            max_pending=5,
+            on_result=on_result
+        )
+        assert read == completed == 30
+        # One more message is read while waiting for a place.
+        assert most_pending <= 6
+    asyncio.run(main())
+
+
+def test_failure_accounting() -> None:
+    """Failed and unrouted messages are counted, and failures do not stop
+    the messages after them"""
+    async def main() -> None:
+        api = FakeApi()
+        payloads = ['a', 'fail', 'unrouted', 'b', 'fail']
+        messages = [OutgoingMessage('key0', payload) for payload in payloads]
+        outcomes: List[Union[bool, Exception]] = []
+        result = await publish_many(
+            api,  # type: ignore[arg-type]
+            '/',
+            'amq.topic',
+            messages,
+            on_result=lambda _position, _message, outcome: outcomes.append(outcome)
+        )
+        assert (result.published, result.routed, result.unrouted) == (3, 2, 1)
+        assert [(position, str(error)) for position, _, error in result.failed] == [
+            (1, 'fail'),
+            (4, 'fail'),
+        ]
+        assert [
+            type(outcome).__name__ if isinstance(outcome, Exception) else outcome
+            for outcome in outcomes
+        ] == [True, 'ValueError', False, True, 'ValueError']
+        assert result.latency(100) >= result.latency(0) > 0
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('asynchronous', [False, True])
+def test_callback_error_stops_publishing(asynchronous: bool) -> None:
+    """An exception from the result callback is raised without hanging, and
+    no more messages are read"""
+    async def main() -> None:
+        api = FakeApi()
+        read = 0
+
+        def messages() -> Iterator[OutgoingMessage]:
+            nonlocal read
+            for message in _messages(1000, 3):
+                read += 1
+                yield message
+
+        async def async_messages() -> AsyncIterator[OutgoingMessage]:
+            for message in messages():
+                yield message
+
+        def on_result(position: int, *_: Any) -> None:
+            if position == 4:
+                raise RuntimeError('callback failed')
+
+        with pytest.raises(RuntimeError, match='callback failed'):
+            await asyncio.wait_for(
+                publish_many(
+                    api,  # type: ignore[arg-type]
+                    '/',
+                    'amq.topic',
+                    async_messages() if asynchronous else messages(),
+                    concurrency=2,
+                    max_pending=4,
+                    on_result=on_result
+                ),
+                1
+            )
+        assert read < 20
+        await asyncio.sleep(0.01)
+        assert not api.in_flight
+    asyncio.run(main())
+
+
+def test_invalid_concurrency() -> None:
+    """The concurrency must be positive"""
+    with pytest.raises(ValueError):
+        asyncio.run(publish_many(None, '/', 'amq.topic', [], concurrency=0))  # type: ignore
@@ -0,0 +1,327 @@
+"""Tests for the requester"""
+
+import asyncio
+import time
+from typing import Any, List, Optional
+
+import pytest
+
+from jetblack_rabbitmqmon.instrumentation import LatencyRecorder
+from jetblack_rabbitmqmon import policy
+from jetblack_rabbitmqmon.policy import CircuitBreaker, RetryPolicy
+from jetblack_rabbitmqmon.requester import (
+    CircuitOpenError,
+    Requester,
+    RequestError,
+    RequestTimeoutError
+)
+
+
+class FakeRequester(Requester):
+    """Answers each request after a delay"""
+
+    def __init__(self, delay: float = 0.01, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.calls: List[tuple] = []
+        self.cancelled = 0
+        self.error: Optional[BaseException] = None
+
+    async def request(
+            self,
+            method: str,
+            *args: str,
+            data: Optional[Any] = None,
+            params: Optional[Any] = None
+    ) -> Optional[Any]:
+        self.calls.append((method, args))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return {'path': list(args)}
+
+
+def test_coalesces_identical_gets() -> None:
+    """Concurrent identical GETs share one request"""
+    async def main() -> None:
+        requester = FakeRequester()
+        responses = await asyncio.gather(
+            *(requester.get('queues', '/') for _ in range(5)),
+            requester.get('queues', 'other')
+        )
+        assert len(requester.calls) == 2
+        assert all(response is responses[0] for response in responses[:5])
+        assert requester.coalescing_stats.requests == 2
+        assert requester.coalescing_stats.coalesced == 4
+        assert not requester._in_flight  # pylint: disable=protected-access
+    asyncio.run(main())
+
+
+def test_cancelled_leader_does_not_cancel_followers() -> None:
+    """The first caller being cancelled leaves the request running"""
+    async def main() -> None:
+        requester = FakeRequester()
+        leader = asyncio.create_task(requester.get('overview'))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(requester.get('overview')) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        responses = await asyncio.gather(*followers)
+        assert responses == [{'path': ['overview']}] * 3
+        assert leader.cancelled()
+        assert len(requester.calls) == 1
+        assert requester.cancelled == 0
+    asyncio.run(main())
+
+
+def test_request_cancelled_when_every_caller_is() -> None:
+    """The shared request is cancelled once no caller is waiting"""
+    async def main() -> None:
+        requester = FakeRequester(delay=10)
+        callers = [asyncio.create_task(requester.get('overview')) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        assert requester.cancelled == 0
+        callers[1].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        assert requester.cancelled == 1
+        assert not requester._in_flight  # pylint: disable=protected-access
+    asyncio.run(main())
+
+
+def test_error_is_shared() -> None:
+    """Every caller receives the error of the shared request"""
+    async def main() -> None:
+        requester = FakeRequester()
+        requester.error = RequestError('boom', 404)
+        results = await asyncio.gather(
+            *(requester.get('overview') for _ in range(3)),
+            return_exceptions=True
+        )
+        assert all(isinstance(result, RequestError) for result in results)
+        assert len(requester.calls) == 1
+    asyncio.run(main())
+
+
+def test_no_coalescing() -> None:
+    """Coalescing can be disabled"""
+    async def main() -> None:
+        requester = FakeRequester(coalesce=False)
+        await asyncio.gather(*(requester.get('overview') for _ in range(3)))
+        assert len(requester.calls) == 3
+    asyncio.run(main())
+
+
+def test_non_get_is_not_coalesced() -> None:
+    """Only GET requests are coalesced"""
+    async def main() -> None:
+        requester = FakeRequester()
+        await asyncio.gather(*(requester.put('vhosts', 'a') for _ in range(2)))
+        assert len(requester.calls) == 2
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('delay', [0.0, 0.01])
+def test_sequential_gets_are_not_coalesced(delay: float) -> None:
+    """A GET made after another completes is sent again"""
+    async def main() -> None:
+        requester = FakeRequester(delay=delay)
+        await requester.get('overview')
+        await requester.get('overview')
+        assert len(requester.calls) == 2
+    asyncio.run(main())
+
+
+def test_iter_content_not_supported() -> None:
+    """A requester which cannot stream fails when the stream is requested,
+    so the api can fall back to a plain request"""
+    with pytest.raises(NotImplementedError):
+        FakeRequester().iter_content('definitions')
+
+
+async def _open_circuit(requester: FakeRequester) -> CircuitBreaker:
+    breaker = requester.circuit_breaker
+    assert breaker is not None
+    requester.error = RequestError('unavailable', 503)
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(RequestError):
+            await requester.send('GET', 'overview')
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        await requester.send('GET', 'overview')
+    requester.error = None
+    await asyncio.sleep(breaker.reset_timeout)
+    return breaker
+
+
+def test_breaker_closes_after_successful_trial() -> None:
+    """A successful trial request closes the circuit"""
+    async def main() -> None:
+        requester = FakeRequester(
+            delay=0,
+            circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+        )
+        breaker = await _open_circuit(requester)
+        await requester.send('GET', 'overview')
+        assert breaker.state == CircuitBreaker.CLOSED
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('error', [ValueError('bad json'), None])
+def test_breaker_reopens_after_abandoned_trial(error: Optional[Exception]) -> None:
+    """A trial request which is cancelled or fails unexpectedly opens the
+    circuit again, rather than leaving it half-open"""
+    async def main() -> None:
+        requester = FakeRequester(
+            delay=0,
+            circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+        )
+        breaker = await _open_circuit(requester)
+        if error is not None:
+            requester.error = error
+            with pytest.raises(ValueError):
+                await requester.send('GET', 'overview')
+        else:
+            requester.delay = 10
+            task = asyncio.create_task(requester.send('GET', 'overview'))
+            await asyncio.sleep(0.01)
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            requester.delay = 0
+        assert breaker.state == CircuitBreaker.OPEN
+        requester.error = None
+        await asyncio.sleep(breaker.reset_timeout)
+        await requester.send('GET', 'overview')
+        assert breaker.state == CircuitBreaker.CLOSED
+    asyncio.run(main())
+
+
+def test_instrumentation_reports_each_outcome() -> None:
+    """Each attempt is reported as a success, an error or a cancellation"""
+    async def main() -> None:
+        recorder = LatencyRecorder()
+        requester = FakeRequester(delay=0, coalesce=False, instrumentation=recorder)
+        await requester.get('queues', '/', 'orders')
+        requester.error = RequestError('not found', 404)
+        with pytest.raises(RequestError):
+            await requester.get('queues', '/', 'orders')
+        requester.error = None
+        requester.delay = 10
+        task = asyncio.create_task(requester.get('queues', '/', 'orders'))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        stats = recorder.endpoints[('GET', 'queues/{vhost}/{name}')]
+        assert (stats.latency.count, stats.errors, stats.cancelled) == (1, 1, 1)
+        assert recorder.report()['GET queues/{vhost}/{name}']['cancelled'] == 1
+    asyncio.run(main())
+
+
+def test_retry_backoff_limits(monkeypatch) -> None:
+    """The limit of the retry delay doubles up to the maximum"""
+    monkeypatch.setattr(policy.random, 'uniform', lambda low, high: high)
+    retry = RetryPolicy(base_delay=0.1, max_delay=0.5)
+    assert [retry.delay(attempt) for attempt in range(1, 6)] == pytest.approx(
+        [0.1, 0.2, 0.4, 0.5, 0.5]
+    )
+    monkeypatch.undo()
+    assert all(0 <= retry.delay(3) <= 0.4 for _ in range(100))
+
+
+@pytest.mark.parametrize('method,status,attempts', [
+    ('GET', 503, 3),
+    ('GET', None, 3),
+    ('GET', 404, 1),
+    ('PUT', 503, 1),
+    ('POST', 503, 1),
+])
+def test_retry_transient_gets_only(method: str, status: Optional[int], attempts: int) -> None:
+    """Only transient failures of the retryable methods are retried"""
+    async def main() -> None:
+        requester = FakeRequester(
+            delay=0,
+            coalesce=False,
+            retry=RetryPolicy(max_attempts=3, base_delay=0)
+        )
+        requester.error = RequestError('failed', status)
+        with pytest.raises(RequestError):
+            await requester.send(method, 'vhosts', 'a')
+        assert len(requester.calls) == attempts
+    asyncio.run(main())
+
+
+def test_retry_succeeds() -> None:
+    """A retry which succeeds returns the response"""
+    class FlakyRequester(FakeRequester):
+        """Fails the first request"""
+
+        async def request(self, method: str, *args: str, **kwargs: Any) -> Optional[Any]:
+            self.error = RequestError('unavailable', 503) if not self.calls else None
+            return await super().request(method, *args, **kwargs)
+
+    async def main() -> None:
+        requester = FlakyRequester(delay=0, retry=RetryPolicy(base_delay=0))
+        assert await requester.send('GET', 'overview') == {'path': ['overview']}
+        assert len(requester.calls) == 2
+    asyncio.run(main())
+
+
+def test_attempt_timeout() -> None:
+    """Each attempt is limited by the timeout and cancelled when it expires"""
+    async def main() -> None:
+        requester = FakeRequester(
+            delay=10,
+            timeout=0.01,
+            retry=RetryPolicy(max_attempts=2, base_delay=0)
+        )
+        with pytest.raises(RequestTimeoutError) as error:
+            await requester.send('GET', 'overview')
+        assert error.value.is_transient
+        assert len(requester.calls) == 2
+        assert requester.cancelled == 2
+    asyncio.run(main())
+
+
+def test_deadline_limits_attempts() -> None:
+    """The deadline limits the last attempt to the time remaining"""
+    async def main() -> None:
+        requester = FakeRequester(
+            delay=10,
+            timeout=0.05,
+            deadline=0.08,
+            retry=RetryPolicy(max_attempts=10, base_delay=0)
+        )
+        start = time.monotonic()
+        with pytest.raises(RequestTimeoutError):
+            await requester.send('GET', 'overview')
+        assert time.monotonic() - start < 0.5
+        assert len(requester.calls) == 2
+    asyncio.run(main())
+
+
+def test_deadline_skips_retry_past_it(monkeypatch) -> None:
+    """A retry is not attempted when its delay would pass the deadline"""
+    monkeypatch.setattr(policy.random, 'uniform', lambda low, high: high)
+
+    async def main() -> None:
+        requester = FakeRequester(
+            delay=0,
+            deadline=1,
+            retry=RetryPolicy(base_delay=5, max_delay=5)
+        )
+        requester.error = RequestError('unavailable', 503)
+        start = time.monotonic()
+        with pytest.raises(RequestError):
+            await requester.send('GET', 'overview')
+        assert time.monotonic() - start < 0.5
+        assert len(requester.calls) == 1
+    asyncio.run(main())
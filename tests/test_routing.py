@@ -0,0 +1,155 @@
+"""Tests for the routing index"""
+
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from jetblack_rabbitmqmon.routing import RoutingIndex
+
+
+def _exchange(name: str, exchange_type: str, **arguments: Any) -> Dict[str, Any]:
+    return {'vhost': '/', 'name': name, 'type': exchange_type, 'arguments': arguments}
+
+
+def _binding(
+        source: str,
+        destination: str,
+        routing_key: str = '',
+        destination_type: str = 'queue',
+        arguments: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return {
+        'vhost': '/',
+        'source': source,
+        'destination': destination,
+        'destination_type': destination_type,
+        'routing_key': routing_key,
+        'arguments': arguments or {},
+    }
+
+
+TOPIC_BINDINGS = {
+    'exact': 'stock.usd.nyse',
+    'star': 'stock.*.nyse',
+    'leading_star': '*.usd.*',
+    'hash': 'stock.#',
+    'only_hash': '#',
+    'middle_hash': 'stock.#.nyse',
+    'double_hash': '#.usd.#',
+    'trailing_star': 'stock.usd.*',
+    'empty_word': 'stock..nyse',
+}
+
+
+@pytest.fixture(name='topic_index')
+def fixture_topic_index() -> RoutingIndex:
+    return RoutingIndex(
+        [_exchange('topic', 'topic')],
+        [_binding('topic', queue, key) for queue, key in TOPIC_BINDINGS.items()]
+    )
+
+
+@pytest.mark.parametrize('routing_key,queues', [
+    ('stock.usd.nyse', {
+        'exact', 'star', 'leading_star', 'hash', 'only_hash', 'middle_hash',
+        'double_hash', 'trailing_star'
+    }),
+    ('stock.eur.nyse', {'star', 'hash', 'only_hash', 'middle_hash'}),
+    ('stock', {'hash', 'only_hash'}),
+    ('stock.nyse', {'hash', 'only_hash', 'middle_hash'}),
+    ('stock.a.b.c.nyse', {'hash', 'only_hash', 'middle_hash'}),
+    ('usd', {'only_hash', 'double_hash'}),
+    ('bond.usd', {'only_hash', 'double_hash'}),
+    ('stock.usd', {'hash', 'only_hash', 'double_hash'}),
+    ('', {'only_hash'}),
+    ('stock..nyse', {'hash', 'only_hash', 'middle_hash', 'star', 'empty_word'}),
+])
+def test_topic(topic_index: RoutingIndex, routing_key: str, queues: set) -> None:
+    """'*' matches exactly one word and '#' zero or more"""
+    assert topic_index.route('/', 'topic', routing_key) == queues
+
+
+def test_topic_many_hashes() -> None:
+    """Patterns of many '#' words are matched without backtracking blowing up"""
+    index = RoutingIndex(
+        [_exchange('topic', 'topic')],
+        [_binding('topic', 'q', '.'.join(['#'] * 20) + '.end')]
+    )
+    assert index.route('/', 'topic', '.'.join(['word'] * 50) + '.end') == {'q'}
+    assert index.route('/', 'topic', '.'.join(['word'] * 50)) == set()
+
+
+def test_direct_fanout_and_exchange_bindings() -> None:
+    """Exchange to exchange bindings and alternate exchanges are followed"""
+    index = RoutingIndex(
+        [
+            _exchange('direct', 'direct', **{'alternate-exchange': 'unrouted'}),
+            _exchange('fanout', 'fanout'),
+            _exchange('unrouted', 'fanout'),
+        ],
+        [
+            _binding('direct', 'orders', 'order'),
+            _binding('direct', 'fanout', 'audit', destination_type='exchange'),
+            _binding('fanout', 'audit'),
+            _binding('fanout', 'direct', destination_type='exchange'),
+            _binding('unrouted', 'dead'),
+        ],
+        [{'vhost': '/', 'name': 'orders'}]
+    )
+    assert index.route('/', 'direct', 'order') == {'orders'}
+    assert index.route('/', 'direct', 'audit') == {'audit'}
+    assert index.route('/', 'direct', 'other') == {'dead'}
+    assert index.route('/', '', 'orders') == {'orders'}
+    with pytest.raises(ValueError):
+        index.route('/', 'missing', 'order')
+
+
+@pytest.mark.parametrize('headers,queues', [
+    ({'format': 'pdf', 'type': 'report'}, {'all', 'any'}),
+    ({'format': 'pdf'}, {'any'}),
+    ({'format': 'zip', 'type': 'log'}, set()),
+    (None, set()),
+])
+def test_headers(headers: Optional[Dict[str, Any]], queues: set) -> None:
+    """Headers exchanges match all or any of the binding arguments"""
+    bindings: List[Dict[str, Any]] = [
+        _binding('headers', 'all', arguments={'x-match': 'all', 'format': 'pdf', 'type': 'report'}),
+        _binding('headers', 'any', arguments={'x-match': 'any', 'format': 'pdf', 'type': 'report'}),
+    ]
+    index = RoutingIndex([_exchange('headers', 'headers')], bindings)
+    assert index.route('/', 'headers', '', headers) == queues
+
+
+def test_built_in_exchanges_from_definitions() -> None:
+    """Bindings from the built in exchanges, which definitions do not list,
+    are kept"""
+    index = RoutingIndex.from_definitions({
+        'exchanges': [_exchange('orders', 'direct')],
+        'bindings': [
+            _binding('amq.topic', 'trades', 'stock.#'),
+            _binding('amq.fanout', 'audit'),
+            _binding('amq.match', 'reports', arguments={'format': 'pdf'}),
+            {**_binding('amq.direct', 'fills', 'fill'), 'vhost': 'prd'},
+        ],
+        'queues': [{'vhost': '/', 'name': 'orders'}],
+    })
+    assert index.route('/', 'amq.topic', 'stock.usd') == {'trades'}
+    assert index.route('/', 'amq.fanout', 'any') == {'audit'}
+    assert index.route('/', 'amq.match', '', {'format': 'pdf'}) == {'reports'}
+    assert index.route('/', 'amq.headers', '', {'format': 'pdf'}) == set()
+    assert index.route('prd', 'amq.direct', 'fill') == {'fills'}
+    assert index.route('/', '', 'orders') == {'orders'}
+    with pytest.raises(ValueError):
+        index.route('other', 'amq.topic', 'stock.usd')
+
+
+def test_listed_built_in_exchanges_are_kept() -> None:
+    """A built in exchange which is listed keeps its arguments"""
+    index = RoutingIndex(
+        [
+            _exchange('amq.direct', 'direct', **{'alternate-exchange': 'unrouted'}),
+            _exchange('unrouted', 'fanout'),
+        ],
+        [_binding('unrouted', 'dead')]
+    )
+    assert index.route('/', 'amq.direct', 'missing') == {'dead'}
@@ -0,0 +1,192 @@
+"""Tests for the cluster snapshots"""
+
+import asyncio
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import pytest
+
+from jetblack_rabbitmqmon.snapshot import SNAPSHOT_ENDPOINTS, take_snapshot
+
+CONNECTION = '127.0.0.1:50000 -> 127.0.0.1:5672'
+CHANNEL = f'{CONNECTION} (1)'
+
+PAYLOADS: Mapping[str, Any] = {
+    'overview': {'cluster_name': 'rabbit@a'},
+    'nodes': [{'name': 'rabbit@a'}],
+    'vhosts': [{'name': '/'}],
+    'connections': [{'name': CONNECTION, 'vhost': '/'}],
+    'channels': [
+        {'name': CHANNEL, 'vhost': '/', 'connection_details': {'name': CONNECTION}},
+        {'name': 'orphan (1)', 'vhost': '/', 'connection_details': {'name': 'gone'}},
+    ],
+    'queues': [
+        {'vhost': '/', 'name': 'orders'},
+        {'vhost': '/', 'name': 'idle'},
+    ],
+    'exchanges': [
+        {'vhost': '/', 'name': 'trades', 'type': 'topic'},
+        {'vhost': '/', 'name': 'audit', 'type': 'fanout'},
+    ],
+    'bindings': [
+        {
+            'vhost': '/',
+            'source': 'trades',
+            'destination': 'orders',
+            'destination_type': 'queue',
+            'routing_key': 'order.#',
+            'arguments': {},
+            'properties_key': 'order.%23',
+        },
+        {
+            'vhost': '/',
+            'source': 'trades',
+            'destination': 'audit',
+            'destination_type': 'exchange',
+            'routing_key': '#',
+            'arguments': {},
+            'properties_key': '%23',
+        },
+    ],
+    'consumers': [
+        {
+            'queue': {'vhost': '/', 'name': 'orders'},
+            'channel_details': {'name': CHANNEL, 'connection_name': CONNECTION},
+            'consumer_tag': 'ctag-1',
+        },
+        {
+            'queue': {'vhost': '/', 'name': 'deleted'},
+            'channel_details': {'name': 'gone (1)', 'connection_name': 'gone'},
+            'consumer_tag': 'ctag-2',
+        },
+    ],
+}
+
+
+class FakeApi:
+    """Answers each endpoint after a delay, or fails"""
+
+    def __init__(self, delays: Optional[Mapping[str, float]] = None) -> None:
+        self.delays = delays or {}
+        self.failing: Dict[str, Exception] = {}
+        self.columns: Dict[str, Optional[Sequence[str]]] = {}
+
+    async def _fetch(self, endpoint: str, columns: Optional[Sequence[str]] = None) -> Any:
+        self.columns[endpoint] = columns
+        await asyncio.sleep(self.delays.get(endpoint, 0))
+        error = self.failing.get(endpoint)
+        if error is not None:
+            raise error
+        return PAYLOADS[endpoint]
+
+    async def get_overview(self) -> Any:
+        return await self._fetch('overview')
+
+    async def get_bindings(self) -> Any:
+        return await self._fetch('bindings')
+
+    async def get_consumers(self) -> Any:
+        return await self._fetch('consumers')
+
+    def __getattr__(self, name: str) -> Any:
+        endpoint = name.removeprefix('get_')
+
+        async def get(columns: Optional[Sequence[str]] = None) -> List[Any]:
+            return await self._fetch(endpoint, columns)
+        return get
+
+
+def test_cross_links() -> None:
+    """Queues, consumers, channels and connections are linked by name"""
+    async def main() -> None:
+        snapshot = await take_snapshot(FakeApi())  # type: ignore[arg-type]
+        assert not snapshot.errors
+        assert snapshot.overview['cluster_name'] == 'rabbit@a'
+
+        queue = snapshot.queues['/', 'orders']
+        consumers = snapshot.consumers_of(queue)
+        assert [consumer.consumer_tag for consumer in consumers] == ['ctag-1']
+        consumer = consumers[0]
+        assert consumer.queue is queue
+        channel = snapshot.channels[CHANNEL]
+        assert consumer.channel is channel
+        connection = snapshot.connections[CONNECTION]
+        assert consumer.connection is connection
+        assert snapshot.consumers_on(channel) == [consumer]
+        assert snapshot.connection_of(channel) is connection
+        assert snapshot.channels_of(connection) == [channel]
+        assert not snapshot.consumers_of(snapshot.queues['/', 'idle'])
+    asyncio.run(main())
+
+
+def test_missing_entities_are_not_linked() -> None:
+    """An entity which refers to one missing from the snapshot has no link"""
+    async def main() -> None:
+        snapshot = await take_snapshot(FakeApi())  # type: ignore[arg-type]
+        orphan = snapshot.consumers[1]
+        assert (orphan.queue, orphan.channel, orphan.connection) == (None, None, None)
+        assert snapshot.connection_of(snapshot.channels['orphan (1)']) is None
+    asyncio.run(main())
+
+
+def test_bindings() -> None:
+    """Bindings are indexed by their source and destination"""
+    async def main() -> None:
+        snapshot = await take_snapshot(FakeApi())  # type: ignore[arg-type]
+        trades = snapshot.exchanges['/', 'trades']
+        audit = snapshot.exchanges['/', 'audit']
+        orders = snapshot.queues['/', 'orders']
+        assert [binding.destination for binding in snapshot.bindings_from(trades)] == [
+            'orders',
+            'audit',
+        ]
+        assert not snapshot.bindings_from(audit)
+        assert [binding.routing_key for binding in snapshot.bindings_to(orders)] == ['order.#']
+        assert [binding.source for binding in snapshot.bindings_to(audit)] == ['trades']
+        assert not snapshot.bindings_to(trades)
+    asyncio.run(main())
+
+
+def test_failed_endpoint_is_recorded() -> None:
+    """An endpoint which fails is recorded, and the others are kept"""
+    async def main() -> None:
+        api = FakeApi()
+        error = ValueError('unavailable')
+        api.failing['channels'] = error
+        snapshot = await take_snapshot(api)  # type: ignore[arg-type]
+        assert snapshot.errors == {'channels': error}
+        assert not snapshot.channels
+        assert len(snapshot.queues) == 2
+        consumer = snapshot.consumers[0]
+        assert consumer.channel is None
+        assert consumer.connection is snapshot.connections[CONNECTION]
+        assert set(snapshot.timings) == set(SNAPSHOT_ENDPOINTS)
+    asyncio.run(main())
+
+
+def test_timings() -> None:
+    """Each endpoint is timed, and the endpoints are fetched concurrently"""
+    async def main() -> None:
+        api = FakeApi({'queues': 0.05, 'bindings': 0.05})
+        snapshot = await take_snapshot(
+            api,  # type: ignore[arg-type]
+            columns={'queues': ('vhost', 'name')}
+        )
+        assert snapshot.timings['queues'] >= 0.05
+        assert snapshot.timings['bindings'] >= 0.05
+        assert snapshot.timings['nodes'] < 0.05
+        assert 0.05 <= snapshot.elapsed < 0.1
+        assert api.columns['queues'] == ('vhost', 'name')
+        assert api.columns['nodes'] is None
+    asyncio.run(main())
+
+
+def test_selected_endpoints() -> None:
+    """Only the selected endpoints are fetched, and unknown ones rejected"""
+    async def main() -> None:
+        api = FakeApi()
+        snapshot = await take_snapshot(api, ('queues',))  # type: ignore[arg-type]
+        assert list(api.columns) == ['queues']
+        assert not snapshot.overview and not snapshot.consumers
+        with pytest.raises(ValueError):
+            await take_snapshot(api, ('queues', 'unknown'))  # type: ignore[arg-type]
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""Tests for the entity tables"""
+
+import asyncio
+import math
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+import pytest
+
+from jetblack_rabbitmqmon.table import EntityTable, QueueTable
+
+QUEUES = [
+    {
+        'vhost': '/',
+        'name': 'orders',
+        'node': 'rabbit@a',
+        'state': 'running',
+        'type': 'classic',
+        'messages': 10,
+        'consumers': 2,
+        'message_stats': {'publish_details': {'rate': 1.5}},
+    },
+    {
+        'vhost': 'prd',
+        'name': 'fills',
+        'node': 'rabbit@b',
+        'state': 'idle',
+        'messages': 0,
+    },
+]
+
+
+def test_round_trip() -> None:
+    """The selected fields of each entity are read back unchanged"""
+    table = QueueTable()
+    table.extend(QUEUES)
+    assert len(table) == 2
+    assert [row.key for row in table] == [('/', 'orders'), ('prd', 'fills')]
+    row = table['/', 'orders']
+    assert row.to_dict() == {
+        'vhost': '/',
+        'name': 'orders',
+        'node': 'rabbit@a',
+        'state': 'running',
+        'type': 'classic',
+        'messages': 10.0,
+        'messages_ready': None,
+        'messages_unacknowledged': None,
+        'consumers': 2.0,
+        'memory': None,
+        'message_stats.publish_details.rate': 1.5,
+        'message_stats.deliver_get_details.rate': None,
+        'message_stats.ack_details.rate': None,
+    }
+    fills = table.get('prd', 'fills')
+    assert fills is not None
+    assert fills['type'] is None
+    assert fills['messages'] == 0.0
+    assert table.get('prd', 'missing') is None
+    assert ('prd', 'fills') in table
+
+
+def test_append_replaces_same_key() -> None:
+    """An entity with the same key replaces the existing row"""
+    table = QueueTable()
+    table.extend(QUEUES)
+    table.append({'vhost': '/', 'name': 'orders', 'messages': 3, 'consumers': 'n/a'})
+    assert len(table) == 2
+    row = table['/', 'orders']
+    assert row['messages'] == 3.0
+    assert row['consumers'] is None
+    assert row['node'] is None
+
+
+def test_column_access() -> None:
+    """Columns are returned as lists of text or arrays of doubles"""
+    table = QueueTable()
+    table.extend(QUEUES)
+    assert list(table.column('node')) == ['rabbit@a', 'rabbit@b']
+    messages = table.column('messages')
+    assert list(messages) == [10.0, 0.0]
+    consumers = table.column('consumers')
+    assert consumers[0] == 2.0
+    assert math.isnan(consumers[1])
+    with pytest.raises(KeyError):
+        table.column('missing')
+
+
+def test_row_get() -> None:
+    """A row returns the default for missing columns and values"""
+    table = QueueTable()
+    table.extend(QUEUES)
+    row = table['prd', 'fills']
+    assert row.get('consumers', 0) == 0
+    assert row.get('missing', 'default') == 'default'
+    assert row.get('state') == 'idle'
+    with pytest.raises(KeyError):
+        row['missing']  # pylint: disable=pointless-statement
+
+
+def test_selected_columns_and_interning() -> None:
+    """Only the selected columns are kept, and repeated text is shared"""
+    table = EntityTable(text_columns=('vhost',), number_columns=('messages',))
+    name = ''.join(['v', 'host'])
+    table.extend(
+        {'name': str(index), 'vhost': name, 'messages': index, 'ignored': 1}
+        for index in range(3)
+    )
+    assert table.column_names == ['name', 'vhost', 'messages']
+    vhosts = table.column('vhost')
+    assert vhosts[0] is vhosts[1] is vhosts[2]
+
+
+def test_load() -> None:
+    """Loading pages through the queues with only the table's columns"""
+    class FakeApi:
+        """Yields the queues"""
+
+        def __init__(self) -> None:
+            self.columns: Optional[Sequence[str]] = None
+
+        async def iter_queues(
+                self,
+                page_size: int,
+                name: Optional[str],
+                use_regex: bool,
+                columns: Sequence[str]
+        ) -> AsyncIterator[Any]:
+            """Yield the queues"""
+            assert (page_size, name, use_regex) == (100, 'o', False)
+            self.columns = columns
+            for queue in QUEUES:
+                yield queue
+
+    async def main() -> None:
+        api = FakeApi()
+        table = await QueueTable().load(api, 100, 'o')  # type: ignore[arg-type]
+        assert len(table) == 2
+        columns: List[str] = list(api.columns or ())
+        assert columns == table.column_names
+    asyncio.run(main())
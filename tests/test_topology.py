@@ -0,0 +1,232 @@
+"""Tests for the topology planner"""
+
+import asyncio
+from typing import Any, Dict, List, Mapping, Tuple
+
+from jetblack_rabbitmqmon.topology import (
+    BindingSpec,
+    ExchangeSpec,
+    PolicySpec,
+    QueueSpec,
+    Topology,
+    TopologyChange
+)
+
+DEFINITIONS: Mapping[str, Any] = {
+    'exchanges': [
+        {'name': 'amq.direct', 'type': 'direct', 'durable': True},
+        {
+            'name': 'orders',
+            'type': 'topic',
+            'durable': True,
+            'auto_delete': False,
+            'internal': False,
+            'arguments': {},
+        },
+        {
+            'name': 'old',
+            'type': 'fanout',
+            'durable': True,
+            'auto_delete': False,
+            'internal': False,
+            'arguments': {},
+        },
+    ],
+    'queues': [
+        {
+            'name': 'fills',
+            'durable': True,
+            'auto_delete': False,
+            'arguments': {'x-queue-type': 'classic'},
+        },
+        {'name': 'stale', 'durable': True, 'auto_delete': False, 'arguments': {}},
+    ],
+    'bindings': [
+        {
+            'source': 'orders',
+            'destination': 'fills',
+            'destination_type': 'queue',
+            'routing_key': 'fill.#',
+            'arguments': {},
+        },
+        {
+            'source': 'old',
+            'destination': 'fills',
+            'destination_type': 'queue',
+            'routing_key': '',
+            'arguments': {},
+        },
+    ],
+    'policies': [
+        {
+            'name': 'ttl',
+            'pattern': '.*',
+            'definition': {'message-ttl': 1000},
+            'priority': 0,
+            'apply-to': 'queues',
+        },
+        {
+            'name': 'unused',
+            'pattern': 'x',
+            'definition': {'max-length': 1},
+            'priority': 0,
+            'apply-to': 'all',
+        },
+    ],
+}
+
+
+def _topology() -> Topology:
+    return (
+        Topology('/')
+        .exchange('orders', 'topic')
+        .exchange('audit', 'fanout')
+        .queue('fills')
+        .queue('audit')
+        .bind('orders', 'fills', routing_key='fill.#')
+        .bind('audit', 'audit')
+        .policy('ttl', '.*', {'message-ttl': 2000}, apply_to='queues')
+    )
+
+
+def _summary(changes: List[TopologyChange]) -> List[Tuple[str, str]]:
+    return [(change.action, str(change.spec)) for change in changes]
+
+
+def test_diff() -> None:
+    """Missing objects are created, changed policies updated, and changed
+    exchanges and queues reported as conflicts"""
+    plan = _topology().diff(DEFINITIONS)
+    assert _summary(plan.changes) == [
+        ('create', 'exchange audit (fanout)'),
+        ('create', 'queue audit'),
+        ('update', 'policy ttl (.*)'),
+        ('create', 'binding audit -> queue audit []'),
+    ]
+    assert not plan.conflicts
+
+    topology = Topology('/').exchange('orders', 'direct').queue('fills', durable=False)
+    plan = topology.diff(DEFINITIONS)
+    assert _summary(plan.conflicts) == [
+        ('conflict', 'exchange orders (direct)'),
+        ('conflict', 'queue fills'),
+    ]
+    assert plan.conflicts[0].current is DEFINITIONS['exchanges'][1]
+
+
+def test_diff_matches_current() -> None:
+    """A topology which matches the definitions has no changes"""
+    topology = (
+        Topology('/')
+        .exchange('orders', 'topic')
+        .queue('fills', arguments={'x-queue-type': 'classic'})
+        .bind('orders', 'fills', routing_key='fill.#')
+        .policy('ttl', '.*', {'message-ttl': 1000}, apply_to='queues')
+    )
+    assert not topology.diff(DEFINITIONS)
+    assert str(topology.diff(DEFINITIONS)) == '/: no changes'
+
+
+def test_prune() -> None:
+    """Pruning deletes what is not in the topology, except the built in
+    exchanges"""
+    plan = _topology().diff(DEFINITIONS, prune=True)
+    deletes = [
+        change for change in plan.changes
+        if change.action == TopologyChange.DELETE
+    ]
+    assert _summary(deletes) == [
+        ('delete', 'binding old -> queue fills []'),
+        ('delete', 'exchange old (fanout)'),
+        ('delete', 'queue stale'),
+        ('delete', 'policy unused (x)'),
+    ]
+    assert all(change.current is not None for change in deletes)
+    assert not any('amq.' in str(change.spec) for change in plan.changes)
+
+
+class FakeApi:
+    """Records the changes applied"""
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, Tuple[Any, ...]]] = []
+        self.failing: Dict[str, Exception] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        async def call(*args: Any) -> Any:
+            self.calls.append((name, args))
+            # Let the other changes of a stage run before this one completes.
+            await asyncio.sleep(0)
+            error = self.failing.get(name)
+            if error is not None:
+                raise error
+            if name == 'get_vhost_exchange_queue_bindings':
+                return [{'routing_key': '', 'arguments': {}, 'properties_key': '~'}]
+            if name == 'get_vhost_definitions':
+                return DEFINITIONS
+            return None
+        return call
+
+
+def test_apply_orders_stages() -> None:
+    """Old bindings are removed first, then exchanges, queues and policies
+    are changed, and new bindings are created last"""
+    async def main() -> None:
+        api = FakeApi()
+        plan = await _topology().plan(api, prune=True)  # type: ignore[arg-type]
+        result = await plan.apply(api, concurrency=2)  # type: ignore[arg-type]
+        assert not result.failed
+        assert len(result.applied) == len(plan)
+        names = [name for name, _ in api.calls]
+        assert names[0] == 'get_vhost_definitions'
+        assert names[1:4] == [
+            'get_vhost_exchange_queue_bindings',
+            'delete_vhost_exchange_queue_binding_props',
+            # The entities stage starts once the old bindings are gone.
+            'create_vhost_exchange',
+        ]
+        assert names[-1] == 'create_vhost_exchange_queue_binding'
+        assert ('delete_vhost_queue', ('/', 'stale', True, True)) in api.calls
+        assert ('delete_vhost_exchange', ('/', 'old', True)) in api.calls
+        assert (
+            'delete_vhost_exchange_queue_binding_props',
+            ('/', 'old', 'fills', '~')
+        ) in api.calls
+    asyncio.run(main())
+
+
+def test_apply_records_failures() -> None:
+    """A failed change is recorded and does not stop the others"""
+    async def main() -> None:
+        api = FakeApi()
+        error = ValueError('failed')
+        api.failing['create_vhost_queue'] = error
+        plan = _topology().diff(DEFINITIONS)
+        result = await plan.apply(api)  # type: ignore[arg-type]
+        assert [(str(change.spec), raised) for change, raised in result.failed] == [
+            ('queue audit', error)
+        ]
+        assert len(result.applied) == len(plan) - 1
+    asyncio.run(main())
+
+
+def test_conflicts_are_not_applied() -> None:
+    """Conflicts are reported but never applied"""
+    async def main() -> None:
+        api = FakeApi()
+        plan = Topology('/').exchange('orders', 'direct').diff(DEFINITIONS)
+        result = await plan.apply(api)  # type: ignore[arg-type]
+        assert not api.calls
+        assert not result.applied and not result.failed
+    asyncio.run(main())
+
+
+def test_binding_spec_key() -> None:
+    """Bindings are identified by all their properties"""
+    first = BindingSpec('a', 'b', arguments={'x': 1, 'y': 2})
+    second = BindingSpec('a', 'b', arguments={'y': 2, 'x': 1})
+    assert first.key == second.key
+    assert BindingSpec('a', 'b', routing_key='k').key != first.key
+    assert str(ExchangeSpec('e')) == 'exchange e (direct)'
+    assert str(QueueSpec('q')) == 'queue q'
+    assert str(PolicySpec('p', '.*', {})) == 'policy p (.*)'
@@ -0,0 +1,121 @@
+"""Tests for the OpenTelemetry tracing"""
+
+import asyncio
+from typing import Any, Optional
+
+import pytest
+
+pytest.importorskip('opentelemetry.sdk')
+
+# pylint: disable=wrong-import-position
+from opentelemetry.sdk.trace import TracerProvider  # noqa: E402
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (  # noqa: E402
+    InMemorySpanExporter
+)
+from opentelemetry.trace import StatusCode  # noqa: E402
+
+from jetblack_rabbitmqmon.api import Api  # noqa: E402
+from jetblack_rabbitmqmon.requester import RequestError  # noqa: E402
+from jetblack_rabbitmqmon.tracing import TracingInstrumentation, trace_api  # noqa: E402
+
+from test_requester import FakeRequester  # noqa: E402
+
+
+def test_request_spans() -> None:
+    """Each attempt has a span, which is ended however it finishes"""
+    async def main() -> None:
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        requester = FakeRequester(
+            delay=0,
+            coalesce=False,
+            instrumentation=TracingInstrumentation(provider)
+        )
+        await requester.get('queues', '/', 'orders')
+        requester.error = RequestError('not found', 404)
+        with pytest.raises(RequestError):
+            await requester.get('queues', '/')
+        requester.error = None
+        requester.delay = 10
+        task = asyncio.create_task(requester.get('overview'))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        succeeded, failed, cancelled = exporter.get_finished_spans()
+        assert succeeded.name == 'GET queues/{vhost}/{name}'
+        assert succeeded.status.status_code == StatusCode.UNSET
+        assert failed.name == 'GET queues/{vhost}'
+        assert failed.attributes is not None
+        assert failed.attributes['http.response.status_code'] == 404
+        assert failed.status.status_code == StatusCode.ERROR
+        assert cancelled.name == 'GET overview'
+        assert cancelled.attributes is not None
+        assert cancelled.attributes['error.type'] == 'cancelled'
+        assert cancelled.status.status_code == StatusCode.ERROR
+    asyncio.run(main())
+
+
+class PagedRequester(FakeRequester):
+    """Answers the queue list a page of two items at a time"""
+
+    async def request(
+            self,
+            method: str,
+            *args: str,
+            data: Optional[Any] = None,
+            params: Optional[Any] = None
+    ) -> Optional[Any]:
+        response = await super().request(method, *args, data=data, params=params)
+        if params is None or 'page' not in params:
+            return response
+        page = params['page']
+        return {
+            'items': [{'name': f'q{page}{index}'} for index in range(2)],
+            'page': page,
+            'page_count': 2,
+        }
+
+
+def test_trace_api() -> None:
+    """Api methods have spans with the names they are given, which are the
+    parents of the request spans"""
+    async def main() -> None:
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        requester = PagedRequester(
+            delay=0,
+            instrumentation=TracingInstrumentation(provider)
+        )
+        api = trace_api(Api(requester), provider)
+
+        await api.get_vhost_queue('/', 'orders')
+        names = [item['name'] async for item in api.iter_vhost_queues('prd', page_size=2)]
+        assert names == ['q10', 'q11', 'q20', 'q21']
+
+        request, method, *page_requests, iterator = exporter.get_finished_spans()
+        assert method.name == 'Api.get_vhost_queue'
+        assert method.attributes is not None
+        assert method.attributes['rabbitmq.operation'] == 'get_vhost_queue'
+        assert method.attributes['rabbitmq.vhost'] == '/'
+        assert method.attributes['rabbitmq.queue'] == 'orders'
+        assert request.name == 'GET queues/{vhost}/{name}'
+        assert request.parent is not None and method.context is not None
+        assert request.parent.span_id == method.context.span_id
+        assert request.context is not None
+        assert request.context.trace_id == method.context.trace_id
+
+        assert iterator.name == 'Api.iter_vhost_queues'
+        assert iterator.attributes is not None
+        assert iterator.attributes['rabbitmq.vhost'] == 'prd'
+        assert iterator.attributes['rabbitmq.items'] == 4
+        assert iterator.context is not None
+        assert [span.name for span in page_requests] == ['GET queues/{vhost}'] * 2
+        for span in page_requests:
+            assert span.parent is not None
+            assert span.parent.span_id == iterator.context.span_id
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""Tests for the vhost queue"""
+
+import asyncio
+from base64 import b64encode
+from typing import Any, AsyncIterator, List, Mapping, Optional, Tuple
+
+import pytest
+
+from jetblack_rabbitmqmon.vhost_queue import VHostQueue
+
+
+class FakeApi:
+    """Serves messages with base64 encoded payloads"""
+
+    def __init__(self, bodies: List[bytes]) -> None:
+        self.bodies = bodies
+        self.requests: List[int] = []
+        self.deleted: Tuple[Any, ...] = ()
+        self.payload_bytes: Optional[int] = None
+        self.closed = 0
+
+    async def iter_vhost_queue_messages(
+            self,
+            vhost: str,
+            name: str,
+            count: int,
+            requeue: bool,
+            *args: Any
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        self.requests.append(count)
+        bodies = self.bodies[:count]
+        if not requeue:
+            del self.bodies[:count]
+        try:
+            for body in bodies:
+                yield {
+                    'exchange': '',
+                    'routing_key': name,
+                    'redelivered': False,
+                    'message_count': 0,
+                    'payload_encoding': 'base64',
+                    'payload_bytes': self.payload_bytes or len(body),
+                    'payload': b64encode(body).decode('ascii'),
+                    'properties': {},
+                }
+        finally:
+            self.closed += 1
+
+    async def delete_vhost_queue(self, *args: Any) -> None:
+        self.deleted = args
+
+
+def _read(api: FakeApi, **kwargs: Any) -> List[bytes]:
+    async def main() -> List[bytes]:
+        queue = VHostQueue(api, vhost='/', name='q')  # type: ignore
+        return [message.body async for message in queue.iter_messages(**kwargs)]
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('requeue', [True, False])
+def test_budget_counts_decoded_bytes(requeue: bool) -> None:
+    """The budget is measured in payload bytes, not base64 text"""
+    api = FakeApi([bytes(30)] * 10)
+    # The base64 payloads are 40 characters, so 3 would exceed 100 bytes.
+    bodies = _read(api, count=10, batch=1, max_bytes=100, requeue=requeue)
+    assert len(bodies) == 4
+
+
+def test_budget_counts_untruncated_size() -> None:
+    """The budget counts the size of each message, even when its payload
+    was truncated, and the response is closed when it is spent"""
+    async def main() -> None:
+        api = FakeApi([bytes(10)] * 10)
+        api.payload_bytes = 50
+        queue = VHostQueue(api, vhost='/', name='q')  # type: ignore
+        messages = queue.iter_messages(count=10, max_bytes=100, truncate=10)
+        assert len([message async for message in messages]) == 2
+        assert api.closed == 1
+    asyncio.run(main())
+
+
+def test_drains_in_batches() -> None:
+    """Messages which are not requeued are fetched a batch at a time"""
+    api = FakeApi([b'message'] * 7)
+    assert len(_read(api, count=10, batch=3, requeue=False)) == 7
+    assert api.requests == [3, 3, 3]
+
+
+def test_delete_is_unconditional_by_default() -> None:
+    """A queue is deleted whether or not it is empty or in use, unless asked"""
+    async def main() -> None:
+        api = FakeApi([])
+        queue = VHostQueue(api, vhost='/', name='q')  # type: ignore
+        await queue.delete()
+        assert api.deleted == ('/', 'q', False, False)
+        await queue.delete(if_empty=True, if_unused=True)
+        assert api.deleted == ('/', 'q', True, True)
+    asyncio.run(main())